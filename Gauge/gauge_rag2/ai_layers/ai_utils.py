@@ -11,7 +11,9 @@ from openai import OpenAI
 
 import sys, os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
 import config
+from rag_common.embedding_cache import EmbeddingCache
 
 logger = logging.getLogger(__name__)
 
@@ -125,39 +127,74 @@ def call_ollama_json(prompt: str, system: str = "", retries: int = 3):
 
 # ── Embeddings ────────────────────────────────────────────────────────────────
 
+OPENAI_EMBEDDING_MODEL = "text-embedding-3-small"
+
+_hasher       = None
+_embed_caches: dict[str, EmbeddingCache] = {}
+
+
+def _cached_embeddings(model: str, revision: str, texts: list[str], encode_fn) -> list[list[float]]:
+    """Embed through the shared on-disk cache; only unseen texts reach encode_fn."""
+    cache = _embed_caches.get(model)
+    if cache is None:
+        cache = _embed_caches[model] = EmbeddingCache(model, revision)
+    vectors = cache.encode(texts, encode_fn).tolist()
+    if len(texts) > 1:
+        logger.info(cache.summary())
+    return vectors
+
+
+def _get_hasher():
+    global _hasher
+    if _hasher is None:
+        from rag.hash_embedder import HashingEmbedder
+        _hasher = HashingEmbedder(dims=config.HASH_EMBEDDING_DIMS)
+    return _hasher
+
+
 def get_embedding(text: str) -> list[float]:
     """
     Groq does not offer an embeddings endpoint.
     Uses OpenAI embeddings if configured, otherwise falls back to
-    a deterministic hash-based pseudo-embedding (free, no API needed).
+    a local feature-hashing embedding (free, no API needed).
     """
+    return get_embeddings([text])[0]
+
+
+def get_embeddings(texts: list[str]) -> list[list[float]]:
+    """
+    Batch form of get_embedding — one API call / one vectorised pass.
+    Vectors go through the shared on-disk embedding cache (rag_common), so
+    only texts never embedded before are sent to the API / the hasher.
+    """
+    if not texts:
+        return []
     if config.EMBEDDING_PROVIDER == "openai" and config.OPENAI_API_KEY:
         try:
             from openai import OpenAI as OAI
-            oai  = OAI(api_key=config.OPENAI_API_KEY)
-            resp = oai.embeddings.create(input=text, model="text-embedding-3-small")
-            return resp.data[0].embedding
+            oai = OAI(api_key=config.OPENAI_API_KEY)
+
+            def fetch(batch):
+                resp = oai.embeddings.create(input=batch, model=OPENAI_EMBEDDING_MODEL)
+                return [d.embedding for d in sorted(resp.data, key=lambda d: d.index)]
+
+            return _cached_embeddings(f"openai:{OPENAI_EMBEDDING_MODEL}", "", texts, fetch)
         except Exception as e:
             logger.warning(f"OpenAI embedding failed, falling back to hash: {e}")
 
-    return _hash_embedding(text)
+    hasher = _get_hasher()
+    return _cached_embeddings(f"hash:{hasher.dims}", hasher.REVISION, texts, hasher.embed_batch)
 
 
-def _hash_embedding(text: str, dims: int = 512) -> list[float]:
+def _hash_embedding(text: str, dims: int = None) -> list[float]:
     """
-    Deterministic pseudo-embedding using MD5 hashing.
-    No API or GPU needed. Good enough for RAG retrieval in this project.
+    Deterministic feature-hashing embedding (word + char n-grams).
+    No API or GPU needed. See rag/hash_embedder.py.
     """
-    import hashlib, struct
-    vector = []
-    for i in range(dims):
-        seed = f"{i}:{text}"
-        h    = hashlib.md5(seed.encode()).digest()
-        val  = struct.unpack("f", h[:4])[0]
-        vector.append(val)
-    # L2 normalise
-    mag = sum(v * v for v in vector) ** 0.5
-    return [v / mag for v in vector] if mag else vector
+    if dims and dims != config.HASH_EMBEDDING_DIMS:
+        from rag.hash_embedder import HashingEmbedder
+        return HashingEmbedder(dims=dims).embed(text)
+    return _get_hasher().embed(text)
 
 
 # ── Health check ──────────────────────────────────────────────────────────────
@@ -6,9 +6,11 @@ import os
 import sys
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
 import config
 from ai_layers.ai_utils import call_ollama_json
 from ai_layers.prompt_templates import LAYER3_SYSTEM, LAYER3_PROMPT, RAG_CONTEXT_TEMPLATE
+from rag_common.context_packer import fit_json, pack_chunks
 
 logger = logging.getLogger(__name__)
 
@@ -24,8 +26,8 @@ def generate_strategy(page_understanding: dict, field_analysis: dict, rag_contex
     rag_section = RAG_CONTEXT_TEMPLATE.format(retrieved_chunks=rag_context) if rag_context else "No prior context available."
 
     prompt = LAYER3_PROMPT.format(
-        page_understanding=json.dumps(page_understanding, indent=2),
-        field_analysis=json.dumps(field_analysis, indent=2),
+        page_understanding=fit_json(page_understanding, config.LAYER3_PAGE_TOKENS),
+        field_analysis=fit_json(field_analysis, config.LAYER3_FIELD_TOKENS),
         rag_context=rag_section,
     )
 
@@ -57,13 +59,16 @@ def generate_all_strategies(
         url = pa.get("url", pa.get("_raw_url", ""))
         fa  = field_map.get(url, {"url": url, "forms": []})
 
-        # Fetch RAG context if retriever is available
+        # Fetch RAG context if retriever is available: more candidates than fit,
+        # packed to RAG_CONTEXT_TOKENS without near-duplicate history entries
         rag_context = ""
         if retriever:
             try:
                 query = f"{pa.get('page_type', '')} {pa.get('page_purpose', '')} {url}"
-                chunks = retriever.retrieve(query)
-                rag_context = "\n\n".join(chunks)
+                chunks = retriever.retrieve(query, top_k=config.RAG_CANDIDATES)
+                packed = pack_chunks(chunks, config.RAG_CONTEXT_TOKENS)
+                rag_context = packed.texts["context"]
+                logger.debug(f"[Layer 3] RAG context: {packed.summary()}")
             except Exception as e:
                 logger.warning(f"[Layer 3] RAG retrieval failed: {e}")
 
@@ -0,0 +1,159 @@
+"""
+benchmarks/bench_hash_embedder.py
+=================================
+Speed and retrieval quality of the offline embedders:
+
+  md5      the previous _hash_embedding (512 MD5 digests per text)
+  hashing  rag/hash_embedder.HashingEmbedder (word + char n-gram feature hashing)
+
+Speed: per-text latency of embed(), and per-text cost of embed_batch() over
+--texts synthetic texts, for short (8-30 word) and long (150-250 word) texts.
+
+Quality: retrieval over knowledge_base/site_knowledge.json with two query sets
+  holdout     index "title + steps", query with the pattern's description
+  paraphrase  hand-written queries that share few exact words with the target
+reported as recall@1, recall@3 and MRR.
+
+Usage:
+    python benchmarks/bench_hash_embedder.py
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import struct
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+from rag.hash_embedder import HashingEmbedder
+
+# (query, title of the expected knowledge-base pattern)
+PARAPHRASES = [
+    ("user signs in with correct email and password", "Login Form - Valid Credentials"),
+    ("wrong password should show an error on sign in", "Login Form - Invalid Credentials"),
+    ("create a new account successfully", "Registration - Happy Path"),
+    ("sign up using an email that is already registered", "Registration - Duplicate Email"),
+    ("submit form leaving mandatory inputs blank", "Required Field Validation"),
+    ("malformed e-mail address rejected", "Email Field Validation"),
+    ("put an item in the basket", "Add Product to Cart"),
+    ("complete purchase and pay for the order", "Checkout Flow"),
+    ("look up an existing product by keyword", "Search Returns Results"),
+    ("query for nonsense term gives empty results page", "Search with No Results"),
+    ("menu links open the right pages", "Navigation Links Work"),
+    ("keyboard only users can reach every control", "Tab Navigation"),
+]
+
+
+def md5_embedding(text, dims=512):
+    vector = []
+    for i in range(dims):
+        h = hashlib.md5(f"{i}:{text}".encode()).digest()
+        vector.append(struct.unpack("f", h[:4])[0])
+    mag = sum(v * v for v in vector) ** 0.5
+    return [v / mag for v in vector] if mag else vector
+
+
+def _matrix(fn, texts):
+    m = np.asarray([fn(t) for t in texts], dtype=np.float64)
+    m = np.nan_to_num(m)
+    norms = np.linalg.norm(m, axis=1, keepdims=True)
+    return np.divide(m, norms, out=np.zeros_like(m), where=norms > 0)
+
+
+def retrieval(embed_many, docs, queries, targets):
+    d = embed_many(docs)
+    q = embed_many(queries)
+    ranks = []
+    for row, target in zip(q @ d.T, targets):
+        order = np.argsort(-row, kind="stable")
+        ranks.append(int(np.where(order == target)[0][0]) + 1)
+    ranks = np.array(ranks)
+    return {
+        "recall@1": round(float((ranks <= 1).mean()), 3),
+        "recall@3": round(float((ranks <= 3).mean()), 3),
+        "mrr": round(float((1.0 / ranks).mean()), 3),
+    }
+
+
+def _sentences(n, words=(8, 30), seed=0):
+    rnd = random.Random(seed)
+    vocab = ("login form email password submit button cart checkout search results page "
+             "navigation link error message valid invalid user account register field "
+             "required dropdown table calculator value enter click verify").split()
+    return [" ".join(rnd.choice(vocab) for _ in range(rnd.randint(*words))) for _ in range(n)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--dims", type=int, default=512)
+    args = parser.parse_args()
+
+    hasher = HashingEmbedder(dims=args.dims)
+
+    # ── speed ────────────────────────────────────────────────────────────────
+    speed = {}
+    for label, words in (("short_8_30_words", (8, 30)), ("long_150_250_words", (150, 250))):
+        texts = _sentences(args.texts, words)
+        sample = texts[:200]
+        t0 = time.perf_counter()
+        for t in sample:
+            md5_embedding(t, args.dims)
+        md5_ms = (time.perf_counter() - t0) / len(sample) * 1000
+
+        t0 = time.perf_counter()
+        for t in sample:
+            hasher.embed(t)
+        single_ms = (time.perf_counter() - t0) / len(sample) * 1000
+
+        t0 = time.perf_counter()
+        hasher.embed_batch(texts)
+        batch_ms = (time.perf_counter() - t0) / len(texts) * 1000
+
+        speed[label] = {
+            "md5_embed": round(md5_ms, 4),
+            "hashing_embed": round(single_ms, 4),
+            "hashing_embed_batch": round(batch_ms, 4),
+            "speedup_single": round(md5_ms / single_ms, 1),
+            "speedup_batch": round(md5_ms / batch_ms, 1),
+        }
+
+    # ── quality ──────────────────────────────────────────────────────────────
+    with open(config.KNOWLEDGE_BASE_PATH) as f:
+        patterns = json.load(f)["test_patterns"]
+    titles = [p["title"] for p in patterns]
+    docs_full = [f"{p['title']} {p['description']} {' '.join(p['steps'])}" for p in patterns]
+    docs_holdout = [f"{p['title']} {' '.join(p['steps'])}" for p in patterns]
+    descriptions = [p["description"] for p in patterns]
+
+    para_q = [q for q, _ in PARAPHRASES]
+    para_t = [titles.index(t) for _, t in PARAPHRASES]
+
+    embedders = {
+        "md5": lambda xs: _matrix(lambda t: md5_embedding(t, args.dims), xs),
+        "hashing": lambda xs: hasher.embed_batch(xs).astype(np.float64),
+    }
+    quality = {
+        name: {
+            "holdout": retrieval(fn, docs_holdout, descriptions, list(range(len(patterns)))),
+            "paraphrase": retrieval(fn, docs_full, para_q, para_t),
+        }
+        for name, fn in embedders.items()
+    }
+
+    print(json.dumps({
+        "dims": args.dims,
+        "speed_ms_per_text": speed,
+        "quality": quality,
+        "kb_patterns": len(patterns),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+benchmarks/bench_history_index.py
+=================================
+Retriever.build_index as a project ages: the previous build (clear the
+store, embed the knowledge base and every result ever saved, one by one;
+reproduced below as legacy_build_index) against the incremental build over
+the compact per-scenario execution history.
+
+A suite of --scenarios scenarios (over --specs specs) is "run" --runs
+times.  Each run saves its results (each scenario has its own flakiness;
+failures carry messages with changing numbers and ids) and the pipeline
+rebuilds the index, as main_pipeline.py does before the next run.  At each
+checkpoint both builds are timed from a fresh Retriever (store loaded from
+disk, as in a new pipeline run).
+
+Reported per checkpoint:
+  entries / disk_mb      index size
+  build_s                build_index wall time
+  embedded               texts sent to the embedder by that build
+The embedder is the default local hashing embedder with the shared on-disk
+embedding cache in a temp file (warm for texts seen before, as in practice).
+
+Usage:
+    python benchmarks/bench_history_index.py
+    python benchmarks/bench_history_index.py --runs 300 --scenarios 400 --checkpoints 1 100 300
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+BENCH_TMP = tempfile.mkdtemp(prefix="bench_history_index_")
+os.environ["RAG_EMBEDDING_CACHE"] = os.path.join(BENCH_TMP, "embeddings.sqlite3")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+from execution.result_parser import load_history, update_history
+from rag.retriever import Retriever
+
+ERRORS = [
+    "Element not found: #result-{n} after {ms} ms",
+    "AssertionError: expected '{a}' but was '{b}'",
+    "TimeoutException: page load exceeded {ms} ms on attempt {n}",
+    "StaleElementReferenceException: element 0x{hex} is no longer attached to the DOM",
+]
+
+
+def legacy_build_index(retriever):
+    """The previous build_index: clear, then embed the knowledge base and every saved result."""
+    retriever.store.clear()
+    count = 0
+    with open(config.KNOWLEDGE_BASE_PATH) as f:
+        kb = json.load(f)
+    for entry in kb.get("test_patterns", []):
+        text = f"{entry.get('title', '')} {entry.get('description', '')} {' '.join(entry.get('steps', []))}"
+        retriever.store.add(f"kb_{count}", text, retriever.embedder.embed(text),
+                            {"source": "knowledge_base", "type": entry.get("type", "")})
+        count += 1
+    with open(config.EXECUTION_RESULTS_PATH) as f:
+        results = json.load(f)
+    for r in results:
+        text = f"Past test: {r.get('scenario', '')} — Result: {r.get('status', '')}"
+        if r.get("failure_reason"):
+            text += f" — Failure: {r['failure_reason']}"
+        retriever.store.add(f"result_{count}", text, retriever.embedder.embed(text),
+                            {"source": "execution_results"})
+        count += 1
+    retriever.store.save()
+
+
+class Suite:
+    def __init__(self, scenarios, specs, seed=0):
+        self.rnd = random.Random(seed)
+        self.scenarios = [(f"Spec {i % specs}", f"Scenario {i}: check calculator case {i}") for i in range(scenarios)]
+        self.flaky = [self.rnd.choice([0.0, 0.0, 0.02, 0.1, 0.5]) for _ in range(scenarios)]
+        self.clock = 1_700_000_000
+
+    def run(self):
+        out = []
+        for (spec, scenario), p in zip(self.scenarios, self.flaky):
+            self.clock += 7
+            failed = self.rnd.random() < p
+            reason = ""
+            if failed:
+                reason = self.rnd.choice(ERRORS).format(n=self.rnd.randint(1, 999), ms=self.rnd.randint(100, 30000),
+                                                        a=self.rnd.randint(1, 99), b=self.rnd.randint(1, 99),
+                                                        hex=f"{self.rnd.getrandbits(32):08x}")
+            out.append({"spec": spec, "scenario": scenario, "status": "failed" if failed else "passed",
+                        "duration_ms": self.rnd.randint(200, 5000), "failure_reason": reason,
+                        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(self.clock))})
+        return out
+
+
+def _disk_mb(store):
+    paths = [store.path, store.matrix_path, store.ann_path]
+    return round(sum(os.path.getsize(p) for p in paths if os.path.exists(p)) / 2**20, 2)
+
+
+def _timed_build(store_path, build):
+    config.VECTOR_STORE_PATH = store_path
+    retriever = Retriever()
+    embed, embed_batch, sent = retriever.embedder.embed, retriever.embedder.embed_batch, [0]
+
+    def counting_embed(text):
+        sent[0] += 1
+        return embed(text)
+
+    def counting_batch(texts):
+        sent[0] += len(texts)
+        return embed_batch(texts)
+
+    retriever.embedder.embed, retriever.embedder.embed_batch = counting_embed, counting_batch
+    t0 = time.perf_counter()
+    build(retriever)
+    return {"build_s": round(time.perf_counter() - t0, 3), "entries": len(retriever.store),
+            "disk_mb": _disk_mb(retriever.store), "embedded": sent[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=1000)
+    parser.add_argument("--scenarios", type=int, default=150)
+    parser.add_argument("--specs", type=int, default=15)
+    parser.add_argument("--checkpoints", type=int, nargs="+", default=[1, 10, 100, 250, 500, 1000])
+    parser.add_argument("--legacy-max", type=int, default=1000, help="last checkpoint the legacy build runs at")
+    args = parser.parse_args()
+
+    config.EXECUTION_RESULTS_PATH = os.path.join(BENCH_TMP, "execution_results.json")
+    config.EXECUTION_HISTORY_PATH = os.path.join(BENCH_TMP, "execution_history.json")
+    new_path = os.path.join(BENCH_TMP, "new", "vector_store.json")
+    old_path = os.path.join(BENCH_TMP, "old", "vector_store.json")
+
+    suite, log, rows = Suite(args.scenarios, args.specs), [], []
+    try:
+        for run in range(1, args.runs + 1):
+            results = suite.run()
+            # save_results() without rewriting the whole log every run (the bench only needs it at checkpoints)
+            update_history(results)
+            log.extend(results)
+            if run not in args.checkpoints:
+                config.VECTOR_STORE_PATH = new_path
+                Retriever().build_index()            # the pipeline rebuilds before every run
+                continue
+
+            row = {"runs": run, "results": len(log), "new": _timed_build(new_path, Retriever.build_index)}
+            history = load_history()
+            row["history_kb"] = round(os.path.getsize(config.EXECUTION_HISTORY_PATH) / 1024, 1)
+            assert sum(r["runs"] for r in history.values()) == len(log)
+            if run <= args.legacy_max:
+                with open(config.EXECUTION_RESULTS_PATH, "w") as f:
+                    json.dump(log, f)
+                row["legacy"] = _timed_build(old_path, legacy_build_index)
+                row["build_speedup"] = round(row["legacy"]["build_s"] / max(row["new"]["build_s"], 1e-6), 1)
+            rows.append(row)
+            print(json.dumps(row), file=sys.stderr)
+    finally:
+        shutil.rmtree(BENCH_TMP, ignore_errors=True)
+
+    print(json.dumps(rows, indent=2))
+
+
+if __name__ == "__main__":
+    main()
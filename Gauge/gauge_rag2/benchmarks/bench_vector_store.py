@@ -0,0 +1,131 @@
+"""
+benchmarks/bench_vector_store.py
+================================
+Compares the NumPy matrix-backed VectorStore with the previous JSON/list
+implementation (reproduced below as LegacyVectorStore) on random unit
+vectors.
+
+Per size it reports: index build time (n x add), mean search latency,
+save / load time and on-disk size, and checks that both stores return the
+same top-k ids.  The legacy store is O(n) per add, so it is only run up to
+--legacy-max entries.
+
+Usage:
+    python benchmarks/bench_vector_store.py
+    python benchmarks/bench_vector_store.py --sizes 1000 10000 100000 --dim 512 --queries 50
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from rag.vector_store import VectorStore
+
+
+class LegacyVectorStore:
+    """The pre-matrix store: list of dicts, pure-Python cosine, one JSON file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = []
+        if os.path.exists(path):
+            with open(path) as f:
+                self.entries = json.load(f)
+
+    def save(self):
+        with open(self.path, "w") as f:
+            json.dump(self.entries, f)
+
+    def add(self, doc_id, text, vector, metadata=None):
+        self.entries = [e for e in self.entries if e["id"] != doc_id]
+        self.entries.append({"id": doc_id, "text": text, "vector": vector, "metadata": metadata or {}})
+
+    def search(self, query_vector, top_k=3):
+        scored = [(_cosine(query_vector, e["vector"]), e) for e in self.entries]
+        scored.sort(key=lambda x: x[0], reverse=True)
+        return [{"score": s, **e} for s, e in scored[:top_k]]
+
+
+def _cosine(a, b):
+    dot = sum(x * y for x, y in zip(a, b))
+    ma = math.sqrt(sum(x * x for x in a))
+    mb = math.sqrt(sum(y * y for y in b))
+    return dot / (ma * mb) if ma and mb else 0.0
+
+
+def _size(*paths):
+    return round(sum(os.path.getsize(p) for p in paths if os.path.exists(p)) / 2**20, 2)
+
+
+def bench(store_cls, path, vectors, queries, top_k):
+    store = store_cls(path)
+    t0 = time.perf_counter()
+    for i, v in enumerate(vectors):
+        store.add(f"doc_{i}", f"text {i}", v, {"i": i})
+    build = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    hits = [[r["id"] for r in store.search(q, top_k=top_k)] for q in queries]
+    search = (time.perf_counter() - t0) / len(queries)
+
+    t0 = time.perf_counter()
+    store.save()
+    save = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    reloaded = store_cls(path)
+    load = time.perf_counter() - t0
+    assert len(reloaded.entries) == len(vectors)
+
+    return {
+        "build_s": round(build, 3),
+        "search_ms": round(search * 1000, 3),
+        "save_s": round(save, 3),
+        "load_s": round(load, 3),
+        "disk_mb": _size(path, getattr(store, "matrix_path", ""), getattr(store, "ann_path", "")),
+    }, hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--dim", type=int, default=512)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--legacy-max", type=int, default=10000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            vecs = rng.standard_normal((n, args.dim)).astype(np.float32)
+            vecs /= np.linalg.norm(vecs, axis=1, keepdims=True)
+            queries = rng.standard_normal((args.queries, args.dim)).astype(np.float32).tolist()
+            vectors = vecs.tolist()
+
+            new_path = os.path.join(tmp, f"new_{n}.json")
+            new, new_hits = bench(VectorStore, new_path, vectors, queries, args.top_k)
+            row = {"entries": n, "matrix": new}
+
+            if n <= args.legacy_max:
+                old, old_hits = bench(LegacyVectorStore, os.path.join(tmp, f"old_{n}.json"),
+                                      vectors, queries[:5], args.top_k)
+                row["legacy"] = old
+                row["same_top_k"] = new_hits[:5] == old_hits
+                row["search_speedup"] = round(old["search_ms"] / max(new["search_ms"], 1e-6), 1)
+                row["build_speedup"] = round(old["build_s"] / max(new["build_s"], 1e-6), 1)
+            rows.append(row)
+            print(json.dumps(row), file=sys.stderr)
+
+    print(json.dumps(rows, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -11,10 +11,26 @@ GROK_MODEL      = os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
 GROK_TIMEOUT    = int(os.getenv("GROQ_TIMEOUT", "120"))
 
 # ─── RAG / Embedding Settings ─────────────────────────────────────────────────
-# Embeddings use sentence-transformers locally — no API key needed.
-# Model: all-MiniLM-L6-v2 (~80MB, downloaded once to ~/.cache/huggingface)
+# Embeddings default to a local feature-hashing embedder — no API key or model download.
 VECTOR_STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "vector_store.json")
 RAG_TOP_K         = int(os.getenv("RAG_TOP_K", "3"))
+# BM25 + vector search fused by reciprocal rank; short keyword queries skip the embedder
+RAG_HYBRID        = os.getenv("RAG_HYBRID", "1") != "0"
+# Vector index: "auto" = exact below ~20k entries, FAISS HNSW / IVF above (needs faiss-cpu);
+# "exact" | "hnsw" | "ivf" force one
+RAG_ANN_BACKEND   = os.getenv("RAG_ANN_BACKEND", "auto").lower()
+# Index storage: "none" (float32) | "sq8" (int8) | "pca<k>" | "pca<k>+sq8"; compressed indexes
+# re-rank their candidates against the float32 matrix (needs faiss-cpu)
+RAG_VECTOR_COMPRESSION = os.getenv("RAG_VECTOR_COMPRESSION", "none").lower()
+# Layer 3 prompt context: RAG_CANDIDATES retrieved entries, near-duplicates dropped and the rest
+# taken in maximal-marginal-relevance order up to RAG_CONTEXT_TOKENS prompt tokens
+RAG_CANDIDATES     = int(os.getenv("RAG_CANDIDATES", "10"))
+RAG_CONTEXT_TOKENS = int(os.getenv("RAG_CONTEXT_TOKENS", "300"))
+
+# "hash" = local feature-hashing embedder (rag/hash_embedder.py), "openai" = text-embedding-3-small
+EMBEDDING_PROVIDER  = os.getenv("EMBEDDING_PROVIDER", "hash").lower()
+OPENAI_API_KEY      = os.getenv("OPENAI_API_KEY", "")
+HASH_EMBEDDING_DIMS = int(os.getenv("HASH_EMBEDDING_DIMS", "512"))
 
 # ─── Selenium / Chrome Settings ───────────────────────────────────────────────
 CHROME_HEADLESS       = os.getenv("CHROME_HEADLESS", "false").lower() == "true"
@@ -32,6 +48,10 @@ MAX_PAGES       = int(os.getenv("MAX_PAGES", "10"))
 MAX_SCENARIOS_PER_PAGE  = int(os.getenv("MAX_SCENARIOS_PER_PAGE", "4"))
 INCLUDE_NEGATIVE_TESTS  = os.getenv("INCLUDE_NEGATIVE_TESTS", "true").lower() == "true"
 INCLUDE_BOUNDARY_TESTS  = os.getenv("INCLUDE_BOUNDARY_TESTS", "true").lower() == "true"
+# Layer 3 prompt budgets (prompt tokens) for the Layer 1 / Layer 2 JSON; over budget, the
+# longest lists (fields, journeys, ...) lose entries from the end
+LAYER3_PAGE_TOKENS  = int(os.getenv("LAYER3_PAGE_TOKENS", "600"))
+LAYER3_FIELD_TOKENS = int(os.getenv("LAYER3_FIELD_TOKENS", "2500"))
 
 # ─── Paths ────────────────────────────────────────────────────────────────────
 BASE_DIR               = os.path.dirname(os.path.abspath(__file__))
@@ -45,6 +65,8 @@ PAGE_ANALYSIS_PATH     = os.path.join(DATA_DIR, "page_analysis.json")
 FIELD_ANALYSIS_PATH    = os.path.join(DATA_DIR, "field_analysis.json")
 TEST_STRATEGY_PATH     = os.path.join(DATA_DIR, "test_strategy.json")
 EXECUTION_RESULTS_PATH = os.path.join(DATA_DIR, "execution_results.json")
+# one compact record per scenario (counts, last error, last seen), updated by save_results
+EXECUTION_HISTORY_PATH = os.path.join(DATA_DIR, "execution_history.json")
 GENERATED_SPEC_PATH    = os.path.join(SPECS_DIR, "generated_test.spec")
 
 # ─── Logging ──────────────────────────────────────────────────────────────────
@@ -3,6 +3,7 @@
 import json
 import logging
 import os
+import re
 import subprocess
 import sys
 import xml.etree.ElementTree as ET
@@ -91,6 +92,10 @@ def save_results(results: list[dict], path: str = None):
         except Exception:
             pass
 
+    # fold into the compact history first: if it doesn't exist yet it is
+    # built from the log as it was before this run
+    update_history(results, results_path=path)
+
     combined = existing + results
     with open(path, "w") as f:
         json.dump(combined, f, indent=2)
@@ -100,6 +105,79 @@ def save_results(results: list[dict], path: str = None):
     logger.info(f"Results saved: {passed} passed, {failed} failed → {path}")
 
 
+# ── Compact per-scenario history ──────────────────────────────────────────────
+# The RAG index reads this instead of the raw results log, which grows with
+# every run: one record per scenario, so its size tracks the test suite,
+# not the project's age.
+
+_VOLATILE = re.compile(r"0x[0-9a-fA-F]+|\d+|'[^']*'|\"[^\"]*\"")
+
+
+def error_signature(message: str) -> str:
+    """First line of a failure message with numbers, ids and quoted values masked."""
+    line = next((l.strip() for l in (message or "").splitlines() if l.strip()), "")
+    return " ".join(_VOLATILE.sub("#", line).split())[:200]
+
+
+def scenario_key(result: dict) -> str:
+    return f"{result.get('spec', '')} :: {result.get('scenario', '')}"
+
+
+def compact_history(results: list[dict], history: dict = None) -> dict:
+    """Fold results (oldest first) into {scenario key: record}; updates and returns `history`."""
+    history = {} if history is None else history
+    for r in results:
+        rec = history.setdefault(scenario_key(r), {
+            "spec": r.get("spec", ""), "scenario": r.get("scenario", ""),
+            "runs": 0, "passed": 0, "failed": 0,
+            "last_status": "", "last_error": "", "last_failed": "", "last_seen": "",
+        })
+        status = r.get("status", "")
+        rec["runs"] += 1
+        if status in ("passed", "failed"):
+            rec[status] += 1
+        rec["last_status"] = status
+        rec["last_seen"]   = r.get("timestamp", "") or rec["last_seen"]
+        if status == "failed":
+            rec["last_error"]  = error_signature(r.get("failure_reason", "")) or rec["last_error"]
+            rec["last_failed"] = rec["last_seen"]
+    return history
+
+
+def load_history(path: str = None, results_path: str = None) -> dict:
+    """The compact history; built once from the raw results log if it doesn't exist yet."""
+    path = path or config.EXECUTION_HISTORY_PATH
+    results_path = results_path or config.EXECUTION_RESULTS_PATH
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f).get("scenarios", {})
+    history = {}
+    if os.path.exists(results_path):
+        with open(results_path) as f:
+            history = compact_history(json.load(f))
+        _write_history(history, path)
+        logger.info(f"Execution history: compacted the results log into {len(history)} scenarios → {path}")
+    return history
+
+
+def update_history(results: list[dict], path: str = None, results_path: str = None):
+    """Fold one run's results into the compact history file."""
+    path = path or config.EXECUTION_HISTORY_PATH
+    try:
+        history = load_history(path, results_path)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Execution history: could not read {path} ({e}), starting a new one")
+        history = {}
+    _write_history(compact_history(results, history), path)
+
+
+def _write_history(history: dict, path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w") as f:
+        json.dump({"version": 1, "scenarios": history}, f, indent=1)
+    os.replace(path + ".tmp", path)
+
+
 def print_summary(results: list[dict]):
     """Print a human-readable results summary."""
     if not results:
@@ -3,7 +3,7 @@
 import logging
 import sys, os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from ai_layers.ai_utils import get_embedding
+from ai_layers.ai_utils import get_embedding, get_embeddings
 
 logger = logging.getLogger(__name__)
 
@@ -23,9 +23,10 @@ class Embedder:
         return vector
 
     def embed_batch(self, texts: list[str]) -> list[list[float]]:
-        """Embed a list of texts."""
-        results = []
-        for i, text in enumerate(texts):
-            logger.debug(f"Embedding {i+1}/{len(texts)}")
-            results.append(self.embed(text))
-        return results
+        """Embed a list of texts; uncached ones go through a single batch call."""
+        missing = list(dict.fromkeys(t for t in texts if t not in self._cache))
+        if missing:
+            logger.debug(f"Embedding {len(missing)} new text(s) in one batch")
+            for text, vector in zip(missing, get_embeddings(missing)):
+                self._cache[text] = vector
+        return [self._cache[t] for t in texts]
@@ -0,0 +1,164 @@
+# rag/hash_embedder.py - Offline feature-hashing text embedder (no API, no model download)
+
+import numpy as np
+
+_WORD_BYTE = np.zeros(256, dtype=bool)
+_WORD_BYTE[[ord(c) for c in "abcdefghijklmnopqrstuvwxyz0123456789_"]] = True
+_WORD_BYTE[128:] = True
+
+_P    = 1_000_003                           # polynomial hash base (odd -> invertible mod 2**64)
+_PINV = pow(_P, -1, 2**64)
+CHUNK_BYTES = 16 * 1024
+
+_SALT = {                                   # keeps feature families apart in bucket space
+    "word":   np.uint64(0x51ED270B27A5E3F1),
+    "bigram": np.uint64(0x2545F4914F6CDD1D),
+    "char":   np.uint64(0x94D049BB133111EB),
+}
+
+
+class HashingEmbedder:
+    """
+    Deterministic bag-of-features embedder.
+
+    Features per text:
+      - word unigrams and bigrams
+      - character n-grams (default 3..5) over the normalised text, so words
+        sharing a stem or differing by a typo still overlap
+
+    Every feature is a polynomial hash of a byte span.  With prefix sums of
+    b[k] * P^-k over the whole batch, the hash of any span is one subtraction
+    and one multiply, so all words and n-grams of all texts are hashed with a
+    handful of vectorised NumPy ops and no per-token Python work.
+
+    Each feature is hashed into one of `dims` buckets with a ±1 sign (signed
+    hashing cancels collisions on average).  Bucket counts are weighted with
+    sublinear TF, sign(x) * log(1 + |x|), then the vector is L2-normalised, so
+    cosine similarity reflects shared words / subwords between texts.
+    """
+
+    REVISION = "1"      # bump when a change alters the vectors (cache key)
+
+    def __init__(self, dims: int = 512, ngram_range: tuple = (3, 5),
+                 word_weight: float = 1.0, bigram_weight: float = 0.5, char_weight: float = 0.35):
+        self.dims          = int(dims)
+        self.ngram_range   = ngram_range
+        self.word_weight   = word_weight
+        self.bigram_weight = bigram_weight
+        self.char_weight   = char_weight
+        self._pw  = np.ones(1, dtype=np.uint64)     # P^k  mod 2**64 (grown on demand)
+        self._ipw = np.ones(1, dtype=np.uint64)     # P^-k mod 2**64
+
+    def embed(self, text: str) -> list[float]:
+        return self.embed_batch([text])[0].tolist()
+
+    def embed_batch(self, texts: list[str]) -> np.ndarray:
+        """Return a (len(texts), dims) float32 matrix of unit-length rows."""
+        texts = list(texts)
+        out = np.zeros((len(texts), self.dims), dtype=np.float32)
+        start = 0
+        while start < len(texts):
+            # cap each pass at ~CHUNK_BYTES of text so the working arrays stay in cache
+            end, size = start, 0
+            while end < len(texts) and (end == start or size < CHUNK_BYTES):
+                size += len(texts[end] or "")
+                end += 1
+            out[start:end] = self._embed_chunk(texts[start:end])
+            start = end
+        return out
+
+    def _embed_chunk(self, texts: list[str]) -> np.ndarray:
+        n = len(texts)
+
+        # lower-case; every byte that isn't a letter, digit, "_" or part of a
+        # multi-byte UTF-8 char becomes a space; runs of spaces collapse to one;
+        # texts are joined as " text \0 text " (all done on the byte array)
+        joined = "\0".join(t.replace("\0", " ") if t else "" for t in texts).lower()
+        buf = np.frombuffer(b" " + joined.encode("utf-8") + b" ", dtype=np.uint8)
+        buf = np.where(_WORD_BYTE[buf] | (buf == 0), buf, np.uint8(32))
+        sep_at = np.flatnonzero(buf == 0)
+        buf = np.insert(buf, np.concatenate((sep_at, sep_at + 1)), np.uint8(32))
+        space = buf == 32
+        keep = np.ones(len(buf), dtype=bool)
+        keep[1:] = ~(space[1:] & space[:-1])
+        buf = buf[keep]
+        length = len(buf)
+        pw, ipw = self._powers(length)
+
+        with np.errstate(over="ignore"):
+            prefix = np.zeros(length + 1, dtype=np.uint64)
+            np.cumsum(buf * ipw[:length], out=prefix[1:])
+
+            def span(start, end):                       # hash of buf[start:end]
+                return (prefix[end] - prefix[start]) * pw[end - 1]
+
+            sep = buf == 0
+            doc_of_byte = np.cumsum(sep)
+            docs, hashes, weights = [], [], []
+
+            # ── words + bigrams ───────────────────────────────────────────────
+            edge = np.diff((buf <= 32).view(np.int8))   # space / separator boundaries
+            starts = np.flatnonzero(edge == -1) + 1
+            ends = np.flatnonzero(edge == 1) + 1
+            if len(starts):
+                wh = span(starts, ends)
+                wdoc = doc_of_byte[starts]
+                docs.append(wdoc)
+                hashes.append(wh ^ _SALT["word"])
+                weights.append(np.full(len(wh), self.word_weight))
+
+                same = wdoc[1:] == wdoc[:-1]
+                docs.append(wdoc[1:][same])
+                hashes.append((wh[:-1][same] * np.uint64(_P) + wh[1:][same]) ^ _SALT["bigram"])
+                weights.append(np.full(int(same.sum()), self.bigram_weight))
+
+            # ── character n-grams (windows crossing a \0 are dropped) ─────────
+            sep_prefix = np.concatenate(([0], np.cumsum(sep)))
+            lo, hi = self.ngram_range
+            for size in range(lo, hi + 1):
+                count = length - size + 1
+                if count <= 0:
+                    continue
+                idx = np.flatnonzero(sep_prefix[size:] == sep_prefix[:count])
+                docs.append(doc_of_byte[idx])
+                hashes.append((span(idx, idx + size) + np.uint64(size)) ^ _SALT["char"])
+                weights.append(np.full(len(idx), self.char_weight))
+
+            if not docs or not sum(len(d) for d in docs):
+                return np.zeros((n, self.dims), dtype=np.float32)
+            doc = np.concatenate(docs)
+            h = _mix(np.concatenate(hashes))
+
+        bucket = (h >> np.uint64(33)) % np.uint64(self.dims)
+        signed = np.where(h & np.uint64(1 << 7), 1.0, -1.0) * np.concatenate(weights)
+        counts = np.bincount(doc.astype(np.int64) * self.dims + bucket.astype(np.int64),
+                             weights=signed, minlength=n * self.dims).reshape(n, self.dims)
+
+        # sublinear TF, then L2 normalise (in place, no temporaries)
+        out = np.abs(counts)
+        np.log1p(out, out=out)
+        np.copysign(out, counts, out=out)
+        norms = np.sqrt(np.einsum("ij,ij->i", out, out))[:, None]
+        np.divide(out, norms, out=out, where=norms > 0)
+        return out.astype(np.float32)
+
+    def _powers(self, length: int):
+        """P^k and P^-k for k < length, cached and grown geometrically."""
+        if len(self._pw) < length:
+            size = max(length, 2 * len(self._pw))
+            with np.errstate(over="ignore"):
+                pw = np.full(size, _P, dtype=np.uint64)
+                ipw = np.full(size, _PINV, dtype=np.uint64)
+                pw[0] = ipw[0] = 1
+                self._pw = np.cumprod(pw, dtype=np.uint64)
+                self._ipw = np.cumprod(ipw, dtype=np.uint64)
+        return self._pw, self._ipw
+
+
+def _mix(h: np.ndarray) -> np.ndarray:
+    """splitmix64 finaliser so nearby hashes land in unrelated buckets."""
+    h = h ^ (h >> np.uint64(30))
+    h = h * np.uint64(0xBF58476D1CE4E5B9)
+    h = h ^ (h >> np.uint64(27))
+    h = h * np.uint64(0x94D049BB133111EB)
+    return h ^ (h >> np.uint64(31))
@@ -1,5 +1,6 @@
 # rag/retriever.py - RAG Retriever: indexes knowledge base and retrieves context
 
+import hashlib
 import json
 import logging
 import os
@@ -7,16 +8,26 @@ import sys
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import config
+from execution.result_parser import load_history
 from rag.embedder import Embedder
+from rag.hash_embedder import HashingEmbedder
 from rag.vector_store import VectorStore
 
 logger = logging.getLogger(__name__)
 
 
+def _embedding_id() -> str:
+    """Which embedder produced the vectors (mirrors ai_utils.get_embeddings)."""
+    if config.EMBEDDING_PROVIDER == "openai" and config.OPENAI_API_KEY:
+        return "openai:text-embedding-3-small"
+    return f"hash:{config.HASH_EMBEDDING_DIMS}:{HashingEmbedder.REVISION}"
+
+
 class Retriever:
     """
     Indexes the knowledge base and past test results into the vector store,
-    then retrieves relevant context for the AI strategy layer.
+    then retrieves relevant context for the AI strategy layer.  The store is
+    kept on disk between runs and updated in place.
     """
 
     def __init__(self):
@@ -24,54 +35,77 @@ class Retriever:
         self.store    = VectorStore()
 
     def build_index(self):
-        """Index the site knowledge base and any past execution results."""
-        logger.info("RAG: Building index...")
-        self.store.clear()
-        count = 0
+        """
+        Bring the index up to date with the site knowledge base and the
+        execution history.
 
-        # Index knowledge base
+        Entries keep stable ids and are upserted: only new or changed texts
+        are embedded, and entries whose source is gone are removed.  Past
+        results are indexed from the compact per-scenario history
+        (execution/result_parser.py), one entry per scenario, so index size
+        and build time track the test suite, not the number of saved runs.
+        """
+        logger.info("RAG: Updating index...")
+        wanted = {}                 # doc_id -> (text, text to embed, metadata)
+        keep   = set()              # prefixes whose source could not be read: leave them as they are
+        embedding = _embedding_id()
+
+        # Knowledge base
         if os.path.exists(config.KNOWLEDGE_BASE_PATH):
             try:
                 with open(config.KNOWLEDGE_BASE_PATH) as f:
                     kb = json.load(f)
-                for entry in kb.get("test_patterns", []):
+                for i, entry in enumerate(kb.get("test_patterns", [])):
                     text = f"{entry.get('title', '')} {entry.get('description', '')} {' '.join(entry.get('steps', []))}"
-                    vector = self.embedder.embed(text)
-                    self.store.add(
-                        doc_id=f"kb_{count}",
-                        text=text,
-                        vector=vector,
-                        metadata={"source": "knowledge_base", "type": entry.get("type", "")},
-                    )
-                    count += 1
-                logger.info(f"RAG: Indexed {count} knowledge base entries.")
+                    wanted[f"kb_{i}"] = (text, text, {"source": "knowledge_base", "type": entry.get("type", ""),
+                                                      "embedding": embedding})
             except Exception as e:
-                logger.warning(f"RAG: Failed to index knowledge base: {e}")
+                logger.warning(f"RAG: Failed to read knowledge base: {e}")
+                keep.add("kb_")
 
-        # Index past execution results
-        if os.path.exists(config.EXECUTION_RESULTS_PATH):
-            try:
-                with open(config.EXECUTION_RESULTS_PATH) as f:
-                    results = json.load(f)
-                for r in results:
-                    scenario = r.get("scenario", "")
-                    status   = r.get("status", "")
-                    text     = f"Past test: {scenario} — Result: {status}"
-                    if r.get("failure_reason"):
-                        text += f" — Failure: {r['failure_reason']}"
-                    vector = self.embedder.embed(text)
-                    self.store.add(
-                        doc_id=f"result_{count}",
-                        text=text,
-                        vector=vector,
-                        metadata={"source": "execution_results"},
-                    )
-                    count += 1
-            except Exception as e:
-                logger.warning(f"RAG: Failed to index execution results: {e}")
+        # Execution history, one compact record per scenario
+        try:
+            history = load_history()
+            for key, rec in history.items():
+                # the vector stands for what ran and how it last ended; counts and
+                # dates only change the stored text, so they never force a re-embed
+                summary = f"Past test: {rec['scenario']} — Result: {rec['last_status']}"
+                if rec.get("last_error"):
+                    label = "Failure" if rec["last_status"] == "failed" else "Last failure"
+                    summary += f" — {label}: {rec['last_error']}"
+                text = (f"{summary} — {rec['runs']} runs ({rec['passed']} passed, {rec['failed']} failed), "
+                        f"last run {rec['last_seen'][:10] or 'unknown'}")
+                doc_id = "history_" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+                wanted[doc_id] = (text, summary, {"source": "execution_history", "scenario": rec["scenario"],
+                                                  "embedding": embedding, "embedded": summary})
+        except Exception as e:
+            logger.warning(f"RAG: Failed to read execution history: {e}")
+            keep.add("history_")
+
+        # a different embedder means none of the stored vectors are comparable
+        if any((self.store.get(i)["metadata"].get("embedding") != embedding) for i in self.store.ids):
+            logger.info("RAG: Embedding settings changed — re-embedding everything")
+            self.store.clear()
+
+        changed, updated = [], 0
+        for doc_id, (text, embed_text, metadata) in wanted.items():
+            old = self.store.get(doc_id)
+            if old is None or old["metadata"].get("embedded", old["text"]) != embed_text:
+                changed.append(doc_id)
+            elif old["text"] != text or old["metadata"] != metadata:
+                self.store.update(doc_id, text, metadata)           # counts / dates only: keep the vector
+                updated += 1
+        vectors = self.embedder.embed_batch([wanted[d][1] for d in changed]) if changed else []
+        for doc_id, vector in zip(changed, vectors):
+            text, _, metadata = wanted[doc_id]
+            self.store.add(doc_id=doc_id, text=text, vector=vector, metadata=metadata)
 
-        self.store.save()
-        logger.info(f"RAG: Index built with {len(self.store)} total entries.")
+        stale = [i for i in self.store.ids if i not in wanted and not i.startswith(tuple(keep))]
+        removed = self.store.remove(stale)
+        if changed or updated or removed or not os.path.exists(self.store.path):
+            self.store.save()
+        logger.info(f"RAG: Index has {len(self.store)} entries "
+                    f"({len(changed)} embedded, {updated} updated, {removed} removed).")
 
     def retrieve(self, query: str, top_k: int = None) -> list[str]:
         """Return the most relevant text chunks for a query."""
@@ -79,8 +113,13 @@ class Retriever:
             logger.debug("RAG: Store is empty, skipping retrieval.")
             return []
 
-        query_vector = self.embedder.embed(query)
-        results = self.store.search(query_vector, top_k=top_k or config.RAG_TOP_K)
-        chunks = [r["text"] for r in results if r["score"] > 0.3]
+        if config.RAG_HYBRID:
+            results = self.store.hybrid_search(query, self.embedder.embed, top_k=top_k or config.RAG_TOP_K)
+            # keep a chunk if either signal vouches for it
+            chunks = [r["text"] for r in results if r["lexical"] or (r["dense"] or 0) > 0.3]
+        else:
+            query_vector = self.embedder.embed(query)
+            results = self.store.search(query_vector, top_k=top_k or config.RAG_TOP_K)
+            chunks = [r["text"] for r in results if r["score"] > 0.3]
         logger.debug(f"RAG: Retrieved {len(chunks)} chunks for query: '{query[:60]}'")
         return chunks
@@ -1,87 +1,314 @@
-# rag/vector_store.py - Simple JSON-backed vector store
+# rag/vector_store.py - NumPy matrix-backed vector store
 
 import json
 import logging
-import math
 import os
+import re
 import sys
+import uuid
+
+import numpy as np
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import config
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+from rag_common import ann
+from rag_common.hybrid_search import BM25Index, HybridSearcher
+
 logger = logging.getLogger(__name__)
 
+FORMAT_VERSION = 3
+
 
 class VectorStore:
     """
-    Lightweight local vector store backed by a JSON file.
-    Uses cosine similarity for retrieval — no external DB required.
+    Lightweight local vector store — no external DB required.
+
+    Vectors are L2-normalised on insert and kept as rows of one contiguous
+    float32 matrix with an id → row map, so cosine similarity for a query is
+    a single matrix-vector product and top-k is an argpartition.
+
+    On disk the store is a sidecar and the files it names, next to each other:
+      <name>.json        small sidecar: ids, texts, metadata, dimension, and
+                         the generation of the two files below
+      <name>.<gen>.npy   the vector matrix (loaded memory-mapped, copied on first write)
+      <name>.<gen>.faiss FAISS index over the matrix, only for large or compressed stores
+    save() writes a new generation next to the old one and then replaces the
+    sidecar, so a crash at any point leaves a sidecar naming a complete,
+    matching set of files; the old generation is deleted afterwards.
+
+    Small stores are searched exactly.  Once config.RAG_ANN_BACKEND picks an
+    approximate backend for the store size (rag_common.ann), or
+    config.RAG_VECTOR_COMPRESSION asks for int8 / PCA storage, and faiss is
+    installed, search goes through a FAISS index, built on first search
+    after a write and saved with the store.  A compressed index only
+    proposes candidates; they are re-ranked against the float32 matrix,
+    which after a load stays memory-mapped, so a query reads just those rows.
+
+    A legacy vector_store.json (a list of {id, text, metadata, vector}) is
+    still readable and is rewritten in the new layout on the next save().
+
+    hybrid_search() adds a BM25 index over the texts (built on first use,
+    dropped on any write) and fuses it with the cosine ranking.
     """
 
     def __init__(self, path: str = None):
-        self.path    = path or config.VECTOR_STORE_PATH
-        self.entries: list[dict] = []  # {id, text, metadata, vector}
+        self.path = path or config.VECTOR_STORE_PATH
+        self._generation(None)
+        self.clear()
         self._load()
 
     # ── Persistence ───────────────────────────────────────────────────────────
 
     def _load(self):
-        if os.path.exists(self.path):
-            try:
-                with open(self.path) as f:
-                    self.entries = json.load(f)
-                logger.info(f"VectorStore: loaded {len(self.entries)} entries from {self.path}")
-            except Exception as e:
-                logger.warning(f"VectorStore: could not load {self.path}: {e}")
-                self.entries = []
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            if isinstance(data, list):
+                for e in data:
+                    self.add(e["id"], e.get("text", ""), e.get("vector", []), e.get("metadata"))
+            else:
+                self._generation(data.get("generation"))       # None: a version 2 store, <name>.npy
+                ids = data.get("ids", [])
+                if ids:
+                    matrix = np.load(self.matrix_path, mmap_mode="r")
+                    if matrix.shape[0] != len(ids):
+                        raise ValueError(
+                            f"{self.matrix_path} has {matrix.shape[0]} rows, sidecar lists {len(ids)} ids"
+                        )
+                    self._matrix = matrix
+                    self._dim    = matrix.shape[1]
+                self._ids   = list(ids)
+                self._texts = list(data.get("texts", []))
+                self._meta  = list(data.get("metadata", []))
+                self._rows  = {doc_id: i for i, doc_id in enumerate(self._ids)}
+                self._ann   = self._read_ann()
+            logger.info(f"VectorStore: loaded {len(self)} entries from {self.path}")
+        except Exception as e:
+            logger.warning(f"VectorStore: could not load {self.path}: {e}")
+            self.clear()
+
+    def _generation(self, gen):
+        """Point matrix_path / ann_path at generation `gen` of the data files."""
+        stem = os.path.splitext(self.path)[0] + (f".{gen}" if gen else "")
+        self.generation  = gen
+        self.matrix_path = stem + ".npy"
+        self.ann_path    = stem + ".faiss"
 
     def save(self):
         os.makedirs(os.path.dirname(self.path), exist_ok=True)
-        with open(self.path, "w") as f:
-            json.dump(self.entries, f)
-        logger.info(f"VectorStore: saved {len(self.entries)} entries to {self.path}")
+        n = len(self._ids)
+        old = (self.matrix_path, self.ann_path)
+        self._generation(uuid.uuid4().hex[:12])
+        np.save(self.matrix_path, np.ascontiguousarray(self._matrix[:n]))
+        index = self._ann_index()
+        if index is not None:
+            import faiss
+            faiss.write_index(index, self.ann_path)
+        tmp_meta = self.path + ".tmp"
+        with open(tmp_meta, "w") as f:
+            json.dump({
+                "version":    FORMAT_VERSION,
+                "generation": self.generation,
+                "dim":        self._dim,
+                "ids":        self._ids,
+                "texts":      self._texts,
+                "metadata":   self._meta,
+            }, f)
+        os.replace(tmp_meta, self.path)      # the commit point: the sidecar now names the new files
+        self._remove_stale(keep=(self.matrix_path, self.ann_path), also=old)
+        logger.info(f"VectorStore: saved {n} entries to {self.path}")
+
+    def _remove_stale(self, keep, also=()):
+        """Delete data files of other generations (the previous one, or left by an interrupted save)."""
+        folder = os.path.dirname(self.path) or "."
+        stem = re.escape(os.path.basename(os.path.splitext(self.path)[0]))
+        pattern = re.compile(rf"{stem}(\.[0-9a-f]{{12}})?\.(npy|faiss)$")
+        stale = {os.path.join(folder, f) for f in os.listdir(folder) if pattern.match(f)} | set(also)
+        for path in stale - set(keep):
+            try:
+                os.remove(path)
+            except OSError:           # gone already, or still mapped (Windows): next save retries
+                pass
+
+    def _read_ann(self):
+        if not os.path.exists(self.ann_path) or not self._use_faiss():
+            return None
+        import faiss
+        try:
+            index = faiss.read_index(self.ann_path)
+        except RuntimeError as e:
+            logger.warning(f"VectorStore: could not read {self.ann_path}: {e}")
+            return None
+        if index.ntotal != len(self._ids) or \
+                not ann.matches(index, config.RAG_ANN_BACKEND, config.RAG_VECTOR_COMPRESSION):
+            return None
+        return ann.tune(index)
 
     # ── CRUD ──────────────────────────────────────────────────────────────────
 
     def add(self, doc_id: str, text: str, vector: list[float], metadata: dict = None):
+        vec = np.asarray(vector, dtype=np.float32).ravel()
+        if self._dim is None:
+            self._dim    = vec.shape[0]
+            self._matrix = np.zeros((16, self._dim), dtype=np.float32)
+        elif vec.shape[0] != self._dim:
+            raise ValueError(f"VectorStore: vector for {doc_id!r} has {vec.shape[0]} dims, store uses {self._dim}")
+
+        norm = float(np.linalg.norm(vec))
+        if norm:
+            vec = vec / norm
+
         # Replace if exists
-        self.entries = [e for e in self.entries if e["id"] != doc_id]
-        self.entries.append({
-            "id": doc_id,
-            "text": text,
-            "vector": vector,
-            "metadata": metadata or {},
-        })
+        row = self._rows.get(doc_id)
+        if row is None:
+            row = len(self._ids)
+            self._reserve(row + 1)
+            self._rows[doc_id] = row
+            self._ids.append(doc_id)
+            self._texts.append(text)
+            self._meta.append(metadata or {})
+        else:
+            self._reserve(len(self._ids))
+            self._texts[row] = text
+            self._meta[row]  = metadata or {}
+        self._matrix[row] = vec
+        self._bm25 = None
+        self._ann  = None
+
+    def update(self, doc_id: str, text: str, metadata: dict = None):
+        """Change an entry's text and metadata, keeping its vector."""
+        row = self._rows[doc_id]
+        self._texts[row] = text
+        self._meta[row]  = metadata or {}
+        self._bm25 = None
+
+    def remove(self, doc_ids) -> int:
+        """Delete entries by id (unknown ids are ignored); returns how many were removed."""
+        drop = {self._rows[d] for d in doc_ids if d in self._rows}
+        if not drop:
+            return 0
+        keep = [i for i in range(len(self._ids)) if i not in drop]
+        self._matrix = self._matrix[keep]           # fancy indexing copies: writable, also after an mmap load
+        self._ids    = [self._ids[i] for i in keep]
+        self._texts  = [self._texts[i] for i in keep]
+        self._meta   = [self._meta[i] for i in keep]
+        self._rows   = {doc_id: i for i, doc_id in enumerate(self._ids)}
+        self._bm25   = None
+        self._ann    = None
+        return len(drop)
 
     def clear(self):
-        self.entries = []
+        self._ids:   list[str]  = []
+        self._texts: list[str]  = []
+        self._meta:  list[dict] = []
+        self._rows:  dict[str, int] = {}
+        self._dim    = None
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._bm25   = None
+        self._ann    = None
+
+    @property
+    def ids(self) -> list[str]:
+        return list(self._ids)
+
+    def get(self, doc_id: str) -> dict:
+        """{id, text, metadata} for one entry (no vector), or None."""
+        row = self._rows.get(doc_id)
+        if row is None:
+            return None
+        return {"id": doc_id, "text": self._texts[row], "metadata": self._meta[row]}
+
+    @property
+    def entries(self) -> list[dict]:
+        """Entries as {id, text, metadata, vector} dicts (materialised on access)."""
+        return [self._entry(i) for i in range(len(self._ids))]
+
+    def _reserve(self, rows: int):
+        """Make rows [0, rows) writable, growing capacity geometrically."""
+        writable = self._matrix.flags.writeable and not isinstance(self._matrix, np.memmap)
+        if writable and rows <= self._matrix.shape[0]:
+            return
+        capacity = max(16, rows, self._matrix.shape[0] * 2 if writable else rows)
+        grown = np.zeros((capacity, self._dim), dtype=np.float32)
+        n = len(self._ids)
+        grown[:n] = self._matrix[:n]
+        self._matrix = grown
 
     # ── Retrieval ─────────────────────────────────────────────────────────────
 
     def search(self, query_vector: list[float], top_k: int = None) -> list[dict]:
         """Return top-k entries by cosine similarity."""
         top_k = top_k or config.RAG_TOP_K
-        if not self.entries or not query_vector:
+        return [{"score": score, **self._entry(i)} for i, score in self._dense_rows(query_vector, top_k)]
+
+    def hybrid_search(self, query: str, embed_fn, top_k: int = None) -> list[dict]:
+        """
+        Top-k entries by BM25 + cosine, fused with reciprocal rank.
+
+        Each entry carries "score" (fused), "dense" (cosine, None if not in
+        the vector candidates) and "lexical" (BM25, None if no term matched).
+        embed_fn(text) is only called when the query is not a short keyword
+        query that BM25 can answer on its own.
+        """
+        top_k = top_k or config.RAG_TOP_K
+        if not self._ids:
             return []
+        if self._bm25 is None:
+            self._bm25 = BM25Index(self._texts)
+        searcher = HybridSearcher(self._bm25, lambda qs, n: [self._dense_rows(embed_fn(q), n) for q in qs])
+        return [{"score": h.score, "dense": h.dense, "lexical": h.lexical, **self._entry(h.row)}
+                for h in searcher.search(query, top_k)]
+
+    def _dense_rows(self, query_vector, top_k: int) -> list[tuple[int, float]]:
+        """(row, cosine) pairs, best first."""
+        n = len(self._ids)
+        if not n or query_vector is None or len(query_vector) == 0:
+            return []
+
+        q = np.asarray(query_vector, dtype=np.float32).ravel()
+        if q.shape[0] != self._dim:
+            return []
+        norm = float(np.linalg.norm(q))
+        if not norm:
+            return []
+
+        index = self._ann_index()
+        if index is not None:
+            scores, rows = ann.search(index, (q / norm)[None, :], top_k, vectors=self._matrix[:n])
+            return [(int(i), float(s)) for i, s in zip(rows[0], scores[0]) if i >= 0]
+
+        scores = self._matrix[:n] @ (q / norm)
+        if top_k < n:
+            top = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            top = np.arange(n)
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(i), float(scores[i])) for i in top]
+
+    def _use_faiss(self) -> bool:
+        """False = plain NumPy full scan (small, uncompressed store, or no faiss)."""
+        approximate = ann.choose_backend(len(self._ids), config.RAG_ANN_BACKEND) != "exact"
+        compressed  = ann.parse_compression(config.RAG_VECTOR_COMPRESSION) != (None, False)
+        return (approximate or compressed) and ann.faiss_available()
 
-        scored = []
-        for entry in self.entries:
-            score = _cosine_similarity(query_vector, entry["vector"])
-            scored.append((score, entry))
+    def _ann_index(self):
+        if self._ann is None and self._ids and self._use_faiss():
+            self._ann = ann.build_index(self._matrix[:len(self._ids)], config.RAG_ANN_BACKEND,
+                                        config.RAG_VECTOR_COMPRESSION)
+            logger.info(f"VectorStore: built {ann.describe(self._ann)} index over {len(self._ids)} entries")
+        return self._ann
 
-        scored.sort(key=lambda x: x[0], reverse=True)
-        return [{"score": s, **e} for s, e in scored[:top_k]]
+    def _entry(self, i: int) -> dict:
+        return {
+            "id":       self._ids[i],
+            "text":     self._texts[i],
+            "vector":   self._matrix[i].tolist(),
+            "metadata": self._meta[i],
+        }
 
     def __len__(self):
-        return len(self.entries)
-
-
-def _cosine_similarity(a: list[float], b: list[float]) -> float:
-    if not a or not b or len(a) != len(b):
-        return 0.0
-    dot   = sum(x * y for x, y in zip(a, b))
-    mag_a = math.sqrt(sum(x * x for x in a))
-    mag_b = math.sqrt(sum(y * y for y in b))
-    if mag_a == 0 or mag_b == 0:
-        return 0.0
-    return dot / (mag_a * mag_b)
+        return len(self._ids)
@@ -1,8 +1,20 @@
 """
 ai_engine/prompt_builder.py
 Builds Groq prompts.  Imported by test_generator.py — do not run directly.
+
+The ELEMENTS JSON and the RAG context are fitted to token budgets
+(rag_common/context_packer.py) instead of cutting the prompt at 2200 words:
+the longest element lists lose entries from their tails, and context chunks
+are taken in maximal-marginal-relevance order with near-duplicates dropped.
 """
-import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+from rag_common.context_packer import fit_json, pack_chunks, prompt_counter
+
+ELEMENTS_TOKENS    = 1800   # compressed ELEMENTS JSON
+RAG_CONTEXT_TOKENS = 900    # retrieved context (+ ELEMENTS budget left unused)
 
 SYSTEM_PROMPT = """You are a senior QA automation engineer with 10+ years of web testing experience.
 Analyse the web page element data and generate comprehensive, realistic test cases.
@@ -49,8 +61,15 @@ OUTPUT FORMAT — return ONLY valid JSON, no markdown, no text outside the JSON:
 }"""
 
 
-def build_prompt(page_data: dict, rag_context: str = "") -> tuple:
-    compressed = _compress(page_data)
+def build_prompt(page_data: dict, rag_context="") -> tuple:
+    """rag_context: retrieval results ({"text", "score"}, best first) or an already formatted string."""
+    elements = fit_json(_compress(page_data), ELEMENTS_TOKENS)
+    used     = prompt_counter()(elements)
+    if isinstance(rag_context, str):
+        chunks, scores = [p for p in rag_context.split("\n\n") if p.strip()], None
+    else:
+        chunks, scores = [c["text"] for c in rag_context], [c.get("score", 0.0) for c in rag_context]
+    rag_context = pack_chunks(chunks, RAG_CONTEXT_TOKENS + ELEMENTS_TOKENS - used, scores).texts["context"]
     rag_block  = (
         "\nRELEVANT CONTEXT FROM KNOWLEDGE BASE:\n" + rag_context + "\n--- END CONTEXT ---\n"
     ) if rag_context.strip() else ""
@@ -61,14 +80,9 @@ def build_prompt(page_data: dict, rag_context: str = "") -> tuple:
         f"Title: {page_data.get('title','unknown')}\n"
         f"Type: {page_data.get('page_type','general')}\n"
         f"{rag_block}\n"
-        f"ELEMENTS:\n{json.dumps(compressed, indent=2)}\n\n"
+        f"ELEMENTS:\n{elements}\n\n"
         f"Return ONLY the JSON object."
     )
-
-    words = user_prompt.split()
-    if len(words) > 2200:
-        user_prompt = " ".join(words[:2200]) + "\n\n[TRUNCATED] Generate test cases from above only."
-
     return SYSTEM_PROMPT, user_prompt
 
 
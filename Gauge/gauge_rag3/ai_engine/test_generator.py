@@ -4,6 +4,11 @@ ai_engine/test_generator.py
 Reads crawled metadata JSON, calls Groq AI with RAG context,
 and writes a testcases.json file.
 
+Each prompt is packed to token budgets (rag_common/context_packer.py):
+selector lines in priority order up to SELECTOR_TOKENS, and retrieved
+knowledge-base chunks in maximal-marginal-relevance order (near-duplicates
+dropped) up to RAG_CONTEXT_TOKENS.
+
 HOW TO RUN (from the project root folder):
     python ai_engine/test_generator.py
 
@@ -21,9 +26,11 @@ from typing import Optional
 
 # Add project root to path so sibling modules can be imported
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
 
 from ai_engine.groq_client import GroqClient
-from rag.retriever import retrieve_for_page
+from rag.retriever import format_chunk, retrieve_chunks_for_pages
+from rag_common.context_packer import Section, mmr_select, pack, prompt_counter
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 logger = logging.getLogger(__name__)
@@ -40,6 +47,10 @@ USE_RAG          = True    # False = skip RAG, pure Groq only
 # Process only specific page indices? e.g. [0, 1, 2]  or  None = all pages
 PAGES_TO_PROCESS = None
 
+# Prompt budgets, in prompt tokens (replaces the old 3000-word cut)
+SELECTOR_TOKENS    = 1500   # VERIFIED SELECTORS lines: inputs, buttons, links, headings
+RAG_CONTEXT_TOKENS = 600    # knowledge-base chunks (the last one cut to fill the budget)
+
 # =============================================================================
 
 os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
@@ -110,14 +121,11 @@ OUTPUT FORMAT — return ONLY valid JSON, no markdown, no text outside the JSON:
 }"""
 
 
-def _build_prompt(page_data, rag_context=""):
+def _build_prompt(page_data, rag_chunks=()):
+    """rag_chunks: retrieval results for the page, best first (retrieve_chunks_for_pages)."""
     e = page_data.get("elements", {})
     page_url = page_data.get("url", "unknown")
 
-    rag_block = (
-        "\nRELEVANT CONTEXT FROM KNOWLEDGE BASE:\n" + rag_context + "\n--- END CONTEXT ---\n"
-    ) if rag_context.strip() else ""
-
     # ── Selector Reference Block ───────────────────────────────────────────────
     # Build a clean, unambiguous list the AI must use verbatim.
     # Key insight from metadata analysis:
@@ -198,7 +206,20 @@ def _build_prompt(page_data, rag_context=""):
             f"  level={level}  text={text}"
         )
 
-    selector_block = "\n".join(selector_ref) if selector_ref else "  (no selectors found)"
+    # ── Token budgets ──────────────────────────────────────────────────────────
+    # Selectors first (the model may only use what is listed); the retrieved
+    # chunks go in MMR order so near-duplicate examples do not crowd out the rest.
+    order  = mmr_select([c["text"] for c in rag_chunks],
+                        scores=[c.get("score", 0.0) for c in rag_chunks])
+    packed = pack([
+        Section("selectors", selector_ref, SELECTOR_TOKENS),
+        Section("rag", [format_chunk(rag_chunks[i]) for i in order], RAG_CONTEXT_TOKENS, "\n\n", cut=True),
+    ], carry=False)
+    rag_context    = packed.texts["rag"]
+    selector_block = packed.texts["selectors"] or "  (no selectors found)"
+    rag_block = (
+        "\nRELEVANT CONTEXT FROM KNOWLEDGE BASE:\n" + rag_context + "\n--- END CONTEXT ---\n"
+    ) if rag_context.strip() else ""
 
     # Warn AI explicitly if no form fields were found
     no_form_warning = ""
@@ -229,10 +250,8 @@ def _build_prompt(page_data, rag_context=""):
         f"6. For headings/visibility: use selector_type and selector_value from HEADING entries\n"
         f"Return ONLY the JSON object."
     )
-
-    words = user_prompt.split()
-    if len(words) > 3000:
-        user_prompt = " ".join(words[:3000]) + "\n\n[TRUNCATED] Generate test cases from above only."
+    logger.info(f"  Prompt: {prompt_counter()(user_prompt)} tokens — {packed.summary()}, "
+                f"{len(rag_chunks) - len(order)} near-duplicate chunks dropped")
 
     return SYSTEM_PROMPT, user_prompt
 
@@ -471,11 +490,14 @@ def run():
     failed  = []
     tc_num  = 1
 
+    # one batched encode + query for every page instead of one per page
+    rag_ctxs = retrieve_chunks_for_pages(pages) if USE_RAG else [[] for _ in pages]
+
     for i, page in enumerate(pages):
         url = page.get("url", "unknown")
         logger.info(f"\n[{i+1}/{len(pages)}] {url}")
         try:
-            rag_ctx = retrieve_for_page(page) if USE_RAG else ""
+            rag_ctx = rag_ctxs[i]
             sys_p, usr_p = _build_prompt(page, rag_ctx)
             response = client.complete(sys_p, usr_p, expect_json=True)
 
@@ -0,0 +1,131 @@
+"""
+benchmarks/bench_batched_retrieval.py
+=====================================
+Retrieval-stage time of ai_engine/test_generator.py for --pages synthetic
+crawled pages:
+
+  per_page        retrieve_for_page(page) in a loop (the previous behaviour)
+  batched         retrieve_for_pages(pages) (one encode + one ChromaDB query)
+  cached_rerun    retrieve_for_pages(pages) with the query-result cache on,
+                  after an untimed run filled it and the in-memory LRU was
+                  dropped (entries come back from the on-disk file, as in
+                  a re-run of the generator)
+
+Runs in-process (RAG_SERVICE=off) against a temporary collection of
+--chunks chunks, with the shared embedding cache disabled so every query is
+really encoded, and the query-result cache off except for cached_rerun.
+Reports wall time, model.encode() calls and collection query calls, and
+checks that all paths return identical contexts.
+
+HOW TO RUN (from the gauge_rag3 folder):
+    python benchmarks/bench_batched_retrieval.py
+    python benchmarks/bench_batched_retrieval.py --pages 300 --chunks 2000
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+os.environ["RAG_SERVICE"] = "off"
+os.environ["RAG_EMBEDDING_CACHE"] = "off"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from rag import rag_client, rag_service, retriever
+
+PAGE_TYPES = ["login", "search", "form", "listing", "product", "general", "contact", "dashboard"]
+
+
+def _pages(n, rnd):
+    pages = []
+    for i in range(n):
+        elems = {}
+        for key, hi in (("forms", 3), ("interactive", 12), ("navigation", 40), ("tables", 2)):
+            k = rnd.randint(0, hi)
+            if k:
+                elems[key] = [{}] * k
+        pages.append({"url": f"https://example.test/page/{i}", "page_type": rnd.choice(PAGE_TYPES),
+                      "elements": elems})
+    return pages
+
+
+def _chunks(n, rnd):
+    vocab = ("verify login form submit error field required page link button table "
+             "click enter value expected result step scenario search navigation").split()
+    return [{"id": f"c{i}", "text": " ".join(rnd.choice(vocab) for _ in range(120)),
+             "meta": {"source": rnd.choice(["test_cases", "best_practices", "selenium_gauge_docs"]),
+                      "file": f"f{i % 30}.txt"}}
+            for i in range(n)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--chunks", type=int, default=1000)
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    rnd = random.Random(0)
+    tmp = tempfile.mkdtemp(prefix="batched_retrieval_")
+    try:
+        rag_service.CHROMA_DIR = os.path.join(tmp, ".chromadb")
+        rag_service.MANIFEST_FILE = os.path.join(rag_service.CHROMA_DIR, "kb_manifest.json")
+        rag_client.upsert(_chunks(args.chunks, rnd))
+        core = rag_client._core()
+
+        counts = {"encode": 0, "query": 0}
+        encode, query = core.model.encode, core._col.query
+
+        def counted_encode(*a, **kw):
+            counts["encode"] += 1
+            return encode(*a, **kw)
+
+        def counted_query(*a, **kw):
+            counts["query"] += 1
+            return query(*a, **kw)
+
+        core.model.encode, core._col.query = counted_encode, counted_query
+        pages = _pages(args.pages, rnd)
+        cache_file = os.path.join(tmp, "query_cache.json")
+        cache_size = retriever.QUERY_CACHE_SIZE
+
+        def fill_cache():
+            retriever.QUERY_CACHE_SIZE = cache_size
+            retriever._cache = retriever._QueryCache(cache_size, cache_file)
+            retriever.retrieve_for_pages(pages)
+            retriever._cache.save()                                               # as at exit
+            retriever._cache = retriever._QueryCache(cache_size, cache_file)     # fresh process
+
+        report = {"pages": args.pages, "chunks": args.chunks,
+                  "distinct_queries": len({retriever._page_query(p) for p in pages})}
+        retriever.QUERY_CACHE_SIZE = 0
+        contexts = {}
+        for label, setup, run in (
+            ("per_page", None, lambda: [retriever.retrieve_for_page(p) for p in pages]),
+            ("batched", None, lambda: retriever.retrieve_for_pages(pages)),
+            ("cached_rerun", fill_cache, lambda: retriever.retrieve_for_pages(pages)),
+        ):
+            if setup:
+                setup()
+            counts.update(encode=0, query=0)
+            t0 = time.perf_counter()
+            contexts[label] = run()
+            report[label] = {"seconds": round(time.perf_counter() - t0, 4),
+                             "encode_calls": counts["encode"], "query_calls": counts["query"]}
+        report["cached_rerun"]["hit_rate"] = round(
+            retriever._cache.hits / max(retriever._cache.hits + retriever._cache.misses, 1), 3)
+
+        report["identical_contexts"] = len({json.dumps(c) for c in contexts.values()}) == 1
+        report["speedup"] = round(report["per_page"]["seconds"] / max(report["batched"]["seconds"], 1e-6), 1)
+        print(json.dumps(report, indent=2))
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
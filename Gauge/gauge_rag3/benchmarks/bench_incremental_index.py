@@ -0,0 +1,96 @@
+"""
+benchmarks/bench_incremental_index.py
+=====================================
+Times rag/embedder.run() on a synthetic knowledge base in a temp folder:
+
+  cold        first build (every file chunked, embedded, upserted)
+  no_change   second run with nothing touched
+  touched     every file's mtime bumped, content identical (hash check only)
+  edit        one file modified, one shrunk, one removed, one added
+
+For each run it reports wall time, chunks in the collection and whether the
+collection holds exactly the chunk ids the manifest lists (no stale chunks).
+
+HOW TO RUN (from the gauge_rag3 folder):
+    python benchmarks/bench_incremental_index.py
+    python benchmarks/bench_incremental_index.py --files 2000 --words 1500
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from rag import embedder
+
+
+def _write(path, words, rnd):
+    vocab = ("verify login form submit error field required page link button table "
+             "click enter value expected result step scenario gauge selenium").split()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(" ".join(rnd.choice(vocab) for _ in range(words)))
+
+
+def _timed(label, results):
+    t0 = time.perf_counter()
+    embedder.run()
+    elapsed = time.perf_counter() - t0
+    manifest = embedder._load_manifest()
+    listed = {cid for f in manifest["files"].values() for cid in f["ids"]}
+
+    import chromadb
+    from chromadb.config import Settings
+    col = chromadb.PersistentClient(path=embedder.CHROMA_DIR, settings=Settings(anonymized_telemetry=False)) \
+        .get_collection(embedder.COLLECTION_NAME)
+    stored = set(col.get(include=[])["ids"])
+    results[label] = {"seconds": round(elapsed, 3), "chunks": len(stored), "no_stale_chunks": stored == listed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=500)
+    parser.add_argument("--words", type=int, default=1200, help="words per file (several CHUNK_TOKENS chunks)")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    rnd = random.Random(0)
+    tmp = tempfile.mkdtemp(prefix="kb_bench_")
+    try:
+        kb = os.path.join(tmp, "kb")
+        os.makedirs(kb)
+        for i in range(args.files):
+            _write(os.path.join(kb, f"doc_{i:05d}.txt"), args.words, rnd)
+
+        embedder.KNOWLEDGE_SOURCES = {"test_cases": kb}
+        embedder.CHROMA_DIR = os.path.join(tmp, ".chromadb")
+        embedder.MANIFEST_FILE = os.path.join(embedder.CHROMA_DIR, "kb_manifest.json")
+        os.makedirs(embedder.CHROMA_DIR)
+
+        results = {}
+        _timed("cold", results)
+        _timed("no_change", results)
+
+        for name in os.listdir(kb):
+            os.utime(os.path.join(kb, name))
+        _timed("touched", results)
+
+        _write(os.path.join(kb, "doc_00000.txt"), args.words, rnd)          # modified
+        _write(os.path.join(kb, "doc_00001.txt"), 100, rnd)                 # shrunk to 1 chunk
+        os.remove(os.path.join(kb, "doc_00002.txt"))                        # removed
+        _write(os.path.join(kb, "new_doc.txt"), args.words, rnd)            # added
+        _timed("edit", results)
+        _timed("no_change_after_edit", results)
+
+        print(json.dumps({"files": args.files, "words_per_file": args.words, "runs": results}, indent=2))
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
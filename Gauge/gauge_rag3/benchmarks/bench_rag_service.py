@@ -0,0 +1,167 @@
+"""
+benchmarks/bench_rag_service.py
+===============================
+Per-query latency of rag/retriever.retrieve() from a fresh CLI process,
+with and without the RAG daemon (rag/rag_service.py), plus micro-batching
+under concurrent load.
+
+  cold_cli_in_process   python process: import retriever + one retrieve(),
+                        RAG_SERVICE=off (model + ChromaDB loaded in-process)
+  cold_cli_daemon       the same with the daemon running
+  concurrent            --threads clients each sending --per-thread queries to
+                        the daemon; reports queries/sec and how many batches
+                        the daemon needed for them
+
+The daemon and the CLI processes use a temporary ChromaDB folder filled with
+--chunks synthetic chunks through rag_client.upsert (so /upsert is exercised
+too); the project's .chromadb is never touched.
+
+HOW TO RUN (from the gauge_rag3 folder):
+    python benchmarks/bench_rag_service.py
+    python benchmarks/bench_rag_service.py --chunks 2000 --threads 16
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+QUERIES = [
+    "form validation test cases for login page",
+    "Test cases for search page with 1 form(s), 3 link(s)",
+    "navigation menu links open the right page",
+    "checkout flow with payment form",
+]
+
+# patches the rag_service settings to the temp collection before anything runs
+_SETUP = ("import sys; sys.path.insert(0, {proj!r}); import rag.rag_service as s; "
+          "s.CHROMA_DIR = {chroma!r}; s.MANIFEST_FILE = s.CHROMA_DIR + '/kb_manifest.json'; ")
+
+_CLI = _SETUP + (
+    "import time; t0 = time.perf_counter(); "
+    "from rag.retriever import retrieve; ctx = retrieve({query!r}); "
+    "print(round((time.perf_counter() - t0) * 1000, 1), len(ctx))"
+)
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _chunks(n):
+    rnd = random.Random(0)
+    vocab = ("verify login form submit error field required page link button table "
+             "click enter value expected result step scenario gauge selenium search").split()
+    return [{"id": f"c{i}", "text": " ".join(rnd.choice(vocab) for _ in range(120)),
+             "meta": {"source": rnd.choice(["test_cases", "best_practices"]), "file": f"f{i % 40}.txt"}}
+            for i in range(n)]
+
+
+def _cli(env, chroma, query):
+    t0 = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", _CLI.format(proj=PROJECT_DIR, chroma=chroma, query=query)],
+                         env=env, cwd=PROJECT_DIR, capture_output=True, text=True, check=True)
+    wall = (time.perf_counter() - t0) * 1000
+    retrieve_ms, ctx_len = out.stdout.split()[-2:]
+    return wall, float(retrieve_ms), int(ctx_len)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=500)
+    parser.add_argument("--runs", type=int, default=3, help="fresh CLI processes per mode")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--per-thread", type=int, default=25)
+    args = parser.parse_args()
+
+    tmp    = tempfile.mkdtemp(prefix="rag_service_bench_")
+    chroma = os.path.join(tmp, ".chromadb")
+    port   = _free_port()
+    env    = dict(os.environ, RAG_SERVICE_PORT=str(port),
+                  RAG_EMBEDDING_CACHE=os.environ.get("RAG_EMBEDDING_CACHE", os.path.join(tmp, "emb.sqlite3")))
+    daemon = subprocess.Popen(
+        [sys.executable, "-c", _SETUP.format(proj=PROJECT_DIR, chroma=chroma) + f"s.serve(port={port})"],
+        env=env, cwd=PROJECT_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        os.environ.update(RAG_SERVICE_PORT=str(port))
+        from rag import rag_client
+        rag_client.SERVICE_URL = f"http://127.0.0.1:{port}"
+        t0 = time.perf_counter()
+        while True:
+            rag_client._service_down = False
+            if rag_client.service_available():
+                break
+            if daemon.poll() is not None or time.perf_counter() - t0 > 300:
+                raise SystemExit("RAG daemon did not start")
+            time.sleep(0.2)
+        startup = time.perf_counter() - t0
+        rag_client.upsert(_chunks(args.chunks))
+
+        report = {"chunks": args.chunks, "daemon_startup_s": round(startup, 2)}
+        for label, mode in (("cold_cli_in_process", "off"), ("cold_cli_daemon", "auto")):
+            runs = [_cli(dict(env, RAG_SERVICE=mode), chroma, QUERIES[i % len(QUERIES)]) for i in range(args.runs)]
+            report[label] = {
+                "process_wall_ms": round(statistics.median(r[0] for r in runs), 1),
+                "import_plus_retrieve_ms": round(statistics.median(r[1] for r in runs), 1),
+                "context_chars": runs[0][2],
+            }
+        report["cli_speedup"] = round(report["cold_cli_in_process"]["import_plus_retrieve_ms"]
+                                      / max(report["cold_cli_daemon"]["import_plus_retrieve_ms"], 1e-3), 1)
+
+        before = json.loads(_health(port))
+        latencies, lock = [], threading.Lock()
+
+        def worker(seed):
+            rnd = random.Random(seed)
+            for _ in range(args.per_thread):
+                q = f"{rnd.choice(QUERIES)} #{rnd.randint(0, 10**6)}"      # unique -> real encodes
+                t = time.perf_counter()
+                rag_client.retrieve(q, 5)
+                with lock:
+                    latencies.append((time.perf_counter() - t) * 1000)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+        t0 = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - t0
+        after = json.loads(_health(port))
+        total = args.threads * args.per_thread
+        report["concurrent"] = {
+            "threads": args.threads,
+            "queries": total,
+            "queries_per_sec": round(total / elapsed, 1),
+            "p50_ms": round(statistics.median(latencies), 1),
+            "daemon_batches": after["batches"] - before["batches"],
+            "avg_queries_per_batch": round(total / max(after["batches"] - before["batches"], 1), 1),
+        }
+        print(json.dumps(report, indent=2))
+    finally:
+        daemon.terminate()
+        daemon.wait()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _health(port):
+    import urllib.request
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=10) as resp:
+        return resp.read()
+
+
+if __name__ == "__main__":
+    main()
@@ -48,8 +48,8 @@ CRAWLER_EXTRACT_ELEMENTS = [
 
 # ─── RAG Settings ──────────────────────────────────────────────────────────────
 RAG_EMBEDDING_MODEL = "all-MiniLM-L6-v2"  # Fast, local, no API cost
-RAG_CHUNK_SIZE = 500
-RAG_CHUNK_OVERLAP = 50
+RAG_CHUNK_TOKENS = 256             # model tokens per chunk (rag/embedder.py)
+RAG_CHUNK_OVERLAP_TOKENS = 32
 RAG_TOP_K = 5                      # Number of relevant chunks to retrieve
 RAG_COLLECTION_NAME = "testing_knowledge_base"
 
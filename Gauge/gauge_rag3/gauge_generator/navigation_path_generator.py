@@ -0,0 +1,428 @@
+"""
+gauge_generator/navigation_path_generator.py
+==============================================
+Builds a state machine from metadata.json and writes a Gauge spec whose
+scenarios are the fewest walks that exercise every transition — no LLM call.
+
+HOW TO RUN (from project root):
+    python gauge_generator/navigation_path_generator.py
+
+ALL SETTINGS ARE HARDCODED BELOW — edit and run.
+No config file, no CLI arguments, no relative imports.
+
+Model:
+  state       = a crawled page (URL without #fragment)
+  transition  = an internal link or a form submit on page A whose target is
+                crawled page B (A -> B).  One transition per (A, B, trigger
+                kind) when DEDUPE_TRANSITIONS is on.
+
+Cost model:
+  Every scenario starts with one "Navigate to url" (a full page load) and then
+  clicks through transitions.  Because a new scenario can start at any state,
+  re-traversing an edge to reach the next uncovered one is never cheaper than
+  starting a new walk, so the problem is the directed Chinese-postman problem
+  with unit-cost "teleports".  Its optimum is the minimum trail decomposition
+  of the transition multigraph:
+
+      walks = sum(max(0, out(v) - in(v)))  +  #balanced components
+
+  computed exactly with Hierholzer's algorithm on the graph augmented by a
+  virtual start node.
+
+Outputs:
+  specs/navigation_paths.spec                   Gauge scenarios
+  data/testcases/navigation_paths_report.json   navigation cost comparison
+"""
+
+import json
+import logging
+import os
+from collections import defaultdict
+from datetime import datetime
+from urllib.parse import urldefrag, urlparse
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+#  SETTINGS — edit these values directly
+# =============================================================================
+
+METADATA_FILE    = "data/metadata/metadata.json"                 # from crawler/web_crawler.py
+TESTCASES_FILE   = "data/testcases/testcases.json"               # current LLM output (for the report)
+SPEC_OUTPUT_FILE = "specs/navigation_paths.spec"
+REPORT_FILE      = "data/testcases/navigation_paths_report.json"
+
+INCLUDE_FORMS      = True    # form submits are transitions too
+SKIP_POST_FORMS    = True    # don't auto-submit POST forms (contact / sign-up side effects)
+DEDUPE_TRANSITIONS = True    # one transition per (page, target, kind) instead of per <a>
+MAX_STEPS_PER_SCENARIO = 25  # split longer walks (each extra part costs one navigation); 0 = no limit
+
+# =============================================================================
+
+os.makedirs(os.path.dirname(SPEC_OUTPUT_FILE), exist_ok=True)
+os.makedirs(os.path.dirname(REPORT_FILE), exist_ok=True)
+
+
+def run():
+    logger.info(f"\n{'='*55}")
+    logger.info("NAVIGATION PATH GENERATOR (model-based)")
+    logger.info(f"  input  : {METADATA_FILE}")
+    logger.info(f"  output : {SPEC_OUTPUT_FILE}")
+    logger.info(f"{'='*55}")
+
+    if not os.path.isfile(METADATA_FILE):
+        raise FileNotFoundError(
+            f"File not found: {METADATA_FILE}\n"
+            f"Run crawler/web_crawler.py first."
+        )
+
+    with open(METADATA_FILE, "r", encoding="utf-8") as f:
+        metadata = json.load(f)
+
+    base_url = metadata.get("crawl_metadata", {}).get("base_url", "unknown")
+    states, transitions = build_state_machine(metadata)
+    logger.info(f"  states      : {len(states)}")
+    logger.info(f"  transitions : {len(transitions)}")
+
+    walks = cover_transitions(transitions)
+    walks = _split(walks)
+
+    _write_spec(walks, states, transitions, base_url)
+    report = _report(walks, states, transitions)
+    with open(REPORT_FILE, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    m, b, c = report["model_based"], report["one_scenario_per_transition"], report["current_testcases"]
+    logger.info(f"  walks       : {m['scenarios']}  ({m['navigations']} navigations, {m['actions']} actions)")
+    logger.info(f"  per-transition baseline : {b['navigations']} navigations, {b['actions']} actions")
+    if c:
+        logger.info(f"  current testcases.json  : {c['navigations']} navigations, "
+                    f"{c['transitions_covered']}/{len(transitions)} transitions covered")
+    logger.info(f"\nDone — {SPEC_OUTPUT_FILE}, {REPORT_FILE}")
+    return report
+
+
+# =============================================================================
+#  STATE MACHINE
+# =============================================================================
+
+def build_state_machine(metadata):
+    """
+    Returns (states, transitions).
+
+    states      : {state_key: {"url", "title"}}
+    transitions : list of {"src", "dst", "kind", "step", "label"} where step is
+                  the Gauge step that fires the transition from src.
+    """
+    states = {}
+    for page in metadata.get("pages", []):
+        key = _key(page.get("url", ""))
+        if key and key not in states:
+            states[key] = {"url": page["url"], "title": page.get("title", "")}
+
+    transitions, seen = [], set()
+    for page in metadata.get("pages", []):
+        src = _key(page.get("url", ""))
+        elements = page.get("elements", {})
+        links = [l for l in elements.get("navigation", [])
+                 if not l.get("is_external") and _key(l.get("href", "")) in states]
+
+        # link text -> set of targets on this page; LINK_TEXT clicks the first
+        # match, so text is only a safe trigger when it is unambiguous
+        by_text = defaultdict(set)
+        for l in links:
+            by_text[l.get("text", "").strip()].add(_key(l["href"]))
+
+        # with dedupe on, keep one trigger per target — preferably a link whose
+        # text is unambiguous, since those survive layout changes best
+        if DEDUPE_TRANSITIONS:
+            best = {}
+            for l in links:
+                dst, text = _key(l["href"]), l.get("text", "").strip()
+                if dst not in best or (text and len(by_text[text]) == 1 and not _safe_text(best[dst], by_text)):
+                    best[dst] = l
+            links = list(best.values())
+
+        for l in links:
+            dst, text = _key(l["href"]), l.get("text", "").strip()
+            ident = (src, dst, "link", text, l["href"])
+            if ident in seen:
+                continue
+            seen.add(ident)
+            if _safe_text(l, by_text):
+                step = f"Click on link with text \"{_q(text)}\""
+            else:
+                step = f"Click on link with css \"{_href_css(l['href'])}\""
+            transitions.append({"src": src, "dst": dst, "kind": "link",
+                                "step": step, "label": text or _tail(l["href"])})
+
+        if not INCLUDE_FORMS:
+            continue
+        for form in elements.get("forms", []):
+            if SKIP_POST_FORMS and form.get("method", "get").lower() == "post":
+                continue
+            dst = _key(form.get("action") or page["url"])
+            submit = next((b for b in form.get("submit_buttons", []) if b.get("type") == "submit"), None)
+            if dst not in states or submit is None:
+                continue
+            fsel = form.get("selector", {})
+            ident = (src, dst, "form", fsel.get("value"))
+            if ident in seen:
+                continue
+            seen.add(ident)
+            transitions.append({"src": src, "dst": dst, "kind": "form",
+                                "step": _submit_step(form, submit),
+                                "label": f"submit {fsel.get('value', form.get('form_index'))}"})
+
+    return states, transitions
+
+
+# =============================================================================
+#  PATH COVER (directed Chinese postman with unit-cost restarts)
+# =============================================================================
+
+def cover_transitions(transitions):
+    """
+    Split the transitions into the minimum number of walks (each walk is a
+    list of transition indices, consecutive ones chained dst -> src).
+    """
+    if not transitions:
+        return []
+
+    START = None                    # virtual node: "open a fresh browser tab"
+    out = defaultdict(list)         # node -> [edge index]; indices >= n are virtual
+    ends = []                       # edge index -> (src, dst)
+    for i, t in enumerate(transitions):
+        out[t["src"]].append(i)
+        ends.append((t["src"], t["dst"]))
+
+    balance = defaultdict(int)
+    for src, dst in ends:
+        balance[src] += 1
+        balance[dst] -= 1
+
+    def add_virtual(a, b):
+        out[a].append(len(ends))
+        ends.append((a, b))
+
+    # Unbalanced nodes get virtual edges to/from START; a component that is
+    # already Eulerian gets one START -> v -> START pair so it is still reached.
+    for comp in _components(ends):
+        surplus = [v for v in comp if balance[v] > 0]
+        if not surplus:
+            v = min(comp, key=lambda s: s or "")
+            add_virtual(START, v)
+            add_virtual(v, START)
+            continue
+        for v in comp:
+            for _ in range(abs(balance[v])):
+                if balance[v] > 0:
+                    add_virtual(START, v)
+                else:
+                    add_virtual(v, START)
+
+    # Hierholzer — iterative, edges in original order so output is deterministic
+    for node in out:
+        out[node].reverse()
+    circuit, stack = [], [(START, None)]
+    while stack:
+        node, via = stack[-1]
+        if out[node]:
+            e = out[node].pop()
+            stack.append((ends[e][1], e))
+        else:
+            stack.pop()
+            if via is not None:
+                circuit.append(via)
+    circuit.reverse()
+
+    walks, current = [], []
+    for e in circuit:
+        if e >= len(transitions):
+            if current:
+                walks.append(current)
+            current = []
+        else:
+            current.append(e)
+    if current:
+        walks.append(current)
+    return walks
+
+
+def _components(ends):
+    parent = {}
+
+    def find(x):
+        parent.setdefault(x, x)
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for a, b in ends:
+        parent[find(a)] = find(b)
+    groups = defaultdict(list)
+    for node in list(parent):
+        groups[find(node)].append(node)
+    return sorted(groups.values(), key=lambda g: sorted(g))
+
+
+def _split(walks):
+    if MAX_STEPS_PER_SCENARIO <= 0:
+        return walks
+    n = MAX_STEPS_PER_SCENARIO
+    return [w[i:i + n] for w in walks for i in range(0, len(w), n)]
+
+
+# =============================================================================
+#  SPEC WRITER
+# =============================================================================
+
+def _write_spec(walks, states, transitions, base_url):
+    lines = [
+        "# Navigation Paths — Model-Based", "",
+        f"Generated   : {datetime.now().strftime('%Y-%m-%d %H:%M')}",
+        f"Base URL    : {base_url}",
+        f"States      : {len(states)}",
+        f"Transitions : {len(transitions)}",
+        f"Scenarios   : {len(walks)}", "",
+        "tags: navigation, model-based, automated", "",
+    ]
+    for n, walk in enumerate(walks, 1):
+        start = states[transitions[walk[0]]["src"]]
+        sid = f"NAV_{n:03d}"
+        lines.append(f"## Navigation path {n}: {_q(start['title'][:50]) or _tail(start['url'])} "
+                     f"({len(walk)} transitions) [{sid}]")
+        lines.append("")
+        lines.append(f"tags: navigation, model-based, {sid}")
+        lines.append("")
+        lines.append(f"* Navigate to url \"{_q(start['url'])}\"")
+        for e in walk:
+            t = transitions[e]
+            lines.append(f"* {t['step']}")
+            lines.append(f"* Assert current URL is \"{_q(states[t['dst']]['url'])}\"")
+        lines.append("")
+    with open(SPEC_OUTPUT_FILE, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+
+
+# =============================================================================
+#  REPORT
+# =============================================================================
+
+def _report(walks, states, transitions):
+    covered = sum(len(w) for w in walks)
+    report = {
+        "generated_at": datetime.now().isoformat(),
+        "states": len(states),
+        "transitions": len(transitions),
+        "by_kind": {k: sum(1 for t in transitions if t["kind"] == k) for k in ("link", "form")},
+        "model_based": {
+            "scenarios": len(walks),
+            "navigations": len(walks),
+            "clicks": covered,
+            "actions": len(walks) + covered,
+            "transitions_covered": covered,
+        },
+        # what per-page generation converges to: re-navigate before every click
+        "one_scenario_per_transition": {
+            "scenarios": len(transitions),
+            "navigations": len(transitions),
+            "clicks": len(transitions),
+            "actions": 2 * len(transitions),
+        },
+        "current_testcases": _current_cost(states, transitions),
+    }
+    base = report["one_scenario_per_transition"]["navigations"]
+    report["navigation_reduction_pct"] = round(100.0 * (1 - len(walks) / base), 1) if base else 0.0
+    return report
+
+
+def _current_cost(states, transitions):
+    """Navigations / clicks in the LLM's testcases.json and which transitions they fire."""
+    if not os.path.isfile(TESTCASES_FILE):
+        return None
+    with open(TESTCASES_FILE, "r", encoding="utf-8") as f:
+        tcs = json.load(f).get("test_cases", [])
+
+    by_step = defaultdict(set)
+    for i, t in enumerate(transitions):
+        by_step[(t["src"], t["label"].lower())].add(i)
+
+    navigations = clicks = 0
+    fired = set()
+    for tc in tcs:
+        here = None
+        for step in sorted(tc.get("steps", []), key=lambda s: s.get("step_number", 0)):
+            target = step.get("target", {})
+            if step.get("action") == "navigate":
+                navigations += 1
+                here = _key(target.get("selector_value", ""))
+            elif step.get("action") == "click":
+                clicks += 1
+                hit = by_step.get((here, str(target.get("selector_value", "")).strip().lower()))
+                if hit:
+                    fired.update(hit)
+                    here = transitions[min(hit)]["dst"]
+    return {
+        "scenarios": len(tcs),
+        "navigations": navigations,
+        "clicks": clicks,
+        "transitions_covered": len(fired),
+    }
+
+
+# =============================================================================
+#  HELPERS
+# =============================================================================
+
+def _key(url):
+    """State identity: URL without #fragment and trailing slash."""
+    if not url:
+        return ""
+    url = urldefrag(url)[0]
+    return url[:-1] if url.endswith("/") else url
+
+
+def _tail(url):
+    p = urlparse(urldefrag(url)[0])
+    return (p.path or "/") + (f"?{p.query}" if p.query else "")
+
+
+def _safe_text(link, by_text):
+    text = link.get("text", "").strip()
+    return bool(text) and len(by_text[text]) == 1
+
+
+def _href_css(href):
+    """Match the href attribute whether the page wrote it relative or absolute."""
+    href = _q(urldefrag(href)[0]).replace("'", "%27")
+    return f"a[href='{_tail(href)}'],a[href='{href}']"
+
+
+def _submit_step(form, submit):
+    sel = submit.get("selector", {})
+    st, sv = sel.get("type", "xpath"), sel.get("value", "")
+    fsel = form.get("selector", {})
+    # a submit button's name/id is often shared by every form on the page
+    # (calculator.net: name="x"), so scope it to its form where possible
+    if st in ("name", "id") and fsel.get("type") in ("name", "id"):
+        attr = "@name" if st == "name" else "@id"
+        return (f"Click on element with xpath "
+                f"\"//form[@{fsel['type']}='{_q(fsel['value'])}']//*[{attr}='{_q(sv)}']\"")
+    if st in ("name", "id", "css", "xpath") and sv != "//input":
+        return f"Click on button with {st} \"{_q(sv)}\""
+    return (f"Click on element with xpath "
+            f"\"(//form)[{form.get('form_index', 0) + 1}]//*[@type='submit']\"")
+
+
+def _q(text):
+    """Make a value safe for Gauge — strip angle brackets and quotes."""
+    if text is None:
+        return ""
+    return str(text).replace("<", "").replace(">", "").replace('"', "'").strip()
+
+
+if __name__ == "__main__":
+    run()
@@ -83,6 +83,52 @@ STEP_PATTERNS = [
             Messages.write_message(f"Clicked link: '{link_text}'")\
         """),
     ),
+    # Click link by CSS selector
+    (
+        r'^click on link with css "([^"]+)"$',
+        "click_on_link_with_css",
+        ["selector"],
+        textwrap.dedent("""\
+            element = WebDriverWait(driver, WAIT_TIMEOUT).until(
+                EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
+            )
+            element.click()
+            Messages.write_message(f"Clicked link css='{selector}'")\
+        """),
+    ),
+    # Click any element by XPath
+    (
+        r'^click on element with xpath "([^"]+)"$',
+        "click_on_element_with_xpath",
+        ["xpath"],
+        textwrap.dedent("""\
+            element = WebDriverWait(driver, WAIT_TIMEOUT).until(
+                EC.element_to_be_clickable((By.XPATH, xpath))
+            )
+            element.click()
+            Messages.write_message(f"Clicked element xpath='{xpath}'")\
+        """),
+    ),
+    # Assert current URL: scheme, host and path equal (trailing slash and
+    # #fragment ignored); the query too when the expected URL has one, so a
+    # GET form landing on "page?x=1" still matches "page"
+    (
+        r'^assert current url is "([^"]+)"$',
+        "assert_current_url_is",
+        ["url"],
+        textwrap.dedent("""\
+            want = urlsplit(url)
+            def matches(d):
+                have = urlsplit(d.current_url)
+                return ((have.scheme, have.netloc, have.path.rstrip("/"))
+                        == (want.scheme, want.netloc, want.path.rstrip("/"))
+                        and (not want.query or have.query == want.query))
+            WebDriverWait(driver, WAIT_TIMEOUT).until(
+                matches, message=f"Expected URL '{url}', but was '{driver.current_url}'"
+            )
+            Messages.write_message(f"URL verified: '{driver.current_url}'")\
+        """),
+    ),
     # Click button by name
     (
         r'^click on button with name "([^"]+)"$',
@@ -216,6 +262,8 @@ Requirements:
     pip install getgauge selenium webdriver-manager
 """
 
+from urllib.parse import urlsplit
+
 from getgauge.python import step, before_scenario, after_scenario, Messages
 from selenium import webdriver
 from selenium.webdriver.common.by import By
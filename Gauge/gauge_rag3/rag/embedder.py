@@ -2,7 +2,18 @@
 rag/embedder.py
 ===============
 Indexes knowledge_base/ docs into ChromaDB for RAG retrieval.
-Run once before generating test cases.
+Run once before generating test cases, and again whenever the docs change.
+
+Indexing is incremental: MANIFEST_FILE records every indexed file's size,
+mtime, sha256 and chunk ids.  A run only re-chunks and re-embeds files that
+were added or whose content changed, and deletes the chunks of files that
+were removed or got shorter.  When nothing changed the run ends after a
+stat() per file, without loading the model or opening ChromaDB.
+
+Files are chunked by rag_common.chunker: read in blocks, cut at sentence /
+paragraph / markdown boundaries and packed up to CHUNK_TOKENS word pieces
+of the embedding model's own tokenizer, so no chunk is truncated when it
+is embedded.
 
 HOW TO RUN (from the project root folder):
     python rag/embedder.py
@@ -15,10 +26,13 @@ import json
 import logging
 import hashlib
 import os
+import sys
+import uuid
 
-import chromadb
-from chromadb.config import Settings
-from sentence_transformers import SentenceTransformer
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+from rag_common import chunker
+from rag_common.embedding_cache import EmbeddingCache, model_revision
+from rag_common.onnx_encoder import load_encoder
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 logger = logging.getLogger(__name__)
@@ -28,13 +42,17 @@ logger = logging.getLogger(__name__)
 # =============================================================================
 
 EMBEDDING_MODEL = "all-MiniLM-L6-v2"            # local model, no API needed
+ENCODER_BACKEND = "torch"                       # "torch" | "onnx" | "onnx-int8" (ONNX Runtime, rag_common/onnx_encoder.py)
 CHROMA_DIR      = ".chromadb"                    # ChromaDB storage folder
 COLLECTION_NAME = "testing_knowledge_base"
 
-CHUNK_SIZE      = 500    # words per chunk
-CHUNK_OVERLAP   = 50     # overlap words between chunks
+CHUNK_TOKENS         = 256   # model tokens per chunk (capped at the model's input limit, 254 for MiniLM)
+CHUNK_OVERLAP_TOKENS = 32    # whole sentences repeated from the previous chunk, up to this many tokens
 
 REBUILD         = False  # True = wipe existing index and start fresh
+                         # (embeddings still come from the shared cache in
+                         # <repo>/.cache/embeddings.sqlite3 — RAG_EMBEDDING_CACHE=off disables it)
+MANIFEST_FILE   = os.path.join(CHROMA_DIR, "kb_manifest.json")   # files + chunk ids in the index
 
 # Knowledge base folders to index (relative paths from project root)
 KNOWLEDGE_SOURCES = {
@@ -53,14 +71,94 @@ def run():
     logger.info(f"EMBEDDER  |  model={EMBEDDING_MODEL}  rebuild={REBUILD}")
     logger.info(f"{'='*55}")
 
-    logger.info("Loading embedding model...")
-    model  = SentenceTransformer(EMBEDDING_MODEL)
+    # no manifest (first build, or an index from before manifests existed) also
+    # means a wipe, so chunks an older build left behind can't survive
+    manifest = _load_manifest()
+    wipe     = REBUILD or manifest.get("settings") != _settings()
+    if wipe and manifest.get("files"):
+        logger.info("Rebuild requested or chunk/model settings changed — re-indexing everything.")
+    if wipe and manifest.get("upserted"):
+        logger.warning(f"{len(manifest['upserted'])} chunk(s) added through rag_service /upsert "
+                       "are not in the knowledge base and will be dropped by the wipe.")
+    previous = {} if wipe else manifest.get("files", {})
+
+    # ── Diff the knowledge base against the manifest ─────────────────────────
+    current  = _scan()
+    files    = {}          # path -> manifest entry after this run
+    changed  = {}          # path -> entry without ids
+    restated = False       # only size/mtime moved, content identical
+    for path, info in current.items():
+        old = previous.get(path)
+        if old and all(old.get(k) == info[k] for k in ("source", "size", "mtime_ns")):
+            files[path] = old
+            continue
+        try:
+            digest = _sha256(path)
+        except OSError as e:
+            logger.warning(f"  Could not read {path}: {e}")
+            if old:
+                files[path] = old
+            continue
+        if old and old.get("source") == info["source"] and old.get("sha256") == digest:
+            files[path] = {**old, **info}
+            restated    = True
+        else:
+            changed[path] = {**info, "sha256": digest}
+    removed = [p for p in previous if p not in current]
+
+    if not changed and not removed and not wipe:
+        if restated:
+            _save_manifest(files, manifest.get("version"))
+        n_chunks = sum(len(f["ids"]) for f in files.values())
+        logger.info(f"Knowledge base unchanged — {len(files)} files, {n_chunks} chunks already indexed.")
+        return
+
+    logger.info(f"{len(changed)} new/modified file(s), {len(removed)} removed, {len(files)} unchanged")
+
+    # ── Embed + upsert changed files, delete stale chunks ────────────────────
+    model, cache, col = _open_index(wipe)
+    counter = chunker.token_counter(model)
+    stale = [cid for p in removed for cid in previous[p]["ids"]]
+    total = 0
+    for path, info in sorted(changed.items()):
+        chunks = _process_file(path, info["source"], counter)
+        if chunks is None:
+            if path in previous:
+                files[path] = previous[path]
+            continue
+        _store(model, col, chunks, cache)
+        ids = [c["id"] for c in chunks]
+        kept = set(ids)
+        stale += [cid for cid in previous.get(path, {}).get("ids", []) if cid not in kept]
+        files[path] = {**info, "ids": ids}
+        total += len(chunks)
+
+    for i in range(0, len(stale), 500):
+        col.delete(ids=stale[i:i + 500])
+
+    _save_manifest(files, uuid.uuid4().hex[:12])
+    logger.info(f"\nDone — {total} chunks (re)embedded, {len(stale)} stale chunks deleted  |  total in DB: {col.count()}")
+    logger.info(cache.summary())
+    logger.info(f"\nNext step: python ai_engine/test_generator.py")
+
+
+def _open_index(wipe):
+    """Load the model and the collection — only needed when something changed."""
+    import chromadb
+    from chromadb.config import Settings
+
+    logger.info(f"Loading embedding model ({ENCODER_BACKEND})...")
+    model  = load_encoder(EMBEDDING_MODEL, ENCODER_BACKEND)
+    cache  = EmbeddingCache(EMBEDDING_MODEL, model_revision(model))
     client = chromadb.PersistentClient(
         path=CHROMA_DIR,
         settings=Settings(anonymized_telemetry=False)
     )
 
-    if REBUILD:
+    if wipe:
+        # drop the manifest first: a rebuild interrupted after this point is
+        # seen as "no manifest" by the next run and wiped again, never as unchanged
+        _drop_manifest()
         try:
             client.delete_collection(COLLECTION_NAME)
             logger.info("Old index deleted.")
@@ -73,57 +171,107 @@ def run():
     except:
         col = client.create_collection(COLLECTION_NAME, metadata={"hnsw:space": "cosine"})
         logger.info("New collection created.")
+    return model, cache, col
 
-    total = 0
+
+# ── Manifest ──────────────────────────────────────────────────────────────────
+
+def _settings():
+    """Anything that changes chunk ids or vectors; a mismatch forces a rebuild."""
+    return {"model": EMBEDDING_MODEL, "encoder": ENCODER_BACKEND, "collection": COLLECTION_NAME,
+            "chunker": chunker.CHUNKER_VERSION,
+            "chunk_tokens": CHUNK_TOKENS, "chunk_overlap_tokens": CHUNK_OVERLAP_TOKENS}
+
+
+def _load_manifest():
+    try:
+        with open(MANIFEST_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(files, version):
+    """
+    version changes on every run that modified the collection (retriever cache
+    key).  Ids rag_service.py recorded as upserted are carried over, re-read
+    here so ones upserted while this run was embedding are kept too.
+    """
+    manifest = {"settings": _settings(), "version": version, "files": files}
+    upserted = _load_manifest().get("upserted")
+    if upserted:
+        manifest["upserted"] = upserted
+    tmp = MANIFEST_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, MANIFEST_FILE)
+
+
+def _drop_manifest():
+    try:
+        os.remove(MANIFEST_FILE)
+    except FileNotFoundError:
+        pass
+
+
+def _sha256(path, block=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for data in iter(lambda: f.read(block), b""):
+            digest.update(data)
+    return digest.hexdigest()
+
+
+def _scan():
+    """{path: {source, size, mtime_ns}} for every indexable file in KNOWLEDGE_SOURCES."""
+    found = {}
     for source_name, folder_path in KNOWLEDGE_SOURCES.items():
         if not os.path.isdir(folder_path):
             logger.warning(f"Folder not found: {folder_path}  (skipping)")
             continue
-        logger.info(f"\nIndexing: {source_name}  ({folder_path})")
-        chunks = _process_folder(folder_path, source_name)
-        _store(model, col, chunks)
-        total += len(chunks)
-        logger.info(f"  {len(chunks)} chunks stored")
+        for root, _, fnames in os.walk(folder_path):
+            for fname in fnames:
+                if not any(fname.endswith(ext) for ext in [".txt", ".md", ".json"]):
+                    continue
+                fpath = os.path.join(root, fname)
+                st    = os.stat(fpath)
+                found[fpath] = {"source": source_name, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    return found
 
-    logger.info(f"\nDone — {total} new chunks  |  total in DB: {col.count()}")
-    logger.info(f"\nNext step: python ai_engine/test_generator.py")
 
+# ── Chunking + storage ────────────────────────────────────────────────────────
 
-def _process_folder(folder, source_name):
-    chunks = []
-    for root, _, files in os.walk(folder):
-        for fname in files:
-            if not any(fname.endswith(ext) for ext in [".txt", ".md", ".json"]):
-                continue
-            fpath = os.path.join(root, fname)
+def _process_file(fpath, source_name, counter=chunker.ESTIMATE):
+    """Chunk one file, streaming it from disk; None if it can't be read or decoded."""
+    fname = os.path.basename(fpath)
+    try:
+        if fname.endswith(".json"):
+            with open(fpath, "r", encoding="utf-8") as f:
+                raw = f.read()
             try:
-                with open(fpath, "r", encoding="utf-8") as f:
-                    raw = f.read()
-                if fname.endswith(".json"):
-                    try:
-                        raw = json.dumps(json.loads(raw), indent=2)
-                    except:
-                        pass
-                words = raw.split()
-                if len(words) <= CHUNK_SIZE:
-                    parts = [raw]
-                else:
-                    step  = CHUNK_SIZE - CHUNK_OVERLAP
-                    parts = [" ".join(words[i:i + CHUNK_SIZE]) for i in range(0, len(words), step) if words[i:i + CHUNK_SIZE]]
-                for i, chunk in enumerate(parts):
-                    cid = hashlib.md5(f"{fpath}_{i}".encode()).hexdigest()
-                    chunks.append({"id": cid, "text": chunk,
-                                   "meta": {"source": source_name, "file": fname, "chunk": i}})
-                logger.info(f"  {fname}  ({len(parts)} chunks)")
-            except Exception as e:
-                logger.warning(f"  Could not read {fname}: {e}")
-    return chunks
-
-
-def _store(model, col, chunks, batch=50):
+                raw = json.dumps(json.loads(raw), indent=2)
+            except:
+                pass
+            parts = chunker.chunk_text(raw, CHUNK_TOKENS, CHUNK_OVERLAP_TOKENS, counter)
+        else:
+            parts = chunker.chunk_file(fpath, CHUNK_TOKENS, CHUNK_OVERLAP_TOKENS, counter, errors="strict")
+        chunks = []
+        for part in parts:
+            cid = hashlib.md5(f"{fpath}_{part.index}".encode()).hexdigest()
+            chunks.append({"id": cid, "text": part.text,
+                           "meta": {"source": source_name, "file": fname, "chunk": part.index}})
+        logger.info(f"  [{source_name}] {fname}  ({len(chunks)} chunks)")
+        return chunks
+    except Exception as e:
+        logger.warning(f"  Could not read {fname}: {e}")
+        return None
+
+
+def _store(model, col, chunks, cache, batch=50):
     for i in range(0, len(chunks), batch):
         b    = chunks[i:i + batch]
-        embs = model.encode([c["text"] for c in b], show_progress_bar=False).tolist()
+        embs = cache.encode([c["text"] for c in b],
+                            lambda texts: model.encode(texts, show_progress_bar=False)).tolist()
         col.upsert(
             ids=[c["id"] for c in b],
             embeddings=embs,
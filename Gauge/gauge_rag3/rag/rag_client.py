@@ -0,0 +1,144 @@
+"""
+rag/rag_client.py
+=================
+Client shim for rag/rag_service.py.
+
+retrieve / retrieve_many / upsert go to the RAG daemon when it is running
+(a few ms per call: no model load, no ChromaDB start-up in this process).
+When the daemon can't be reached, or whatever answers on SERVICE_URL is
+not the RAG daemon (its /health must say so; another server's 404 counts
+as not running), the same calls run in-process through rag_service.RagCore,
+loaded once on first use — so callers never need to know whether the
+daemon is up.
+
+Only the standard library is imported here; the model and ChromaDB are
+imported lazily, and only on the in-process fallback path.
+
+ALL SETTINGS ARE HARDCODED BELOW.
+No config file, no CLI arguments, no relative imports.
+"""
+
+import http.client
+import json
+import logging
+import os
+import sys
+import threading
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+#  SETTINGS
+# =============================================================================
+
+SERVICE_URL     = os.getenv("RAG_SERVICE_URL", f"http://127.0.0.1:{os.getenv('RAG_SERVICE_PORT', '8767')}")
+USE_SERVICE     = os.getenv("RAG_SERVICE", "auto").lower() != "off"    # RAG_SERVICE=off = always in-process
+CONNECT_TIMEOUT = 0.25   # seconds to decide the daemon is not there
+REQUEST_TIMEOUT = 120    # seconds for a request the daemon accepted
+
+# =============================================================================
+
+_service_down = False     # set after the first failed connect; stay in-process from then on
+_service_seen = False     # set once /health answered as the RAG daemon
+_local        = None
+_local_lock   = threading.Lock()
+
+
+def retrieve(query, top_k=5):
+    """Top-k chunks for one query: [{"text", "source", "file", "score"}]."""
+    return retrieve_many([query], top_k)[0]
+
+
+def retrieve_many(queries, top_k=5):
+    """One result list per query, all encoded and searched in one batch."""
+    queries = list(queries)
+    if not queries:
+        return []
+    out = _call("/retrieve_many", {"queries": queries, "top_k": top_k})
+    if out is not None:
+        return out["results"]
+    return _core().retrieve_many(queries, top_k)
+
+
+def upsert(chunks):
+    """Embed and store [{"id", "text", "meta"}]; returns the number written."""
+    chunks = list(chunks)
+    out = _call("/upsert", {"chunks": chunks})
+    if out is not None:
+        return out["upserted"]
+    return _core().upsert(chunks)
+
+
+def service_available():
+    return _call("/health", None) is not None
+
+
+def _call(path, payload):
+    """JSON round-trip to the daemon; None when it isn't running."""
+    global _service_seen
+    if not USE_SERVICE or _service_down:
+        return None
+    if not _service_seen:
+        try:
+            health = _request("/health", None)
+        except (RuntimeError, ValueError) as e:     # an error status or a non-JSON page
+            _not_the_service(str(e)[:200])
+            return None
+        if health is None:
+            return None
+        if not (isinstance(health, dict) and health.get("ok") is True and "model" in health):
+            _not_the_service(f"/health answered {str(health)[:200]!r}")
+            return None
+        _service_seen = True
+        if path == "/health":
+            return health
+    return _request(path, payload)
+
+
+def _not_the_service(why):
+    global _service_down
+    logger.warning(f"{SERVICE_URL} is not the RAG service ({why}) — running retrieval in-process")
+    _service_down = True
+
+
+def _request(path, payload):
+    """One round-trip: the decoded JSON, or None when nothing listens or the path is unknown."""
+    global _service_down
+    url  = urlsplit(SERVICE_URL)
+    conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=CONNECT_TIMEOUT)
+    try:
+        conn.connect()
+    except OSError:
+        logger.info(f"RAG service not reachable at {SERVICE_URL} — running retrieval in-process")
+        _service_down = True
+        conn.close()
+        return None
+    try:
+        # short timeout for the connect; the daemon may legitimately take longer to answer
+        conn.sock.settimeout(REQUEST_TIMEOUT)
+        if payload is None:
+            conn.request("GET", path)
+        else:
+            conn.request("POST", path, body=json.dumps(payload).encode("utf-8"),
+                         headers={"Content-Type": "application/json"})
+        resp = conn.getresponse()
+        body = resp.read()
+        if resp.status == 404:
+            _not_the_service(f"HTTP 404 for {path}")
+            return None
+        if resp.status != 200:
+            raise RuntimeError(f"RAG service {path}: HTTP {resp.status} {body[:200]!r}")
+        return json.loads(body)
+    finally:
+        conn.close()
+
+
+def _core():
+    global _local
+    with _local_lock:
+        if _local is None:
+            sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+            from rag.rag_service import RagCore
+            _local = RagCore()
+    return _local
@@ -0,0 +1,349 @@
+"""
+rag/rag_service.py
+==================
+Optional long-lived RAG daemon.  Holds the embedding model and the ChromaDB
+collection warm so CLI runs don't each pay the model load (seconds) and a
+fresh PersistentClient.
+
+Concurrent requests are micro-batched: everything that arrives within
+BATCH_WAIT_MS (up to MAX_BATCH queries) is encoded with one model.encode()
+call and answered with one collection.query() call.
+
+Endpoints (JSON over localhost HTTP):
+    GET  /health          {"ok": true, "chunks": N, "model": ...}
+    POST /retrieve        {"query": str, "top_k": int}          -> {"results": [...]}
+    POST /retrieve_many   {"queries": [str], "top_k": int}      -> {"results": [[...], ...]}
+    POST /upsert          {"chunks": [{"id", "text", "meta"}]}  -> {"upserted": N}
+
+Upserted ids are recorded in embedder.py's manifest under "upserted".
+embedder.py keeps them across incremental runs (they belong to no
+knowledge-base file, so its diff never deletes them); a rebuild or settings
+change wipes the collection and drops them, with a warning naming how many.
+
+Retrieval is hybrid (rag_common/hybrid_search.py): a BM25 index over the
+same chunks is built alongside the collection and fused with the vector
+ranking by reciprocal rank; short keyword queries ("password", "maxlength")
+are answered from BM25 alone and skip the encode.  HYBRID_SEARCH = False
+restores plain vector search.
+
+ENCODER_BACKEND = "onnx-int8" encodes queries with ONNX Runtime instead of
+PyTorch (rag_common/onnx_encoder.py); it only loads if its vectors agree
+with PyTorch's to cosine >= 0.99, so it can differ from embedder.py's.
+
+Each result is {"text", "source", "file", "score"}.  Clients should go
+through rag/rag_client.py, which falls back to running RagCore in-process
+when the daemon is not up.
+
+When rag/embedder.py rewrites the index (its manifest file changes), the
+collection is reopened before the next query.  /upsert gives the manifest a
+new version, so rag/retriever.py's query cache drops results from before it.
+
+HOW TO RUN (from the project root folder):
+    python rag/rag_service.py
+
+ALL SETTINGS ARE HARDCODED BELOW.
+No config file, no CLI arguments, no relative imports.
+"""
+
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+from rag_common.embedding_cache import EmbeddingCache, model_revision
+from rag_common.hybrid_search import BM25Index, HybridSearcher
+from rag_common.onnx_encoder import load_encoder
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+#  SETTINGS — model / collection must match embedder.py
+# =============================================================================
+
+PROJECT_DIR     = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+ENCODER_BACKEND = "torch"  # "torch" | "onnx" | "onnx-int8"
+CHROMA_DIR      = os.path.join(PROJECT_DIR, ".chromadb")
+COLLECTION_NAME = "testing_knowledge_base"
+MANIFEST_FILE   = os.path.join(CHROMA_DIR, "kb_manifest.json")
+
+HOST            = "127.0.0.1"
+PORT            = int(os.getenv("RAG_SERVICE_PORT", "8767"))   # 8765: crawl coordinator, 8766: meeting server
+BATCH_WAIT_MS   = 5      # how long the first request in a batch waits for company
+MAX_BATCH       = 64     # max queries encoded / searched together
+
+HYBRID_SEARCH   = True   # BM25 + vector with RRF; False = vector only
+HYBRID_DEPTH    = 20     # depth of each ranking fed into the fusion
+
+# =============================================================================
+
+
+class RagCore:
+    """Model + collection.  Used by the daemon, and in-process by rag_client."""
+
+    def __init__(self):
+        logger.info(f"Loading embedding model: {EMBEDDING_MODEL} ({ENCODER_BACKEND})")
+        self.model = load_encoder(EMBEDDING_MODEL, ENCODER_BACKEND)
+        self.cache = EmbeddingCache(EMBEDDING_MODEL, model_revision(self.model))
+        self._lock = threading.Lock()
+        self._col  = None
+        self._hybrid = None
+        self._manifest_mtime = None
+        self._open()
+
+    def _open(self):
+        import chromadb
+        from chromadb.config import Settings
+
+        try:   # drop chroma's per-process client cache so a rebuilt index is re-read
+            from chromadb.api.client import SharedSystemClient
+            SharedSystemClient.clear_system_cache()
+        except Exception:
+            pass
+        client = chromadb.PersistentClient(path=CHROMA_DIR, settings=Settings(anonymized_telemetry=False))
+        try:
+            self._col = client.get_collection(COLLECTION_NAME)
+            logger.info(f"Vector store ready: {self._col.count()} chunks")
+        except Exception:
+            logger.warning("Collection not found — run: python rag/embedder.py")
+            self._col = client.create_collection(COLLECTION_NAME, metadata={"hnsw:space": "cosine"})
+        self._hybrid = None
+        self._manifest_mtime = _mtime(MANIFEST_FILE)
+
+    def _refresh(self):
+        if _mtime(MANIFEST_FILE) != self._manifest_mtime:
+            logger.info("Knowledge base was re-indexed — reopening collection")
+            self._open()
+
+    def count(self) -> int:
+        with self._lock:
+            self._refresh()
+            return self._col.count()
+
+    def encode(self, texts):
+        return self.cache.encode(texts, lambda batch: self.model.encode(batch, show_progress_bar=False))
+
+    def retrieve_many(self, queries, top_k=5):
+        """One result list per query, best first."""
+        if not queries:
+            return []
+        with self._lock:
+            self._refresh()
+            n = self._col.count()
+            if n == 0:
+                return [[] for _ in queries]
+            if HYBRID_SEARCH:
+                return self._hybrid_many(queries, top_k)
+            embs = self.encode(queries).tolist()
+            res  = self._col.query(
+                query_embeddings=embs,
+                n_results=min(top_k, n),
+                include=["documents", "metadatas", "distances"],
+            )
+        return [
+            [{"text": d, "source": m.get("source", "?"), "file": m.get("file", "?"),
+              "score": round(1 - dist, 3)}
+             for d, m, dist in zip(docs, metas, dists)]
+            for docs, metas, dists in zip(res["documents"], res["metadatas"], res["distances"])
+        ]
+
+    def _hybrid_many(self, queries, top_k):
+        if self._hybrid is None:
+            data  = self._col.get(include=["documents", "metadatas"])
+            self._rows   = list(zip(data["documents"], data["metadatas"]))
+            self._row_of = {cid: i for i, cid in enumerate(data["ids"])}
+            self._hybrid = HybridSearcher(BM25Index([d for d, _ in self._rows]), self._dense,
+                                          candidates=HYBRID_DEPTH)
+            logger.info(f"BM25 index built over {len(self._rows)} chunks")
+        return [
+            [{"text": self._rows[h.row][0], "source": (self._rows[h.row][1] or {}).get("source", "?"),
+              "file": (self._rows[h.row][1] or {}).get("file", "?"), "score": round(h.score, 4)}
+             for h in hits]
+            for hits in self._hybrid.search_many(queries, top_k)
+        ]
+
+    def _dense(self, queries, n):
+        """Vector side of the hybrid search: [(row, cosine)] per query."""
+        res = self._col.query(
+            query_embeddings=self.encode(queries).tolist(),
+            n_results=min(n, len(self._rows)),
+            include=["distances"],
+        )
+        return [[(self._row_of[cid], 1 - dist) for cid, dist in zip(ids, dists) if cid in self._row_of]
+                for ids, dists in zip(res["ids"], res["distances"])]
+
+    def upsert(self, chunks):
+        """chunks: [{"id", "text", "meta"}] — embedded and written to the collection."""
+        if not chunks:
+            return 0
+        embs = self.encode([c["text"] for c in chunks]).tolist()
+        with self._lock:
+            self._col.upsert(
+                ids=[c["id"] for c in chunks],
+                embeddings=embs,
+                documents=[c["text"] for c in chunks],
+                metadatas=[c.get("meta") or {} for c in chunks],
+            )
+            self._hybrid = None      # BM25 index is rebuilt on the next query
+            _record_upsert([c["id"] for c in chunks])
+            self._manifest_mtime = _mtime(MANIFEST_FILE)
+        return len(chunks)
+
+
+class MicroBatcher:
+    """Coalesces concurrent retrieve calls into one encode + one query."""
+
+    def __init__(self, core, wait_ms=BATCH_WAIT_MS, max_batch=MAX_BATCH):
+        self.core      = core
+        self.wait      = wait_ms / 1000
+        self.max_batch = max_batch
+        self.batches   = 0
+        self.queries   = 0
+        self._q        = queue.Queue()
+        threading.Thread(target=self._loop, name="rag-batcher", daemon=True).start()
+
+    def retrieve_many(self, queries, top_k):
+        fut = Future()
+        self._q.put((list(queries), int(top_k), fut))
+        return fut.result()
+
+    def _loop(self):
+        while True:
+            batch    = [self._q.get()]
+            size     = len(batch[0][0])
+            deadline = time.monotonic() + self.wait
+            while size < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._q.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                size += len(item[0])
+
+            queries = [q for qs, _, _ in batch for q in qs]
+            try:
+                results = self.core.retrieve_many(queries, max(k for _, k, _ in batch))
+            except Exception as e:
+                if len(batch) == 1:
+                    batch[0][2].set_exception(e)
+                else:             # one bad request must not fail its neighbours: retry each alone
+                    self._run_alone(batch)
+                continue
+            self.batches += 1
+            self.queries += len(queries)
+            pos = 0
+            for qs, k, fut in batch:
+                fut.set_result([r[:k] for r in results[pos:pos + len(qs)]])
+                pos += len(qs)
+
+    def _run_alone(self, batch):
+        for qs, k, fut in batch:
+            try:
+                fut.set_result(self.core.retrieve_many(qs, k))
+            except Exception as e:
+                fut.set_exception(e)
+                continue
+            self.batches += 1
+            self.queries += len(qs)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    core    = None
+    batcher = None
+
+    def do_GET(self):
+        if self.path != "/health":
+            return self._send(404, {"error": "not found"})
+        self._send(200, {"ok": True, "model": EMBEDDING_MODEL, "chunks": self.core.count(),
+                         "batches": self.batcher.batches, "queries": self.batcher.queries})
+
+    def do_POST(self):
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body   = json.loads(self.rfile.read(length) or b"{}")
+            top_k  = int(body.get("top_k", 5))
+            if self.path == "/retrieve":
+                out = {"results": self.batcher.retrieve_many([body["query"]], top_k)[0]}
+            elif self.path == "/retrieve_many":
+                out = {"results": self.batcher.retrieve_many(body["queries"], top_k)}
+            elif self.path == "/upsert":
+                out = {"upserted": self.core.upsert(body["chunks"])}
+            else:
+                return self._send(404, {"error": "not found"})
+        except (KeyError, TypeError, ValueError) as e:
+            return self._send(400, {"error": f"bad request: {e}"})
+        except Exception as e:
+            logger.error(f"{self.path} failed: {e}")
+            return self._send(500, {"error": str(e)})
+        self._send(200, out)
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, fmt, *args):          # keep the console for our own logging
+        logger.debug(fmt % args)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads     = True
+    request_queue_size = 128      # the default backlog of 5 refuses bursts of clients
+
+
+def _record_upsert(ids):
+    """
+    Add `ids` to the "upserted" list in embedder.py's manifest and give it a
+    new version id, so retriever.py's cached results for the old one are not
+    served.
+    """
+    try:
+        with open(MANIFEST_FILE, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+    manifest["upserted"] = sorted(set(manifest.get("upserted", [])) | set(ids))
+    manifest["version"]  = uuid.uuid4().hex[:12]
+    os.makedirs(CHROMA_DIR, exist_ok=True)
+    tmp = MANIFEST_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, MANIFEST_FILE)
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def serve(host=HOST, port=PORT, core=None):
+    _Handler.core    = core or RagCore()
+    _Handler.batcher = MicroBatcher(_Handler.core)
+    server = _Server((host, port), _Handler)
+    logger.info(f"RAG service listening on http://{host}:{port}  (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    serve()
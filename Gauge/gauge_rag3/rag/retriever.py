@@ -5,6 +5,15 @@ Retrieves relevant chunks from ChromaDB.
 Imported by test_generator.py.
 Can also be run standalone to test retrieval.
 
+Queries go through rag/rag_client.py: to the warm RAG daemon
+(python rag/rag_service.py) when it is running, otherwise in-process.
+
+Results are cached (LRU, persisted to QUERY_CACHE_FILE) keyed by
+(normalised query, n_results, collection version).  The version comes from
+embedder.py's manifest and changes whenever the knowledge base is
+re-indexed or chunks are upserted (rag_service.py), so stale entries are
+never served.  The file is written once, at exit, and the hit rate logged.
+
 HOW TO RUN (optional debug, from project root):
     python rag/retriever.py
 
@@ -12,69 +21,42 @@ ALL SETTINGS ARE HARDCODED BELOW.
 No config file, no CLI arguments, no relative imports.
 """
 
+import atexit
+import json
 import logging
 import os
+import re
+import sys
+from collections import OrderedDict
 
-import chromadb
-from chromadb.config import Settings
-from sentence_transformers import SentenceTransformer
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from rag import rag_client
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 logger = logging.getLogger(__name__)
 
 # =============================================================================
-#  SETTINGS — must match embedder.py
+#  SETTINGS — model / collection live in rag_service.py (must match embedder.py)
 # =============================================================================
 
-EMBEDDING_MODEL = "all-MiniLM-L6-v2"
-CHROMA_DIR      = ".chromadb"
-COLLECTION_NAME = "testing_knowledge_base"
 TOP_K           = 5      # how many chunks to retrieve per query
+CANDIDATES      = 12     # chunks per page handed to the prompt packer (it keeps the diverse ones that fit)
+
+PROJECT_DIR      = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MANIFEST_FILE    = os.path.join(PROJECT_DIR, ".chromadb", "kb_manifest.json")   # written by embedder.py
+QUERY_CACHE_SIZE = 1024   # LRU entries (0 = no caching)
+QUERY_CACHE_FILE = os.path.join(PROJECT_DIR, ".chromadb", "query_cache.json")  # None = memory only
 
 # Used only when running this file directly to test retrieval:
 TEST_QUERY = "form validation test cases for login page"
 
 # =============================================================================
 
-_model = None
-_col   = None
-
-
-def _init():
-    global _model, _col
-    if _model is None:
-        logger.info(f"Loading embedding model: {EMBEDDING_MODEL}")
-        _model = SentenceTransformer(EMBEDDING_MODEL)
-    if _col is None:
-        client = chromadb.PersistentClient(
-            path=CHROMA_DIR,
-            settings=Settings(anonymized_telemetry=False)
-        )
-        try:
-            _col = client.get_collection(COLLECTION_NAME)
-            logger.info(f"Vector store ready: {_col.count()} chunks")
-        except:
-            logger.warning("Collection not found — run: python rag/embedder.py")
-            _col = None
-
 
 def retrieve(query):
     """Return formatted context string for the given query."""
-    _init()
-    if _col is None or _col.count() == 0:
-        return ""
     try:
-        emb  = _model.encode(query).tolist()
-        res  = _col.query(
-            query_embeddings=[emb],
-            n_results=min(TOP_K, _col.count()),
-            include=["documents", "metadatas", "distances"]
-        )
-        results = [
-            {"text": d, "source": m.get("source", "?"), "score": round(1 - dist, 3)}
-            for d, m, dist in zip(res["documents"][0], res["metadatas"][0], res["distances"][0])
-        ]
-        return _format(results)
+        return _format(_retrieve_many([query])[0])
     except Exception as e:
         logger.error(f"Retrieval error: {e}")
         return ""
@@ -82,6 +64,176 @@ def retrieve(query):
 
 def retrieve_for_page(page_data):
     """Build a query from crawled page metadata and retrieve context."""
+    query = _page_query(page_data)
+    logger.info(f"  RAG query: {query}")
+    return retrieve(query)
+
+
+def retrieve_for_pages(pages):
+    """
+    Context for every page, same strings as retrieve_for_page() per page, but
+    all queries are encoded in one batch and searched in one ChromaDB query
+    (each distinct query once — many pages share the same query text).
+    """
+    queries = [_page_query(p) for p in pages]
+    unique  = list(dict.fromkeys(queries))
+    logger.info(f"  RAG: {len(queries)} page queries ({len(unique)} distinct) in one batch")
+    try:
+        by_query = dict(zip(unique, (_format(r) for r in _retrieve_many(unique))))
+    except Exception as e:
+        logger.error(f"Retrieval error: {e}")
+        return [""] * len(pages)
+    return [by_query[q] for q in queries]
+
+
+def retrieve_chunks_for_pages(pages, n_results=CANDIDATES):
+    """
+    Raw results ({"text", "source", "file", "score"}, best first) for every
+    page, batched like retrieve_for_pages(); test_generator.py packs them
+    into the prompt with rag_common.context_packer.
+    """
+    queries = [_page_query(p) for p in pages]
+    unique  = list(dict.fromkeys(queries))
+    logger.info(f"  RAG: {len(queries)} page queries ({len(unique)} distinct) in one batch, {n_results} candidates each")
+    try:
+        by_query = dict(zip(unique, _retrieve_many(unique, n_results)))
+    except Exception as e:
+        logger.error(f"Retrieval error: {e}")
+        return [[] for _ in pages]
+    return [by_query[q] for q in queries]
+
+
+def format_chunk(result):
+    """One result as a prompt line, labelled with its knowledge-base section."""
+    return f"[{SOURCE_LABELS.get(result['source'], result['source'].upper())}] {result['text']}"
+
+
+# ── Query-result cache ────────────────────────────────────────────────────────
+
+class _QueryCache:
+    """LRU of raw result lists for one collection version, read from and saved to a JSON file."""
+
+    def __init__(self, size, path):
+        self.size    = size
+        self.path    = path
+        self.version = None
+        self.loaded  = False
+        self.hits    = 0
+        self.misses  = 0
+        self.dirty   = False      # entries added since the last save
+        self._lru    = OrderedDict()
+
+    def use_version(self, version):
+        if self.loaded and version == self.version:
+            return
+        self.version = version
+        self.loaded  = True
+        self.dirty   = False
+        self._lru.clear()
+        if not self.path:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == version:
+                for query, n, results in data.get("entries", [])[-self.size:]:
+                    self._lru[(query, n, version)] = results
+        except (OSError, ValueError, TypeError):
+            pass
+
+    def get(self, key):
+        results = self._lru.get(key)
+        if results is None:
+            self.misses += 1
+            return None
+        self._lru.move_to_end(key)
+        self.hits += 1
+        return results
+
+    def put(self, key, results):
+        self._lru[key] = results
+        self._lru.move_to_end(key)
+        self.dirty = True
+        while len(self._lru) > self.size:
+            self._lru.popitem(last=False)
+
+    def save(self):
+        if not self.path or not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": self.version,
+                       "entries": [[q, n, r] for (q, n, _), r in self._lru.items()]}, f)
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+
+_cache = _QueryCache(QUERY_CACHE_SIZE, QUERY_CACHE_FILE)
+_manifest_stat = (None, None)     # (mtime_ns, version) of the last manifest read
+
+
+def _retrieve_many(queries, n_results=TOP_K):
+    """Raw results per query; distinct cache misses go to rag_client in one batch."""
+    if QUERY_CACHE_SIZE <= 0:
+        return rag_client.retrieve_many(queries, n_results)
+
+    version = _collection_version()
+    _cache.use_version(version)
+    keys    = [(_normalize(q), n_results, version) for q in queries]
+    found   = {}
+    missing = {}                   # key -> original query text
+    for q, key in zip(queries, keys):
+        if key in found or key in missing:
+            continue
+        results = _cache.get(key)
+        if results is None:
+            missing[key] = q
+        else:
+            found[key] = results
+
+    if missing:
+        for key, results in zip(missing, rag_client.retrieve_many(list(missing.values()), n_results)):
+            found[key] = results
+            _cache.put(key, results)
+    return [found[k] for k in keys]
+
+
+def _collection_version():
+    """Version id embedder.py writes on every index change (re-read when the manifest changes)."""
+    global _manifest_stat
+    try:
+        mtime = os.stat(MANIFEST_FILE).st_mtime_ns
+    except OSError:
+        return None
+    if mtime != _manifest_stat[0]:
+        try:
+            with open(MANIFEST_FILE, "r", encoding="utf-8") as f:
+                version = json.load(f).get("version")
+        except (OSError, ValueError):
+            version = None
+        _manifest_stat = (mtime, version)
+    return _manifest_stat[1]
+
+
+def _normalize(query):
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+
+@atexit.register
+def _save_cache():
+    """Write the query cache once per run (not after every miss), and log its hit rate."""
+    try:
+        _cache.save()
+    except OSError as e:
+        logger.warning(f"RAG query cache not saved: {e}")
+    total = _cache.hits + _cache.misses
+    if total:
+        logger.info(f"RAG query cache: {_cache.hits} hit / {_cache.misses} miss "
+                    f"({100 * _cache.hits / total:.0f}% hit rate)")
+
+
+def _page_query(page_data):
     ptype = page_data.get("page_type", "general")
     elems = page_data.get("elements", {})
     parts = []
@@ -89,23 +241,23 @@ def retrieve_for_page(page_data):
     if elems.get("interactive"): parts.append(f"{len(elems['interactive'])} button(s)")
     if elems.get("navigation"):  parts.append(f"{len(elems['navigation'])} link(s)")
     if elems.get("tables"):      parts.append(f"{len(elems['tables'])} table(s)")
-    query = f"Test cases for {ptype} page with {', '.join(parts) or 'general elements'}"
-    logger.info(f"  RAG query: {query}")
-    return retrieve(query)
+    return f"Test cases for {ptype} page with {', '.join(parts) or 'general elements'}"
+
+
+SOURCE_LABELS = {
+    "test_cases":          "EXAMPLE TEST CASES",
+    "best_practices":      "TESTING BEST PRACTICES",
+    "selenium_gauge_docs": "FRAMEWORK DOCS",
+}
 
 
 def _format(results):
     by_src = {}
     for r in results:
         by_src.setdefault(r["source"], []).append(r)
-    labels = {
-        "test_cases":          "EXAMPLE TEST CASES",
-        "best_practices":      "TESTING BEST PRACTICES",
-        "selenium_gauge_docs": "FRAMEWORK DOCS",
-    }
     lines = []
     for src, chunks in by_src.items():
-        lines.append(f"--- {labels.get(src, src.upper())} ---")
+        lines.append(f"--- {SOURCE_LABELS.get(src, src.upper())} ---")
         for c in chunks:
             lines.append(c["text"])
             lines.append("")
@@ -117,6 +269,5 @@ if __name__ == "__main__":
     print(f"RAG RETRIEVER TEST")
     print(f"Query: {TEST_QUERY}")
     print(f"{'='*55}\n")
-    _init()
     ctx = retrieve(TEST_QUERY)
     print(ctx if ctx else "(no results — run python rag/embedder.py first)")
\ No newline at end of file
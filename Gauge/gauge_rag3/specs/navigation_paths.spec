@@ -0,0 +1,77 @@
+# Navigation Paths — Model-Based
+
+Generated   : 2026-10-19 11:29
+Base URL    : https://www.calculator.net/
+States      : 5
+Transitions : 28
+Scenarios   : 2
+
+tags: navigation, model-based, automated
+
+## Navigation path 1: Time Calculator (24 transitions) [NAV_001]
+
+tags: navigation, model-based, NAV_001
+
+* Navigate to url "https://www.calculator.net/time-calculator.html"
+* Click on link with css "a[href='/'],a[href='https://www.calculator.net/']"
+* Assert current URL is "https://www.calculator.net/"
+* Click on link with css "a[href='/'],a[href='https://www.calculator.net/']"
+* Assert current URL is "https://www.calculator.net/"
+* Click on link with text "Time Calculator"
+* Assert current URL is "https://www.calculator.net/time-calculator.html"
+* Click on link with text "time calculator"
+* Assert current URL is "https://www.calculator.net/time-calculator.html"
+* Click on link with text "IP Subnet"
+* Assert current URL is "https://www.calculator.net/ip-subnet-calculator.html"
+* Click on link with css "a[href='/'],a[href='https://www.calculator.net/']"
+* Assert current URL is "https://www.calculator.net/"
+* Click on link with text "Subnet Calculator"
+* Assert current URL is "https://www.calculator.net/ip-subnet-calculator.html"
+* Click on link with text "ip subnet calculator"
+* Assert current URL is "https://www.calculator.net/ip-subnet-calculator.html"
+* Click on link with text "Time"
+* Assert current URL is "https://www.calculator.net/time-calculator.html"
+* Click on link with text "about us"
+* Assert current URL is "https://www.calculator.net/about-us.html#terms"
+* Click on link with css "a[href='/'],a[href='https://www.calculator.net/']"
+* Assert current URL is "https://www.calculator.net/"
+* Click on link with css "a[href='/sitemap.html'],a[href='https://www.calculator.net/sitemap.html']"
+* Assert current URL is "https://www.calculator.net/sitemap.html"
+* Click on link with css "a[href='/'],a[href='https://www.calculator.net/']"
+* Assert current URL is "https://www.calculator.net/"
+* Click on link with text "about us"
+* Assert current URL is "https://www.calculator.net/about-us.html#terms"
+* Click on link with text "about us"
+* Assert current URL is "https://www.calculator.net/about-us.html#terms"
+* Click on link with text "sitemap"
+* Assert current URL is "https://www.calculator.net/sitemap.html"
+* Click on link with text "sitemap"
+* Assert current URL is "https://www.calculator.net/sitemap.html"
+* Click on link with text "Time Calculator"
+* Assert current URL is "https://www.calculator.net/time-calculator.html"
+* Click on element with xpath "//form[@name='calc']//*[@name='x']"
+* Assert current URL is "https://www.calculator.net/time-calculator.html"
+* Click on element with xpath "//form[@name='calcf2']//*[@name='x']"
+* Assert current URL is "https://www.calculator.net/time-calculator.html"
+* Click on element with xpath "//form[@name='calcf3']//*[@name='x']"
+* Assert current URL is "https://www.calculator.net/time-calculator.html"
+* Click on link with text "sitemap"
+* Assert current URL is "https://www.calculator.net/sitemap.html"
+* Click on link with text "IP Subnet Calculator"
+* Assert current URL is "https://www.calculator.net/ip-subnet-calculator.html"
+* Click on link with text "about us"
+* Assert current URL is "https://www.calculator.net/about-us.html#terms"
+
+## Navigation path 2: IP Subnet Calculator (4 transitions) [NAV_002]
+
+tags: navigation, model-based, NAV_002
+
+* Navigate to url "https://www.calculator.net/ip-subnet-calculator.html"
+* Click on element with xpath "//form[@name='calform']//*[@name='x']"
+* Assert current URL is "https://www.calculator.net/ip-subnet-calculator.html"
+* Click on element with xpath "//form[@name='calform2']//*[@name='x']"
+* Assert current URL is "https://www.calculator.net/ip-subnet-calculator.html"
+* Click on link with text "sitemap"
+* Assert current URL is "https://www.calculator.net/sitemap.html"
+* Click on link with text "About Us"
+* Assert current URL is "https://www.calculator.net/about-us.html#terms"
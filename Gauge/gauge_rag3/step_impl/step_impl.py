@@ -6,6 +6,8 @@ Requirements:
     pip install getgauge selenium webdriver-manager
 """
 
+from urllib.parse import urlsplit
+
 from getgauge.python import step, before_scenario, after_scenario, Messages
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -109,6 +111,38 @@ def clear_field_with_id(field_id):
     Messages.write_message(f"Cleared input id='{field_id}'")        
 
 
+@step("Click on link with css <selector>")
+def click_on_link_with_css(selector):
+    element = WebDriverWait(driver, WAIT_TIMEOUT).until(
+        EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
+    )
+    element.click()
+    Messages.write_message(f"Clicked link css='{selector}'")        
+
+
+@step("Assert current URL is <url>")
+def assert_current_url_is(url):
+    want = urlsplit(url)
+    def matches(d):
+        have = urlsplit(d.current_url)
+        return ((have.scheme, have.netloc, have.path.rstrip("/"))
+                == (want.scheme, want.netloc, want.path.rstrip("/"))
+                and (not want.query or have.query == want.query))
+    WebDriverWait(driver, WAIT_TIMEOUT).until(
+        matches, message=f"Expected URL '{url}', but was '{driver.current_url}'"
+    )
+    Messages.write_message(f"URL verified: '{driver.current_url}'")        
+
+
+@step("Click on element with xpath <xpath>")
+def click_on_element_with_xpath(xpath):
+    element = WebDriverWait(driver, WAIT_TIMEOUT).until(
+        EC.element_to_be_clickable((By.XPATH, xpath))
+    )
+    element.click()
+    Messages.write_message(f"Clicked element xpath='{xpath}'")        
+
+
 @step("Verify element with name <name> is visible")
 def verify_element_with_name_is_visible(name):
     element = WebDriverWait(driver, WAIT_TIMEOUT).until(
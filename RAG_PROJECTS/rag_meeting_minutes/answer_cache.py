@@ -0,0 +1,223 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from ingest import MANIFEST_NAME
+
+# =====================================================
+# Semantic answer cache
+# =====================================================
+# People ask the same things in different words ("what were the action
+# items?", "list the action items").  Before retrieval, the question's query
+# vector - the one retrieval would use anyway - is compared with the
+# questions already answered; at cosine similarity >= ANSWER_CACHE_THRESHOLD
+# the stored answer is returned and no LLM generation happens.
+#
+# Entries are tied to an index version (a hash of ingest.py's manifest:
+# per-file hashes and chunk settings) and to the answer settings (models,
+# TOP_K, prompt).  A process only uses the cache while the index it has
+# loaded is the one on disk; once ingest.py saves a new index, entries made
+# against older versions are deleted on the next lookup.
+#
+# An entry also records its scope - which meetings the question was routed
+# to (shards.Route.scope, '' for the whole archive) - and only answers
+# questions with the same scope.
+#
+# Entries live in one SQLite file in WAL mode (as rag_common/embedding_cache.py),
+# so query.py sessions, server.py and batch runs share them.  Set
+# ANSWER_CACHE to move the file, or to "off" to disable it.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+ANSWER_CACHE = os.getenv("ANSWER_CACHE", os.path.join(BASE_DIR, ".cache", "answer_cache.sqlite3"))
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", 0.92))
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", 5000))   # entries kept per index version
+
+BUSY_TIMEOUT = 30
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    id        INTEGER PRIMARY KEY,
+    index_ver TEXT    NOT NULL,
+    config    TEXT    NOT NULL,
+    scope     TEXT    NOT NULL DEFAULT '',
+    question  TEXT    NOT NULL,
+    vec       BLOB    NOT NULL,
+    answer    TEXT    NOT NULL,
+    sources   TEXT    NOT NULL,
+    answer_ms REAL    NOT NULL,
+    hits      INTEGER NOT NULL DEFAULT 0,
+    used      REAL    NOT NULL
+)
+"""
+
+_versions = {}          # index dir -> (stat key, version)
+_versions_lock = threading.Lock()
+
+
+def index_version(index_dir):
+    """Hash of the index's manifest ('' when there is no index).  Indexes built
+    before the manifest existed fall back to the size / mtime of their files."""
+    manifest = os.path.join(index_dir, MANIFEST_NAME)
+    try:
+        st = os.stat(manifest)
+        key = ("manifest", st.st_size, st.st_mtime_ns, st.st_ino)
+    except OSError:
+        try:
+            key = tuple((os.stat(p).st_size, os.stat(p).st_mtime_ns)
+                        for p in (os.path.join(index_dir, "index.faiss"), os.path.join(index_dir, "index.pkl")))
+        except OSError:
+            return ""
+    with _versions_lock:
+        cached = _versions.get(index_dir)
+        if cached and cached[0] == key:
+            return cached[1]
+    if key[0] == "manifest":
+        try:
+            with open(manifest, "rb") as f:
+                version = hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            return ""
+    else:
+        version = hashlib.sha256(repr(key).encode()).hexdigest()
+    with _versions_lock:
+        _versions[index_dir] = (key, version)
+    return version
+
+
+def _unit(vector):
+    v = np.asarray(vector, dtype=np.float32).ravel()
+    n = np.linalg.norm(v)
+    return v / n if n else v
+
+
+class AnswerCache:
+
+    def __init__(self, index_dir, settings, path=ANSWER_CACHE, threshold=ANSWER_CACHE_THRESHOLD,
+                 max_entries=ANSWER_CACHE_SIZE):
+        self.index_dir = index_dir
+        self.config = hashlib.sha256(json.dumps(settings, sort_keys=True).encode()).hexdigest()
+        self.path = "" if path.lower() in ("", "0", "off", "none", "false") else path
+        self.threshold = threshold
+        self.max_entries = max(1, max_entries)
+        self.hits = self.misses = self.bypassed = 0
+        self.saved_ms = 0.0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._version = None                       # index version the in-memory copy belongs to
+        self._ids, self._scopes, self._vecs, self._last_id = [], [], None, 0
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            if "scope" not in {row[1] for row in conn.execute("PRAGMA table_info(answers)")}:
+                conn.execute("ALTER TABLE answers ADD COLUMN scope TEXT NOT NULL DEFAULT ''")
+            self._local.conn = conn
+        return conn
+
+    def _usable(self, version):
+        """True when `version` (the loaded index) is the index on disk."""
+        if not self.path or not version or version != index_version(self.index_dir):
+            with self._lock:
+                self.bypassed += 1
+            return False
+        return True
+
+    def _sync(self, version):
+        """Bring the in-memory question vectors up to date with the file (call under self._lock)."""
+        conn = self._conn()
+        if version != self._version:
+            with conn:
+                conn.execute("DELETE FROM answers WHERE index_ver != ?", (version,))
+            self._version, self._ids, self._scopes, self._vecs, self._last_id = version, [], [], None, 0
+        rows = conn.execute("SELECT id, scope, vec FROM answers WHERE index_ver = ? AND config = ? AND id > ? "
+                            "ORDER BY id", (version, self.config, self._last_id)).fetchall()
+        if rows:
+            new = np.stack([np.frombuffer(blob, dtype=np.float32) for _, _, blob in rows])
+            self._vecs = new if self._vecs is None else np.vstack([self._vecs, new])
+            self._ids.extend(i for i, _, _ in rows)
+            self._scopes.extend(s for _, s, _ in rows)
+            self._last_id = rows[-1][0]
+
+    # =====================================================
+    # Lookup / store
+    # =====================================================
+    def lookup(self, question, vector, version, scope=""):
+        """Stored answer for a question like this one, asked against index `version` in `scope`, or None."""
+        if not self._usable(version):
+            return None
+        start = time.perf_counter()
+        q = _unit(vector)
+        with self._lock:
+            self._sync(version)
+            best = None
+            if self._ids and self._vecs.shape[1] == q.shape[0]:
+                sims = np.where(np.asarray(self._scopes) == scope, self._vecs @ q, -np.inf)
+                i = int(np.argmax(sims))
+                if sims[i] >= self.threshold:
+                    best = (self._ids[i], float(sims[i]))
+        row = None
+        if best:
+            conn = self._conn()
+            row = conn.execute("SELECT question, answer, sources, answer_ms FROM answers WHERE id = ?",
+                               (best[0],)).fetchone()
+            if row:
+                with conn:
+                    conn.execute("UPDATE answers SET hits = hits + 1, used = ? WHERE id = ?", (time.time(), best[0]))
+            else:                                  # evicted by another process
+                with self._lock:
+                    self._version = None
+        with self._lock:
+            if not row:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.saved_ms += max(0.0, row[3] - 1000 * (time.perf_counter() - start))
+        return {"answer": row[1], "sources": json.loads(row[2]), "cached": True,
+                "cached_question": row[0], "similarity": round(best[1], 4)}
+
+    def store(self, question, vector, version, answer, sources, answer_ms, scope=""):
+        """Remember an answer generated against index `version` (ignored if the index has moved on)."""
+        if not self._usable(version):
+            return
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("INSERT INTO answers (index_ver, config, scope, question, vec, answer, sources, answer_ms, "
+                         "used) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                         (version, self.config, scope, question, _unit(vector).tobytes(), answer,
+                          json.dumps(list(sources)), float(answer_ms), time.time()))
+            n = conn.execute("SELECT COUNT(*) FROM answers WHERE index_ver = ? AND config = ?",
+                             (version, self.config)).fetchone()[0]
+            if n > self.max_entries:               # least recently used go first
+                conn.execute("DELETE FROM answers WHERE id IN (SELECT id FROM answers WHERE index_ver = ? "
+                             "AND config = ? ORDER BY used LIMIT ?)", (version, self.config, n - self.max_entries))
+                with self._lock:
+                    self._version = None           # reload the in-memory copy on the next lookup
+
+    # =====================================================
+    # Stats
+    # =====================================================
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "bypassed": self.bypassed,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "saved_ms": round(self.saved_ms, 1)}
+
+    def summary(self):
+        if not self.path:
+            return "Answer cache: disabled"
+        s = self.stats()
+        rate = f"{100 * s['hit_rate']:.0f}%" if s["hit_rate"] is not None else "n/a"
+        return (f"Answer cache: {s['hits']} hit / {s['misses']} miss ({rate} hit rate, "
+                f"{s['saved_ms'] / 1000:.1f}s of answering saved)")
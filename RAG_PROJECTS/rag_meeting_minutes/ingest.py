@@ -1,9 +1,13 @@
+import argparse
+import glob
+import hashlib
+import json
 import os
-import sys
 import shutil
-from langchain_community.document_loaders import TextLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.embeddings import OllamaEmbeddings
+import sys
+import time
+import uuid
+from langchain_core.documents import Document
 from langchain_community.vectorstores import FAISS
 
 # =====================================================
@@ -11,74 +15,245 @@ from langchain_community.vectorstores import FAISS
 # =====================================================
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
+sys.path.insert(0, os.path.join(BASE_DIR, "..", ".."))
+from rag_common import chunker
+from ollama_embeddings import OllamaBatchEmbeddings
+from shards import CATALOG_NAME, SHARDS_DIR, build_catalog, meeting_meta, shard_key, speakers
+
 DATA_DIR = os.getenv("DATA_DIR", os.path.join(BASE_DIR, "data"))
 VECTOR_DB_DIR = os.getenv("VECTOR_DB_DIR", os.path.join(BASE_DIR, "faiss_index"))
+MANIFEST_NAME = "ingest_manifest.json"   # per-file hashes + docstore ids, kept next to the index
 
 EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "nomic-embed-text")
-CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", 300))
-CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", 50))
+CHUNK_TOKENS = int(os.getenv("CHUNK_TOKENS", 128))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", 24))
+FLUSH_CHUNKS = int(os.getenv("FLUSH_CHUNKS", 2048))   # chunks embedded + added per step
+SHARD_BY = os.getenv("SHARD_BY", "month")             # one FAISS index per month | meeting; none: a single index
+EXTENSIONS = (".txt", ".md")
+
+# Usage:
+#   python ingest.py                       every transcript in DATA_DIR
+#   python ingest.py meetings/ "2026-*.txt" standup_meeting.txt
+#   python ingest.py --rebuild             drop the index and embed everything again
+#
+# Only files that are new or whose content changed are chunked and embedded;
+# their chunks are appended to the saved index.  A changed file's old chunks
+# and the chunks of files that no longer exist are deleted by docstore id.
+# A bare file name that does not exist is looked up in DATA_DIR.
+#
+# The index is sharded by meeting month (SHARD_BY), with a catalog of each
+# meeting's date, title and participants that query.py routes questions
+# by; see shards.py.  Only the shards holding changed files are rewritten.
+
 
 # =====================================================
-# 2. Validate input file
+# 2. Resolve input files
 # =====================================================
-if len(sys.argv) < 2:
-    raise ValueError(
-        " Usage: python ingest.py <text_file>\n"
-        "Example: python ingest.py standup_meeting.txt"
-    )
+def resolve(patterns):
+    found = set()
+    for pattern in patterns or [DATA_DIR]:
+        if os.path.isdir(pattern):
+            for root, _, names in os.walk(pattern):
+                found.update(os.path.join(root, n) for n in names if n.endswith(EXTENSIONS))
+        elif glob.has_magic(pattern):
+            found.update(p for p in glob.glob(pattern, recursive=True) if os.path.isfile(p))
+        elif os.path.isfile(pattern):
+            found.add(pattern)
+        elif os.path.isfile(os.path.join(DATA_DIR, pattern)):
+            found.add(os.path.join(DATA_DIR, pattern))
+        else:
+            raise FileNotFoundError(f" File not found: {pattern}")
+    return sorted(os.path.abspath(p) for p in found)
 
-file_name = sys.argv[1]
-DATA_PATH = os.path.join(DATA_DIR, file_name)
 
-if not os.path.exists(DATA_PATH):
-    raise FileNotFoundError(f" File not found: {DATA_PATH}")
+def sha256(path, block=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for data in iter(lambda: f.read(block), b""):
+            digest.update(data)
+    return digest.hexdigest()
 
-# =====================================================
-# 3. Load stand-up / speech text
-# =====================================================
-loader = TextLoader(DATA_PATH, encoding="utf-8")
-documents = loader.load()
-print(f"Loaded file: {file_name}")
 
 # =====================================================
-# 4. Chunking
+# 3. Manifest
 # =====================================================
-splitter = RecursiveCharacterTextSplitter(
-    chunk_size=CHUNK_SIZE,
-    chunk_overlap=CHUNK_OVERLAP,
-    separators=["\n\n", "\n", ".", " "]
-)
+def settings():
+    """Anything that changes chunk ids or vectors; a mismatch forces a rebuild."""
+    return {"embedding_model": EMBEDDING_MODEL, "embeddings": "ollama-batch",
+            "chunker": chunker.CHUNKER_VERSION,
+            "chunk_tokens": CHUNK_TOKENS, "chunk_overlap_tokens": CHUNK_OVERLAP_TOKENS,
+            "shard_by": SHARD_BY}
 
-chunks = splitter.split_documents(documents)
 
-for i, chunk in enumerate(chunks):
-    chunk.metadata.update({
-        "chunk_id": i,
-        "source_file": file_name,
-        "content_type": "standup_speech"
-    })
+def load_manifest():
+    try:
+        with open(os.path.join(VECTOR_DB_DIR, MANIFEST_NAME), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
 
-print(f"Created {len(chunks)} chunks")
 
-# =====================================================
-# 5. Ollama embeddings
-# =====================================================
-embeddings = OllamaEmbeddings(model=EMBEDDING_MODEL)
+def _write_json(name, obj):
+    tmp = os.path.join(VECTOR_DB_DIR, name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f, indent=1, sort_keys=True)
+    os.replace(tmp, os.path.join(VECTOR_DB_DIR, name))
+
+
+def save_manifest(files, shards):
+    _write_json(MANIFEST_NAME, {"settings": settings(), "files": files, "shards": shards})
+
+
+def save(stores, files, shards):
+    """
+    Write each changed shard to a new folder, then the catalog, then the
+    manifest, which switches to the new folders; folders no longer named
+    in it are deleted last.  A crash leaves the previous index whole.
+    """
+    os.makedirs(os.path.join(VECTOR_DB_DIR, SHARDS_DIR), exist_ok=True)
+    for key, vectorstore in stores.items():
+        if not vectorstore.index_to_docstore_id:     # every chunk deleted
+            shards.pop(key, None)
+            continue
+        folder = os.path.join(SHARDS_DIR, f"{key}.{uuid.uuid4().hex[:8]}")
+        vectorstore.save_local(os.path.join(VECTOR_DB_DIR, folder))
+        shards[key] = {"dir": folder, "chunks": len(vectorstore.index_to_docstore_id)}
+    _write_json(CATALOG_NAME, build_catalog(files, shards))
+    save_manifest(files, shards)
+
+    live = {os.path.basename(s["dir"]) for s in shards.values()}
+    for name in os.listdir(os.path.join(VECTOR_DB_DIR, SHARDS_DIR)):
+        if name not in live:
+            shutil.rmtree(os.path.join(VECTOR_DB_DIR, SHARDS_DIR, name), ignore_errors=True)
+    for name in ("index.faiss", "index.pkl"):         # the single index of earlier versions
+        if os.path.exists(os.path.join(VECTOR_DB_DIR, name)):
+            os.remove(os.path.join(VECTOR_DB_DIR, name))
 
-# =====================================================
-# 6. Clean previous vector DB
-# =====================================================
-if os.path.exists(VECTOR_DB_DIR):
-    shutil.rmtree(VECTOR_DB_DIR)
-    print(" Old vector store removed")
 
 # =====================================================
-# 7. Create FAISS index
+# 4. Chunk the stand-up / speech text
 # =====================================================
-vectorstore = FAISS.from_documents(chunks, embeddings)
+# Whole sentences packed up to CHUNK_TOKENS tokens (rag_common.chunker;
+# estimated counts, the Ollama model's tokenizer is not available locally).
+# Each file is read in blocks, never loaded whole.
+def chunk(path, meta=None):
+    for c in chunker.chunk_file(path, CHUNK_TOKENS, CHUNK_OVERLAP_TOKENS, errors="strict"):
+        doc_id = hashlib.md5(f"{path}_{c.index}".encode()).hexdigest()
+        yield doc_id, Document(
+            page_content=c.text,
+            metadata={
+                "source": path,
+                "chunk_id": c.index,
+                "source_file": os.path.basename(path),
+                "content_type": "standup_speech",
+                "meeting_date": (meta or {}).get("date")
+            }
+        )
+
 
 # =====================================================
-# 8. Save vector DB
+# 5. Incremental ingest
 # =====================================================
-vectorstore.save_local(VECTOR_DB_DIR)
-print(" Stand-up meeting text indexed successfully")
+def ingest(patterns=None, rebuild=False):
+    start = time.perf_counter()
+    paths = resolve(patterns)
+    embeddings = OllamaBatchEmbeddings(model=EMBEDDING_MODEL)
+
+    manifest = load_manifest()
+    shards = manifest.get("shards", {})
+    fresh = (rebuild or manifest.get("settings") != settings() or "shards" not in manifest
+             or not all(os.path.exists(os.path.join(VECTOR_DB_DIR, s["dir"], "index.faiss")) for s in shards.values()))
+    if fresh and os.path.exists(VECTOR_DB_DIR):
+        print(" Rebuild requested or index settings changed — re-embedding everything")
+    known = {} if fresh else manifest["files"]
+    shards = {} if fresh else dict(shards)
+
+    # what changed: stat first, hash only when size / mtime moved
+    files, todo = dict(known), []
+    for path in paths:
+        st = os.stat(path)
+        old = known.get(path)
+        if old and old["size"] == st.st_size and old["mtime_ns"] == st.st_mtime_ns:
+            continue
+        digest = sha256(path)
+        if old and old["sha256"] == digest:
+            files[path] = {**old, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+            continue
+        meta = meeting_meta(path)
+        todo.append((path, {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest, **meta,
+                            "shard": shard_key(meta, path, SHARD_BY)}))
+    removed = [p for p in known if not os.path.exists(p)]
+
+    # only the shards a deleted or added chunk belongs to are loaded
+    stores = {}
+
+    def store(key):
+        if key not in stores and key in shards:
+            stores[key] = FAISS.load_local(os.path.join(VECTOR_DB_DIR, shards[key]["dir"]), embeddings,
+                                           allow_dangerous_deserialization=True)
+        return stores.get(key)
+
+    for path in removed + [p for p, _ in todo if p in known]:
+        vectorstore = store(known[path].get("shard"))
+        if vectorstore is None:             # a file without chunks has no shard
+            continue
+        present = set(vectorstore.index_to_docstore_id.values())
+        stale = [i for i in known[path]["ids"] if i in present]
+        if stale:
+            vectorstore.delete(stale)
+    for path in removed:
+        del files[path]
+
+    # chunk and embed the new / changed files, FLUSH_CHUNKS at a time
+    embed_start, pending, added = time.perf_counter(), [], 0
+
+    def flush():
+        nonlocal added
+        if not pending:
+            return
+        vectors = embeddings.embed_documents([d.page_content for _, _, d in pending])
+        by_shard = {}
+        for (key, doc_id, doc), vector in zip(pending, vectors):
+            by_shard.setdefault(key, []).append((doc_id, doc, vector))
+        for key, rows in by_shard.items():
+            pairs = [(d.page_content, v) for _, d, v in rows]
+            metadatas, ids = [d.metadata for _, d, _ in rows], [i for i, _, _ in rows]
+            if store(key) is None:
+                stores[key] = FAISS.from_embeddings(pairs, embeddings, metadatas=metadatas, ids=ids)
+            else:
+                stores[key].add_embeddings(pairs, metadatas=metadatas, ids=ids)
+        added += len(pending)
+        pending.clear()
+
+    for path, info in todo:
+        ids, names = [], set(info["participants"])
+        for doc_id, doc in chunk(path, info):
+            ids.append(doc_id)
+            names.update(speakers(doc.page_content))
+            pending.append((info["shard"], doc_id, doc))
+            if len(pending) >= FLUSH_CHUNKS:
+                flush()
+        files[path] = {**info, "ids": ids, "participants": sorted(names)}
+    flush()
+    embed_s = time.perf_counter() - embed_start
+
+    new = sum(p not in known for p, _ in todo)
+    print(f"Files: {new} new, {len(todo) - new} changed, {len(removed)} removed, "
+          f"{len(paths) - len(todo)} unchanged")
+    if not stores:
+        if files != known:         # only mtimes moved: refresh them in the manifest
+            save_manifest(files, shards)
+        print(" Nothing to index" if not files else " Index is up to date")
+        return
+    save(stores, files, shards)
+    print(f"Embedded {added} chunks in {embed_s:.2f}s; {len(stores)} of {len(shards)} shards rewritten; "
+          f"index has {sum(s['chunks'] for s in shards.values())} chunks from {len(files)} files "
+          f"({time.perf_counter() - start:.2f}s total)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incrementally index meeting transcripts into FAISS.")
+    parser.add_argument("paths", nargs="*", help="files, directories or glob patterns (default: DATA_DIR)")
+    parser.add_argument("--rebuild", action="store_true", help="drop the index and embed everything again")
+    args = parser.parse_args()
+    ingest(args.paths, args.rebuild)
@@ -0,0 +1,79 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from langchain_core.embeddings import Embeddings
+
+# =====================================================
+# Batched, concurrent Ollama embeddings
+# =====================================================
+# Drop-in for langchain_community's OllamaEmbeddings, which sends one HTTP
+# request per text, one after another.  Here texts go in EMBED_BATCH-sized
+# /api/embed requests, EMBED_CONCURRENCY of them in flight at once, over
+# kept-alive connections.  Ollama servers without /api/embed (before 0.3)
+# get the old one-text /api/embeddings requests, still sent concurrently.
+# The "passage: " / "query: " instructions are the ones OllamaEmbeddings
+# adds, so the texts embedded are the same as before.
+
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+EMBED_BATCH = int(os.getenv("EMBED_BATCH", 32))
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", 4))
+EMBED_TIMEOUT = float(os.getenv("EMBED_TIMEOUT", 120))
+
+
+class OllamaBatchEmbeddings(Embeddings):
+
+    def __init__(self, model, base_url=OLLAMA_BASE_URL, batch_size=EMBED_BATCH,
+                 concurrency=EMBED_CONCURRENCY, embed_instruction="passage: ",
+                 query_instruction="query: "):
+        self.model = model
+        self.base_url = base_url.rstrip("/")
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self.embed_instruction = embed_instruction
+        self.query_instruction = query_instruction
+        self._local = threading.local()
+        self._batch_api = None          # unknown until the first request
+
+    def embed_documents(self, texts):
+        texts = [f"{self.embed_instruction}{t}" for t in texts]
+        vectors = []
+        if texts and self._batch_api is None:      # probe with one batch before fanning out
+            vectors = self._embed_batch(texts[:self.batch_size])
+            texts = texts[self.batch_size:]
+        size = self.batch_size if self._batch_api else 1
+        batches = [texts[i:i + size] for i in range(0, len(texts), size)]
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            for batch in pool.map(self._embed_batch, batches):
+                vectors.extend(batch)
+        return vectors
+
+    def embed_query(self, text):
+        return self._embed_batch([f"{self.query_instruction}{text}"])[0]
+
+    def _embed_batch(self, texts):
+        if self._batch_api is not False:
+            res = self._post("/api/embed", {"model": self.model, "input": texts})
+            # a server without /api/embed answers a bare 404; an unknown model is a 404 naming it
+            if res.status_code != 404 or "model" in res.text.lower():
+                self._batch_api = True
+                return self._json(res)["embeddings"]
+            self._batch_api = False
+        return [self._json(self._post("/api/embeddings", {"model": self.model, "prompt": t}))["embedding"]
+                for t in texts]
+
+    def _post(self, path, payload):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        try:
+            return session.post(f"{self.base_url}{path}", json=payload, timeout=EMBED_TIMEOUT)
+        except requests.exceptions.RequestException as e:
+            raise ValueError(f"Error raised by Ollama at {self.base_url}: {e}")
+
+    @staticmethod
+    def _json(res):
+        if res.status_code != 200:
+            raise ValueError(f"Ollama embedding request failed: HTTP {res.status_code}, {res.text[:200]}")
+        return res.json()
@@ -1,8 +1,11 @@
 import os
-from langchain_community.vectorstores import FAISS
-from langchain_community.embeddings import OllamaEmbeddings
+import threading
+import time
 from langchain_community.llms import Ollama
-from langchain.prompts import PromptTemplate
+from langchain_core.prompts import PromptTemplate
+from ollama_embeddings import OLLAMA_BASE_URL, OllamaBatchEmbeddings
+from answer_cache import AnswerCache, index_version
+from shards import ShardedIndex
 
 # =====================================================
 # 1. Configuration
@@ -13,20 +16,45 @@ VECTOR_DB_DIR = os.getenv("VECTOR_DB_DIR", os.path.join(BASE_DIR, "faiss_index")
 EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "nomic-embed-text")
 LLM_MODEL = os.getenv("LLM_MODEL", "llama3")
 TOP_K = int(os.getenv("TOP_K", 3))
+LLM_KEEP_ALIVE = os.getenv("LLM_KEEP_ALIVE", "30m")   # how long Ollama keeps the model loaded between questions
+
+NOT_MENTIONED = "Not mentioned in the meeting."
 
 # =====================================================
 # 2. Load vector database
 # =====================================================
-embeddings = OllamaEmbeddings(model=EMBEDDING_MODEL)
+# same client (and endpoint) as ingest.py, so query and chunk vectors match
+embeddings = OllamaBatchEmbeddings(model=EMBEDDING_MODEL)
 
-vectorstore = FAISS.load_local(
-    VECTOR_DB_DIR,
-    embeddings,
-    allow_dangerous_deserialization=True
-)
 
-retriever = vectorstore.as_retriever(search_kwargs={"k": TOP_K})
+def load_vectorstore(loaded=None):
+    """The sharded index and its meeting catalog (shards.py); `loaded` shards are reused."""
+    return ShardedIndex(VECTOR_DB_DIR, embeddings, loaded)
+
+
+_index_lock = threading.Lock()
+_vectorstore, _version = None, None
+
 
+def current_index():
+    """The loaded index and its version; reloaded when ingest.py has saved a new one."""
+    global _vectorstore, _version
+    version = index_version(VECTOR_DB_DIR)      # read before loading, so answers are never tagged newer than their index
+    with _index_lock:
+        if _vectorstore is None or version != _version:
+            try:
+                # unchanged shards keep their folder, so only rewritten ones are read again
+                _vectorstore = load_vectorstore(_vectorstore.folders if _vectorstore else None)
+                _version = version
+            except (OSError, RuntimeError):
+                if _vectorstore is None:        # mid-swap reload: keep serving the old index
+                    raise
+        return _vectorstore, _version
+
+
+# =====================================================
+# 3. Prompt
+# =====================================================
 PROMPT_TEMPLATE = """
 You are an assistant answering questions strictly based on the provided stand-up meeting context.
 
@@ -51,42 +79,71 @@ prompt = PromptTemplate(
     input_variables=["context", "question"]
 )
 
-# =====================================================
-# 4. LLaMA 3 (Generation)
-# =====================================================
-llm = Ollama(model=LLM_MODEL)
-
-# =====================================================
-# 5. RAG QA Function
-# =====================================================
-def ask(question: str) -> str:
-    
-    docs = retriever.invoke(question)
-
-    if not docs:
-        return "Not mentioned in the meeting."
 
+def build_prompt(question, docs):
     context = "\n\n".join(d.page_content for d in docs)
+    return prompt.format(context=context, question=question)
 
-    final_prompt = prompt.format(
-        context=context,
-        question=question
-    )
-
-    response = llm.invoke(final_prompt)
 
+def clean_answer(response):
     if not response or response.strip().lower() in {
         "not mentioned",
         "not mentioned.",
         "n/a"
     }:
-        return "Not mentioned in the meeting."
-
+        return NOT_MENTIONED
     return response.strip()
 
+
+def sources(docs):
+    return sorted({d.metadata.get("source_file", "") for d in docs})
+
+
+# =====================================================
+# 4. Semantic answer cache
+# =====================================================
+# Paraphrases of an earlier question get its answer without retrieval or
+# generation; see answer_cache.py.  Answers are kept per route scope, so
+# "what did Priya say on the 3rd of May?" never answers the same question
+# about the 4th.
+answer_cache = AnswerCache(VECTOR_DB_DIR, {
+    "embedding_model": EMBEDDING_MODEL,
+    "llm_model": LLM_MODEL,
+    "top_k": TOP_K,
+    "prompt": PROMPT_TEMPLATE
+})
+
+# =====================================================
+# 5. LLaMA 3 (Generation)
+# =====================================================
+llm = Ollama(model=LLM_MODEL, base_url=OLLAMA_BASE_URL, keep_alive=LLM_KEEP_ALIVE)
+
 # =====================================================
-# 6. Interactive Mode
+# 6. RAG QA Function
 # =====================================================
+def ask(question: str) -> str:
+    vectorstore, version = current_index()
+
+    # one query embedding serves both the cache lookup and retrieval
+    vector = embeddings.embed_query(question)
+    start = time.perf_counter()
+    route = vectorstore.route(question)
+    hit = answer_cache.lookup(question, vector, version, route.scope)
+    if hit:
+        return hit["answer"]
+
+    docs = vectorstore.search(vector, TOP_K, route)
+
+    answer = clean_answer(llm.invoke(build_prompt(question, docs))) if docs else NOT_MENTIONED
+    answer_cache.store(question, vector, version, answer, sources(docs), 1000 * (time.perf_counter() - start),
+                       route.scope)
+    return answer
+
+# =====================================================
+# 7. Interactive Mode
+# =====================================================
+# For answers streamed as they are generated, and batches of questions,
+# run the resident server instead: python server.py
 if __name__ == "__main__":
     print("\nRAG Q&A using LLaMA 3 (Ollama)")
     print("Type 'exit' to quit")
@@ -96,3 +153,5 @@ if __name__ == "__main__":
         if q.lower() == "exit":
             break
         print("\nAnswer:", ask(q))
+
+    print(answer_cache.summary())
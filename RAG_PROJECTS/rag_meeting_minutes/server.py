@@ -0,0 +1,256 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+import query
+
+# =====================================================
+# 1. Configuration
+# =====================================================
+HOST = os.getenv("QUERY_SERVER_HOST", "127.0.0.1")
+PORT = int(os.getenv("QUERY_SERVER_PORT", 8766))
+MAX_GENERATIONS = int(os.getenv("MAX_GENERATIONS", 4))     # answers generated at once (match OLLAMA_NUM_PARALLEL)
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", 4))
+
+# Usage:
+#   python server.py                                  serve on QUERY_SERVER_HOST:QUERY_SERVER_PORT
+#   python server.py --ask "Who is working on the login page?"
+#   python server.py --batch questions.txt --out answers.jsonl --concurrency 4
+#
+# The server loads the FAISS index once, keeps the embedding / LLM clients
+# (and, through keep_alive, the Ollama models) warm, and reloads the index
+# when ingest.py saves a new one.  Paraphrases of earlier questions are
+# answered from query.answer_cache ("cached": true in the final event).
+#
+#   GET  /health                      {"status", "chunks", "shards", "answer_cache": hit / miss stats}
+#   POST /ask  {"question": "..."}    NDJSON stream: {"token": "..."} lines while the
+#                                     answer is generated, then {"done": true, "answer",
+#                                     "sources", "cached", "ttft_ms", "total_ms"}
+#   POST /ask  {"question": "...", "stream": false}   the final object only
+#
+# --batch answers a file of questions (one per line, '#' comments) in this
+# process, --concurrency at a time, and writes one JSON line per question
+# in input order.
+
+
+# =====================================================
+# 2. Query engine
+# =====================================================
+class QueryEngine:
+    def __init__(self, max_generations=MAX_GENERATIONS):
+        self.generations = threading.Semaphore(max_generations)
+
+    def vectorstore(self):
+        """The loaded index; reloaded when ingest.py has saved a new one."""
+        return query.current_index()[0]
+
+    def warm(self):
+        """Load the index and both Ollama models before the first question."""
+        self.vectorstore()
+        query.embeddings.embed_query("warm-up")
+        requests.post(f"{query.OLLAMA_BASE_URL}/api/generate",
+                      json={"model": query.LLM_MODEL, "keep_alive": query.LLM_KEEP_ALIVE},
+                      timeout=600).raise_for_status()
+
+    def stream(self, question):
+        """Yield {"token"} events as the answer is generated, then the final {"done"} event."""
+        start = time.perf_counter()
+        vectorstore, version = query.current_index()
+        vector = query.embeddings.embed_query(question)
+        embedded = time.perf_counter()
+        route = vectorstore.route(question)
+        hit = query.answer_cache.lookup(question, vector, version, route.scope)
+        if hit:
+            total = round(1000 * (time.perf_counter() - start), 1)
+            yield {"token": hit["answer"]}
+            yield {"done": True, "answer": hit["answer"], "sources": hit["sources"], "cached": True,
+                   "ttft_ms": total, "total_ms": total}
+            return
+
+        docs = vectorstore.search(vector, query.TOP_K, route)
+        parts, ttft = [], None
+        if docs:
+            with self.generations:
+                for token in query.llm.stream(query.build_prompt(question, docs)):
+                    if ttft is None:
+                        ttft = time.perf_counter() - start
+                    parts.append(token)
+                    yield {"token": token}
+        answer = query.clean_answer("".join(parts)) if docs else query.NOT_MENTIONED
+        query.answer_cache.store(question, vector, version, answer, query.sources(docs),
+                                 1000 * (time.perf_counter() - embedded), route.scope)
+        total = time.perf_counter() - start
+        yield {"done": True, "answer": answer, "sources": query.sources(docs), "cached": False,
+               "ttft_ms": round(1000 * (total if ttft is None else ttft), 1),
+               "total_ms": round(1000 * total, 1)}
+
+    def ask(self, question):
+        for event in self.stream(question):
+            pass
+        return event
+
+
+# =====================================================
+# 3. HTTP server
+# =====================================================
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True         # small writes (headers, streamed tokens) go out at once
+
+    def do_GET(self):
+        if self.path != "/health":
+            return self._send(404, {"error": "not found"})
+        vectorstore = self.server.engine.vectorstore()
+        self._send(200, {"status": "ok", "chunks": vectorstore.chunks, "shards": len(vectorstore.shards),
+                         "answer_cache": query.answer_cache.stats()})
+
+    def do_POST(self):
+        if self.path != "/ask":
+            return self._send(404, {"error": "not found"})
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            question = body["question"].strip()
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return self._send(400, {"error": 'expected {"question": "..."}'})
+
+        engine = self.server.engine
+        if not body.get("stream", True):
+            try:
+                return self._send(200, engine.ask(question))
+            except (OSError, ValueError) as e:
+                return self._send(502, {"error": str(e)})
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        events = engine.stream(question)
+        try:
+            for event in events:
+                self._chunk(event)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True     # client left; closing the generator frees its LLM slot
+            return
+        except (OSError, ValueError) as e:   # Ollama unreachable / returned an error
+            self._chunk({"error": str(e)})
+        finally:
+            events.close()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _chunk(self, obj):
+        data = json.dumps(obj).encode() + b"\n"
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def _send(self, code, obj):
+        data = json.dumps(obj).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class QueryServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, engine, host=HOST, port=PORT):
+        super().__init__((host, port), _Handler)
+        self.engine = engine
+
+
+def serve(host=HOST, port=PORT):
+    engine = QueryEngine()
+    start = time.perf_counter()
+    engine.warm()
+    server = QueryServer(engine, host, port)
+    print(f"Index and models loaded in {time.perf_counter() - start:.2f}s; "
+          f"serving on http://{host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(query.answer_cache.summary())
+
+
+# =====================================================
+# 4. Clients: single question, batch file
+# =====================================================
+def ask_server(question, host=HOST, port=PORT):
+    """Print the answer from a running server as it is generated."""
+    with requests.post(f"http://{host}:{port}/ask", json={"question": question}, stream=True, timeout=600) as r:
+        r.raise_for_status()
+        for line in r.iter_lines():
+            event = json.loads(line)
+            if "token" in event:
+                print(event["token"], end="", flush=True)
+            elif "error" in event:
+                sys.exit(f"\n Error: {event['error']}")
+            else:
+                print(f"\n\nAnswer: {event['answer']}\nSources: {', '.join(event['sources']) or '-'}"
+                      f"\nFirst token {event['ttft_ms']:.0f} ms, total {event['total_ms']:.0f} ms"
+                      f"{' (cached answer)' if event.get('cached') else ''}")
+
+
+def read_questions(path):
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+def batch(path, out=None, concurrency=BATCH_CONCURRENCY, engine=None):
+    """Answer every question in `path`, `concurrency` at a time; returns questions per minute."""
+    questions = read_questions(path)
+    engine = engine or QueryEngine(max_generations=concurrency)
+    engine.vectorstore()
+    start = time.perf_counter()
+
+    def answer(question):
+        try:
+            return engine.ask(question)
+        except (OSError, ValueError) as e:     # one failed question does not stop the batch
+            return {"error": str(e)}
+
+    sink = open(out, "w", encoding="utf-8") if out else sys.stdout
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for q, result in zip(questions, pool.map(answer, questions)):
+                sink.write(json.dumps({"question": q, **{k: v for k, v in result.items() if k != "done"}}) + "\n")
+                sink.flush()
+    finally:
+        if out:
+            sink.close()
+    elapsed = time.perf_counter() - start
+    rate = 60 * len(questions) / elapsed if elapsed else 0.0
+    print(f"Answered {len(questions)} questions in {elapsed:.2f}s "
+          f"({rate:.1f}/min, concurrency {concurrency})", file=sys.stderr)
+    print(query.answer_cache.summary(), file=sys.stderr)
+    return rate
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resident question-answering server for the meeting index.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--ask", metavar="QUESTION", help="stream one answer from the running server")
+    parser.add_argument("--batch", metavar="FILE", help="answer a file of questions (one per line)")
+    parser.add_argument("--out", metavar="FILE", help="--batch: write JSON lines here (default: stdout)")
+    parser.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY, help="--batch: questions at once")
+    args = parser.parse_args()
+    if args.ask:
+        ask_server(args.ask, args.host, args.port)
+    elif args.batch:
+        batch(args.batch, args.out, args.concurrency)
+    else:
+        serve(args.host, args.port)
@@ -0,0 +1,323 @@
+import hashlib
+import json
+import os
+import re
+import time
+from collections import defaultdict
+from typing import NamedTuple, Optional, Tuple
+
+import faiss
+import numpy as np
+from langchain_community.vectorstores import FAISS
+
+# =====================================================
+# Meeting catalog and index shards
+# =====================================================
+# ingest.py splits the index into shards - one FAISS index per month (or
+# per meeting, SHARD_BY) under VECTOR_DB_DIR/shards/ - and writes
+# CATALOG_NAME next to them: per shard its folder and chunk count, per
+# meeting its date, title, participants and shard.
+#
+# Before the vector search, route() reads the question for what it is
+# about: dates ("on the 14th of March", "2026-03-14"), months ("in
+# March 2026"), ranges ("between March and May"), the latest / first
+# meeting, participants and meeting titles named in the catalog.  Only
+# the chunks of the matching meetings are searched, in the shards that hold
+# them.  A question that names none of these, or whose meetings are not in
+# the catalog, is searched across every shard and the hits merged by
+# distance, as one flat index would rank them.
+#
+# Shard folders are never rewritten: ingest.py saves a changed shard to a
+# new folder and the manifest switches to it, so a loaded shard whose
+# folder is unchanged is reused when the index is reloaded.
+
+CATALOG_NAME = "catalog.json"
+SHARDS_DIR = "shards"
+TITLE_MAX_CHARS = 80
+HEAD_BYTES = 4096            # title / date / attendee lines are read from the start of a transcript
+
+MONTHS = ["january", "february", "march", "april", "may", "june", "july", "august", "september",
+          "october", "november", "december"]
+_MONTH_NUMBER = {**{m: i + 1 for i, m in enumerate(MONTHS)}, **{m[:3]: i + 1 for i, m in enumerate(MONTHS)},
+                 "sept": 9}
+_MONTH = r"(january|february|march|april|may|june|july|august|september|october|november|december|" \
+         r"jan|feb|mar|apr|jun|jul|aug|sept|sep|oct|nov|dec)\.?"
+_DAY_MONTH = re.compile(rf"\b(\d{{1,2}})(?:st|nd|rd|th)?\s+(?:of\s+)?{_MONTH}(?:,?\s+(\d{{4}}))?\b", re.I)
+_MONTH_DAY = re.compile(rf"\b{_MONTH}\s+(\d{{1,2}})(?:st|nd|rd|th)?\b(?:,?\s+(\d{{4}}))?", re.I)
+_ISO_DATE = re.compile(r"\b(\d{4})-(\d{2})-(\d{2})\b")
+# a month on its own only counts after a preposition or before a year ("may", "march" are verbs too)
+_MONTH_ONLY = re.compile(rf"\b(?:in|during|for|of|from|since|until|through|throughout|between)\s+{_MONTH}"
+                         rf"(?:\s+(\d{{4}}))?\b|\b{_MONTH}\s+(\d{{4}})\b", re.I)
+_RANGE_JOIN = re.compile(r"^\s*(?:and|to|until|till|through|-|–)\s*(?:the\s+)?$", re.I)
+# ... and a bare month counts as the end of a range ("between March and May"), checked in _date_mentions
+_RANGE_END = re.compile(rf"(?:\b(?:and|to|until|till|through)\s+|[-–]\s*){_MONTH}(?:\s+(\d{{4}}))?\b", re.I)
+_EDGE_MEETING = re.compile(r"\b(latest|last|most recent|previous|first|earliest)\s+"
+                           r"(?:meeting|stand-?up|sync|call|review)\b", re.I)
+
+_ATTENDEES = re.compile(r"^\s*(?:participants|attendees|present)\s*:\s*(.+)$", re.I | re.M)
+_SPEAKER = re.compile(r"(?:^|[.!?]\s+)(?:(?:Then|Also|Next|Briefly|Finally|Lastly),?\s+)?([A-Z][a-z]+(?: [A-Z][a-z]+)?)\s+(?:then\s+|also\s+|next\s+|briefly\s+|"
+                      r"finally\s+)?(?:began|gave|said|shared|followed|provided|concluded|reported|presented|"
+                      r"explained|mentioned|noted|added|asked|stated|confirmed|opened|closed|led|summari[sz]ed|"
+                      r"updated|raised|proposed|suggested|agreed)\b", re.M)
+_NOT_NAMES = {"He", "She", "They", "We", "It", "I", "You", "The", "This", "That", "Everyone", "Team", "Work"}
+
+
+# =====================================================
+# 1. Meeting metadata (ingest side)
+# =====================================================
+def find_date(text, default_year=None):
+    """First date in `text` as YYYY-MM-DD, or None."""
+    found = []
+    for m in _ISO_DATE.finditer(text):
+        found.append((m.start(), int(m.group(1)), int(m.group(2)), int(m.group(3))))
+    for m in _DAY_MONTH.finditer(text):
+        found.append((m.start(), int(m.group(3) or 0), _MONTH_NUMBER[m.group(2).lower()], int(m.group(1))))
+    for m in _MONTH_DAY.finditer(text):
+        found.append((m.start(), int(m.group(3) or 0), _MONTH_NUMBER[m.group(1).lower()], int(m.group(2))))
+    for _, year, month, day in sorted(found):
+        year = year or default_year
+        if year and 1 <= month <= 12 and 1 <= day <= 31:
+            return f"{year:04d}-{month:02d}-{day:02d}"
+    return None
+
+
+def speakers(text):
+    """Names of people reported speaking in `text` ("Shilpa then shared ...")."""
+    return {m.group(1) for m in _SPEAKER.finditer(text) if m.group(1).split()[0] not in _NOT_NAMES}
+
+
+def meeting_meta(path):
+    """Date, title and listed attendees of a transcript, from its file name and first lines."""
+    with open(path, encoding="utf-8") as f:
+        head = f.read(HEAD_BYTES)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    year = int(_ISO_DATE.search(stem).group(1)) if _ISO_DATE.search(stem) else None
+    date = find_date(stem) or find_date(head, year or _mtime_year(path))
+
+    first = next((line.strip() for line in head.splitlines() if line.strip()), "")
+    first = re.sub(r"^title\s*:\s*", "", first, flags=re.I)
+    if first and len(first) <= TITLE_MAX_CHARS and first[-1] not in ".!?":
+        title = first
+    else:
+        title = re.sub(r"[_\s]+", " ", stem).strip()
+
+    participants = set()
+    for m in _ATTENDEES.finditer(head):
+        participants.update(p.strip() for p in re.split(r",|;|\band\b", m.group(1)) if p.strip())
+    return {"date": date, "title": title, "participants": sorted(participants)}
+
+
+def _mtime_year(path):
+    return time.localtime(os.path.getmtime(path)).tm_year
+
+
+def shard_key(meta, path, shard_by):
+    if shard_by == "meeting":
+        stem = re.sub(r"[^A-Za-z0-9_-]+", "-", os.path.splitext(os.path.basename(path))[0])[:40]
+        return f"{stem}-{hashlib.md5(path.encode()).hexdigest()[:8]}"
+    if shard_by == "month":
+        return meta["date"][:7] if meta.get("date") else "undated"
+    return "all"
+
+
+def build_catalog(files, shards):
+    """The query-side view of the manifest: shards and meeting metadata, no hashes or chunk ids."""
+    meetings = {path: {k: info.get(k) for k in ("date", "title", "participants", "shard")}
+                for path, info in files.items()}
+    out = {}
+    for key, shard in shards.items():
+        dates = sorted(m["date"] for m in meetings.values() if m["shard"] == key and m["date"])
+        out[key] = {**shard, "meetings": sum(m["shard"] == key for m in meetings.values()),
+                    "first": dates[0] if dates else None, "last": dates[-1] if dates else None}
+    return {"shards": out, "meetings": meetings}
+
+
+# =====================================================
+# 2. Routing (query side)
+# =====================================================
+class Route(NamedTuple):
+    files: Optional[frozenset]      # meetings to search; None searches every shard
+    shards: Tuple[str, ...]
+    reason: str
+
+    @property
+    def scope(self):
+        """Key for answers that depend on which meetings were searched ('' for the whole archive)."""
+        if self.files is None:
+            return ""
+        return hashlib.sha1("\n".join(sorted(self.files)).encode()).hexdigest()[:16]
+
+
+def _date_mentions(question):
+    """(year or None, (month, day) low, (month, day) high) per date, month or range in the question."""
+    found = []
+    for m in _ISO_DATE.finditer(question):
+        y, mo, d = int(m.group(1)), int(m.group(2)), int(m.group(3))
+        found.append((m.start(), m.end(), y, (mo, d), (mo, d), False))
+    for m in _DAY_MONTH.finditer(question):
+        mo, d = _MONTH_NUMBER[m.group(2).lower()], int(m.group(1))
+        found.append((m.start(), m.end(), int(m.group(3) or 0) or None, (mo, d), (mo, d), False))
+    for m in _MONTH_DAY.finditer(question):
+        mo, d = _MONTH_NUMBER[m.group(1).lower()], int(m.group(2))
+        found.append((m.start(), m.end(), int(m.group(3) or 0) or None, (mo, d), (mo, d), False))
+    for m in _MONTH_ONLY.finditer(question):
+        name, year = (m.group(1), m.group(2)) if m.group(1) else (m.group(3), m.group(4))
+        mo = _MONTH_NUMBER[name.lower()]
+        start = m.start(1) if m.group(1) else m.start()
+        found.append((start, m.end(), int(year) if year else None, (mo, 1), (mo, 31), False))
+    for m in _RANGE_END.finditer(question):            # only kept right after another mention
+        mo = _MONTH_NUMBER[m.group(1).lower()]
+        found.append((m.start(1), m.end(), int(m.group(2)) if m.group(2) else None, (mo, 1), (mo, 31), True))
+
+    mentions, last_end = [], -1           # drop a mention inside a longer one found first
+    for start, end, year, lo, hi, bare in sorted(found, key=lambda f: (f[0], -f[1], f[5])):
+        if start < last_end:
+            continue
+        joined = mentions and _RANGE_JOIN.match(question[last_end:start])
+        if bare and not joined:
+            continue
+        if joined:
+            prev_year, prev_lo, _ = mentions.pop()
+            mentions.append((prev_year or year, prev_lo, hi))
+        else:
+            mentions.append((year, lo, hi))
+        last_end = end
+    return mentions
+
+
+class Catalog:
+
+    def __init__(self, catalog):
+        self.shards = catalog.get("shards", {})
+        self.meetings = catalog.get("meetings", {})
+        self.by_name = defaultdict(set)         # full names ("priya sharma"), matched as phrases
+        self.by_word = defaultdict(set)         # each word of a name ("priya", "sharma")
+        for path, m in self.meetings.items():
+            for name in m.get("participants") or ():
+                self.by_name[name.lower()].add(path)
+                for word in name.lower().split():
+                    self.by_word[word].add(path)
+        self.titles = {m["title"].lower(): path for path, m in self.meetings.items()
+                       if m.get("title") and len(m["title"]) >= 8}
+        self.dated = sorted((m["date"], path) for path, m in self.meetings.items() if m.get("date"))
+        self.days = [(int(d[:4]), (int(d[5:7]), int(d[8:10])), path) for d, path in self.dated]
+
+    def route(self, question):
+        """Which meetings (and so shards) a question is about; every shard when it cannot tell."""
+        everything = Route(None, tuple(self.shards), "all shards")
+        if not self.meetings:
+            return everything
+        matches, reasons = [], []
+
+        mentions = _date_mentions(question)
+        if mentions:
+            files = set()
+            for year, lo, hi in mentions:
+                files.update(p for y, day, p in self.days if (year is None or y == year) and lo <= day <= hi)
+            matches.append(files)
+            reasons.append("date")
+        edge = _EDGE_MEETING.search(question)
+        if edge and self.dated and not mentions:
+            day = self.dated[0][0] if edge.group(1).lower() in ("first", "earliest") else self.dated[-1][0]
+            matches.append({p for d, p in self.dated if d == day})
+            reasons.append(f"{edge.group(1).lower()} meeting")
+
+        q = question.lower()
+        words = set(re.findall(r"[a-z][a-z-]+", q))     # "Priya's" -> priya
+        phrases = [name for name in self.by_name if " " in name and re.search(rf"\b{re.escape(name)}\b", q)]
+        words.difference_update(w for name in phrases for w in name.split())
+        named = [self.by_name[name] for name in phrases] + [self.by_word[w] for w in words if w in self.by_word]
+        if named:
+            matches.append(set().union(*named))
+            reasons.append("participant")
+        titled = {path for title, path in self.titles.items() if title in q}
+        if titled:
+            matches.append(titled)
+            reasons.append("title")
+
+        if not matches:
+            return everything
+        files = set.intersection(*matches)
+        if not files:
+            return everything._replace(reason=f"no meeting matches {' + '.join(reasons)}; all shards")
+        shards = tuple(sorted({self.meetings[p]["shard"] for p in files}))
+        return Route(frozenset(files), shards, f"{' + '.join(reasons)}: {len(files)} meetings, {len(shards)} shards")
+
+
+# =====================================================
+# 3. Sharded index
+# =====================================================
+class Shard:
+    """One loaded FAISS shard, with its rows grouped by source file for filtered searches."""
+
+    def __init__(self, store):
+        self.store = store
+        self.rows = defaultdict(list)
+        for row, doc_id in store.index_to_docstore_id.items():
+            self.rows[store.docstore.search(doc_id).metadata.get("source", "")].append(row)
+
+    def __len__(self):
+        return self.store.index.ntotal
+
+    def search(self, query, k, files=None):
+        """[(distance, row)] for the k nearest chunks, only from `files` (of this shard) when given."""
+        params = None
+        if files is not None:
+            rows = [r for f in files for r in self.rows.get(f, ())]
+            if not rows:
+                return []
+            if len(rows) < len(self):        # the whole shard needs no selector
+                selector = faiss.IDSelectorBatch(np.asarray(rows, dtype=np.int64))
+                params = faiss.SearchParameters(sel=selector)
+            k = min(k, len(rows))
+        k = min(k, len(self))
+        if k <= 0:
+            return []
+        dist, idx = self.store.index.search(query, k, params=params)
+        return [(float(d), int(i)) for d, i in zip(dist[0], idx[0]) if i >= 0]
+
+    def document(self, row):
+        return self.store.docstore.search(self.store.index_to_docstore_id[row])
+
+
+class ShardedIndex:
+
+    def __init__(self, index_dir, embeddings, loaded=None):
+        """Load the shards named in the catalog; `loaded` (folder -> Shard) are reused, not re-read."""
+        loaded = loaded or {}
+        try:
+            with open(os.path.join(index_dir, CATALOG_NAME), encoding="utf-8") as f:
+                catalog = json.load(f)
+        except FileNotFoundError:           # an index saved before shards: one flat index, no catalog
+            catalog = {"shards": {"all": {"dir": "."}}, "meetings": {}}
+        self.catalog = Catalog(catalog)
+        self.shards = {}
+        for key, info in self.catalog.shards.items():
+            folder = os.path.normpath(os.path.join(index_dir, info["dir"]))
+            self.shards[key] = loaded.get(folder) or Shard(
+                FAISS.load_local(folder, embeddings, allow_dangerous_deserialization=True))
+        self.folders = {os.path.normpath(os.path.join(index_dir, info["dir"])): self.shards[key]
+                        for key, info in self.catalog.shards.items()}
+
+    @property
+    def chunks(self):
+        return sum(len(s) for s in self.shards.values())
+
+    def route(self, question):
+        return self.catalog.route(question)
+
+    def search(self, vector, k, route=None):
+        """The k nearest chunks in the routed meetings (every shard when the route finds none)."""
+        query = np.asarray([vector], dtype=np.float32)
+        hits = []
+        if route is not None and route.files is not None:
+            by_shard = defaultdict(list)
+            for path in route.files:
+                by_shard[self.catalog.meetings[path]["shard"]].append(path)
+            for key, files in by_shard.items():
+                hits.extend((d, key, row) for d, row in self.shards[key].search(query, k, files))
+        if not hits:
+            for key, shard in self.shards.items():
+                hits.extend((d, key, row) for d, row in shard.search(query, k))
+        hits.sort(key=lambda h: h[0])
+        return [self.shards[key].document(row) for _, key, row in hits[:k]]
@@ -0,0 +1,150 @@
+"""
+benchmarks/bench_dom_merge.py
+=============================
+Peak-RSS benchmark for DOMAnalyzer._merge on a large synthetic crawl.
+
+Each mode runs in its own subprocess so ru_maxrss is not shared:
+
+  legacy   per-page dicts + copied {**el, "_source_url": ...} merged views,
+           serialised with json.dumps (the pre-CrawlResult behaviour)
+  compact  slotted/interned records, referenced merged views, streamed
+           with json.dump(..., default=json_default)
+
+Usage:
+    python benchmarks/bench_dom_merge.py --pages 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+NAV_LINKS = 80      # site-wide header/footer links repeated on every page
+PAGE_LINKS = 15     # links unique to each page
+FORMS = 2
+FIELDS = 6
+BUTTONS = 8
+
+
+def _synthetic_html(n: int) -> str:
+    nav = "".join(
+        f'<a href="/section-{i}.html" aria-label="Section {i}">Section {i}</a>'
+        for i in range(NAV_LINKS)
+    )
+    own = "".join(
+        f'<a href="/page-{n}/item-{i}.html">Item {i} of page {n}</a>'
+        for i in range(PAGE_LINKS)
+    )
+    forms = "".join(
+        f'<form id="form-{f}" action="/submit-{f}" method="post">'
+        + "".join(
+            f'<input type="text" name="field_{k}" id="field_{k}" '
+            f'placeholder="Enter field {k}" required>'
+            for k in range(FIELDS)
+        )
+        + '<input type="submit" value="Go"></form>'
+        for f in range(FORMS)
+    )
+    buttons = "".join(
+        f'<button type="button" id="btn-{b}" aria-label="Action {b}">Action {b}</button>'
+        for b in range(BUTTONS)
+    )
+    return (
+        f"<html><head><title>Synthetic page {n}</title></head><body>"
+        f"<h1>Page {n}</h1><h2>Overview</h2><h3>Details</h3>"
+        f"<nav>{nav}</nav>{own}{forms}{buttons}</body></html>"
+    )
+
+
+def _run_mode(mode: str, pages: int) -> dict:
+    from bs4 import BeautifulSoup
+    from intelligence_layer.dom_analyser import DOMAnalyzer, _PageExtractor, json_default
+
+    analyzer = DOMAnalyzer("https://bench.local/", max_pages=pages)
+    t0 = time.perf_counter()
+    for n in range(pages):
+        url = f"https://bench.local/page-{n}.html"
+        soup = BeautifulSoup(_synthetic_html(n), "lxml")
+        page = _PageExtractor(url, soup).extract()
+        analyzer._pages.append(page.to_dict() if mode == "legacy" else page)
+        analyzer._visited.add(url)
+    crawl_s = time.perf_counter() - t0
+
+    out = Path(tempfile.mkstemp(suffix=".json")[1])
+    t0 = time.perf_counter()
+    if mode == "legacy":
+        result = _legacy_merge(analyzer._pages)
+        out.write_text(json.dumps({"dom_data": result}, indent=2), encoding="utf-8")
+    else:
+        result = analyzer._merge()
+        with out.open("w", encoding="utf-8") as fh:
+            json.dump({"dom_data": result}, fh, indent=2, default=json_default)
+    merge_s = time.perf_counter() - t0
+    size = out.stat().st_size
+    out.unlink()
+
+    return {
+        "mode":         mode,
+        "pages":        pages,
+        "crawl_s":      round(crawl_s, 2),
+        "merge_dump_s": round(merge_s, 2),
+        "json_mb":      round(size / 1e6, 1),
+        "peak_rss_mb":  round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def _legacy_merge(pages: list[dict]) -> dict:
+    all_forms, all_inputs, all_buttons, all_links, all_headings = [], [], [], [], []
+    for pg in pages:
+        src = pg["url"]
+        all_forms.extend({**f, "_source_url": src}   for f in pg["forms"])
+        all_inputs.extend({**i, "_source_url": src}  for i in pg["inputs"])
+        all_buttons.extend({**b, "_source_url": src} for b in pg["buttons"])
+        all_links.extend({**l, "_source_url": src}   for l in pg["links"])
+        all_headings.extend(pg["headings"])
+    seen, unique_links = set(), []
+    for lnk in all_links:
+        if lnk["href"] not in seen:
+            seen.add(lnk["href"])
+            unique_links.append(lnk)
+    return {
+        "forms": all_forms, "inputs": all_inputs, "buttons": all_buttons,
+        "links": unique_links[:100], "headings": all_headings, "pages": pages,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--mode", choices=["legacy", "compact"], default=None,
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(_run_mode(args.mode, args.pages)))
+        return
+
+    results = []
+    for mode in ("legacy", "compact"):
+        proc = subprocess.run(
+            [sys.executable, __file__, "--pages", str(args.pages), "--mode", mode],
+            capture_output=True, text=True, check=True, cwd=str(ROOT),
+            env={**os.environ, "PYTHONPATH": str(ROOT)},
+        )
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+benchmarks/bench_rag_engine.py
+==============================
+Construction time of intelligence_layer.rag_engine.RAGEngine with the
+persisted index, in a temp INDEX_DIR / RAG_DATA_DIR:
+
+  cold         no persisted index, empty embedding cache
+  warm         persisted index, nothing changed (model is not loaded)
+  one_changed  one source file edited (only its chunks re-embedded)
+  rebuilt_warm warm load after that incremental rebuild
+
+Every case runs in a fresh subprocess, so import and model-load costs are
+counted the way a Pipeline run or a Flask /run request pays them.  The
+query results of the warm engine are compared with the cold one.
+
+Usage:
+    python benchmarks/bench_rag_engine.py
+    python benchmarks/bench_rag_engine.py --files 50 --kb 40
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+QUERIES = ["login form with email and password", "table with sortable columns", "navigation menu links"]
+
+
+def _child():
+    import time
+    t0 = time.perf_counter()
+    from intelligence_layer.rag_engine import RAGEngine
+    engine = RAGEngine()
+    construct = time.perf_counter() - t0
+    model_loaded = engine._model is not None
+    results = [engine.query(q) for q in QUERIES]
+    print(json.dumps({
+        "construct_ms": round(construct * 1000, 1),
+        "model_loaded_by_constructor": model_loaded,
+        "chunks": len(engine._chunks),
+        "results": results,
+    }))
+
+
+def _write(path: Path, kb: int, rnd: random.Random):
+    words = ("verify login form email password submit error message table column sort "
+             "navigation menu link button click dropdown select checkbox page title").split()
+    path.write_text(" ".join(rnd.choice(words) for _ in range(kb * 1024 // 6)), encoding="utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--kb", type=int, default=20, help="approx. size of each source file in KiB")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return _child()
+
+    rnd = random.Random(0)
+    tmp = Path(tempfile.mkdtemp(prefix="rag_engine_bench_"))
+    data = tmp / "rag_data"
+    data.mkdir()
+    for i in range(args.files):
+        _write(data / f"doc_{i:03d}.txt", args.kb, rnd)
+
+    env = dict(os.environ,
+               RAG_INDEX_DIR=str(tmp / "index"),
+               RAG_EMBEDDING_CACHE=str(tmp / "embeddings.sqlite3"),
+               PYTHONPATH=os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")])))
+    # rag_data location is a module constant; point it at the temp folder
+    code = ("import sys, runpy; sys.argv = ['x', '--child']; "
+            "import intelligence_layer.rag_engine as r; from pathlib import Path; "
+            f"r.RAG_DATA_DIR = Path({str(data)!r}); "
+            f"runpy.run_path({str(Path(__file__).resolve())!r}, run_name='__main__')")
+
+    def run():
+        out = subprocess.run([sys.executable, "-c", code], env=env, cwd=ROOT,
+                             capture_output=True, text=True, check=True)
+        return json.loads(out.stdout.strip().splitlines()[-1])
+
+    try:
+        report = {"files": args.files, "kb_per_file": args.kb}
+        cold = run()
+        warm = run()
+        _write(data / "doc_000.txt", args.kb, rnd)
+        changed = run()
+        rebuilt = run()
+        for label, r in (("cold", cold), ("warm", warm), ("one_changed", changed), ("rebuilt_warm", rebuilt)):
+            report[label] = {k: v for k, v in r.items() if k != "results"}
+        report["warm_results_match_cold"] = warm["results"] == cold["results"]
+        report["warm_speedup"] = round(cold["construct_ms"] / max(warm["construct_ms"], 1e-3), 1)
+        print(json.dumps(report, indent=2))
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,469 @@
+"""
+crawl_coordinator.py
+====================
+Distributed crawl for the DOMAnalyzer pipeline.
+
+One coordinator process owns the BFS frontier and the visited set and hands
+out URL leases over a small local HTTP/JSON API.  Any number of worker
+processes — on this machine or on other Linux boxes that can reach it —
+lease a URL, render it in their own browser, and post the extracted page
+back.  Results are merged into one dom_data with the same shape as
+DOMAnalyzer.extract().
+
+Leases expire after CRAWLER_LEASE_TTL seconds.  An expired lease (worker
+killed, browser hung, box lost) is re-queued up to CRAWLER_LEASE_RETRIES
+times, so a crawl survives workers dying mid-page.  A late result for an
+expired lease is still accepted if nobody else finished that URL first.
+
+Endpoints:
+    POST /lease   {"worker"}                          -> {"lease_id","url","depth"} | {"wait": s} | {"done": true}
+    POST /result  {"lease_id","url","depth","page"}   -> {"ok": true}
+    POST /fail    {"lease_id","error"}                -> {"ok": true}
+    GET  /status                                      -> counters
+    GET  /dom_data                                    -> merged dom_data
+
+Config (.env):
+    CRAWLER_WORKERS          = 1       worker processes for `local` / main_pipeline
+    CRAWLER_LEASE_TTL        = 120     seconds before an unreported lease is re-queued
+    CRAWLER_LEASE_RETRIES    = 2       re-queues per URL before it is dropped
+    CRAWLER_COORDINATOR_PORT = 8765
+
+Usage:
+    python intelligence_layer/crawl_coordinator.py serve --url https://example.com
+    python intelligence_layer/crawl_coordinator.py work  --coordinator http://10.0.0.5:8765
+    python intelligence_layer/crawl_coordinator.py local --url https://example.com --workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.error import URLError
+from urllib.request import Request, urlopen
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from intelligence_layer.dom_analyser import (  # noqa: E402
+    MAX_DEPTH,
+    MAX_PAGES,
+    PAGE_TIMEOUT,
+    SAME_DOMAIN,
+    CrawlResult,
+    DOMAnalyzer,
+    _crawlable,
+    _normalize,
+    _Page,
+    _same_domain,
+    json_default,
+)
+
+WORKERS          = int(os.getenv("CRAWLER_WORKERS",          1))
+LEASE_TTL        = float(os.getenv("CRAWLER_LEASE_TTL",      120))
+LEASE_RETRIES    = int(os.getenv("CRAWLER_LEASE_RETRIES",    2))
+COORDINATOR_PORT = int(os.getenv("CRAWLER_COORDINATOR_PORT", 8765))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Coordinator state
+# ─────────────────────────────────────────────────────────────────────────────
+
+@dataclass
+class _Lease:
+    url:     str
+    depth:   int
+    worker:  str
+    expires: float
+
+
+class CrawlCoordinator:
+    """
+    Thread-safe frontier + visited set with expiring URL leases.
+
+    Parameters mirror DOMAnalyzer so a distributed crawl honours the same
+    page/depth/domain limits as a single-process one.
+    """
+
+    def __init__(
+        self,
+        url:         str,
+        max_pages:   int   = MAX_PAGES,
+        max_depth:   int   = MAX_DEPTH,
+        same_domain: bool  = SAME_DOMAIN,
+        timeout:     int   = PAGE_TIMEOUT,
+        lease_ttl:   float = LEASE_TTL,
+        retries:     int   = LEASE_RETRIES,
+    ):
+        self.start_url   = url
+        self.max_pages   = max_pages
+        self.max_depth   = max_depth
+        self.same_domain = same_domain
+        self.timeout     = timeout
+        self.lease_ttl   = lease_ttl
+        self.retries     = retries
+
+        start = _normalize(url)
+        self._lock      = threading.Lock()
+        self._done      = threading.Event()
+        self._frontier: deque[tuple[str, int]] = deque([(start, 0)])
+        self._seen:     set[str]               = {start}
+        self._visited:  set[str]               = set()
+        self._failed:   set[str]               = set()
+        self._attempts: dict[str, int]         = {}
+        self._leases:   dict[str, _Lease]      = {}
+        self._pages:    list[_Page]            = []
+        self._requeued  = 0
+
+    # ── Worker-facing operations ─────────────────────────────────────────────
+
+    def lease(self, worker: str) -> dict:
+        with self._lock:
+            self._reap()
+            while self._frontier and self._frontier[0][0] in self._visited:
+                self._frontier.popleft()
+            if self._finished():
+                self._done.set()
+                return {"done": True}
+            if not self._frontier or len(self._visited) + len(self._leases) >= self.max_pages:
+                return {"wait": 0.5}
+
+            url, depth = self._frontier.popleft()
+            lease_id   = uuid.uuid4().hex
+            self._leases[lease_id] = _Lease(url, depth, worker, time.monotonic() + self.lease_ttl)
+            print(f"[Coordinator] lease {lease_id[:8]} -> {worker}  depth={depth}  {url}")
+            return {"lease_id": lease_id, "url": url, "depth": depth, "timeout": self.timeout}
+
+    def complete(self, lease_id: str, url: str, depth: int, page: dict) -> None:
+        with self._lock:
+            lease = self._leases.pop(lease_id, None)
+            if lease is not None:
+                url, depth = lease.url, lease.depth
+            if url in self._visited or len(self._visited) >= self.max_pages:
+                return
+
+            pg = _Page.from_dict(page)
+            self._visited.add(url)
+            self._failed.discard(url)
+            self._pages.append(pg)
+            print(f"[Coordinator] [{len(self._visited)}/{self.max_pages}] done  {url}")
+
+            if depth < self.max_depth:
+                remaining = self.max_pages - len(self._visited)
+                added     = 0
+                for link in pg.links:
+                    if added >= remaining:
+                        break
+                    href = link.href
+                    if not href:
+                        continue
+                    norm = _normalize(href)
+                    if (
+                        norm not in self._seen
+                        and _crawlable(href, self.start_url)
+                        and (not self.same_domain or _same_domain(href, self.start_url))
+                    ):
+                        self._seen.add(norm)
+                        self._frontier.append((norm, depth + 1))
+                        added += 1
+
+            if self._finished():
+                self._done.set()
+
+    def fail(self, lease_id: str, error: str = "") -> None:
+        with self._lock:
+            lease = self._leases.pop(lease_id, None)
+            if lease is None:
+                return
+            print(f"[Coordinator] worker {lease.worker} failed {lease.url}: {error[:80]}")
+            self._retry(lease)
+            if self._finished():
+                self._done.set()
+
+    # ── Results ──────────────────────────────────────────────────────────────
+
+    def status(self) -> dict:
+        with self._lock:
+            return {
+                "visited":  len(self._visited),
+                "frontier": len(self._frontier),
+                "leased":   len(self._leases),
+                "failed":   len(self._failed),
+                "requeued": self._requeued,
+                "done":     self._done.is_set(),
+            }
+
+    def dom_data(self) -> CrawlResult:
+        """Merge every page received so far, exactly as DOMAnalyzer would."""
+        with self._lock:
+            if not self._pages:
+                raise RuntimeError(f"No pages could be crawled from {self.start_url}")
+            analyzer = DOMAnalyzer(
+                self.start_url,
+                max_pages   = self.max_pages,
+                max_depth   = self.max_depth,
+                same_domain = self.same_domain,
+                timeout     = self.timeout,
+            )
+            analyzer._pages   = list(self._pages)
+            analyzer._visited = set(self._visited)
+            return analyzer._merge()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._done.wait(timeout)
+
+    # ── Internals (call with self._lock held) ────────────────────────────────
+
+    def _reap(self):
+        now = time.monotonic()
+        for lease_id in [lid for lid, ls in self._leases.items() if ls.expires <= now]:
+            lease = self._leases.pop(lease_id)
+            print(f"[Coordinator] lease {lease_id[:8]} expired ({lease.worker}): {lease.url}")
+            self._retry(lease)
+
+    def _retry(self, lease: _Lease):
+        attempts = self._attempts.get(lease.url, 0) + 1
+        self._attempts[lease.url] = attempts
+        if lease.url in self._visited:
+            return
+        if attempts <= self.retries:
+            self._frontier.appendleft((lease.url, lease.depth))
+            self._requeued += 1
+        else:
+            self._failed.add(lease.url)
+            print(f"[Coordinator] giving up on {lease.url} after {attempts} attempts")
+
+    def _finished(self) -> bool:
+        if len(self._visited) >= self.max_pages:
+            return True
+        return not self._frontier and not self._leases
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# HTTP server
+# ─────────────────────────────────────────────────────────────────────────────
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/status":
+            self._reply(self.server.coordinator.status())
+        elif self.path == "/dom_data":
+            try:
+                self._reply(self.server.coordinator.dom_data())
+            except RuntimeError as exc:
+                self._reply({"error": str(exc)}, code=409)
+        else:
+            self._reply({"error": "not found"}, code=404)
+
+    def do_POST(self):
+        coord = self.server.coordinator
+        body  = self._body()
+        if self.path == "/lease":
+            self._reply(coord.lease(body.get("worker", self.client_address[0])))
+        elif self.path == "/result":
+            coord.complete(body.get("lease_id", ""), body["url"], int(body.get("depth", 0)), body["page"])
+            self._reply({"ok": True})
+        elif self.path == "/fail":
+            coord.fail(body.get("lease_id", ""), body.get("error", ""))
+            self._reply({"ok": True})
+        else:
+            self._reply({"error": "not found"}, code=404)
+
+    def _body(self) -> dict:
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _reply(self, payload, code: int = 200):
+        data = json.dumps(payload, default=json_default).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+def serve(coordinator: CrawlCoordinator, host: str = "127.0.0.1",
+          port: int = COORDINATOR_PORT) -> ThreadingHTTPServer:
+    """Start the coordinator HTTP server on a background thread and return it."""
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.coordinator    = coordinator
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"[Coordinator] listening on http://{host}:{server.server_address[1]}")
+    return server
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Worker
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _post(url: str, payload: dict, timeout: float = 30) -> dict:
+    req = Request(url, data=json.dumps(payload).encode("utf-8"),
+                  headers={"Content-Type": "application/json"})
+    with urlopen(req, timeout=timeout) as resp:
+        return json.loads(resp.read())
+
+
+def _playwright_fetch(url: str, timeout: int) -> _Page | None:
+    return DOMAnalyzer(url, timeout=timeout)._visit(url)
+
+
+def _http_fetch(url: str, timeout: int) -> _Page | None:
+    """Plain HTTP fetch (no JS) — for static sites and localhost testing."""
+    from bs4 import BeautifulSoup
+    from intelligence_layer.dom_analyser import _PageExtractor
+
+    try:
+        with urlopen(url, timeout=timeout / 1000) as resp:
+            if "html" not in resp.headers.get("Content-Type", "text/html"):
+                return None
+            html = resp.read().decode("utf-8", errors="ignore")
+    except Exception as exc:
+        print(f"[Worker] SKIP {url}  reason: {exc}")
+        return None
+    return _PageExtractor(url, BeautifulSoup(html, "lxml")).extract()
+
+
+FETCHERS = {"playwright": _playwright_fetch, "http": _http_fetch}
+
+
+def run_worker(coordinator_url: str, worker_id: str = "", fetcher: str = "playwright") -> int:
+    """Lease URLs from the coordinator until it reports done. Returns pages crawled."""
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    fetch     = FETCHERS[fetcher]
+    base      = coordinator_url.rstrip("/")
+    crawled   = 0
+    try:
+        while True:
+            try:
+                job = _post(f"{base}/lease", {"worker": worker_id})
+            except URLError:
+                print(f"[Worker {worker_id}] coordinator unreachable — stopping")
+                break
+            if job.get("done"):
+                break
+            if "wait" in job:
+                time.sleep(job["wait"])
+                continue
+
+            page = fetch(job["url"], job.get("timeout", PAGE_TIMEOUT))
+            if page is None:
+                _post(f"{base}/fail", {"lease_id": job["lease_id"], "error": "load failed"})
+                continue
+            _post(f"{base}/result", {
+                "lease_id": job["lease_id"],
+                "url":      job["url"],
+                "depth":    job["depth"],
+                "page":     page.to_dict(),
+            })
+            crawled += 1
+    finally:
+        if fetcher == "playwright":
+            from intelligence_layer import dom_analyser
+            if dom_analyser._driver_instance is not None:
+                dom_analyser._driver_instance.close()
+    print(f"[Worker {worker_id}] finished — {crawled} pages")
+    return crawled
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Single-host convenience
+# ─────────────────────────────────────────────────────────────────────────────
+
+def crawl_distributed(
+    url:     str,
+    workers: int = WORKERS,
+    fetcher: str = "playwright",
+    **limits,
+) -> CrawlResult:
+    """
+    Run a coordinator plus ``workers`` local worker processes and return the
+    merged dom_data.  ``limits`` are passed through to CrawlCoordinator.
+    """
+    coordinator = CrawlCoordinator(url, **limits)
+    server      = serve(coordinator, port=0)
+    address     = f"http://127.0.0.1:{server.server_address[1]}"
+    procs = [
+        subprocess.Popen([
+            sys.executable, __file__, "work",
+            "--coordinator", address,
+            "--worker-id",   f"local-{i}",
+            "--fetcher",     fetcher,
+        ])
+        for i in range(workers)
+    ]
+    try:
+        while not coordinator.wait(0.5):
+            if all(p.poll() is not None for p in procs):
+                print("[Coordinator] all workers exited before the crawl finished")
+                break
+        return coordinator.dom_data()
+    finally:
+        for p in procs:
+            try:
+                p.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                p.kill()
+        server.shutdown()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description="Distributed DOMAnalyzer crawl")
+    sub    = parser.add_subparsers(dest="cmd", required=True)
+
+    for name in ("serve", "local"):
+        p = sub.add_parser(name)
+        p.add_argument("--url",       required=True)
+        p.add_argument("--max_pages", type=int, default=MAX_PAGES)
+        p.add_argument("--max_depth", type=int, default=MAX_DEPTH)
+        p.add_argument("--output",    default="", help="write merged dom_data JSON here")
+    sub.choices["serve"].add_argument("--host", default="0.0.0.0")
+    sub.choices["serve"].add_argument("--port", type=int, default=COORDINATOR_PORT)
+    sub.choices["local"].add_argument("--workers", type=int, default=max(WORKERS, 2))
+    sub.choices["local"].add_argument("--fetcher", choices=list(FETCHERS), default="playwright")
+
+    w = sub.add_parser("work")
+    w.add_argument("--coordinator", required=True)
+    w.add_argument("--worker-id",   default="")
+    w.add_argument("--fetcher",     choices=list(FETCHERS), default="playwright")
+
+    args = parser.parse_args()
+
+    if args.cmd == "work":
+        run_worker(args.coordinator, args.worker_id, args.fetcher)
+        return
+
+    limits = {"max_pages": args.max_pages, "max_depth": args.max_depth}
+    if args.cmd == "local":
+        result = crawl_distributed(args.url, workers=args.workers, fetcher=args.fetcher, **limits)
+    else:
+        coordinator = CrawlCoordinator(args.url, **limits)
+        server      = serve(coordinator, host=args.host, port=args.port)
+        coordinator.wait()
+        result = coordinator.dom_data()
+        server.shutdown()
+
+    print(f"[Coordinator] {result['pages_visited']} pages merged")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(result, fh, indent=2, default=json_default)
+
+
+if __name__ == "__main__":
+    main()
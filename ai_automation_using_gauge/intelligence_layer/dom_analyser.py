@@ -16,6 +16,12 @@ Config (.env):
     CRAWLER_SAME_DOMAIN      = true
     CRAWLER_TIMEOUT          = 30000   per-page timeout ms
     CRAWLER_WAIT_UNTIL       = load    wait strategy: networkidle|load|domcontentloaded
+
+Memory: elements are held as slotted records with interned strings, and the
+merged forms/inputs/buttons/links views reference the per-page records rather
+than copying them.  DOMAnalyzer.extract() returns a read-only CrawlResult;
+plain dicts are only built on access or while json.dump(..., default=
+json_default) streams it to disk.
 """
 
 from __future__ import annotations
@@ -24,8 +30,8 @@ import os
 import sys
 import time
 from collections import deque
+from collections.abc import Mapping
 from pathlib import Path
-from typing import Any
 from urllib.parse import urljoin, urlparse
 
 from bs4 import BeautifulSoup
@@ -108,65 +114,281 @@ def _load_page(page, url: str, timeout: int) -> bool:
     return False
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# Compact page model
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _i(value):
+    """Intern strings so repeated types, hrefs and labels share one object."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class _Record:
+    """
+    Slotted element record.  Subclasses list their keys in ``_keys`` (which
+    doubles as ``__slots__``); ``source`` is the interned URL of the page the
+    element was found on.
+    """
+    __slots__ = ("source",)
+    _keys: tuple[str, ...] = ()
+
+    def __init__(self, source: str, **values):
+        self.source = source
+        for key in self._keys:
+            setattr(self, key, _i(values[key]))
+
+    def to_dict(self, with_source: bool = True) -> dict:
+        d = {key: getattr(self, key) for key in self._keys}
+        if with_source:
+            d["_source_url"] = self.source
+        return d
+
+
+class _Input(_Record):
+    _keys = ("type", "name", "id", "placeholder", "required", "aria_label")
+    __slots__ = _keys
+
+
+class _Button(_Record):
+    _keys = ("tag", "type", "text", "id", "aria_label")
+    __slots__ = _keys
+
+
+class _Link(_Record):
+    _keys = ("text", "href", "aria_label")
+    __slots__ = _keys
+
+
+class _Field:
+    __slots__ = ("tag", "type", "name", "id", "placeholder", "required")
+
+    def __init__(self, tag, type, name, id, placeholder, required):
+        self.tag         = _i(tag)
+        self.type        = _i(type)
+        self.name        = _i(name)
+        self.id          = _i(id)
+        self.placeholder = _i(placeholder)
+        self.required    = required
+
+    def to_dict(self) -> dict:
+        return {key: getattr(self, key) for key in self.__slots__}
+
+
+class _Form(_Record):
+    _keys = ("id", "action", "method", "fields")
+    __slots__ = _keys
+
+    def to_dict(self, with_source: bool = True) -> dict:
+        d = {
+            "id":     self.id,
+            "action": self.action,
+            "method": self.method,
+            "fields": [f.to_dict() for f in self.fields],
+        }
+        if with_source:
+            d["_source_url"] = self.source
+        return d
+
+
+class _Page:
+    """One crawled page; ``summary`` is rendered on demand, not stored."""
+    __slots__ = ("url", "title", "forms", "inputs", "buttons", "links", "headings")
+
+    def __init__(self, url, title, forms, inputs, buttons, links, headings):
+        self.url      = url
+        self.title    = _i(title)
+        self.forms    = forms
+        self.inputs   = inputs
+        self.buttons  = buttons
+        self.links    = links
+        self.headings = headings
+
+    @property
+    def summary(self) -> str:
+        lines = [
+            f"Page    : {self.url}",
+            f"Title   : {self.title}",
+            f"Forms={len(self.forms)} | Inputs={len(self.inputs)} | "
+            f"Buttons={len(self.buttons)} | Links={len(self.links)}",
+        ]
+        if self.headings:
+            lines.append("Headings: " + " | ".join(self.headings[:5]))
+        for f in self.forms:
+            names = [fld.name or fld.id for fld in f.fields if fld.name or fld.id]
+            lines.append(f"  Form[{f.method}] fields={names}")
+        return "\n".join(lines)
+
+    def to_dict(self) -> dict:
+        return {
+            "url":      self.url,
+            "title":    self.title,
+            "forms":    [r.to_dict(with_source=False) for r in self.forms],
+            "inputs":   [r.to_dict(with_source=False) for r in self.inputs],
+            "buttons":  [r.to_dict(with_source=False) for r in self.buttons],
+            "links":    [r.to_dict(with_source=False) for r in self.links],
+            "headings": list(self.headings),
+            "summary":  self.summary,
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "_Page":
+        """Rebuild a page from its to_dict() form (e.g. posted by a crawl worker)."""
+        url = sys.intern(d["url"])
+        forms = [
+            _Form(
+                url,
+                id     = f.get("id", ""),
+                action = f.get("action", ""),
+                method = f.get("method", "GET"),
+                fields = [
+                    _Field(
+                        tag         = fld.get("tag", "input"),
+                        type        = fld.get("type", "text"),
+                        name        = fld.get("name", ""),
+                        id          = fld.get("id", ""),
+                        placeholder = fld.get("placeholder", ""),
+                        required    = fld.get("required", False),
+                    )
+                    for fld in f.get("fields", [])
+                ],
+            )
+            for f in d.get("forms", [])
+        ]
+        return cls(
+            url      = url,
+            title    = d.get("title", ""),
+            forms    = forms,
+            inputs   = [_Input(url, **_only(_Input, r))  for r in d.get("inputs", [])],
+            buttons  = [_Button(url, **_only(_Button, r)) for r in d.get("buttons", [])],
+            links    = [_Link(url, **_only(_Link, r))    for r in d.get("links", [])],
+            headings = [_i(h) for h in d.get("headings", [])],
+        )
+
+
+def _only(record_cls: type[_Record], d: dict) -> dict:
+    return {key: d.get(key, "") for key in record_cls._keys}
+
+
+class CrawlResult(Mapping):
+    """
+    Read-only, dict-like result of DOMAnalyzer.extract().
+
+    Element views (forms/inputs/buttons/links) and ``pages`` are built as
+    fresh lists of plain dicts each time they are read, so callers that only
+    need counts should prefer ``result.count("forms")``.  Pass
+    ``default=json_default`` to json.dump to write the result without
+    materialising it in full.
+    """
+
+    _KEYS = (
+        "url", "page_title", "summary", "forms", "inputs", "buttons",
+        "links", "headings", "pages", "pages_visited", "max_depth_reached",
+        "crawl_config",
+    )
+    _VIEWS = ("forms", "inputs", "buttons", "links")
+
+    def __init__(self, meta: dict, pages: list[_Page], views: dict[str, list]):
+        self._meta  = meta
+        self._pages = pages
+        self._views = views
+
+    def __getitem__(self, key: str):
+        if key in self._views:
+            return [r.to_dict() for r in self._views[key]]
+        if key == "pages":
+            return [p.to_dict() for p in self._pages]
+        return self._meta[key]
+
+    def __iter__(self):
+        return iter(self._KEYS)
+
+    def __len__(self) -> int:
+        return len(self._KEYS)
+
+    def count(self, key: str) -> int:
+        if key == "pages":
+            return len(self._pages)
+        return len(self._views[key])
+
+    def to_dict(self) -> dict:
+        return {key: self[key] for key in self._KEYS}
+
+    def _json_obj(self) -> dict:
+        obj = {}
+        for key in self._KEYS:
+            if key in self._views:
+                obj[key] = self._views[key]
+            elif key == "pages":
+                obj[key] = self._pages
+            else:
+                obj[key] = self._meta[key]
+        return obj
+
+
+def json_default(obj):
+    """``default=`` hook for json.dump(s) that serialises a CrawlResult lazily."""
+    if isinstance(obj, CrawlResult):
+        return obj._json_obj()
+    if isinstance(obj, (_Record, _Page)):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Single-page DOM extractor
 # ─────────────────────────────────────────────────────────────────────────────
 
 class _PageExtractor:
     def __init__(self, url: str, soup: BeautifulSoup):
-        self.url  = url
+        self.url  = sys.intern(url)
         self.soup = soup
 
-    def extract(self) -> dict:
-        forms    = self._forms()
-        inputs   = self._inputs()
-        buttons  = self._buttons()
-        links    = self._links()
-        headings = self._headings()
-        title    = self.soup.title.get_text(strip=True) if self.soup.title else ""
-        return {
-            "url":      self.url,
-            "title":    title,
-            "forms":    forms,
-            "inputs":   inputs,
-            "buttons":  buttons,
-            "links":    links,
-            "headings": headings,
-            "summary":  self._summary(title, forms, inputs, buttons, links, headings),
-        }
+    def extract(self) -> _Page:
+        title = self.soup.title.get_text(strip=True) if self.soup.title else ""
+        return _Page(
+            url      = self.url,
+            title    = title,
+            forms    = self._forms(),
+            inputs   = self._inputs(),
+            buttons  = self._buttons(),
+            links    = self._links(),
+            headings = self._headings(),
+        )
 
     def _forms(self):
         forms = []
         for form in self.soup.find_all("form"):
             fields = [
-                {
-                    "tag":         f.name,
-                    "type":        f.get("type", "text"),
-                    "name":        f.get("name", ""),
-                    "id":          f.get("id", ""),
-                    "placeholder": f.get("placeholder", ""),
-                    "required":    f.has_attr("required"),
-                }
+                _Field(
+                    tag         = f.name,
+                    type        = f.get("type", "text"),
+                    name        = f.get("name", ""),
+                    id          = f.get("id", ""),
+                    placeholder = f.get("placeholder", ""),
+                    required    = f.has_attr("required"),
+                )
                 for f in form.find_all(["input", "select", "textarea"])
             ]
-            forms.append({
-                "id":     form.get("id", ""),
-                "action": form.get("action", ""),
-                "method": form.get("method", "get").upper(),
-                "fields": fields,
-            })
+            forms.append(_Form(
+                self.url,
+                id     = form.get("id", ""),
+                action = form.get("action", ""),
+                method = form.get("method", "get").upper(),
+                fields = fields,
+            ))
         return forms
 
     def _inputs(self):
         return [
-            {
-                "type":        el.get("type", "text"),
-                "name":        el.get("name", ""),
-                "id":          el.get("id", ""),
-                "placeholder": el.get("placeholder", ""),
-                "required":    el.has_attr("required"),
-                "aria_label":  el.get("aria-label", ""),
-            }
+            _Input(
+                self.url,
+                type        = el.get("type", "text"),
+                name        = el.get("name", ""),
+                id          = el.get("id", ""),
+                placeholder = el.get("placeholder", ""),
+                required    = el.has_attr("required"),
+                aria_label  = el.get("aria-label", ""),
+            )
             for el in self.soup.find_all("input")
         ]
 
@@ -174,13 +396,14 @@ class _PageExtractor:
         buttons = []
         for el in self.soup.find_all(["button", "input"]):
             if el.name == "button" or el.get("type") in ("submit", "button", "reset"):
-                buttons.append({
-                    "tag":        el.name,
-                    "type":       el.get("type", "button"),
-                    "text":       el.get_text(strip=True)[:80],
-                    "id":         el.get("id", ""),
-                    "aria_label": el.get("aria-label", ""),
-                })
+                buttons.append(_Button(
+                    self.url,
+                    tag        = el.name,
+                    type       = el.get("type", "button"),
+                    text       = el.get_text(strip=True)[:80],
+                    id         = el.get("id", ""),
+                    aria_label = el.get("aria-label", ""),
+                ))
         return buttons
 
     def _links(self):
@@ -188,11 +411,12 @@ class _PageExtractor:
         for el in self.soup.find_all("a", href=True):
             href = el["href"].strip()
             if href:
-                links.append({
-                    "text":       el.get_text(strip=True)[:60],
-                    "href":       urljoin(self.url, href),
-                    "aria_label": el.get("aria-label", ""),
-                })
+                links.append(_Link(
+                    self.url,
+                    text       = el.get_text(strip=True)[:60],
+                    href       = urljoin(self.url, href),
+                    aria_label = el.get("aria-label", ""),
+                ))
         return links
 
     def _headings(self):
@@ -201,28 +425,9 @@ class _PageExtractor:
             for el in self.soup.find_all(tag):
                 text = el.get_text(strip=True)
                 if text:
-                    headings.append(f"[{tag.upper()}] {text}")
+                    headings.append(_i(f"[{tag.upper()}] {text}"))
         return headings
 
-    def _summary(self, title, forms, inputs, buttons, links, headings) -> str:
-        lines = [
-            f"Page    : {self.url}",
-            f"Title   : {title}",
-            f"Forms={len(forms)} | Inputs={len(inputs)} | "
-            f"Buttons={len(buttons)} | Links={len(links)}",
-        ]
-        if headings:
-            lines.append("Headings: " + " | ".join(headings[:5]))
-        if forms:
-            for f in forms:
-                names = [
-                    fld["name"] or fld["id"]
-                    for fld in f["fields"]
-                    if fld["name"] or fld["id"]
-                ]
-                lines.append(f"  Form[{f['method']}] fields={names}")
-        return "\n".join(lines)
-
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Multi-page BFS crawler
@@ -255,13 +460,13 @@ class DOMAnalyzer:
         self.max_depth   = max_depth
         self.same_domain = same_domain
         self.timeout     = timeout
-        self._visited:   set[str]   = set()
-        self._pages:     list[dict] = []
+        self._visited:   set[str]    = set()
+        self._pages:     list[_Page] = []
         self._queue:     deque      = deque()
 
     # ── Public ────────────────────────────────────────────────────────────────
 
-    def extract(self) -> dict[str, Any]:
+    def extract(self) -> CrawlResult:
         print(f"\n[DOMAnalyzer] Start: {self.start_url}")
         print(f"[DOMAnalyzer] Limits -> max_pages={self.max_pages}  "
               f"max_depth={self.max_depth}  same_domain={self.same_domain}")
@@ -312,10 +517,10 @@ class DOMAnalyzer:
             if depth < self.max_depth:
                 remaining = self.max_pages - len(self._visited)
                 added     = 0
-                for link in page_data["links"]:
+                for link in page_data.links:
                     if added >= remaining:
                         break
-                    href = link.get("href", "")
+                    href = link.href
                     if not href:
                         continue
                     norm = _normalize(href)
@@ -328,7 +533,7 @@ class DOMAnalyzer:
                         self._queue.append((norm, depth + 1))
                         added += 1
 
-    def _visit(self, url: str) -> dict | None:
+    def _visit(self, url: str) -> _Page | None:
         try:
             page = _get_driver().page
 
@@ -362,35 +567,30 @@ class DOMAnalyzer:
 
     # ── Merge ─────────────────────────────────────────────────────────────────
 
-    def _merge(self) -> dict[str, Any]:
+    def _merge(self) -> CrawlResult:
         first = self._pages[0]
         all_forms, all_inputs, all_buttons = [], [], []
         all_links, all_headings = [], []
 
+        # Merged views hold references to the page records, not copies.
         for pg in self._pages:
-            src = pg["url"]
-            all_forms.extend({**f, "_source_url": src}   for f in pg["forms"])
-            all_inputs.extend({**i, "_source_url": src}  for i in pg["inputs"])
-            all_buttons.extend({**b, "_source_url": src} for b in pg["buttons"])
-            all_links.extend({**l, "_source_url": src}   for l in pg["links"])
-            all_headings.extend(pg["headings"])
+            all_forms.extend(pg.forms)
+            all_inputs.extend(pg.inputs)
+            all_buttons.extend(pg.buttons)
+            all_links.extend(pg.links)
+            all_headings.extend(pg.headings)
 
         seen, unique_links = set(), []
         for lnk in all_links:
-            if lnk["href"] not in seen:
-                seen.add(lnk["href"])
+            if lnk.href not in seen:
+                seen.add(lnk.href)
                 unique_links.append(lnk)
 
-        return {
+        meta = {
             "url":               self.start_url,
-            "page_title":        first["title"],
+            "page_title":        first.title,
             "summary":           self._combined_summary(first),
-            "forms":             all_forms,
-            "inputs":            all_inputs,
-            "buttons":           all_buttons,
-            "links":             unique_links[:100],
             "headings":          all_headings,
-            "pages":             self._pages,
             "pages_visited":     len(self._visited),
             "max_depth_reached": min(self.max_depth, len(self._visited)),
             "crawl_config": {
@@ -401,16 +601,23 @@ class DOMAnalyzer:
                 "wait_until":  WAIT_UNTIL,
             },
         }
+        views = {
+            "forms":   all_forms,
+            "inputs":  all_inputs,
+            "buttons": all_buttons,
+            "links":   unique_links[:100],
+        }
+        return CrawlResult(meta, self._pages, views)
 
-    def _combined_summary(self, first: dict) -> str:
-        t_forms   = sum(len(p["forms"])   for p in self._pages)
-        t_inputs  = sum(len(p["inputs"])  for p in self._pages)
-        t_buttons = sum(len(p["buttons"]) for p in self._pages)
-        t_links   = sum(len(p["links"])   for p in self._pages)
+    def _combined_summary(self, first: _Page) -> str:
+        t_forms   = sum(len(p.forms)   for p in self._pages)
+        t_inputs  = sum(len(p.inputs)  for p in self._pages)
+        t_buttons = sum(len(p.buttons) for p in self._pages)
+        t_links   = sum(len(p.links)   for p in self._pages)
 
         lines = [
             f"Entry URL    : {self.start_url}",
-            f"Page Title   : {first['title']}",
+            f"Page Title   : {first.title}",
             f"Pages Crawled: {len(self._pages)}  "
             f"(limit={self.max_pages}, depth_limit={self.max_depth})",
             f"Totals: Forms={t_forms}  Inputs={t_inputs}  "
@@ -420,20 +627,20 @@ class DOMAnalyzer:
         ]
         for pg in self._pages:
             lines.append(
-                f"  {pg['url']}  "
-                f"[forms={len(pg['forms'])} "
-                f"inputs={len(pg['inputs'])} "
-                f"buttons={len(pg['buttons'])}]"
+                f"  {pg.url}  "
+                f"[forms={len(pg.forms)} "
+                f"inputs={len(pg.inputs)} "
+                f"buttons={len(pg.buttons)}]"
             )
-        if first["headings"]:
+        if first.headings:
             lines += ["", "Headings (first page):"]
-            lines.extend(first["headings"][:6])
-        if first["forms"]:
+            lines.extend(first.headings[:6])
+        if first.forms:
             lines += ["", "Forms (first page):"]
-            for f in first["forms"]:
-                names = [fld["name"] or fld["id"] for fld in f["fields"]]
+            for f in first.forms:
+                names = [fld.name or fld.id for fld in f.fields]
                 lines.append(
-                    f"  id='{f['id']}' [{f['method']}] "
-                    f"action='{f['action']}' fields={names}"
+                    f"  id='{f.id}' [{f.method}] "
+                    f"action='{f.action}' fields={names}"
                 )
-        return "\n".join(lines)
\ No newline at end of file
+        return "\n".join(lines)
@@ -2,62 +2,279 @@
 RAG Engine
 Loads static knowledge from rag_data/, embeds with sentence-transformers,
 indexes with FAISS, and retrieves relevant chunks for a given query.
+Embeddings go through the repo-wide on-disk cache (rag_common), so chunks
+and queries already embedded by any earlier run are not re-encoded.
+Files are streamed through rag_common.chunker: sentence-aware chunks of at
+most RAG_CHUNK_TOKENS model tokens, so nothing is truncated by the encoder.
+
+The FAISS index and chunk list are persisted in INDEX_DIR together with a
+fingerprint (model, revision, chunker settings, and size / mtime / sha256 of every
+source file).  When the fingerprint matches, construction just reads the
+index back; the model is only loaded when something has to be encoded.
+When files change, only their chunks are re-embedded - vectors of unchanged
+files are copied out of the old index.
+
+The vector index is exact (IndexFlatIP) for small corpora and switches to
+HNSW / IVF as the corpus grows (rag_common.ann; RAG_ANN_BACKEND forces
+one).  RAG_VECTOR_COMPRESSION (sq8, pca<k>, pca<k>+sq8) stores the index
+int8-quantised and/or PCA-reduced; its candidates are then re-ranked at
+full precision against vectors.npy, which is memory-mapped so only the
+candidate rows are read.  A persisted index of the wrong kind for the
+current size or settings is rebuilt from the stored vectors, without
+re-encoding.
+
+RAG_ENCODER_BACKEND=onnx-int8 (or onnx) encodes with ONNX Runtime instead
+of PyTorch (rag_common.onnx_encoder); its vectors carry their own revision,
+so switching backends re-embeds the corpus once.  The backend is part of
+the fingerprint, so the switch is seen when the index is loaded rather than
+on the first query that loads the model.
+
+Queries are answered by BM25 + FAISS fused with reciprocal rank
+(rag_common.hybrid_search); short keyword queries are answered from BM25
+alone, so they never load or call the model.  RAG_HYBRID=0 turns it off.
 """
 
 from __future__ import annotations
 
+import hashlib
+import json
+import logging
 import os
+import sys
+import time
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional
 
 import numpy as np
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from rag_common import ann, chunker
+from rag_common.embedding_cache import EmbeddingCache, model_revision
+from rag_common.hybrid_search import BM25Index, HybridSearcher
+from rag_common.onnx_encoder import load_encoder
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+ENCODER_BACKEND = os.getenv("RAG_ENCODER_BACKEND", "torch")    # torch | onnx | onnx-int8
 RAG_DATA_DIR = Path(__file__).parent.parent / "rag_data"
-CHUNK_SIZE   = int(os.getenv("RAG_CHUNK_SIZE", 500))
+INDEX_DIR    = Path(os.getenv("RAG_INDEX_DIR", Path(__file__).parent.parent / ".rag_index"))
+CHUNK_TOKENS = int(os.getenv("RAG_CHUNK_TOKENS", 256))          # capped at the model's input limit
+CHUNK_OVERLAP_TOKENS = int(os.getenv("RAG_CHUNK_OVERLAP_TOKENS", 32))
 TOP_K        = int(os.getenv("RAG_TOP_K", 5))
+CANDIDATES   = int(os.getenv("RAG_CANDIDATES", 12))   # chunks handed to the prompt packer (testcase_generator)
+HYBRID       = os.getenv("RAG_HYBRID", "1") != "0"
+ANN_BACKEND  = os.getenv("RAG_ANN_BACKEND", "auto")    # auto | exact | hnsw | ivf
+COMPRESSION  = os.getenv("RAG_VECTOR_COMPRESSION", "none")    # none | sq8 | pca<k> | pca<k>+sq8
+
+INDEX_VERSION = 1
 
 
 class RAGEngine:
     def __init__(self):
-        self._model  = None
-        self._index  = None
+        self._model    = None
+        self._cache    = None
+        self._revision = ""
+        self._index    = None
+        self._vectors  = None     # full-precision rows for re-ranking a compressed index
+        self._hybrid   = None
         self._chunks: List[str] = []
-        self._build_index()
+        self._files: Dict[str, dict] = {}
+        self._load_or_build()
 
     def query(self, query: str, top_k: int = TOP_K) -> str:
         if not self._chunks:
             return ""
-        q_emb = self._encode([query])
-        distances, indices = self._index.search(q_emb, min(top_k, len(self._chunks)))
-        retrieved = [self._chunks[i] for i in indices[0] if i < len(self._chunks)]
+        if HYBRID:
+            if self._hybrid is None:
+                self._hybrid = HybridSearcher(BM25Index(self._chunks), self._dense_search)
+            retrieved = [self._chunks[h.row] for h in self._hybrid.search(query, top_k)]
+        else:
+            retrieved = [self._chunks[i] for i, _ in self._dense_search([query], top_k)[0]]
         return "\n\n---\n\n".join(retrieved)
 
-    def _load_docs(self) -> List[str]:
-        chunks = []
-        for txt_file in RAG_DATA_DIR.glob("*.txt"):
-            content = txt_file.read_text(encoding="utf-8", errors="ignore")
-            for i in range(0, len(content), CHUNK_SIZE - 50):
-                chunk = content[i : i + CHUNK_SIZE].strip()
-                if len(chunk) > 100:
-                    chunks.append(chunk)
-        return chunks
+    def _dense_search(self, queries: List[str], n: int):
+        q = self._encode(queries)       # first: loading the model may rebuild the index
+        scores, indices = ann.search(self._index, q, n, self._vectors)
+        return [[(int(i), float(s)) for i, s in zip(row_i, row_s) if 0 <= i < len(self._chunks)]
+                for row_i, row_s in zip(indices, scores)]
+
+    # ── Chunking / encoding ──────────────────────────────────────────────────
+
+    @staticmethod
+    def _chunk_file(path: Path, counter: chunker.TokenCounter = chunker.ESTIMATE) -> List[str]:
+        return [c.text for c in chunker.chunk_file(path, CHUNK_TOKENS, CHUNK_OVERLAP_TOKENS, counter, errors="ignore")]
 
     def _encode(self, texts: List[str]) -> np.ndarray:
-        embeddings = self._model.encode(texts, convert_to_numpy=True)
+        embeddings = self._get_cache().encode(
+            texts, lambda batch: self._get_model().encode(batch, convert_to_numpy=True)
+        )
         norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
         return (embeddings / np.maximum(norms, 1e-10)).astype("float32")
 
-    def _build_index(self):
+    def _get_model(self):
+        if self._model is None:
+            self._model = load_encoder(EMBEDDING_MODEL, ENCODER_BACKEND)
+            revision    = model_revision(self._model)
+            if self._revision and revision != self._revision:
+                logger.warning("RAGEngine: embedding model changed since the index was built — rebuilding")
+                self._revision = revision
+                if self._cache is not None:         # an encode may be in flight on this cache
+                    self._cache.revision = revision
+                self._build(self._scan(), previous=None)
+            self._revision = revision
+        return self._model
+
+    def _get_cache(self) -> EmbeddingCache:
+        if self._cache is None:
+            if not self._revision:
+                self._get_model()
+            self._cache = EmbeddingCache(EMBEDDING_MODEL, self._revision)
+        return self._cache
+
+    # ── Persisted index ──────────────────────────────────────────────────────
+
+    def _settings(self) -> dict:
+        return {"version": INDEX_VERSION, "model": EMBEDDING_MODEL, "encoder": ENCODER_BACKEND,
+                "chunker": chunker.CHUNKER_VERSION,
+                "chunk_tokens": CHUNK_TOKENS, "chunk_overlap_tokens": CHUNK_OVERLAP_TOKENS}
+
+    def _scan(self, previous: Optional[dict] = None) -> Dict[str, dict]:
+        """{file name: size, mtime_ns, sha256}; sha256 reused when the stat is unchanged."""
+        known = (previous or {}).get("files", {})
+        files = {}
+        for txt_file in sorted(RAG_DATA_DIR.glob("*.txt")):
+            st   = txt_file.stat()
+            info = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+            old  = known.get(txt_file.name)
+            if old and old["size"] == info["size"] and old["mtime_ns"] == info["mtime_ns"]:
+                info["sha256"] = old["sha256"]
+            else:
+                info["sha256"] = hashlib.sha256(txt_file.read_bytes()).hexdigest()
+            files[txt_file.name] = info
+        return files
+
+    def _load_or_build(self):
+        start    = time.perf_counter()
+        previous = self._read_meta()
+        if previous and previous.get("settings") != self._settings():
+            previous = None
+        current = self._scan(previous)
+
+        if previous and {n: f["sha256"] for n, f in previous["files"].items()} == \
+                        {n: f["sha256"] for n, f in current.items()}:
+            index   = self._read_index(previous)
+            vectors = self._read_vectors(index)
+            if index is not None and (not ann.matches(index, ANN_BACKEND, COMPRESSION)
+                                      or (ann.is_compressed(index) and vectors is None)):
+                logger.info(f"RAGEngine: persisted {ann.describe(index)} index does not suit "
+                            f"{index.ntotal} chunks / current settings — rebuilding it")
+            elif index is not None or not previous["chunks"]:
+                self._index    = index
+                self._vectors  = vectors
+                self._chunks   = previous["chunks"]
+                self._files    = previous["files"]
+                self._revision = previous.get("revision", "")
+                if any(previous["files"][n]["mtime_ns"] != f["mtime_ns"] for n, f in current.items()):
+                    self._files = {n: {**previous["files"][n], **f} for n, f in current.items()}
+                    self._write(index=None)         # refresh the stored mtimes only
+                logger.info(f"RAGEngine: loaded {len(self._chunks)} chunks from {INDEX_DIR} "
+                            f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+                return
+
+        self._build(current, previous)
+        logger.info(f"RAGEngine: index built in {time.perf_counter() - start:.2f} s")
+
+    def _build(self, current: Dict[str, dict], previous: Optional[dict]):
+        self._get_model()
+        if previous and previous.get("revision") != self._revision:
+            previous = None
+        old_index = self._read_index(previous) if previous else None
+        old_vecs  = self._read_vectors(old_index)
+        if old_index is not None and old_vecs is None and ann.is_compressed(old_index):
+            old_index = None                        # its own vectors are lossy: re-encode
+        old_files = previous["files"] if old_index is not None else {}
+
+        chunks:  List[str] = []
+        vectors: List[np.ndarray] = []
+        files:   Dict[str, dict] = {}
+        embedded = []
+        for name, info in current.items():
+            old = old_files.get(name)
+            if old and old["sha256"] == info["sha256"]:
+                lo, hi      = old["rows"]
+                file_chunks = previous["chunks"][lo:hi]
+                vecs        = old_vecs[lo:hi] if old_vecs is not None else ann.reconstruct(old_index, lo, hi - lo)
+            else:
+                file_chunks = self._chunk_file(RAG_DATA_DIR / name, chunker.token_counter(self._model))
+                vecs        = self._encode(file_chunks) if file_chunks else None
+                embedded.append(name)
+            files[name] = {**info, "rows": [len(chunks), len(chunks) + len(file_chunks)]}
+            chunks.extend(file_chunks)
+            if vecs is not None:
+                vectors.append(vecs)
+
+        index = matrix = None
+        if chunks:
+            matrix = np.ascontiguousarray(np.concatenate(vectors), dtype="float32")
+            index  = ann.build_index(matrix, ANN_BACKEND, COMPRESSION)
+
+        self._index, self._chunks, self._files = index, chunks, files
+        self._vectors = matrix if index is not None and ann.is_compressed(index) else None
+        self._hybrid = None
+        self._write(index)
+        logger.info(f"RAGEngine: re-embedded {len(embedded)} of {len(current)} file(s), "
+                    f"{len(chunks)} chunks, {ann.describe(index) if index else 'no'} index  |  {self._get_cache().summary()}")
+
+    def _read_meta(self) -> Optional[dict]:
+        try:
+            return json.loads((INDEX_DIR / "chunks.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def _read_index(self, meta: Optional[dict]):
+        if not meta or not meta.get("chunks"):
+            return None
         import faiss
-        from sentence_transformers import SentenceTransformer
 
-        self._model  = SentenceTransformer("all-MiniLM-L6-v2")
-        self._chunks = self._load_docs()
+        try:
+            index = faiss.read_index(str(INDEX_DIR / "index.faiss"))
+        except RuntimeError as exc:
+            logger.warning(f"RAGEngine: could not read persisted index: {exc}")
+            return None
+        return ann.tune(index) if index.ntotal == len(meta["chunks"]) else None
 
-        if not self._chunks:
-            return
+    def _read_vectors(self, index) -> Optional[np.ndarray]:
+        """vectors.npy (memory-mapped) if it matches index, else None."""
+        if index is None:
+            return None
+        try:
+            vectors = np.load(INDEX_DIR / "vectors.npy", mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+        return vectors if vectors.shape == (index.ntotal, index.d) else None
+
+    def _write(self, index=None):
+        """Write vectors.npy + index.faiss (if given) then chunks.json (the fingerprint), each via rename."""
+        INDEX_DIR.mkdir(parents=True, exist_ok=True)
+        if index is not None:
+            import faiss
 
-        embeddings   = self._encode(self._chunks)
-        dim          = embeddings.shape[1]
-        self._index  = faiss.IndexFlatIP(dim)
-        self._index.add(embeddings)
\ No newline at end of file
+            if self._vectors is not None:
+                tmp = INDEX_DIR / "vectors.tmp.npy"
+                np.save(tmp, self._vectors)
+                os.replace(tmp, INDEX_DIR / "vectors.npy")
+            elif (INDEX_DIR / "vectors.npy").exists():
+                (INDEX_DIR / "vectors.npy").unlink()
+            tmp = INDEX_DIR / "index.faiss.tmp"
+            faiss.write_index(index, str(tmp))
+            os.replace(tmp, INDEX_DIR / "index.faiss")
+        meta = {
+            "settings": self._settings(),
+            "revision": self._revision,
+            "files":    self._files,
+            "chunks":   self._chunks,
+        }
+        tmp = INDEX_DIR / "chunks.json.tmp"
+        tmp.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp, INDEX_DIR / "chunks.json")
@@ -2,6 +2,12 @@
 testcase_generator.py
 =====================
 Sends DOM summary + RAG context to Groq LLaMA and parses structured test cases.
+
+The forms, buttons and RAG chunks are packed to prompt-token budgets
+(rag_common.context_packer) rather than cut at a character count: forms
+and buttons repeated across crawled pages count once, near-duplicate
+chunks are dropped and the rest go in maximal-marginal-relevance order,
+and budget one section leaves unused carries over to the next.
 """
 
 from __future__ import annotations
@@ -9,10 +15,20 @@ from __future__ import annotations
 import json
 import os
 import re
+import sys
+from pathlib import Path
 from typing import Any
 
 from groq import Groq
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from rag_common.context_packer import Section, mmr_select, pack, prompt_counter
+
+FORMS_TOKENS   = int(os.getenv("TESTGEN_FORMS_TOKENS", 500))
+BUTTONS_TOKENS = int(os.getenv("TESTGEN_BUTTONS_TOKENS", 250))
+RAG_TOKENS     = int(os.getenv("TESTGEN_RAG_TOKENS", 600))
+RAG_SEPARATOR  = "\n\n---\n\n"          # between chunks in RAGEngine.query() output
+
 _client = None
 
 
@@ -165,26 +181,32 @@ class TestCaseGenerator:
         return self._parse_response(raw)
 
     def _build_prompt(self, dom_data: dict, rag_context: str) -> str:
-        forms_json   = json.dumps(dom_data.get("forms",   []), indent=2)[:2000]
-        buttons_json = json.dumps(dom_data.get("buttons", []), indent=2)[:1000]
+        packed = pack([
+            Section("forms",   _distinct_json(dom_data.get("forms",   [])), FORMS_TOKENS),
+            Section("buttons", _distinct_json(dom_data.get("buttons", [])), BUTTONS_TOKENS),
+            Section("rag",     _distinct([c for c in rag_context.split(RAG_SEPARATOR) if c.strip()]),
+                    RAG_TOKENS, RAG_SEPARATOR, cut=True),
+        ])
 
         parts = [
             "## DOM Analysis",
             dom_data.get("summary", ""),
             "",
             "## Forms Detail",
-            forms_json,
+            packed.texts["forms"],
             "",
             "## Buttons",
-            buttons_json,
+            packed.texts["buttons"],
             "",
             "## Relevant Testing Patterns (RAG Context)",
-            rag_context[:3000],
+            packed.texts["rag"],
             "",
             "## Task",
             "Generate exploratory test cases for this web application.",
         ]
-        return "\n".join(parts)
+        prompt = "\n".join(parts)
+        print(f"[TestCaseGenerator] Prompt: {prompt_counter()(prompt)} tokens — {packed.summary()}")
+        return prompt
 
     def _parse_response(self, raw: str) -> list[dict]:
         # Strip markdown code fences if present
@@ -220,4 +242,14 @@ class TestCaseGenerator:
         except json.JSONDecodeError as exc:
             print(f"[TestCaseGenerator] JSON parse error: {exc}")
             print("[TestCaseGenerator] Attempted to parse:", clean[start:end+1][:300])
-            return []
\ No newline at end of file
+            return []
+
+
+def _distinct(texts: list[str]) -> list[str]:
+    """Chunks in MMR order, near-duplicates dropped."""
+    return [texts[i] for i in mmr_select(texts)]
+
+
+def _distinct_json(elements: list[dict]) -> list[str]:
+    """One compact JSON line per element; the same element crawled on several pages counts once."""
+    return list(dict.fromkeys(json.dumps({k: v for k, v in el.items() if k != "_source_url"}) for el in elements))
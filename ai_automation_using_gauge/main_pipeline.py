@@ -25,6 +25,7 @@ Usage:
     python main_pipeline.py --url https://example.com --skip_gauge
     python main_pipeline.py --replay --report_id 20240101_120000_abc12345
     python main_pipeline.py --url https://example.com --debug
+    python main_pipeline.py --url https://example.com --crawl_workers 4
 """
 
 from __future__ import annotations
@@ -210,16 +211,21 @@ class Pipeline:
     # ── Steps ─────────────────────────────────────────────────────────────────
 
     def _step_dom_analysis(self):
-        n = self.log.begin("DOM Analysis  (Playwright)")
+        workers = int(os.getenv("CRAWLER_WORKERS", 1))
+        n = self.log.begin(f"DOM Analysis  (Playwright, {workers} worker(s))")
         try:
-            from intelligence_layer.dom_analyser import DOMAnalyzer
-            analyzer      = DOMAnalyzer(self.url)
-            self.dom_data = analyzer.extract()
+            if workers > 1:
+                from intelligence_layer.crawl_coordinator import crawl_distributed
+                self.dom_data = crawl_distributed(self.url, workers=workers)
+            else:
+                from intelligence_layer.dom_analyser import DOMAnalyzer
+                analyzer      = DOMAnalyzer(self.url)
+                self.dom_data = analyzer.extract()
             self.log.info(f"Page title : {self.dom_data.get('page_title', 'N/A')}")
-            self.log.info(f"Forms      : {len(self.dom_data.get('forms', []))}")
-            self.log.info(f"Inputs     : {len(self.dom_data.get('inputs', []))}")
-            self.log.info(f"Buttons    : {len(self.dom_data.get('buttons', []))}")
-            self.log.info(f"Links      : {len(self.dom_data.get('links', []))}")
+            self.log.info(f"Forms      : {self.dom_data.count('forms')}")
+            self.log.info(f"Inputs     : {self.dom_data.count('inputs')}")
+            self.log.info(f"Buttons    : {self.dom_data.count('buttons')}")
+            self.log.info(f"Links      : {self.dom_data.count('links')}")
             self.log.ok(n)
         except Exception as exc:
             self.log.fail(n, exc)
@@ -228,9 +234,9 @@ class Pipeline:
     def _step_rag_enrichment(self):
         n = self.log.begin("RAG Enrichment  (FAISS + sentence-transformers)")
         try:
-            from intelligence_layer.rag_engine import RAGEngine
+            from intelligence_layer.rag_engine import CANDIDATES, RAGEngine
             rag               = RAGEngine()
-            self._rag_context = rag.query(self.dom_data.get("summary", ""))
+            self._rag_context = rag.query(self.dom_data.get("summary", ""), top_k=CANDIDATES)
             preview = self._rag_context[:120].replace("\n", " ")
             self.log.info(f"Context preview: {preview}…")
             self.log.ok(n)
@@ -267,7 +273,11 @@ class Pipeline:
                 "dom_data":   self.dom_data,
                 "test_cases": self.test_cases,
             }
-            self.json_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+            # json_default streams the CrawlResult page by page instead of
+            # materialising the whole dom_data as dicts first.
+            from intelligence_layer.dom_analyser import json_default
+            with self.json_path.open("w", encoding="utf-8") as fh:
+                json.dump(payload, fh, indent=2, default=json_default)
             self.log.info(f"Saved -> {self.json_path}")
             self.log.ok(n)
         except Exception as exc:
@@ -540,10 +550,14 @@ def main():
                         help="Skip DOM + AI; reload existing JSON by --report_id")
     parser.add_argument("--debug",     action="store_true",
                         help="Print full tracebacks on errors")
+    parser.add_argument("--crawl_workers", type=int, default=0,
+                        help="Crawl with N browser worker processes (overrides CRAWLER_WORKERS)")
     args = parser.parse_args()
 
     if args.debug:
         os.environ["PIPELINE_DEBUG"] = "true"
+    if args.crawl_workers:
+        os.environ["CRAWLER_WORKERS"] = str(args.crawl_workers)
 
     if args.replay and not args.report_id:
         parser.error("--replay requires --report_id")
@@ -37,7 +37,7 @@ def create_app():
 
         try:
             # 1. DOM Analysis
-            from intelligence_layer.dom_analyzer import DOMAnalyzer
+            from intelligence_layer.dom_analyser import DOMAnalyzer, json_default
             analyzer = DOMAnalyzer(target_url)
             dom_data = analyzer.extract()
 
@@ -54,13 +54,14 @@ def create_app():
             # 4. Persist to JSON store
             store_path = BASE_DIR / "intelligence_layer" / "json_store" / f"{report_id}.json"
             store_path.parent.mkdir(exist_ok=True)
-            store_path.write_text(json.dumps({
-                "report_id": report_id,
-                "url": target_url,
-                "timestamp": timestamp,
-                "dom_data": dom_data,
-                "test_cases": test_cases,
-            }, indent=2))
+            with store_path.open("w") as fh:
+                json.dump({
+                    "report_id": report_id,
+                    "url": target_url,
+                    "timestamp": timestamp,
+                    "dom_data": dom_data,
+                    "test_cases": test_cases,
+                }, fh, indent=2, default=json_default)
 
             # 5. Gauge Execution
             from execution_layer.gauge_runner import GaugeRunner
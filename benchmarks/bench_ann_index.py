@@ -0,0 +1,116 @@
+"""
+benchmarks/bench_ann_index.py
+=============================
+Exact vs HNSW vs IVF search through rag_common.ann at growing corpus sizes.
+
+Vectors are synthetic but clustered like real chunk embeddings: --dim-
+dimensional Gaussian blobs around --topics random centres, L2-normalised.
+Queries are drawn from the same distribution.  Ground truth is exact
+inner-product top-10.
+
+Reported per size and backend:
+  build_s        index construction (IVF includes k-means training)
+  ms_per_query   single-query search latency (how the retrievers call it)
+  recall@10      |ANN top-10 ∩ exact top-10| / 10, averaged over queries
+  auto           the backend choose_backend() picks for that size
+
+HNSW is skipped above --hnsw-max vectors unless raised (its build at 1M on
+one core takes many minutes; auto never picks it there).
+
+Usage:
+    python benchmarks/bench_ann_index.py
+    python benchmarks/bench_ann_index.py --sizes 10000 100000 --queries 500
+    python benchmarks/bench_ann_index.py --sweep        # efSearch / nprobe curves
+"""
+
+import argparse
+import gc
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from rag_common import ann  # noqa: E402
+
+
+def _vectors(n, dim, centres, rng, spread=1.0):
+    out = np.empty((n, dim), dtype=np.float32)
+    for lo in range(0, n, 100_000):
+        hi = min(n, lo + 100_000)
+        block = centres[rng.integers(0, len(centres), hi - lo)]
+        block += rng.standard_normal((hi - lo, dim), dtype=np.float32) * spread
+        block /= np.linalg.norm(block, axis=1, keepdims=True)
+        out[lo:hi] = block
+    return out
+
+
+def _search_each(index, queries, k):
+    found = np.empty((len(queries), k), dtype=np.int64)
+    t0 = time.perf_counter()
+    for i in range(len(queries)):
+        _, found[i] = index.search(queries[i:i + 1], k)
+    return found, (time.perf_counter() - t0) * 1000 / len(queries)
+
+
+def _recall(found, truth):
+    return float(np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--topics", type=int, default=256, help="cluster centres")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--hnsw-max", type=int, default=200_000)
+    parser.add_argument("--sweep", action="store_true", help="also report recall/latency per efSearch / nprobe")
+    args = parser.parse_args()
+
+    import faiss
+    faiss.omp_set_num_threads(1)
+    report = {"dim": args.dim, "queries": args.queries, "k": 10}
+    for n in args.sizes:
+        rng     = np.random.default_rng(n)
+        centres = rng.standard_normal((args.topics, args.dim), dtype=np.float32)
+        data    = _vectors(n, args.dim, centres, rng)
+        queries = _vectors(args.queries, args.dim, centres, rng)
+        row = {"auto": ann.choose_backend(n)}
+
+        for backend in ("exact", "hnsw", "ivf"):
+            if backend == "hnsw" and n > args.hnsw_max:
+                row[backend] = "skipped (--hnsw-max)"
+                continue
+            t0 = time.perf_counter()
+            index = ann.build_index(data, backend)
+            build = time.perf_counter() - t0
+            found, ms = _search_each(index, queries, 10)
+            if backend == "exact":
+                truth = found
+            row[backend] = {"index": ann.describe(index), "build_s": round(build, 2),
+                            "ms_per_query": round(ms, 3), "recall@10": round(_recall(found, truth), 4)}
+            if args.sweep and backend != "exact":
+                curve = {}
+                for knob in ((16, 32, 64, 128, 256) if backend == "hnsw" else (4, 8, 16, 32, 64, 128)):
+                    if backend == "hnsw":
+                        index.hnsw.efSearch = knob
+                    else:
+                        index.nprobe = min(knob, index.nlist)
+                    f, m = _search_each(index, queries, 10)
+                    curve[knob] = {"ms_per_query": round(m, 3), "recall@10": round(_recall(f, truth), 4)}
+                row[backend]["efSearch" if backend == "hnsw" else "nprobe"] = curve
+            del index
+            gc.collect()
+        report[n] = row
+        print(json.dumps({n: row}), file=sys.stderr, flush=True)
+        del data
+        gc.collect()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
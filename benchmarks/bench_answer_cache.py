@@ -0,0 +1,197 @@
+"""
+benchmarks/bench_answer_cache.py
+================================
+Hit rate and latency saved by the rag_meeting_minutes semantic answer cache
+(answer_cache.py) on a stream of paraphrased questions.
+
+INTENTS holds a few phrasings of each question.  The stream is --asks
+questions drawn with Zipf weights over the intents (a few questions are
+asked far more often than the rest), a random phrasing each time, half of
+them retyped (lower case, no question mark).  It is answered through
+query.ask() once without the cache (ANSWER_CACHE off) and once with it.
+A hit is correct when the cached question belongs to the same intent.
+
+The index is built by ingest.py over --meetings generated transcripts (see
+bench_meeting_ingest.py); Ollama is the stand-in in fixture_ollama.py, so
+question vectors are gauge_rag2 HashingEmbedder vectors - lexical, much
+weaker at paraphrase than nomic-embed-text.  "sweep" replays the stream on
+the vectors alone at other thresholds to show the hit / false-hit trade-off.
+
+Invalidation: a transcript is then added and ingest.py run again; the
+first phrasing of every intent is asked (it was cached, but the index
+changed, so it must miss), then asked again and must hit.
+
+Usage:
+    python benchmarks/bench_answer_cache.py
+    python benchmarks/bench_answer_cache.py --threshold 0.8 --token-ms 50
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT    = Path(__file__).resolve().parent.parent
+PROJECT = ROOT / "RAG_PROJECTS" / "rag_meeting_minutes"
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(PROJECT))
+
+from bench_meeting_ingest import _write_archive  # noqa: E402
+from fixture_ollama import add_ollama_args, from_args  # noqa: E402
+
+INTENTS = [
+    ["What were the action items?", "List the action items", "Which action items came out of the meeting?"],
+    ["When is the final submission deadline?", "What is the deadline for the final submission?",
+     "By when is the final submission due?"],
+    ["When is the code freeze planned?", "When is the code freeze?", "What date is the code freeze?"],
+    ["What did Shilpa say about the backend?", "What was Shilpa's backend update?",
+     "Give me Shilpa's update on the backend"],
+    ["When will Sayon deliver the UI prototype?", "When is the UI prototype from Sayon due?",
+     "Sayon's UI prototype - when will it be ready?"],
+    ["Which tool is used for deployment?", "What is used for deployment?", "What deployment tool does the team use?"],
+    ["Are there any blockers?", "Were any blockers mentioned?", "Is anything blocking the team?"],
+    ["How often are progress reviews held?", "How frequently will progress be reviewed?",
+     "Are progress reviews weekly?"],
+    ["What is Irfana working on?", "What is Irfana currently doing?", "What was Irfana's QA update?"],
+    ["When will automated test cases be written?", "When does writing automated tests start?",
+     "When are the automated test cases planned?"],
+    ["Who began the stand-up?", "Who started the stand-up?", "Who opened the meeting?"],
+    ["Who gave the DevOps update?", "Who is responsible for DevOps?", "Who reported the DevOps status?"],
+]
+
+
+def _p50(values):
+    return round(float(np.median(values)), 1) if values else None
+
+
+def _stream(n, seed=0):
+    rnd = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(INTENTS))]
+    out = []
+    for intent in rnd.choices(range(len(INTENTS)), weights, k=n):
+        question = rnd.choice(INTENTS[intent])
+        if rnd.random() < 0.5:
+            question = question.lower().rstrip("?")
+        out.append((intent, question))
+    return out
+
+
+def _run(query, stream, intent_of):
+    """Ask every question; per question: (latency ms, hit, hit is correct)."""
+    lookup, results, last = query.answer_cache.lookup, [], {}
+
+    def recording(question, vector, version, scope=""):
+        last["hit"] = hit = lookup(question, vector, version, scope)
+        return hit
+
+    query.answer_cache.lookup = recording
+    try:
+        for intent, question in stream:
+            last.clear()
+            t0 = time.perf_counter()
+            query.ask(question)
+            hit = last.get("hit")
+            results.append((1000 * (time.perf_counter() - t0), bool(hit),
+                            bool(hit) and intent_of.get(hit["cached_question"]) == intent))
+    finally:
+        query.answer_cache.lookup = lookup
+    return results
+
+
+def _sweep(vectors, intents, thresholds):
+    """Replay the stream on question vectors alone: misses are stored, hits are not."""
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    out = {}
+    for t in thresholds:
+        stored, hits, false_hits = [], 0, 0
+        for v, intent in zip(unit, intents):
+            if stored:
+                sims = np.array([v @ s for s, _ in stored])
+                best = int(np.argmax(sims))
+                if sims[best] >= t:
+                    hits += 1
+                    false_hits += stored[best][1] != intent
+                    continue
+            stored.append((v, intent))
+        out[str(t)] = {"hit_rate": round(hits / len(intents), 3), "false_hits": false_hits}
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--meetings", type=int, default=20)
+    parser.add_argument("--asks", type=int, default=100, help="questions in the stream")
+    parser.add_argument("--threshold", type=float, default=None, help="default: ANSWER_CACHE_THRESHOLD")
+    parser.add_argument("--dir", default=os.path.join("/tmp", "bench_answer_cache"))
+    add_ollama_args(parser)
+    args = parser.parse_args()
+
+    fake = from_args(args)
+    base = Path(args.dir)
+    shutil.rmtree(base, ignore_errors=True)
+    os.environ.update({"OLLAMA_BASE_URL": fake.url, "DATA_DIR": str(base / "meetings"),
+                       "VECTOR_DB_DIR": str(base / "faiss_index"),
+                       "ANSWER_CACHE": str(base / "answers.sqlite3")})
+    if args.threshold is not None:
+        os.environ["ANSWER_CACHE_THRESHOLD"] = str(args.threshold)
+    import ingest                                         # these read the environment at import
+    import query
+    from answer_cache import AnswerCache
+
+    _write_archive(base / "meetings", args.meetings)
+    with contextlib.redirect_stdout(io.StringIO()):
+        ingest.ingest(rebuild=True)
+    query.current_index()
+
+    stream = _stream(args.asks)
+    intent_of = {q: i for i, q in stream}
+    distinct = len(intent_of)
+    intent_of.update((phrasings[0], i) for i, phrasings in enumerate(INTENTS))
+    cache = query.answer_cache
+
+    query.answer_cache = AnswerCache(query.VECTOR_DB_DIR, {}, path="off")
+    uncached = _run(query, stream, intent_of)
+    query.answer_cache = cache
+    cached = _run(query, stream, intent_of)
+
+    hits = [r for r in cached if r[1]]
+    report = {
+        "questions": len(stream), "distinct": distinct, "intents": len(INTENTS),
+        "threshold": cache.threshold,
+        "uncached_s": round(sum(r[0] for r in uncached) / 1000, 2),
+        "cached_s": round(sum(r[0] for r in cached) / 1000, 2),
+        "hit_rate": round(len(hits) / len(cached), 3),
+        "correct_hits": sum(r[2] for r in hits), "false_hits": sum(not r[2] for r in hits),
+        "p50_ms": {"uncached": _p50([r[0] for r in uncached]), "hit": _p50([r[0] for r in hits]),
+                   "miss": _p50([r[0] for r in cached if not r[1]])},
+        "cache_stats": cache.stats(),
+    }
+
+    vectors = np.array([query.embeddings.embed_query(q) for _, q in stream], dtype=np.float32)
+    report["sweep"] = _sweep(vectors, [i for i, _ in stream], [0.6, 0.7, 0.8, 0.85, 0.9, 0.92, 0.95])
+
+    (base / "meetings" / "retro.txt").write_text("The retrospective is on Friday; the action item is to "
+                                                 "update the release checklist.\n", encoding="utf-8")
+    with contextlib.redirect_stdout(io.StringIO()):
+        ingest.ingest()
+    first_round = [(i, phrasings[0]) for i, phrasings in enumerate(INTENTS)]
+    after = _run(query, first_round, intent_of)
+    again = _run(query, first_round, intent_of)
+    report["after_ingest"] = {"hits": sum(r[1] for r in after), "asked_again_hits": sum(r[1] for r in again),
+                              "of": len(first_round)}
+
+    fake.shutdown()
+    shutil.rmtree(base, ignore_errors=True)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+benchmarks/bench_chunker.py
+===========================
+Throughput, peak memory and chunk quality of the previous chunkers against
+rag_common.chunker on a multi-hundred-MB corpus.
+
+The corpus is generated once into --dir: sentences and markdown blocks taken
+from the repo's knowledge bases, shuffled into one --big-mb file plus 1 MB
+files up to --mb in total.
+
+Chunkers (each run in its own process, so peak RSS is its own):
+  old_words   gauge_rag3 embedder before: whole file read, split into words,
+              500-word windows, 50 words overlap
+  old_chars   RAGEngine before: whole file read, 500-char windows every 450
+  streaming   rag_common.chunker.chunk_file, 256 tokens / 32 overlap,
+              capped at the model limit as the pipelines do
+  streaming_64k   the same with 64 KiB read blocks (must give identical chunks)
+
+Reported per chunker:
+  mb_per_s      corpus MB / wall seconds (read + chunk, no embedding)
+  peak_rss_mb   ru_maxrss of the process
+  chunks, mean_tokens
+  over_limit    share of chunks longer than 254 tokens (what MiniLM keeps;
+                the rest is silently truncated when embedded)
+  digest        sha256 over all chunk texts (determinism check)
+
+Token counts use the chunker's offline estimate (no HF tokenizer needed).
+
+Usage:
+    python benchmarks/bench_chunker.py
+    python benchmarks/bench_chunker.py --mb 50 --big-mb 20
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from rag_common import chunker  # noqa: E402
+
+MODEL_LIMIT = 254
+CHUNKERS    = ("old_words", "old_chars", "streaming", "streaming_64k")
+COUNTER     = chunker.TokenCounter(chunker.estimate_tokens, "estimate", MODEL_LIMIT)
+
+
+def _corpus(directory: Path, mb: int, big_mb: int):
+    """Generate (or reuse) the corpus; returns its files."""
+    marker = directory / f".corpus_{mb}_{big_mb}"
+    if marker.exists():
+        return sorted(directory.glob("*.md"))
+    directory.mkdir(parents=True, exist_ok=True)
+    for old in directory.glob("*.md"):
+        old.unlink()
+    blocks = []
+    for src in sorted(ROOT.glob("Gauge/gauge_rag3/knowledge_base/*/*.txt")) + \
+               sorted(ROOT.glob("ai_automation_using_gauge/rag_data/*.txt")) + \
+               sorted(ROOT.glob("RAG_PROJECTS/rag_meeting_minutes/data/*.txt")):
+        blocks += [b.strip() + "\n\n" for b in src.read_text(encoding="utf-8").split("\n\n") if b.strip()]
+    rnd   = random.Random(0)
+    sizes = [big_mb] + [1] * max(0, mb - big_mb)
+    for i, size in enumerate(sizes):
+        with open(directory / f"doc_{i:04d}.md", "w", encoding="utf-8") as f:
+            written = 0
+            while written < size << 20:
+                text = "".join(rnd.choice(blocks) for _ in range(200))
+                f.write(text)
+                written += len(text)
+    marker.touch()
+    return sorted(directory.glob("*.md"))
+
+
+def _old_words(path):
+    words = path.read_bytes().decode("utf-8").split()
+    if len(words) <= 500:
+        return [" ".join(words)]
+    return [" ".join(words[i:i + 500]) for i in range(0, len(words), 450) if words[i:i + 500]]
+
+
+def _old_chars(path):
+    content = path.read_text(encoding="utf-8", errors="ignore")
+    chunks = []
+    for i in range(0, len(content), 450):
+        chunk = content[i:i + 500].strip()
+        if len(chunk) > 100:
+            chunks.append(chunk)
+    return chunks
+
+
+def _streaming(path):
+    return (c.text for c in chunker.chunk_file(path, 256, 32, COUNTER))
+
+
+def _child(name, files):
+    """Run one chunker over the corpus in this process and print its stats."""
+    if name == "streaming_64k":
+        chunker.BLOCK_CHARS = 1 << 16
+    fn = {"old_words": _old_words, "old_chars": _old_chars}.get(name, _streaming)
+    digest, count, sample = hashlib.sha256(), 0, []
+    t0 = time.perf_counter()
+    for path in files:
+        for text in fn(path):
+            digest.update(text.encode("utf-8"))
+            digest.update(b"\0")
+            if count % 50 == 0:
+                sample.append(text)
+            count += 1
+    elapsed = time.perf_counter() - t0
+    peak    = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    tokens  = chunker.estimate_tokens(sample)
+    size    = sum(p.stat().st_size for p in files) / (1 << 20)
+    print(json.dumps({
+        "seconds":          round(elapsed, 1),
+        "mb_per_s":         round(size / elapsed, 2),
+        "peak_rss_mb":      round(peak, 1),
+        "chunks":           count,
+        "mean_tokens":      round(sum(tokens) / max(len(tokens), 1), 1),
+        "over_limit":       round(sum(t > MODEL_LIMIT for t in tokens) / max(len(tokens), 1), 4),
+        "digest":           digest.hexdigest()[:16],
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mb", type=int, default=300, help="corpus size")
+    parser.add_argument("--big-mb", type=int, default=100, help="size of the single large file")
+    parser.add_argument("--dir", default=os.path.join("/tmp", "bench_chunker_corpus"))
+    parser.add_argument("--only", choices=CHUNKERS, nargs="+", default=list(CHUNKERS))
+    parser.add_argument("--child", choices=CHUNKERS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    files = _corpus(Path(args.dir), args.mb, args.big_mb)
+    if args.child:
+        return _child(args.child, files)
+
+    report = {"corpus_mb": round(sum(p.stat().st_size for p in files) / (1 << 20), 1), "files": len(files)}
+    for name in args.only:
+        out = subprocess.run([sys.executable, __file__, "--mb", str(args.mb), "--big-mb", str(args.big_mb),
+                              "--dir", args.dir, "--child", name], capture_output=True, text=True, check=True)
+        report[name] = json.loads(out.stdout)
+        print(json.dumps({name: report[name]}), file=sys.stderr, flush=True)
+    if "streaming" in report and "streaming_64k" in report:
+        report["block_size_invariant"] = report["streaming"]["digest"] == report["streaming_64k"]["digest"]
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+"""
+benchmarks/bench_context_packing.py
+===================================
+Prompt size, context redundancy and generation latency of the three test
+generators before and after rag_common.context_packer (MMR selection of
+retrieved chunks, near-duplicates dropped, exact per-section token budgets).
+
+Sites (each built in its own process: gauge_rag2 and gauge_rag3 both have a
+top-level `rag` package):
+  rag3      gauge_rag3 ai_engine/test_generator.py, one prompt per page of
+            data/metadata/metadata.json.  Candidates: knowledge_base chunked
+            as rag/embedder.py does, ranked by BM25 for retriever._page_query.
+            before: top TOP_K chunks, formatted by retriever._format, the
+            whole prompt cut at 3000 words (the selector lines are built by
+            the current _build_prompt with unlimited budgets; the old code
+            built the same lines)
+            after:  top CANDIDATES chunks through _build_prompt
+            ranked: as after, but the chunks in retrieval order (no MMR):
+                    the same budgets, to isolate what MMR adds
+  rag3_dup  rag3 with a lightly edited copy of every knowledge-base file
+            indexed next to it (test ids renumbered, one word in 25
+            dropped), the way exported / revised test-case files pile up
+  rag2      gauge_rag2 ai_layers/layer3_strategy.py, one prompt per page of
+            data/page_analysis.json + field_analysis.json.  The Retriever
+            indexes the site knowledge base plus an execution history of the
+            scenarios in data/test_strategy.json (--runs runs, synthetic
+            pass / fail).  before: retrieve(query) (RAG_TOP_K) joined, the
+            Layer 1 / 2 JSON in full; after: generate_all_strategies() as
+            shipped.  Generation goes through ai_utils.call_ollama_json.
+  ai        ai_automation TestCaseGenerator._build_prompt, one prompt per
+            crawl report in intelligence_layer/json_store.  Candidates:
+            rag_data chunked as RAGEngine does, ranked by BM25 for the DOM
+            summary.  before: the old builder (forms / buttons / context
+            cut at 2000 / 1000 / 3000 characters, top TOP_K chunks);
+            after: top CANDIDATES chunks through _build_prompt.
+
+The LLM is fixture_ollama.py's OpenAI-compatible /v1/chat/completions:
+--prefill-token-ms per prompt token plus --tokens generated tokens at
+--token-ms, the same answer length before and after, so latency differences
+are prompt processing only.
+
+Reported per site and variant:
+  prompt_tokens        system + user prompt per page (mean / max), counted
+                       by context_packer.prompt_counter()
+  context_tokens       retrieved-context part of the user prompt (mean)
+  chunks               context chunks in the prompt (mean)
+  near_duplicate_pairs chunk pairs in one prompt with TF-IDF cosine >= 0.9 (total)
+  redundancy           per chunk, TF-IDF cosine to the most similar other chunk in
+                       the same prompt (mean)
+  distinct_terms       distinct content words in the context (mean): how much
+                       different material the context tokens carry
+  latency_ms           generation request time per page (p50 / mean)
+
+Usage:
+    python benchmarks/bench_context_packing.py
+    python benchmarks/bench_context_packing.py --sites rag3,ai --prefill-token-ms 2 --token-ms 20
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+RAG2 = ROOT / "Gauge" / "gauge_rag2"
+RAG3 = ROOT / "Gauge" / "gauge_rag3"
+AI   = ROOT / "ai_automation_using_gauge"
+sys.path.insert(0, str(ROOT))
+
+from rag_common.context_packer import prompt_counter, text_similarity  # noqa: E402
+from rag_common.hybrid_search import STOPWORDS, BM25Index, tokenize  # noqa: E402
+
+
+def _bm25_ranker(texts):
+    bm25 = BM25Index(texts)
+
+    def rank(query, n):
+        return bm25.search(query, n)                  # [(row, score)], best first
+    return rank
+
+
+def _context_stats(chunks):
+    """(near-duplicate pairs, redundancy, distinct content terms) of the chunks in one prompt."""
+    pairs, redundancy = 0, 0.0
+    if len(chunks) > 1:
+        sim = text_similarity(chunks)
+        pairs = int(np.count_nonzero(np.triu(sim >= 0.9, k=1)))
+        np.fill_diagonal(sim, 0.0)
+        redundancy = float(sim.max(axis=1).mean())
+    terms = {t for c in chunks for t in tokenize(c) if t not in STOPWORDS}
+    return pairs, redundancy, len(terms)
+
+
+class _Chat:
+    """The generation call the sites make (system + user message -> completion), against the fixture."""
+
+    def __init__(self, url):
+        from openai import OpenAI
+        self.client = OpenAI(api_key="bench", base_url=f"{url}/v1", max_retries=0)
+
+    def __call__(self, system, user):
+        t0 = time.perf_counter()
+        self.client.chat.completions.create(model="bench", temperature=0.3, max_tokens=4096, messages=[
+            {"role": "system", "content": system}, {"role": "user", "content": user}])
+        return 1000 * (time.perf_counter() - t0)
+
+
+def _row(system, user, chunks, latency_ms):
+    count = prompt_counter()
+    pairs, redundancy, terms = _context_stats(chunks)
+    return {"prompt_tokens": count(system) + count(user), "context_tokens": sum(count(c) for c in chunks),
+            "chunks": len(chunks), "pairs": pairs, "redundancy": redundancy, "terms": terms,
+            "latency_ms": latency_ms}
+
+
+# ── Sites (each runs in a child process) ──────────────────────────────────────
+
+def _edited_copy(text, rnd):
+    text = re.sub(r"_TC_(\d+)", lambda m: f"_TC_{int(m.group(1)) + 100}", text)
+    return re.sub(r"[^\S\n]*\b\w+\b", lambda m: "" if rnd.random() < 0.04 else m.group(0), text)
+
+
+def site_rag3(args, duplicates=False):
+    os.chdir(RAG3)                                    # test_generator creates its output dir relative to cwd
+    sys.path.insert(0, str(RAG3))
+    from ai_engine import test_generator as tg
+    from rag import embedder, retriever
+    import logging
+    logging.getLogger().setLevel(logging.WARNING)
+
+    texts, sources = [], []
+    tmp, rnd = tempfile.mkdtemp(prefix="bench_context_packing_"), random.Random(0)
+    for path in sorted((RAG3 / "knowledge_base").rglob("*.txt")):
+        files = [path]
+        if duplicates:
+            files.append(Path(tmp) / f"{path.stem}_v2.txt")
+            files[1].write_text(_edited_copy(path.read_text(encoding="utf-8"), rnd), encoding="utf-8")
+        for file in files:
+            for c in embedder._process_file(str(file), path.parent.name):
+                texts.append(c["text"])
+                sources.append(path.parent.name)
+    shutil.rmtree(tmp, ignore_errors=True)
+    rank = _bm25_ranker(texts)
+    count = prompt_counter()
+    labelled = re.compile(r"\n\n(?=\[(?:%s)\] )" % "|".join(re.escape(v) for v in retriever.SOURCE_LABELS.values()))
+    with open(RAG3 / "data" / "metadata" / "metadata.json", encoding="utf-8") as f:
+        pages = json.load(f)["pages"]
+    chat = _Chat(args.url)
+
+    def results(page, n):
+        return [{"text": texts[i], "source": sources[i], "file": "", "score": s}
+                for i, s in rank(retriever._page_query(page), n)]
+
+    rows = {"before": [], "after": [], "ranked": []}
+    budgets, mmr = (tg.SELECTOR_TOKENS, tg.RAG_CONTEXT_TOKENS), tg.mmr_select
+    for page in pages:
+        # before: same selector lines, the old grouped top-k context block, 3000-word cut
+        tg.SELECTOR_TOKENS = tg.RAG_CONTEXT_TOKENS = 10 ** 9
+        top = results(page, retriever.TOP_K)
+        system, user = tg._build_prompt(page)
+        head = f"Type: {page.get('page_type', 'general')}\n"
+        cut = user.index(head) + len(head)
+        context = retriever._format(top)
+        block = ("\nRELEVANT CONTEXT FROM KNOWLEDGE BASE:\n" + context + "\n--- END CONTEXT ---\n") if top else ""
+        user = user[:cut] + block + user[cut:]
+        words = user.split()
+        if len(words) > 3000:
+            user = " ".join(words[:3000]) + "\n\n[TRUNCATED] Generate test cases from above only."
+        rows["before"].append(_row(system, user, [r["text"] for r in top], chat(system, user)))
+        rows["before"][-1]["context_tokens"] = count(context)
+
+        tg.SELECTOR_TOKENS, tg.RAG_CONTEXT_TOKENS = budgets
+        candidates = results(page, retriever.CANDIDATES)
+        for key in ("after", "ranked"):
+            tg.mmr_select = mmr if key == "after" else lambda texts, scores=None: list(range(len(texts)))
+            system, user = tg._build_prompt(page, candidates)
+            m = re.search(r"FROM KNOWLEDGE BASE:\n(.*)\n--- END CONTEXT ---", user, re.S)
+            context = m.group(1) if m else ""
+            kept = [c.split("] ", 1)[1] for c in labelled.split(context) if c.strip()]
+            rows[key].append(_row(system, user, kept, chat(system, user)))
+            rows[key][-1]["context_tokens"] = count(context)
+        tg.mmr_select = mmr
+    return rows
+
+
+def site_rag2(args):
+    sys.path.insert(0, str(RAG2))
+    tmp = tempfile.mkdtemp(prefix="bench_context_packing_")
+    os.environ["RAG_EMBEDDING_CACHE"] = os.path.join(tmp, "embeddings.sqlite3")
+    import config
+    config.GROK_API_KEY, config.GROK_BASE_URL = "bench", f"{args.url}/v1"
+    config.DATA_DIR = tmp
+    config.TEST_STRATEGY_PATH = os.path.join(tmp, "test_strategy.json")
+    config.VECTOR_STORE_PATH = os.path.join(tmp, "vector_store.json")
+    config.EXECUTION_RESULTS_PATH = os.path.join(tmp, "execution_results.json")
+    config.EXECUTION_HISTORY_PATH = os.path.join(tmp, "execution_history.json")
+    import logging
+    logging.disable(logging.WARNING)
+    from ai_layers import layer3_strategy as layer3
+    from execution.result_parser import update_history
+    from rag.retriever import Retriever
+
+    try:
+        with open(RAG2 / "data" / "test_strategy.json") as f:
+            strategies = json.load(f)
+        with open(RAG2 / "data" / "page_analysis.json") as f:
+            page_analyses = json.load(f)
+        with open(RAG2 / "data" / "field_analysis.json") as f:
+            field_analyses = json.load(f)
+
+        rnd = random.Random(0)
+        scenarios = [(s.get("url", ""), t["title"]) for s in strategies for t in s.get("test_scenarios", [])]
+        for run in range(args.runs):
+            update_history([{"spec": url, "scenario": title, "status": "failed" if rnd.random() < 0.2 else "passed",
+                             "duration_ms": 1000, "timestamp": f"2026-03-{1 + run % 28:02d}T10:00:00",
+                             "failure_reason": "Element not found: #result after 10000 ms" if rnd.random() < 0.2 else ""}
+                            for url, title in scenarios])
+        retriever = Retriever()
+        retriever.build_index()
+
+        count, calls = prompt_counter(), []
+        call = layer3.call_ollama_json
+
+        def recording(prompt, system=""):
+            t0 = time.perf_counter()
+            out = call(prompt, system=system)
+            calls.append((system, prompt, 1000 * (time.perf_counter() - t0)))
+            return out
+        layer3.call_ollama_json = recording
+
+        def context_of(prompt):
+            m = re.search(r"knowledge for this type of page:\n\n(.*?)\n\nUse this to inform", prompt, re.S)
+            return m.group(1) if m else ""
+
+        rows = {"before": [], "after": []}
+        field_map = {f.get("url", ""): f for f in field_analyses}
+        budgets = (config.LAYER3_PAGE_TOKENS, config.LAYER3_FIELD_TOKENS)
+        config.LAYER3_PAGE_TOKENS = config.LAYER3_FIELD_TOKENS = 10 ** 9
+        for pa in page_analyses:                      # before: RAG_TOP_K entries joined, no budgets
+            url = pa.get("url", pa.get("_raw_url", ""))
+            query = f"{pa.get('page_type', '')} {pa.get('page_purpose', '')} {url}"
+            chunks = retriever.retrieve(query)
+            layer3.generate_strategy(pa, field_map.get(url, {"url": url, "forms": []}), "\n\n".join(chunks))
+        config.LAYER3_PAGE_TOKENS, config.LAYER3_FIELD_TOKENS = budgets
+        for key in ("before", "after"):
+            if key == "after":
+                layer3.generate_all_strategies(page_analyses, field_analyses, retriever)
+            for system, prompt, ms in calls:
+                context = context_of(prompt)
+                chunks = [c for c in context.split("\n\n") if c.strip()]
+                rows[key].append(_row(system, prompt, chunks, ms))
+                rows[key][-1]["context_tokens"] = count(context)
+            calls.clear()
+        return rows
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _legacy_ai_prompt(dom_data, rag_context):
+    forms_json   = json.dumps(dom_data.get("forms",   []), indent=2)[:2000]
+    buttons_json = json.dumps(dom_data.get("buttons", []), indent=2)[:1000]
+    parts = ["## DOM Analysis", dom_data.get("summary", ""), "", "## Forms Detail", forms_json, "",
+             "## Buttons", buttons_json, "", "## Relevant Testing Patterns (RAG Context)", rag_context[:3000], "",
+             "## Task", "Generate exploratory test cases for this web application."]
+    return "\n".join(parts)
+
+
+def site_ai(args):
+    sys.path.insert(0, str(AI))
+    from intelligence_layer import rag_engine, testcase_generator as tcg
+    texts = []
+    for path in sorted((AI / "rag_data").glob("*.txt")):
+        texts.extend(rag_engine.RAGEngine._chunk_file(path))
+    rank = _bm25_ranker(texts)
+    chat, generator = _Chat(args.url), tcg.TestCaseGenerator()
+
+    rows = {"before": [], "after": []}
+    for path in sorted((AI / "intelligence_layer" / "json_store").glob("*.json")):
+        with open(path, encoding="utf-8") as f:
+            dom = json.load(f)["dom_data"]
+        for key, n in (("before", rag_engine.TOP_K), ("after", rag_engine.CANDIDATES)):
+            chunks = [texts[i] for i, _ in rank(dom.get("summary", ""), n)]
+            context = tcg.RAG_SEPARATOR.join(chunks)
+            if key == "before":
+                user = _legacy_ai_prompt(dom, context)
+                section = context[:3000]
+            else:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    user = generator._build_prompt(dom, context)
+                section = user.split("## Relevant Testing Patterns (RAG Context)\n", 1)[1].split("\n\n## Task", 1)[0]
+            kept = [c for c in section.split(tcg.RAG_SEPARATOR) if c.strip()]
+            rows[key].append(_row(tcg.SYSTEM_PROMPT, user, kept, chat(tcg.SYSTEM_PROMPT, user)))
+            rows[key][-1]["context_tokens"] = prompt_counter()(section)
+    return rows
+
+
+SITES = {"rag3": site_rag3, "rag3_dup": lambda args: site_rag3(args, duplicates=True),
+         "rag2": site_rag2, "ai": site_ai}
+
+
+# ── Report ────────────────────────────────────────────────────────────────────
+
+def _summary(rows):
+    lat = [r["latency_ms"] for r in rows]
+    return {
+        "pages": len(rows),
+        "prompt_tokens": {"mean": round(float(np.mean([r["prompt_tokens"] for r in rows])), 1),
+                          "max": max(r["prompt_tokens"] for r in rows)},
+        "context_tokens": round(float(np.mean([r["context_tokens"] for r in rows])), 1),
+        "chunks": round(float(np.mean([r["chunks"] for r in rows])), 2),
+        "near_duplicate_pairs": sum(r["pairs"] for r in rows),
+        "redundancy": round(float(np.mean([r["redundancy"] for r in rows])), 3),
+        "distinct_terms": round(float(np.mean([r["terms"] for r in rows])), 1),
+        "latency_ms": {"p50": round(float(np.median(lat)), 1), "mean": round(float(np.mean(lat)), 1)},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sites", default="rag3,rag3_dup,rag2,ai")
+    parser.add_argument("--runs", type=int, default=30, help="rag2: saved runs in the execution history")
+    parser.add_argument("--site", choices=sorted(SITES), help=argparse.SUPPRESS)     # child process
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from fixture_ollama import add_ollama_args, from_args
+    add_ollama_args(parser)
+    parser.set_defaults(prefill_ms=50.0, prefill_token_ms=1.0, token_ms=10.0, tokens=40)
+    args = parser.parse_args()
+
+    if args.site:
+        print(json.dumps(SITES[args.site](args)))
+        return
+
+    fake = from_args(args)
+    report = {"tokenizer": prompt_counter().name,
+              "llm": {"prefill_ms": args.prefill_ms, "prefill_token_ms": args.prefill_token_ms,
+                      "token_ms": args.token_ms, "tokens": args.tokens}, "sites": {}}
+    try:
+        for site in args.sites.split(","):
+            out = subprocess.run([sys.executable, "-W", "ignore", __file__, "--site", site, "--url", fake.url,
+                                  "--runs", str(args.runs)], capture_output=True, text=True, check=True).stdout
+            rows = json.loads(out.strip().splitlines()[-1])
+            entry = {key: _summary(value) for key, value in rows.items()}
+            b, a = entry["before"], entry["after"]
+            entry["prompt_tokens_saved"] = round(1 - a["prompt_tokens"]["mean"] / b["prompt_tokens"]["mean"], 3)
+            entry["latency_speedup"] = round(b["latency_ms"]["mean"] / a["latency_ms"]["mean"], 2)
+            report["sites"][site] = entry
+            print(json.dumps({site: entry}), file=sys.stderr)
+    finally:
+        fake.shutdown()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""
+benchmarks/bench_crawlers.py
+============================
+Runs every crawler in the repo against the local fixture site and reports
+throughput, per-page timing and peak memory as JSON, so runs from different
+commits can be diffed.
+
+Crawlers:
+  rag3          Gauge/gauge_rag3  crawler.web_crawler.WebCrawler   (Selenium)
+  rag2          Gauge/gauge_rag2  crawler.dom_crawler.crawl()      (Selenium)
+  rag1          Gauge/gauge_rag1  crawler/crawler.py crawl()       (Selenium)
+  dom_analyzer  ai_automation_using_gauge  DOMAnalyzer             (Playwright)
+  dom_analyzer_http  crawl_distributed(fetcher="http")             (urllib, no browser)
+
+Each crawler runs in its own subprocess with the fixture server in this
+process.  Metrics:
+
+  pages            unique fixture pages fetched
+  pages_per_sec    pages / crawl wall time (excludes interpreter start-up)
+  page_p50_ms /    interval between consecutive page fetches seen by the
+  page_p95_ms      server = load + wait + extraction per page (for parallel
+                   crawlers, the effective interval across all workers)
+  server_p50_ms    time the fixture server spent on a page (latency floor)
+  peak_rss_mb      peak RSS of the crawler process tree incl. the browser
+                   (sampled with psutil); python_peak_rss_mb is the crawler
+                   interpreter alone (ru_maxrss)
+
+A crawler whose dependencies are missing (selenium, playwright, chromedriver)
+is reported with an "error" entry instead of aborting the run.
+
+Usage:
+    python benchmarks/bench_crawlers.py
+    python benchmarks/bench_crawlers.py --crawlers rag3 dom_analyzer --pages 200 --latency 50
+    python benchmarks/bench_crawlers.py --max-pages 100 --out bench_crawl.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import psutil
+except ImportError:  # tree RSS is skipped; python_peak_rss_mb is still reported
+    psutil = None
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent
+sys.path.insert(0, str(HERE))
+
+from fixture_site import FixtureServer, add_site_args, site_config  # noqa: E402
+
+RAG1 = ROOT / "Gauge" / "gauge_rag1"
+RAG2 = ROOT / "Gauge" / "gauge_rag2"
+RAG3 = ROOT / "Gauge" / "gauge_rag3"
+AI_AUTOMATION = ROOT / "ai_automation_using_gauge"
+
+SAMPLE_EVERY = 0.05     # seconds between RSS samples
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Crawler adapters (run inside the child process)
+# ─────────────────────────────────────────────────────────────────────────────
+# Each adapter points one crawler at `url`, runs it with the given limits and
+# returns the number of pages it reports.  Output files go to `work`, never
+# into the project's data/ folders.
+
+def _run_rag3(url, max_pages, max_depth, work):
+    sys.path.insert(0, str(RAG3))
+    os.chdir(work)                              # module makedirs()s OUTPUT_FILE's folder on import
+    from crawler import web_crawler as wc
+    wc.TARGET_URL = url
+    wc.MAX_PAGES = max_pages
+    wc.MAX_DEPTH = max_depth
+    wc.HEADLESS = True
+    wc.OUTPUT_FILE = os.path.join(work, "metadata.json")
+    wc.WebCrawler().run()
+    with open(wc.OUTPUT_FILE, encoding="utf-8") as fh:
+        return len(json.load(fh)["pages"])
+
+
+def _run_rag2(url, max_pages, max_depth, work):
+    sys.path.insert(0, str(RAG2))
+    import config
+    config.CHROME_HEADLESS = True
+    config.DATA_DIR = work
+    config.DOM_DATA_PATH = os.path.join(work, "dom_data.json")
+    from crawler.dom_crawler import crawl
+    return len(crawl(url, max_depth=max_depth, max_pages=max_pages))
+
+
+def _run_rag1(url, max_pages, max_depth, work):
+    sys.path.insert(0, str(RAG1))
+    from crawler import crawler as c1
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
+    def headless_driver():                      # rag1 opens a maximised window by default
+        opts = Options()
+        opts.add_argument("--headless=new")
+        opts.add_argument("--disable-gpu")
+        opts.add_argument("--no-sandbox")
+        opts.add_argument("--log-level=3")
+        return webdriver.Chrome(options=opts)
+
+    c1.get_driver = headless_driver
+    c1.START_URL = url
+    c1.MAX_PAGES = max_pages
+    c1.MAX_DEPTH = max_depth
+    c1.OUTPUT_FILE = Path(work) / "elements.json"
+    c1.crawl()
+    return len(json.loads(c1.OUTPUT_FILE.read_text(encoding="utf-8")))
+
+
+def _run_dom_analyzer(url, max_pages, max_depth, work):
+    sys.path.insert(0, str(AI_AUTOMATION))
+    from intelligence_layer.dom_analyser import DOMAnalyzer
+    return DOMAnalyzer(url, max_pages=max_pages, max_depth=max_depth).extract().count("pages")
+
+
+def _run_dom_analyzer_http(url, max_pages, max_depth, work):
+    sys.path.insert(0, str(AI_AUTOMATION))
+    from intelligence_layer.crawl_coordinator import crawl_distributed
+    workers = int(os.getenv("CRAWLER_WORKERS", "4"))
+    return crawl_distributed(url, workers=workers, fetcher="http",
+                             max_pages=max_pages, max_depth=max_depth).count("pages")
+
+
+CRAWLERS = {
+    "rag3":              _run_rag3,
+    "rag2":              _run_rag2,
+    "rag1":              _run_rag1,
+    "dom_analyzer":      _run_dom_analyzer,
+    "dom_analyzer_http": _run_dom_analyzer_http,
+}
+
+
+def _child(args):
+    result = {}
+    work = tempfile.mkdtemp(prefix=f"bench_{args.child}_")
+    start = time.perf_counter()
+    try:
+        result["reported_pages"] = CRAWLERS[args.child](args.url, args.max_pages, args.max_depth, work)
+    except BaseException as exc:                # SystemExit from a crawler counts as a failure too
+        result["error"] = f"{type(exc).__name__}: {exc}"
+    result["crawl_s"] = time.perf_counter() - start
+    result["python_peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    with open(args.result, "w", encoding="utf-8") as fh:
+        json.dump(result, fh)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Harness
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _tree_rss(proc) -> int:
+    try:
+        procs = [proc] + proc.children(recursive=True)
+    except psutil.Error:
+        return 0
+    total = 0
+    for p in procs:
+        try:
+            total += p.memory_info().rss
+        except psutil.Error:
+            pass
+    return total
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    k = (len(values) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def run_one(name, server, args):
+    server.reset_log()
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as tmp:
+        result_path = tmp.name
+    cmd = [sys.executable, str(Path(__file__).resolve()), "--child", name,
+           "--url", server.url, "--max-pages", str(args.max_pages),
+           "--max-depth", str(args.max_depth), "--result", result_path]
+    log = subprocess.DEVNULL if not args.verbose else None
+    proc = subprocess.Popen(cmd, stdout=log, stderr=log)
+
+    peak = 0
+    handle = psutil.Process(proc.pid) if psutil else None
+    deadline = time.monotonic() + args.timeout
+    while proc.poll() is None:
+        if handle is not None:
+            peak = max(peak, _tree_rss(handle))
+        if time.monotonic() > deadline:
+            proc.kill()
+            break
+        time.sleep(SAMPLE_EVERY)
+    proc.wait()
+
+    try:
+        with open(result_path, encoding="utf-8") as fh:
+            child = json.load(fh)
+    except (OSError, ValueError):
+        child = {"error": f"crawler process exited with code {proc.returncode} (timeout={args.timeout}s)"}
+    finally:
+        if os.path.exists(result_path):
+            os.remove(result_path)
+
+    hits = sorted(server.requests, key=lambda r: r[1])
+    starts = [r[1] for r in hits]
+    intervals = [(b - a) * 1000 for a, b in zip(starts, starts[1:])]
+    served = [(end - start) * 1000 for _, start, end in hits]
+    pages = len({r[0] for r in hits})
+    crawl_s = child.get("crawl_s") or 0.0
+
+    out = {
+        "pages": pages,
+        "requests": len(hits),
+        "reported_pages": child.get("reported_pages"),
+        "crawl_s": round(crawl_s, 3),
+        "pages_per_sec": round(pages / crawl_s, 2) if crawl_s and pages else 0.0,
+        "page_p50_ms": _round(_percentile(intervals, 50)),
+        "page_p95_ms": _round(_percentile(intervals, 95)),
+        "server_p50_ms": _round(_percentile(served, 50)),
+        "peak_rss_mb": round(peak / 2**20, 1) if handle is not None else None,
+        "python_peak_rss_mb": child.get("python_peak_rss_mb"),
+    }
+    if "error" in child:
+        out["error"] = child["error"]
+    return out
+
+
+def _round(value):
+    return None if value is None else round(value, 1)
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawler benchmark against the local fixture site")
+    add_site_args(parser)
+    parser.add_argument("--crawlers", nargs="+", choices=list(CRAWLERS), default=list(CRAWLERS))
+    parser.add_argument("--max-pages", type=int, default=50)
+    parser.add_argument("--max-depth", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=900, help="seconds per crawler")
+    parser.add_argument("--out", help="also write the JSON report here")
+    parser.add_argument("--verbose", action="store_true", help="show crawler output")
+    # internal: run one adapter in this process
+    parser.add_argument("--child", choices=list(CRAWLERS), help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return _child(args)
+
+    cfg = site_config(args)
+    server = FixtureServer(cfg).start()
+    report = {
+        "commit": _commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "site": vars(cfg),
+        "limits": {"max_pages": args.max_pages, "max_depth": args.max_depth},
+        "results": {},
+    }
+    try:
+        for name in args.crawlers:
+            print(f"[bench] {name} ...", file=sys.stderr)
+            report["results"][name] = run_one(name, server, args)
+    finally:
+        server.stop()
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
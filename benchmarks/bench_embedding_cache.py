@@ -0,0 +1,186 @@
+"""
+benchmarks/bench_embedding_cache.py
+===================================
+Cold vs warm RAG build through rag_common.EmbeddingCache.
+
+The "model" is gauge_rag2's HashingEmbedder wrapped to count forward calls
+and texts, plus an optional per-text sleep (--model-ms) that stands in for a
+sentence-transformers forward pass on CPU.  With --model st the real
+all-MiniLM-L6-v2 is used instead (needs sentence-transformers).
+
+Reported:
+  cold / warm        build time, encode_fn calls and texts encoded, hit/miss
+  read_ms_per_text   cost of a cached lookup (batch get_many)
+  hash_ms_per_text   cost of recomputing a hash vector, for comparison
+  float16            worst |cos(a, b) - cos(a16, b16)| over random chunk pairs
+  concurrency        reader processes doing get_many while this process
+                     writes; any "database is locked" error is counted
+
+Usage:
+    python benchmarks/bench_embedding_cache.py
+    python benchmarks/bench_embedding_cache.py --chunks 5000 --model-ms 2 --readers 8
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "Gauge" / "gauge_rag2"))
+
+from rag_common.embedding_cache import EmbeddingCache  # noqa: E402
+from rag.hash_embedder import HashingEmbedder          # noqa: E402
+
+
+class CountingModel:
+    def __init__(self, kind, model_ms):
+        self.calls = self.texts = 0
+        self.model_ms = model_ms
+        if kind == "st":
+            from sentence_transformers import SentenceTransformer
+            self._st = SentenceTransformer("all-MiniLM-L6-v2")
+            self.name = "all-MiniLM-L6-v2"
+        else:
+            self._st = None
+            self._hasher = HashingEmbedder(dims=384)
+            self.name = "bench-hash-384"
+
+    def encode(self, texts):
+        self.calls += 1
+        self.texts += len(texts)
+        if self._st is not None:
+            return self._st.encode(texts, show_progress_bar=False)
+        if self.model_ms:
+            time.sleep(self.model_ms * len(texts) / 1000)
+        return self._hasher.embed_batch(texts)
+
+
+def _chunks(n, seed=0):
+    rnd = random.Random(seed)
+    vocab = ("login form email password submit button cart checkout search results page "
+             "navigation link error message valid invalid user account register field "
+             "required dropdown table calculator value enter click verify gauge step spec").split()
+    return [f"chunk {i}: " + " ".join(rnd.choice(vocab) for _ in range(rnd.randint(60, 120)))
+            for i in range(n)]
+
+
+def build(path, model, chunks, batch=50):
+    """One RAG build the way gauge_rag3's embedder does it: batches of 50."""
+    cache = EmbeddingCache(model.name, "bench", path=path)
+    calls, texts = model.calls, model.texts
+    t0 = time.perf_counter()
+    out = [cache.encode(chunks[i:i + batch], model.encode) for i in range(0, len(chunks), batch)]
+    elapsed = time.perf_counter() - t0
+    cache.close()
+    return {
+        "build_s": round(elapsed, 3),
+        "encode_fn_calls": model.calls - calls,
+        "texts_encoded": model.texts - texts,
+        "hits": cache.hits,
+        "misses": cache.misses,
+    }, np.concatenate(out)
+
+
+def _reader(path, model, texts, seconds, queue):
+    cache = EmbeddingCache(model, "bench", path=path)
+    reads = errors = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        try:
+            cache.get_many(texts)
+            reads += 1
+        except Exception:
+            errors += 1
+    queue.put((reads, errors))
+
+
+def concurrency(path, model, chunks, readers, seconds=3.0):
+    queue = mp.Queue()
+    procs = [mp.Process(target=_reader, args=(path, model.name, chunks[:200], seconds, queue))
+             for _ in range(readers)]
+    for p in procs:
+        p.start()
+    writer = EmbeddingCache(model.name, "bench-writer", path=path)
+    hasher, writes, write_errors = HashingEmbedder(dims=384), 0, 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        batch = [f"w{writes}-{i}" for i in range(50)]
+        try:
+            writer.put_many(batch, hasher.embed_batch(batch))
+            writes += 1
+        except Exception:
+            write_errors += 1
+    for p in procs:
+        p.join()
+    results = [queue.get() for _ in procs]
+    return {
+        "readers": readers,
+        "reader_batches": sum(r for r, _ in results),
+        "reader_errors": sum(e for _, e in results),
+        "writer_batches": writes,
+        "writer_errors": write_errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--model", choices=["hash", "st"], default="hash")
+    parser.add_argument("--model-ms", type=float, default=2.0, help="simulated forward cost per text")
+    parser.add_argument("--readers", type=int, default=4)
+    args = parser.parse_args()
+
+    model = CountingModel(args.model, args.model_ms)
+    chunks = _chunks(args.chunks)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "embeddings.sqlite3")
+        cold, cold_vecs = build(path, model, chunks)
+        warm, warm_vecs = build(path, model, chunks)
+        edited = chunks[: len(chunks) // 10] + [c + " edited" for c in chunks[len(chunks) // 10:len(chunks) // 5]]
+        partial, _ = build(path, model, edited + chunks[len(chunks) // 5:])
+
+        cache = EmbeddingCache(model.name, "bench", path=path)
+        t0 = time.perf_counter()
+        cache.get_many(chunks)
+        read_ms = (time.perf_counter() - t0) / len(chunks) * 1000
+        hasher = HashingEmbedder(dims=384)
+        t0 = time.perf_counter()
+        full = hasher.embed_batch(chunks)
+        hash_ms = (time.perf_counter() - t0) / len(chunks) * 1000
+        db_mb = sum(os.path.getsize(os.path.join(tmp, f)) for f in os.listdir(tmp)) / 2**20
+
+        rnd = np.random.default_rng(0)
+        a, b = rnd.integers(0, len(chunks), 5000), rnd.integers(0, len(chunks), 5000)
+        half = full.astype(np.float16).astype(np.float32)
+        cos_err = float(np.abs((full[a] * full[b]).sum(1) - (half[a] * half[b]).sum(1)).max())
+
+        conc = concurrency(path, model, chunks, args.readers)
+
+    print(json.dumps({
+        "model": model.name,
+        "chunks": args.chunks,
+        "simulated_model_ms_per_text": args.model_ms if args.model == "hash" else None,
+        "cold": cold,
+        "warm": warm,
+        "warm_10pct_edited": partial,
+        "warm_equals_cold": bool(np.array_equal(cold_vecs, warm_vecs)),
+        "read_ms_per_text": round(read_ms, 4),
+        "hash_ms_per_text": round(hash_ms, 4),
+        "db_mb": round(db_mb, 2),
+        "float16_max_cosine_error": round(cos_err, 6),
+        "concurrency": conc,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
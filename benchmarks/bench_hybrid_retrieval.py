@@ -0,0 +1,164 @@
+"""
+benchmarks/bench_hybrid_retrieval.py
+====================================
+Dense-only vs BM25 vs hybrid (RRF) retrieval on the repo's own corpora,
+through rag_common.hybrid_search.
+
+Corpora (chunked exactly as their pipelines chunk them):
+  rag3_kb     Gauge/gauge_rag3/knowledge_base   rag/embedder._process_file
+  ai_rag      ai_automation_using_gauge/rag_data RAGEngine._chunk_file
+(token counts from rag_common.chunker's offline estimate, not the model's tokenizer)
+
+Queries, generated from the corpora so they have known answers:
+  heading     every markdown heading ("Password Fields", "Valid Search
+              Term", ...); relevant = the chunks that contain that heading
+  keyword     rare single terms (in at most 2 chunks, e.g. "maxlength");
+              relevant = the chunks containing the term
+
+Methods:
+  dense       vector search only (the previous behaviour)
+  bm25        lexical only
+  hybrid      BM25 + dense fused with RRF for every query
+  hybrid_fast hybrid, with the lexical-only path for short keyword queries
+              (the shipped default)
+
+Reported per corpus and query kind: recall@k (share of relevant chunks in
+the top k, capped at k), mean latency per query, and how many queries
+reached the encoder.  The dense model is gauge_rag2's HashingEmbedder
+(384 dims) plus an optional per-call sleep (--model-ms) standing in for a
+sentence-transformers query encode on CPU; --model st uses the real
+all-MiniLM-L6-v2 (needs sentence-transformers).
+
+Usage:
+    python benchmarks/bench_hybrid_retrieval.py
+    python benchmarks/bench_hybrid_retrieval.py --model-ms 8 --k 3
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "Gauge" / "gauge_rag2"))
+
+from rag_common.hybrid_search import BM25Index, HybridSearcher, tokenize  # noqa: E402
+from rag.hash_embedder import HashingEmbedder                             # noqa: E402
+
+_HEADING = re.compile(r"^#{1,4}\s+(?:[A-Z]+_[A-Z_]*\d+:\s*|\d+\.\s*)?(.+?)\s*$", re.M)
+
+
+def _rag3_chunks():
+    import importlib.util
+    spec = importlib.util.spec_from_file_location("rag3_embedder", ROOT / "Gauge" / "gauge_rag3" / "rag" / "embedder.py")
+    embedder = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(embedder)
+    texts, sources = [], []
+    for path in sorted((ROOT / "Gauge" / "gauge_rag3" / "knowledge_base").rglob("*.txt")):
+        texts.extend(c["text"] for c in embedder._process_file(str(path), path.parent.name))
+        sources.append(path.read_text(encoding="utf-8"))
+    return texts, sources
+
+
+def _ai_chunks():
+    sys.path.insert(0, str(ROOT / "ai_automation_using_gauge"))
+    from intelligence_layer.rag_engine import RAGEngine
+    texts, sources = [], []
+    for path in sorted((ROOT / "ai_automation_using_gauge" / "rag_data").glob("*.txt")):
+        texts.extend(RAGEngine._chunk_file(path))
+        sources.append(path.read_text(encoding="utf-8", errors="ignore"))
+    return texts, sources
+
+
+def _queries(chunks, sources, max_keywords):
+    flat = [" ".join(c.split()) for c in chunks]
+    heading = []
+    for src in sources:
+        for title in _HEADING.findall(src):
+            title = " ".join(title.split())
+            rel = {i for i, c in enumerate(flat) if title in c}
+            if rel:
+                heading.append((title, rel))
+    df = {}
+    for i, c in enumerate(chunks):
+        for t in set(tokenize(c)):
+            df.setdefault(t, set()).add(i)
+    keyword = [(t, rows) for t, rows in sorted(df.items())
+               if len(rows) <= 2 and len(t) >= 6 and t.isalpha()][:max_keywords]
+    return {"heading": heading, "keyword": keyword}
+
+
+class Dense:
+    def __init__(self, chunks, kind, model_ms):
+        self.calls, self.model_ms = 0, model_ms
+        if kind == "st":
+            from sentence_transformers import SentenceTransformer
+            st = SentenceTransformer("all-MiniLM-L6-v2")
+            self._encode = lambda texts: st.encode(texts, normalize_embeddings=True)
+        else:
+            hasher = HashingEmbedder(dims=384)
+            self._encode = lambda texts: hasher.embed_batch(texts)
+        self.matrix = np.asarray(self._encode(chunks), dtype=np.float32)
+
+    def search(self, queries, n):
+        self.calls += len(queries)
+        if self.model_ms:
+            time.sleep(self.model_ms / 1000)
+        q = np.asarray(self._encode(list(queries)), dtype=np.float32)
+        scores = q @ self.matrix.T
+        top = np.argsort(-scores, axis=1, kind="stable")[:, :n]
+        return [[(int(i), float(s[i])) for i in row] for row, s in zip(top, scores)]
+
+
+def _recall(found, relevant, k):
+    return len(set(found[:k]) & relevant) / min(k, len(relevant))
+
+
+def _run(name, chunks, sources, args):
+    dense = Dense(chunks, args.model, args.model_ms)
+    bm25  = BM25Index(chunks)
+    qsets = _queries(chunks, sources, args.keywords)
+    methods = {
+        "dense":       lambda q: [r for r, _ in dense.search([q], args.k)[0]],
+        "bm25":        lambda q: [r for r, _ in bm25.search(q, args.k)],
+        "hybrid":      lambda q, s=HybridSearcher(bm25, dense.search, keyword_max_terms=0): [h.row for h in s.search(q, args.k)],
+        "hybrid_fast": lambda q, s=HybridSearcher(bm25, dense.search): [h.row for h in s.search(q, args.k)],
+    }
+    out = {"chunks": len(chunks)}
+    for kind, queries in qsets.items():
+        out[kind] = {"queries": len(queries)}
+        for label, fn in methods.items():
+            dense.calls = 0
+            t0 = time.perf_counter()
+            found = [fn(q) for q, _ in queries]
+            elapsed = time.perf_counter() - t0
+            out[kind][label] = {
+                f"recall@{args.k}": round(float(np.mean([_recall(f, rel, args.k) for f, (_, rel) in zip(found, queries)])), 3),
+                "ms_per_query":     round(elapsed * 1000 / max(len(queries), 1), 3),
+                "encoded":          dense.calls,
+            }
+    return name, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", choices=["hash", "st"], default="hash")
+    parser.add_argument("--model-ms", type=float, default=0.0, help="simulated encode cost per call")
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--keywords", type=int, default=40, help="max keyword queries per corpus")
+    args = parser.parse_args()
+
+    report = {"model": args.model, "model_ms": args.model_ms, "k": args.k}
+    for name, load in (("rag3_kb", _rag3_chunks), ("ai_rag", _ai_chunks)):
+        chunks, sources = load()
+        report.update([_run(name, chunks, sources, args)])
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+benchmarks/bench_meeting_ingest.py
+==================================
+Adding one meeting to a large rag_meeting_minutes archive: the previous
+ingest (wipe the index, re-embed every chunk through OllamaEmbeddings, one
+request per chunk) against the incremental ingest.py (per-file hashes,
+batched concurrent /api/embed requests, append to the saved index).
+
+The archive is --meetings transcripts generated from data/meeting.txt
+(names, dates and paragraph order varied, plus a unique reference line).
+
+The embedding endpoint is the local Ollama stand-in in fixture_ollama.py
+(no model needed): /api/embed and /api/embeddings answer with gauge_rag2
+HashingEmbedder vectors (768 dims, like nomic-embed-text) after sleeping
+  --request-ms   per request (HTTP + scheduling; requests overlap)
+  --text-ms      per text, serialised over --server-parallel slots
+                 (OLLAMA_NUM_PARALLEL), so concurrency cannot fake compute
+
+Reported (seconds, requests sent, texts embedded):
+  old_add_one        previous ingest.py over the archive + 1 file
+  full_build         ingest.py --rebuild over the archive
+  add_one            ingest.py after one new file was dropped in
+  unchanged          ingest.py with nothing changed
+  change_one / remove_one   one file edited / deleted
+plus the chunk count of the index after each step (must match the files).
+
+Usage:
+    python benchmarks/bench_meeting_ingest.py
+    python benchmarks/bench_meeting_ingest.py --meetings 100 --text-ms 10 --server-parallel 2
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import re
+import shutil
+import sys
+import time
+from pathlib import Path
+
+ROOT    = Path(__file__).resolve().parent.parent
+PROJECT = ROOT / "RAG_PROJECTS" / "rag_meeting_minutes"
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "Gauge" / "gauge_rag2"))
+sys.path.insert(0, str(PROJECT))
+
+from fixture_ollama import FakeOllama  # noqa: E402
+
+NAMES = ["Amith", "Shilpa", "Sayon", "Irfana", "Kalidas"]
+POOL  = ["Asha", "Bilal", "Chen", "Divya", "Emeka", "Farah", "Gopal", "Hana", "Ivan", "Jaya", "Kiran",
+         "Lena", "Manoj", "Nadia", "Omar", "Priya", "Quinn", "Ravi", "Sara", "Tomas"]
+MONTHS = ["January", "February", "March", "April", "May", "June", "July", "August", "September",
+          "October", "November", "December"]
+_DATE = re.compile(r"(\d+)(st|nd|rd|th) of January")
+
+
+# ── Archive ───────────────────────────────────────────────────────────────────
+
+def _meeting(i, paragraphs):
+    rnd   = random.Random(i)
+    names = dict(zip(NAMES, rnd.sample(POOL, len(NAMES))))
+    month = MONTHS[i % 12]
+    body  = paragraphs[1:-1]
+    rnd.shuffle(body)
+    text  = "\n\n".join([paragraphs[0]] + body + [paragraphs[-1], f"Meeting reference MTG-{i:04d}."])
+    for old, new in names.items():
+        text = text.replace(old, new)
+    return _DATE.sub(lambda m: f"{rnd.randint(1, 28)}th of {month}", text) + "\n"
+
+
+def _write_archive(directory: Path, n):
+    shutil.rmtree(directory, ignore_errors=True)
+    directory.mkdir(parents=True)
+    paragraphs = [p.strip() for p in (PROJECT / "data" / "meeting.txt").read_text(encoding="utf-8").split("\n\n") if p.strip()]
+    for i in range(n + 1):
+        (directory / f"meeting_{i:04d}.txt").write_text(_meeting(i, paragraphs), encoding="utf-8")
+    return directory / f"meeting_{n:04d}.txt"          # the "new" file, moved aside below
+
+
+# ── Runs ──────────────────────────────────────────────────────────────────────
+
+def _old_ingest(ingest, files, out_dir, url):
+    """The previous ingest.py: wipe, then FAISS.from_documents over OllamaEmbeddings."""
+    from langchain_community.embeddings import OllamaEmbeddings
+    from langchain_community.vectorstores import FAISS
+    docs = [doc for path in files for _, doc in ingest.chunk(str(path))]
+    shutil.rmtree(out_dir, ignore_errors=True)
+    store = FAISS.from_documents(docs, OllamaEmbeddings(model=ingest.EMBEDDING_MODEL, base_url=url))
+    store.save_local(str(out_dir))
+    return len(docs)
+
+
+def _step(server, fn):
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        fn()
+    row = {"seconds": round(time.perf_counter() - t0, 3), **server.counters()}
+    return row, out.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--meetings", type=int, default=500)
+    parser.add_argument("--request-ms", type=float, default=8.0)
+    parser.add_argument("--text-ms", type=float, default=4.0)
+    parser.add_argument("--server-parallel", type=int, default=1)
+    parser.add_argument("--skip-old", action="store_true", help="don't time the previous full re-embed")
+    parser.add_argument("--dir", default=os.path.join("/tmp", "bench_meeting_ingest"))
+    args = parser.parse_args()
+
+    server  = FakeOllama(args.request_ms, args.text_ms, parallel=args.server_parallel)
+    base    = Path(args.dir)
+    archive = base / "meetings"
+    os.environ.update({"OLLAMA_BASE_URL": server.url, "DATA_DIR": str(archive),
+                       "VECTOR_DB_DIR": str(base / "faiss_index")})
+    import ingest                                         # reads the environment at import
+
+    new_file = _write_archive(archive, args.meetings)
+    held = base / new_file.name
+    shutil.move(str(new_file), held)
+
+    def chunks():
+        from shards import ShardedIndex
+        return ShardedIndex(ingest.VECTOR_DB_DIR, ingest.OllamaBatchEmbeddings(model=ingest.EMBEDDING_MODEL)).chunks
+
+    def expected():
+        return sum(sum(1 for _ in ingest.chunk(str(p))) for p in archive.glob("*.txt"))
+
+    report = {"meetings": args.meetings, "server": {"request_ms": args.request_ms, "text_ms": args.text_ms,
+                                                    "parallel": args.server_parallel},
+              "ingest": {"batch": ingest.OllamaBatchEmbeddings(model="x").batch_size,
+                         "concurrency": ingest.OllamaBatchEmbeddings(model="x").concurrency}}
+
+    report["full_build"], _ = _step(server, lambda: ingest.ingest([str(archive)], rebuild=True))
+    report["full_build"]["chunks"] = chunks()
+
+    shutil.move(str(held), new_file)
+    if not args.skip_old:
+        files = sorted(archive.glob("*.txt"))
+        report["old_add_one"], _ = _step(server, lambda: _old_ingest(ingest, files, base / "old_index", server.url))
+        shutil.rmtree(base / "old_index", ignore_errors=True)
+    report["add_one"], log = _step(server, lambda: ingest.ingest([str(archive)]))
+    report["add_one"].update(chunks=chunks(), expected=expected(), log=log.strip().splitlines())
+
+    report["unchanged"], _ = _step(server, lambda: ingest.ingest([str(archive)]))
+
+    edited = archive / "meeting_0007.txt"
+    edited.write_text(edited.read_text(encoding="utf-8") + "\nAction item: review the release checklist.\n",
+                      encoding="utf-8")
+    report["change_one"], _ = _step(server, lambda: ingest.ingest([str(archive)]))
+    report["change_one"].update(chunks=chunks(), expected=expected())
+
+    (archive / "meeting_0003.txt").unlink()
+    report["remove_one"], _ = _step(server, lambda: ingest.ingest([str(archive)]))
+    report["remove_one"].update(chunks=chunks(), expected=expected())
+
+    if "old_add_one" in report:
+        report["add_one_speedup"] = round(report["old_add_one"]["seconds"] / report["add_one"]["seconds"], 1)
+    server.shutdown()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
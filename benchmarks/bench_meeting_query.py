@@ -0,0 +1,168 @@
+"""
+benchmarks/bench_meeting_query.py
+=================================
+Answer latency and throughput of rag_meeting_minutes: the blocking
+query.ask() (an answer is shown only when the LLM has finished) against the
+resident server.py (index and clients kept warm, tokens streamed as they
+are generated, batches answered with bounded concurrency).
+
+The index is built by ingest.py over --meetings transcripts generated from
+data/meeting.txt (see bench_meeting_ingest.py).  Ollama is the local
+stand-in in fixture_ollama.py: an answer costs --prefill-ms before its
+first token and --token-ms per token (--tokens tokens), serialised over
+OLLAMA_NUM_PARALLEL slots; the whole run is repeated for each --parallel.
+
+Reported per --parallel (milliseconds unless named otherwise):
+  one_shot_ms        `python -c "import query; query.ask(q)"` per question: imports,
+                     index load and the blocking answer (what a user waits for)
+  blocking           query.ask() in a warm process; first token == full answer
+  server_stream      POST /ask over HTTP, streaming: time to the first token and
+                     to the last, measured by the client
+  questions_per_min  sequential blocking query.ask() against server.batch()
+                     at each --concurrency
+
+Usage:
+    python benchmarks/bench_meeting_query.py
+    python benchmarks/bench_meeting_query.py --parallel 1,2,4 --concurrency 1,4,8 --token-ms 50
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT    = Path(__file__).resolve().parent.parent
+PROJECT = ROOT / "RAG_PROJECTS" / "rag_meeting_minutes"
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(PROJECT))
+
+import requests  # noqa: E402
+
+from bench_meeting_ingest import _write_archive  # noqa: E402
+from fixture_ollama import add_ollama_args, from_args  # noqa: E402
+
+QUESTIONS = [
+    "When is the final submission deadline?",
+    "When is the code freeze planned?",
+    "What did Shilpa say about the backend?",
+    "When will the backend integration be complete?",
+    "When will Sayon deliver the UI prototype?",
+    "Is placeholder data used in the frontend?",
+    "What is Irfana working on?",
+    "When will automated test cases be written?",
+    "Which tool is used for deployment?",
+    "Who gave the DevOps update?",
+    "Are there any blockers?",
+    "How often are progress reviews held?",
+    "Who began the stand-up?",
+    "Was the meeting held online?",
+    "What could affect the testing schedule?",
+    "What is the goal of the stand-up?",
+]
+
+
+def _pct(values, q):
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(q * len(values)))], 1)
+
+
+def _summary(values):
+    return {"p50": _pct(values, 0.5), "p95": _pct(values, 0.95)}
+
+
+def _one_shot(question):
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, "-c", f"import query; query.ask({question!r})"], cwd=PROJECT,
+                   check=True, capture_output=True)
+    return 1000 * (time.perf_counter() - t0)
+
+
+def _stream_http(url, question):
+    t0, first = time.perf_counter(), None
+    with requests.post(f"{url}/ask", json={"question": question}, stream=True, timeout=600) as r:
+        r.raise_for_status()
+        for line in r.iter_lines():
+            if first is None and "token" in json.loads(line):
+                first = time.perf_counter() - t0
+    return 1000 * first, 1000 * (time.perf_counter() - t0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--meetings", type=int, default=100)
+    parser.add_argument("--parallel", default="1,4", help="OLLAMA_NUM_PARALLEL values to run")
+    parser.add_argument("--concurrency", default="1,4,8", help="server.batch() concurrency values")
+    parser.add_argument("--one-shot", type=int, default=3, help="one-shot processes per --parallel")
+    parser.add_argument("--dir", default=os.path.join("/tmp", "bench_meeting_query"))
+    add_ollama_args(parser)
+    args = parser.parse_args()
+
+    fake = from_args(args)
+    base = Path(args.dir)
+    os.environ.update({"OLLAMA_BASE_URL": fake.url, "DATA_DIR": str(base / "meetings"),
+                       "VECTOR_DB_DIR": str(base / "faiss_index"),
+                       "ANSWER_CACHE": "off"})           # every question is generated (bench_answer_cache.py covers hits)
+    import ingest                                         # these read the environment at import
+    import query
+    import server
+
+    _write_archive(base / "meetings", args.meetings)
+    with contextlib.redirect_stdout(io.StringIO()):
+        ingest.ingest(rebuild=True)
+    questions_file = base / "questions.txt"
+    questions_file.write_text("\n".join(QUESTIONS) + "\n", encoding="utf-8")
+
+    engine = server.QueryEngine()
+    engine.warm()
+    http = server.QueryServer(engine, port=0)
+    threading.Thread(target=http.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{http.server_address[1]}"
+
+    report = {"meetings": args.meetings, "chunks": engine.vectorstore().chunks,
+              "questions": len(QUESTIONS), "llm": {"prefill_ms": args.prefill_ms, "token_ms": args.token_ms,
+                                                   "tokens": args.tokens}, "runs": {}}
+    for parallel in [int(p) for p in args.parallel.split(",")]:
+        fake.slots = threading.Semaphore(parallel)
+        engine.generations = threading.Semaphore(parallel)
+        run = {}
+
+        run["one_shot_ms"] = _summary([_one_shot(q) for q in QUESTIONS[:args.one_shot]])
+
+        blocking = []
+        t0 = time.perf_counter()
+        for q in QUESTIONS:
+            t = time.perf_counter()
+            query.ask(q)
+            blocking.append(1000 * (time.perf_counter() - t))
+        sequential_s = time.perf_counter() - t0
+        run["blocking"] = {"ttft": _summary(blocking), "total": _summary(blocking)}
+
+        streamed = [_stream_http(url, q) for q in QUESTIONS]
+        run["server_stream"] = {"ttft": _summary([f for f, _ in streamed]),
+                                "total": _summary([t for _, t in streamed])}
+
+        rates = {"sequential_blocking": round(60 * len(QUESTIONS) / sequential_s, 1)}
+        for c in [int(c) for c in args.concurrency.split(",")]:
+            with contextlib.redirect_stderr(io.StringIO()):
+                rates[f"batch_c{c}"] = round(server.batch(str(questions_file), os.devnull, c,
+                                                          server.QueryEngine(max_generations=c)), 1)
+        run["questions_per_min"] = rates
+        run["ttft_speedup"] = round(run["blocking"]["ttft"]["p50"] / run["server_stream"]["ttft"]["p50"], 1)
+        report["runs"][f"parallel_{parallel}"] = run
+        fake.counters()
+
+    http.shutdown()
+    fake.shutdown()
+    shutil.rmtree(base, ignore_errors=True)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+benchmarks/bench_meeting_shards.py
+==================================
+Query latency and context precision of rag_meeting_minutes on a large
+archive: one flat FAISS index (the previous layout, every question
+searches every chunk) against the sharded index with a meeting catalog
+(shards.py), where questions are routed to the meetings they name.
+
+The archive is --meetings transcripts generated from data/meeting.txt (see
+bench_meeting_ingest.py): meeting i is held in month i % 12 of 2026 on a
+random day, with five of twenty people.  Questions, --per-kind of each:
+  day          "... in the stand-up on the 14th of March?"
+  day_person   "What did Priya report on the 14th of March?"
+  month        "What risks were raised in March?"
+  range        "... between March and May?" / "... from March to May?"
+  person       "What was Priya's update on the backend?"
+  general      no meeting named ("Which tool is used for deployment?")
+The relevant meetings come from the generator, not from the catalog.
+
+Layouts (SHARD_BY), each built by ingest.py into its own folder:
+  flat            SHARD_BY=none, unrouted        (previous query.py)
+  flat_filtered   SHARD_BY=none, routed          (catalog filter, one index)
+  month           SHARD_BY=month, routed         (default)
+  month_fanout    SHARD_BY=month, unrouted       (cost of searching all shards)
+  meeting         SHARD_BY=meeting, routed
+
+Reported per layout and kind:
+  precision   share of the TOP_K retrieved chunks from a relevant meeting
+  hit_rate    questions with at least one relevant chunk
+  search_ms   route + vector search (p50 / mean); the question is embedded
+              once for all layouts, embed_ms is reported separately
+  shards      shards searched per question
+plus per layout: build_s, load_s (query.current_index from disk) and
+add_one_s (ingest.py after one new meeting is dropped in).
+
+Embeddings come from fixture_ollama.py (gauge_rag2 HashingEmbedder vectors,
+lexical), so precision without routing is lower than nomic-embed-text
+would give; the routed layouts do not depend on the embedder for it.
+
+Usage:
+    python benchmarks/bench_meeting_shards.py
+    python benchmarks/bench_meeting_shards.py --meetings 200 --per-kind 20
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import re
+import shutil
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT    = Path(__file__).resolve().parent.parent
+PROJECT = ROOT / "RAG_PROJECTS" / "rag_meeting_minutes"
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(PROJECT))
+
+from bench_meeting_ingest import MONTHS, NAMES, POOL, _write_archive  # noqa: E402
+from fixture_ollama import add_ollama_args, from_args  # noqa: E402
+
+LAYOUTS = [("flat", "none", False), ("flat_filtered", "none", True), ("month", "month", True),
+           ("month_fanout", "month", False), ("meeting", "meeting", True)]
+TOPICS  = ["the backend", "the frontend", "testing", "the deployment setup", "the deadline"]
+GENERAL = ["Which tool is used for deployment?", "When is the code freeze planned?",
+           "Are there any blockers?", "How often are progress reviews held?",
+           "When will the automated test cases be written?"]
+
+
+# ── Ground truth ──────────────────────────────────────────────────────────────
+
+def _truth(archive, n):
+    """Per meeting path: (month, day, participants) as the generator made them."""
+    out = {}
+    for i in range(n):
+        path = archive / f"meeting_{i:04d}.txt"
+        if not path.exists():
+            continue
+        people = set(random.Random(i).sample(POOL, len(NAMES)))
+        day = int(re.search(r"(\d+)th of " + MONTHS[i % 12], path.read_text(encoding="utf-8")).group(1))
+        out[os.path.abspath(path)] = (i % 12 + 1, day, people)
+    return out
+
+
+def _questions(truth, per_kind, seed=0):
+    """[(kind, question, relevant meeting paths)]."""
+    rnd = random.Random(seed)
+    meetings = sorted(truth)
+    out = []
+    for _ in range(per_kind):
+        month, day, people = truth[rnd.choice(meetings)]
+        name, topic = rnd.choice(sorted(people)), rnd.choice(TOPICS)
+        on_day = {p for p, t in truth.items() if t[:2] == (month, day)}
+        out.append(("day", f"What was discussed about {topic} in the stand-up on the {day}th of "
+                           f"{MONTHS[month - 1]}?", on_day))
+        out.append(("day_person", f"What did {name} report on the {day}th of {MONTHS[month - 1]}?",
+                    {p for p in on_day if name in truth[p][2]}))
+        month = rnd.randint(1, 12)
+        out.append(("month", f"What risks about {topic} were raised in {MONTHS[month - 1]}?",
+                    {p for p, t in truth.items() if t[0] == month}))
+        first = rnd.randint(1, 11)
+        last = rnd.randint(first + 1, min(12, first + 3))
+        span = f"between {MONTHS[first - 1]} and {MONTHS[last - 1]}" if rnd.random() < 0.5 else \
+               f"from {MONTHS[first - 1]} to {MONTHS[last - 1]}"
+        out.append(("range", f"What was decided about {topic} {span}?",
+                    {p for p, t in truth.items() if first <= t[0] <= last}))
+        name = rnd.choice(POOL)
+        out.append(("person", f"What was {name}'s update on {topic}?",
+                    {p for p, t in truth.items() if name in t[2]}))
+        out.append(("general", rnd.choice(GENERAL), set(truth)))
+    return out
+
+
+# ── Runs ──────────────────────────────────────────────────────────────────────
+
+def _quiet(fn, *a, **kw):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*a, **kw)
+
+
+def _summary(rows):
+    ms = [r["ms"] for r in rows]
+    return {"precision": round(float(np.mean([r["precision"] for r in rows])), 3),
+            "hit_rate": round(float(np.mean([r["precision"] > 0 for r in rows])), 3),
+            "search_ms": {"p50": round(float(np.median(ms)), 2), "mean": round(float(np.mean(ms)), 2)},
+            "shards": round(float(np.mean([r["shards"] for r in rows])), 1)}
+
+
+def _run(query, questions, vectors, routed):
+    index, _ = query.current_index()
+    rows = {}
+    for (kind, question, relevant), vector in zip(questions, vectors):
+        t0 = time.perf_counter()
+        route = index.route(question) if routed else None
+        docs = index.search(vector, query.TOP_K, route)
+        ms = 1000 * (time.perf_counter() - t0)
+        searched = len(route.shards) if route is not None and route.files is not None else len(index.shards)
+        precision = sum(os.path.abspath(d.metadata["source"]) in relevant for d in docs) / max(1, len(docs))
+        rows.setdefault(kind, []).append({"ms": ms, "precision": precision, "shards": searched})
+    return {kind: _summary(r) for kind, r in rows.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--meetings", type=int, default=1000)
+    parser.add_argument("--per-kind", type=int, default=40, help="questions of each kind")
+    parser.add_argument("--dir", default=os.path.join("/tmp", "bench_meeting_shards"))
+    add_ollama_args(parser)
+    parser.set_defaults(request_ms=0.0, text_ms=0.0)
+    args = parser.parse_args()
+
+    fake = from_args(args)
+    base = Path(args.dir)
+    shutil.rmtree(base, ignore_errors=True)
+    archive = base / "meetings"
+    os.environ.update({"OLLAMA_BASE_URL": fake.url, "DATA_DIR": str(archive),
+                       "VECTOR_DB_DIR": str(base / "index_none"), "ANSWER_CACHE": "off"})
+    import ingest                                         # these read the environment at import
+    import query
+
+    new_file = _write_archive(archive, args.meetings)
+    held = base / new_file.name
+    shutil.move(str(new_file), held)
+    truth = _truth(archive, args.meetings)
+    questions = _questions(truth, args.per_kind)
+
+    t0 = time.perf_counter()
+    vectors = [query.embeddings.embed_query(q) for _, q, _ in questions]
+    report = {"meetings": len(truth), "questions": len(questions), "top_k": query.TOP_K,
+              "embed_ms": round(1000 * (time.perf_counter() - t0) / len(questions), 2), "layouts": {}}
+
+    built = {}
+    for name, shard_by, routed in LAYOUTS:
+        folder = str(base / f"index_{shard_by}")
+        ingest.SHARD_BY, ingest.VECTOR_DB_DIR, query.VECTOR_DB_DIR = shard_by, folder, folder
+        query._vectorstore = query._version = None
+        entry = {}
+        if shard_by not in built:
+            t0 = time.perf_counter()
+            _quiet(ingest.ingest, [str(archive)], rebuild=True)
+            built[shard_by] = {"build_s": round(time.perf_counter() - t0, 2)}
+            t0 = time.perf_counter()
+            index, _ = query.current_index()
+            built[shard_by].update(load_s=round(time.perf_counter() - t0, 2), shards=len(index.shards),
+                                   chunks=index.chunks)
+            entry.update(built[shard_by])
+        entry["kinds"] = _run(query, questions, vectors, routed)
+        report["layouts"][name] = entry
+        print(json.dumps({name: entry}), file=sys.stderr)
+
+    shutil.move(str(held), new_file)                      # one new meeting, every layout
+    for shard_by in built:
+        folder = str(base / f"index_{shard_by}")
+        ingest.SHARD_BY, ingest.VECTOR_DB_DIR = shard_by, folder
+        t0 = time.perf_counter()
+        _quiet(ingest.ingest, [str(archive)])
+        built[shard_by]["add_one_s"] = round(time.perf_counter() - t0, 3)
+    report["add_one_s"] = {shard_by: b["add_one_s"] for shard_by, b in built.items()}
+
+    fake.shutdown()
+    shutil.rmtree(base, ignore_errors=True)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+benchmarks/bench_onnx_encoder.py
+================================
+PyTorch vs ONNX Runtime (float32 / int8) encoding through
+rag_common.onnx_encoder.
+
+Workloads, taken from the repo's knowledge bases:
+  sentences   single sentences / list items (query-sized)
+  chunks      256-token chunks from rag_common.chunker (what the embedders encode)
+
+Reported per backend:
+  cold_load_s        fresh process: imports + model load + first encode
+                     (export excluded; it runs once beforehand)
+  sentences_per_s, chunks_per_s   batch-32 throughput per workload
+  query_ms           median latency of a single-query encode
+  cosine_min/mean    agreement with the PyTorch vectors of the same texts
+  rss_mb             peak RSS of the cold-load process
+
+Usage:
+    python benchmarks/bench_onnx_encoder.py
+    python benchmarks/bench_onnx_encoder.py --model all-MiniLM-L6-v2 --threads 1 2 4
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from rag_common import chunker                               # noqa: E402
+from rag_common.onnx_encoder import BACKENDS, load_encoder   # noqa: E402
+
+
+def _workloads(n):
+    sentences, chunks = [], []
+    for path in sorted(ROOT.glob("Gauge/gauge_rag3/knowledge_base/*/*.txt")) + \
+                sorted(ROOT.glob("ai_automation_using_gauge/rag_data/*.txt")) + \
+                sorted(ROOT.glob("RAG_PROJECTS/rag_meeting_minutes/data/*.txt")):
+        text = path.read_text(encoding="utf-8")
+        units, _ = chunker._split(text, final=True)
+        sentences += [u.strip() for u in units if len(u.split()) >= 3]
+        chunks    += [c.text for c in chunker.chunk_text(text, 256, 32)]
+    return {"sentences": (sentences * (n // len(sentences) + 1))[:n],
+            "chunks":    (chunks * (n // 4 // len(chunks) + 1))[:n // 4]}
+
+
+def _child(model, backend, threads):
+    """Cold load in a fresh process: print load seconds and peak RSS."""
+    t0 = time.perf_counter()
+    encoder = load_encoder(model, backend, threads)
+    encoder.encode(["warm-up query"], show_progress_bar=False)
+    print(json.dumps({"cold_load_s": round(time.perf_counter() - t0, 2), "rss_mb": _peak_rss_mb()}))
+
+
+def _peak_rss_mb():
+    """VmHWM (ru_maxrss would include the forking parent's peak on Linux)."""
+    try:
+        with open("/proc/self/status") as f:
+            return round(int(next(line for line in f if line.startswith("VmHWM")).split()[1]) / 1024, 1)
+    except (OSError, StopIteration):
+        return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--threads", type=int, nargs="+", default=[None], help="ONNX intra-op threads to try")
+    parser.add_argument("--sentences", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--child", choices=BACKENDS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return _child(args.model, args.child, args.threads[0])
+
+    import torch
+    work = _workloads(args.sentences)
+    report = {"model": args.model, "cpus": os.cpu_count(), "torch_threads": torch.get_num_threads(),
+              "workload_sizes": {k: len(v) for k, v in work.items()}}
+
+    t0 = time.perf_counter()
+    for backend in args.backends:
+        load_encoder(args.model, backend)                # export once, outside the timings
+    report["export_s"] = round(time.perf_counter() - t0, 1)
+
+    reference = {}
+    for backend in args.backends:
+        for threads in (args.threads if backend != "torch" else [None]):
+            label   = backend if threads is None else f"{backend}@{threads}"
+            cmd     = [sys.executable, __file__, "--model", args.model, "--child", backend]
+            cmd    += ["--threads", str(threads)] if threads else []
+            row     = json.loads(subprocess.run(cmd, capture_output=True, text=True, check=True).stdout.strip().splitlines()[-1])
+            encoder = load_encoder(args.model, backend, threads)
+            for name, texts in work.items():
+                encoder.encode(texts[:32], show_progress_bar=False)
+                t0   = time.perf_counter()
+                vecs = encoder.encode(texts, batch_size=32, show_progress_bar=False, normalize_embeddings=True)
+                row[f"{name}_per_s"] = round(len(texts) / (time.perf_counter() - t0), 1)
+                if backend == "torch":
+                    reference[name] = vecs
+                elif name in reference:
+                    cos = np.sum(reference[name] * vecs, axis=1)
+                    row[f"{name}_cosine_min"]  = round(float(cos.min()), 5)
+                    row[f"{name}_cosine_mean"] = round(float(cos.mean()), 5)
+            lat = []
+            for q in work["sentences"][:args.queries]:
+                t0 = time.perf_counter()
+                encoder.encode([q], show_progress_bar=False)
+                lat.append((time.perf_counter() - t0) * 1000)
+            row["query_ms"] = round(float(np.median(lat)), 2)
+            report[label] = row
+            print(json.dumps({label: row}), file=sys.stderr, flush=True)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
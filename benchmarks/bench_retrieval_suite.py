@@ -0,0 +1,450 @@
+"""
+benchmarks/bench_retrieval_suite.py
+===================================
+Retrieval quality and latency of every RAG implementation in the repo,
+each driven through its own indexing and query code, on the same corpus
+and the same labelled queries.
+
+Backends:
+  gauge_rag3       rag/embedder.run() into ChromaDB, queried through
+                   rag_service.RagCore (hybrid BM25 + vector)       needs chromadb
+  gauge_rag2       rag.retriever.Retriever: build_index() over a
+                   site_knowledge.json, retrieve() (hybrid, score filter)
+                                                                     needs openai (imported by rag.embedder)
+  ai_automation    intelligence_layer.rag_engine.RAGEngine          needs faiss
+  meeting_minutes  ingest.chunk() into LangChain FAISS, queried with
+                   as_retriever() like query.py                      needs langchain-community, faiss
+A backend whose dependencies are missing is reported as skipped.
+
+Corpus: the knowledge bases of all four projects (gauge_rag3
+knowledge_base, ai_automation rag_data, gauge_rag2 site_knowledge.json as
+one paragraph per test pattern, the meeting transcript), written flat into
+--dir, plus synthetic distractor files up to --scales x its size.  The
+distractors are a bigram chain over the corpus' own words, so they share
+its vocabulary but contain none of the label phrases.
+
+Queries: benchmarks/retrieval_queries.json, hand-labelled.  A retrieved
+chunk is relevant when it comes from a labelled file and contains the
+label's phrase; recall@k is the share of a query's labels met in the top k.
+
+Embeddings: --model hash (default) is gauge_rag2's HashingEmbedder, 384
+dims, so the suite runs offline; any other name is loaded with
+rag_common.onnx_encoder.load_encoder (a local sentence-transformers path
+works).  The embedding cache is off, so builds always encode.
+
+Reported per backend and scale (each run in a fresh process):
+  build_s          index build from nothing (model load excluded: load_s)
+  recall@k, mrr    averaged over the queries
+  p50_ms, p95_ms   single-query latency over --repeats passes (after one
+                   warm-up pass, which also builds lazy BM25 indexes)
+  rss_index_mb     RSS growth across build + queries
+  rss_peak_mb      peak RSS of the process
+  disk_mb          size of what the backend wrote
+
+Usage:
+    python benchmarks/bench_retrieval_suite.py
+    python benchmarks/bench_retrieval_suite.py --scales 1 --backends ai_automation --k 1 5
+    python benchmarks/bench_retrieval_suite.py --model /models/all-MiniLM-L6-v2 --encoder-backend onnx-int8 --out report.json
+"""
+
+import argparse
+import importlib.util
+import json
+import logging
+import os
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from rag_common import chunker  # noqa: E402
+
+QUERIES  = Path(__file__).resolve().parent / "retrieval_queries.json"
+SOURCES  = ["Gauge/gauge_rag3/knowledge_base/*/*.txt", "ai_automation_using_gauge/rag_data/*.txt",
+            "RAG_PROJECTS/rag_meeting_minutes/data/*.txt"]
+SITE_KB  = "Gauge/gauge_rag2/knowledge_base/site_knowledge.json"
+BACKENDS = ("gauge_rag3", "gauge_rag2", "ai_automation", "meeting_minutes")
+SYNTHETIC_CHARS = 16 << 10       # size of one distractor file
+
+
+def _norm(text):
+    return " ".join(text.lower().split())
+
+
+def _doc_name(path):
+    """Flat corpus file name of a repo file (site_knowledge.json is written as text)."""
+    return Path(path).stem + ".txt"
+
+
+# ── Corpus ────────────────────────────────────────────────────────────────────
+
+def _base_docs():
+    docs = {}
+    for pattern in SOURCES:
+        for path in sorted(ROOT.glob(pattern)):
+            docs[_doc_name(path)] = path.read_text(encoding="utf-8")
+    with open(ROOT / SITE_KB, encoding="utf-8") as f:
+        patterns = json.load(f).get("test_patterns", [])
+    # rag2's own text form of a pattern (Retriever.build_index), one per paragraph
+    docs[_doc_name(SITE_KB)] = "\n\n".join(
+        f"{p.get('title', '')} {p.get('description', '')} {' '.join(p.get('steps', []))}" for p in patterns) + "\n"
+    return docs
+
+
+def _corpus(directory: Path, scale: int, phrases):
+    """Write (or reuse) the corpus for a scale; returns its directory."""
+    out    = directory / f"corpus_x{scale}"
+    marker = out / ".complete"
+    if marker.exists():
+        return out
+    shutil.rmtree(out, ignore_errors=True)
+    out.mkdir(parents=True)
+    docs = _base_docs()
+    for name, text in docs.items():
+        (out / name).write_text(text, encoding="utf-8")
+
+    target = sum(len(t) for t in docs.values()) * (scale - 1)
+    if target > 0:
+        words = " ".join(docs.values()).split()
+        follow = {}
+        for a, b in zip(words, words[1:]):
+            follow.setdefault(a, []).append(b)
+        i = 0
+        while target > 0:
+            text = _synthetic(random.Random(i), words, follow, phrases)
+            (out / f"synthetic_{i:04d}.txt").write_text(text, encoding="utf-8")
+            target -= len(text)
+            i += 1
+    marker.touch()
+    return out
+
+
+def _synthetic(rnd, words, follow, phrases):
+    """One distractor file: headings, paragraphs and lists walked off the word bigrams."""
+    def sentence(lo, hi):
+        w = [rnd.choice(words)]
+        for _ in range(rnd.randint(lo, hi)):
+            w.append(rnd.choice(follow.get(w[-1]) or words))
+        s = " ".join(w).strip(".")
+        return s[:1].upper() + s[1:] + "."
+
+    blocks, size = [], 0
+    while size < SYNTHETIC_CHARS:
+        kind = rnd.random()
+        if kind < 0.15:
+            block = "## " + sentence(2, 5).rstrip(".")
+        elif kind < 0.35:
+            block = "\n".join("- " + sentence(3, 10) for _ in range(rnd.randint(3, 7)))
+        else:
+            block = " ".join(sentence(8, 25) for _ in range(rnd.randint(3, 6)))
+        if any(p in _norm(block) for p in phrases):
+            continue
+        blocks.append(block)
+        size += len(block) + 2
+    return "\n\n".join(blocks) + "\n"
+
+
+# ── Encoders ──────────────────────────────────────────────────────────────────
+
+class _HashEncoder:
+    """gauge_rag2's HashingEmbedder behind the sentence-transformers encode() interface."""
+
+    def __init__(self, dims=384):
+        sys.path.insert(0, str(ROOT / "Gauge" / "gauge_rag2"))
+        from rag.hash_embedder import HashingEmbedder
+        self._hasher = HashingEmbedder(dims=dims)
+        self.embedding_revision = f"hash-{dims}-r{HashingEmbedder.REVISION}"
+
+    def get_sentence_embedding_dimension(self):
+        return self._hasher.dims
+
+    def encode(self, sentences, batch_size=32, show_progress_bar=False, convert_to_numpy=True,
+               normalize_embeddings=False, **_):
+        single = isinstance(sentences, str)
+        vecs   = self._hasher.embed_batch([sentences] if single else list(sentences))
+        return vecs[0] if single else vecs
+
+
+def _load_encoder(model, backend, dims):
+    if model == "hash":
+        return _HashEncoder(dims)
+    from rag_common.onnx_encoder import load_encoder
+    return load_encoder(model, backend)
+
+
+# ── Backends ──────────────────────────────────────────────────────────────────
+# build(corpus, encoder) indexes every file of the flat corpus with the
+# project's own code; search(query, k) returns [(corpus file name, chunk text)].
+
+def _load_module(name, path):
+    spec   = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class Rag3Backend:
+    def __init__(self, work: Path):
+        self.work = work
+        rag = ROOT / "Gauge" / "gauge_rag3" / "rag"
+        self.embedder = _load_module("rag3_embedder", rag / "embedder.py")
+        self.service  = _load_module("rag3_service", rag / "rag_service.py")
+        import chromadb  # noqa: F401  (imported lazily by both modules)
+
+    def build(self, corpus, encoder):
+        for module in (self.embedder, self.service):
+            module.load_encoder = lambda *a, **kw: encoder
+        chroma = str(self.work / ".chromadb")
+        self.embedder.KNOWLEDGE_SOURCES = {"corpus": str(corpus)}
+        self.embedder.CHROMA_DIR    = self.service.CHROMA_DIR    = chroma
+        self.embedder.MANIFEST_FILE = self.service.MANIFEST_FILE = os.path.join(chroma, "kb_manifest.json")
+        os.makedirs(chroma, exist_ok=True)
+        self.embedder.run()
+        self.core = self.service.RagCore()
+
+    def search(self, query, k):
+        return [(r["file"], r["text"]) for r in self.core.retrieve_many([query], k)[0]]
+
+
+class Rag2Backend:
+    def __init__(self, work: Path):
+        self.work = work
+        sys.path.insert(0, str(ROOT / "Gauge" / "gauge_rag2"))
+        import config
+        from rag.retriever import Retriever
+        config.VECTOR_STORE_PATH      = str(work / "vector_store.json")
+        config.KNOWLEDGE_BASE_PATH    = str(work / "site_knowledge.json")
+        config.EXECUTION_RESULTS_PATH = str(work / "no_execution_results.json")
+        config.EXECUTION_HISTORY_PATH = str(work / "no_execution_history.json")
+        self.retriever_cls = Retriever
+
+    def build(self, corpus, encoder):
+        # the retriever indexes test patterns: the site's own stay one entry
+        # each, every other file is chunked into description-only patterns
+        patterns, self.doc_of = [], {}
+        for path in sorted(corpus.glob("*.txt")):
+            text = path.read_text(encoding="utf-8")
+            if path.name == _doc_name(SITE_KB):
+                parts = [p.strip() for p in text.split("\n\n") if p.strip()]
+            else:
+                parts = [c.text for c in chunker.chunk_text(text)]
+            for part in parts:
+                patterns.append({"title": "", "description": part, "steps": []})
+                self.doc_of.setdefault(part, path.name)
+        with open(self.work / "site_knowledge.json", "w", encoding="utf-8") as f:
+            json.dump({"test_patterns": patterns}, f)
+
+        class Embedder:
+            def embed(self, text):
+                return encoder.encode([text], normalize_embeddings=True)[0].tolist()
+
+            def embed_batch(self, texts):
+                return encoder.encode(texts, normalize_embeddings=True).tolist()
+
+        t0 = time.perf_counter()
+        self.retriever = self.retriever_cls()
+        self.retriever.embedder = Embedder()
+        self.retriever.build_index()
+        return time.perf_counter() - t0               # KB file writing is corpus prep, not build
+
+    def search(self, query, k):
+        return [(self.doc_of.get(t.strip(), "?"), t) for t in self.retriever.retrieve(query, top_k=k)]
+
+
+class AiAutomationBackend:
+    def __init__(self, work: Path):
+        sys.path.insert(0, str(ROOT / "ai_automation_using_gauge"))
+        from intelligence_layer import rag_engine
+        import faiss  # noqa: F401  (the engine persists its index with it)
+        self.engine_mod = rag_engine
+        rag_engine.INDEX_DIR = work / ".rag_index"
+
+    def build(self, corpus, encoder):
+        self.engine_mod.RAG_DATA_DIR = corpus
+        self.engine_mod.load_encoder = lambda *a, **kw: encoder
+        self.engine = self.engine_mod.RAGEngine()
+        self.doc_of = {}
+        for name, info in self.engine._files.items():
+            lo, hi = info["rows"]
+            for text in self.engine._chunks[lo:hi]:
+                self.doc_of.setdefault(text, name)
+
+    def search(self, query, k):
+        # query() joins the chunks with "\n\n---\n\n", which markdown chunks
+        # can contain too: rejoin pieces until they form a known chunk
+        sep   = "\n\n---\n\n"
+        parts = self.engine.query(query, k).split(sep)
+        hits, i = [], 0
+        while i < len(parts) and parts[i]:
+            j = next((j for j in range(i + 1, len(parts) + 1) if sep.join(parts[i:j]) in self.doc_of), i + 1)
+            text = sep.join(parts[i:j])
+            hits.append((self.doc_of.get(text, "?"), text))
+            i = j
+        return hits
+
+
+class MeetingBackend:
+    def __init__(self, work: Path):
+        self.work = work
+        from langchain_core.embeddings import Embeddings
+        from langchain_community.vectorstores import FAISS
+        sys.path.insert(0, str(ROOT / "RAG_PROJECTS" / "rag_meeting_minutes"))
+        import ingest
+        self.ingest, self.embeddings_cls, self.faiss = ingest, Embeddings, FAISS
+
+    def build(self, corpus, encoder):
+        class LocalEmbeddings(self.embeddings_cls):
+            def embed_documents(self, texts):
+                return encoder.encode(list(texts)).tolist()
+
+            def embed_query(self, text):
+                return encoder.encode([text])[0].tolist()
+
+        embeddings = LocalEmbeddings()
+        docs = [doc for path in sorted(corpus.glob("*.txt")) for _, doc in self.ingest.chunk(str(path))]
+        index_dir = str(self.work / "faiss_index")
+        self.faiss.from_documents(docs, embeddings).save_local(index_dir)
+        self.store = self.faiss.load_local(index_dir, embeddings, allow_dangerous_deserialization=True)
+
+    def search(self, query, k):
+        hits = self.store.as_retriever(search_kwargs={"k": k}).invoke(query)
+        return [(d.metadata.get("source_file", "?"), d.page_content) for d in hits]
+
+
+_BACKENDS = {"gauge_rag3": Rag3Backend, "gauge_rag2": Rag2Backend,
+             "ai_automation": AiAutomationBackend, "meeting_minutes": MeetingBackend}
+
+
+# ── Measurement ───────────────────────────────────────────────────────────────
+
+def _proc_mb(field):
+    """VmRSS / VmHWM of this process in MB (ru_maxrss as a fallback for both)."""
+    try:
+        with open("/proc/self/status") as f:
+            return round(int(next(line for line in f if line.startswith(field)).split()[1]) / 1024, 1)
+    except (OSError, StopIteration):
+        return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def _disk_mb(path: Path):
+    return round(sum(p.stat().st_size for p in path.rglob("*") if p.is_file()) / (1 << 20), 2)
+
+
+def _labels(queries):
+    return [[(_doc_name(r["file"]), _norm(r["contains"])) for r in q["relevant"]] for q in queries]
+
+
+def _score(hits, labels, ks):
+    """recall@k per k and reciprocal rank of the first relevant hit, for one query."""
+    met = [{i for i, (doc, phrase) in enumerate(labels) if doc == d and phrase in _norm(t)} for d, t in hits]
+    row = {}
+    for k in ks:
+        row[f"recall@{k}"] = len(set().union(*met[:k])) / len(labels)
+    row["mrr"] = next((1 / (rank + 1) for rank, m in enumerate(met) if m), 0.0)
+    return row
+
+
+def _child(backend, corpus, work, args):
+    """Build and query one backend in this process; print its row."""
+    work.mkdir(parents=True, exist_ok=True)
+    os.chdir(work)                                    # rag3 creates its folders relative to the cwd
+    t0 = time.perf_counter()
+    try:
+        impl    = _BACKENDS[backend](work)
+        encoder = _load_encoder(args.model, args.encoder_backend, args.dims)
+    except ImportError as e:
+        print(json.dumps({"skipped": f"{type(e).__name__}: {e}"}))
+        return
+    logging.disable(logging.INFO)
+    load_s = time.perf_counter() - t0
+    queries = json.loads(QUERIES.read_text(encoding="utf-8"))["queries"]
+    labels  = _labels(queries)
+    depth   = max(args.k)
+
+    rss0 = _proc_mb("VmRSS")
+    t0 = time.perf_counter()
+    build_s = impl.build(corpus, encoder)
+    build_s = build_s if build_s is not None else time.perf_counter() - t0
+
+    rows = [_score(impl.search(q["query"], depth), lab, args.k) for q, lab in zip(queries, labels)]
+    lat = []
+    for _ in range(args.repeats):
+        for q in queries:
+            t0 = time.perf_counter()
+            impl.search(q["query"], depth)
+            lat.append((time.perf_counter() - t0) * 1000)
+
+    out = {"load_s": round(load_s, 2), "build_s": round(build_s, 2)}
+    for key in rows[0]:
+        out[key] = round(float(np.mean([r[key] for r in rows])), 4)
+    out["p50_ms"]       = round(float(np.percentile(lat, 50)), 2)
+    out["p95_ms"]       = round(float(np.percentile(lat, 95)), 2)
+    out["rss_index_mb"] = round(_proc_mb("VmRSS") - rss0, 1)
+    out["rss_peak_mb"]  = _proc_mb("VmHWM")
+    out["disk_mb"]      = _disk_mb(work)
+    out["misses"]       = [q["id"] for q, r in zip(queries, rows) if r["mrr"] == 0]
+    print(json.dumps(out))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 50],
+                        help="corpus size as a multiple of the real knowledge bases (1 = no distractors)")
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 3, 5, 10])
+    parser.add_argument("--repeats", type=int, default=3, help="timed passes over the queries")
+    parser.add_argument("--model", default="hash", help="'hash' (offline) or an embedding model name / path")
+    parser.add_argument("--encoder-backend", default="torch", help="load_encoder backend for --model")
+    parser.add_argument("--dims", type=int, default=384, help="hash embedding size")
+    parser.add_argument("--dir", default=os.path.join("/tmp", "bench_retrieval_suite"))
+    parser.add_argument("--out", help="also write the JSON report here")
+    parser.add_argument("--child", choices=BACKENDS, help=argparse.SUPPRESS)
+    parser.add_argument("--corpus", help=argparse.SUPPRESS)
+    parser.add_argument("--work", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return _child(args.child, Path(args.corpus), Path(args.work), args)
+
+    queries = json.loads(QUERIES.read_text(encoding="utf-8"))["queries"]
+    phrases = {p for lab in _labels(queries) for _, p in lab}
+    base    = Path(args.dir)
+    env     = {**os.environ, "RAG_EMBEDDING_CACHE": "off"}
+    report  = {"model": args.model if args.model == "hash" else f"{args.model} ({args.encoder_backend})",
+               "queries": len(queries), "cpus": os.cpu_count(), "corpus": {}, "results": {}}
+
+    for scale in args.scales:
+        corpus = _corpus(base, scale, phrases)
+        files  = list(corpus.glob("*.txt"))
+        report["corpus"][f"x{scale}"] = {"files": len(files),
+                                         "mb": round(sum(p.stat().st_size for p in files) / (1 << 20), 2)}
+        for backend in args.backends:
+            work = base / f"run_{backend}_x{scale}"
+            shutil.rmtree(work, ignore_errors=True)
+            cmd  = [sys.executable, os.path.abspath(__file__), "--child", backend, "--corpus", str(corpus),
+                    "--work", str(work), "--model", args.model, "--encoder-backend", args.encoder_backend,
+                    "--dims", str(args.dims), "--repeats", str(args.repeats), "--k", *map(str, args.k)]
+            proc = subprocess.run(cmd, capture_output=True, text=True, env=env)
+            if proc.returncode == 0:
+                row = json.loads(proc.stdout.strip().splitlines()[-1])
+            else:
+                row = {"error": (proc.stderr.strip().splitlines() or ["exit %d" % proc.returncode])[-1]}
+            shutil.rmtree(work, ignore_errors=True)
+            report["results"].setdefault(backend, {})[f"x{scale}"] = row
+            print(json.dumps({backend: {f"x{scale}": row}}), file=sys.stderr, flush=True)
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
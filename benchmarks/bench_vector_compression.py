@@ -0,0 +1,92 @@
+"""
+benchmarks/bench_vector_compression.py
+======================================
+Memory / latency / recall of the vector-compression settings in
+rag_common.ann (int8 scalar quantisation, PCA, both), with and without
+full-precision re-ranking of RERANK_FACTOR * k candidates.
+
+Vectors are synthetic with an embedding-like spectrum: --topics cluster
+centres plus noise whose per-dimension variance decays as a power law (so
+PCA has something to find, as with real sentence embeddings), rotated by a
+random orthogonal matrix and L2-normalised.  Ground truth is exact
+float32 inner-product top-10.
+
+Reported per setting:
+  bytes_per_vector   serialised index size / n (what the index holds in RAM;
+                     re-ranking additionally reads k * RERANK_FACTOR rows of
+                     the float32 matrix per query, which stays on disk)
+  ms_per_query       single-query latency including re-ranking
+  recall@10          vs exact float32 search
+
+Usage:
+    python benchmarks/bench_vector_compression.py
+    python benchmarks/bench_vector_compression.py --n 200000 --backend ivf
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from rag_common import ann  # noqa: E402
+
+SETTINGS = ["none", "sq8", "pca192", "pca128", "pca128+sq8", "pca64+sq8"]
+
+
+def _data(n, dim, topics, rng):
+    scale   = (np.arange(1, dim + 1, dtype=np.float32) ** -0.75) * 2.0
+    rot, _  = np.linalg.qr(rng.standard_normal((dim, dim)).astype(np.float32))
+    centres = rng.standard_normal((topics, dim)).astype(np.float32) * scale
+    out = (centres[rng.integers(0, topics, n)] + rng.standard_normal((n, dim)).astype(np.float32) * scale * 0.6) @ rot
+    out /= np.linalg.norm(out, axis=1, keepdims=True)
+    return out.astype(np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--topics", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--backend", default="exact", choices=["exact", "hnsw", "ivf"])
+    args = parser.parse_args()
+
+    import faiss
+    faiss.omp_set_num_threads(1)
+    rng     = np.random.default_rng(0)
+    data    = _data(args.n + args.queries, args.dim, args.topics, rng)
+    data, queries = data[:args.n], data[args.n:]
+    truth   = faiss.IndexFlatIP(args.dim)
+    truth.add(data)
+    _, truth = truth.search(queries, 10)
+
+    report = {"n": args.n, "dim": args.dim, "backend": args.backend, "rerank_factor": ann.RERANK_FACTOR}
+    for setting in SETTINGS:
+        t0    = time.perf_counter()
+        index = ann.build_index(data, args.backend, setting)
+        build = time.perf_counter() - t0
+        row   = {"index": ann.describe(index), "build_s": round(build, 2),
+                 "bytes_per_vector": round(faiss.serialize_index(index).size / args.n, 1)}
+        for label, vectors in (("no_rerank", None), ("rerank", data)):
+            if vectors is not None and setting == "none":
+                continue
+            found = np.empty((len(queries), 10), dtype=np.int64)
+            t0 = time.perf_counter()
+            for i in range(len(queries)):
+                _, found[i] = ann.search(index, queries[i:i + 1], 10, vectors)
+            ms = (time.perf_counter() - t0) * 1000 / len(queries)
+            recall = np.mean([len(set(f) & set(t)) / 10 for f, t in zip(found, truth)])
+            row[label] = {"ms_per_query": round(ms, 3), "recall@10": round(float(recall), 4)}
+        report[setting] = row
+        print(json.dumps({setting: row}), file=sys.stderr, flush=True)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
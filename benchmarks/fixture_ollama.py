@@ -0,0 +1,202 @@
+"""
+benchmarks/fixture_ollama.py
+============================
+Local stand-in for an Ollama server, for benchmarks that must not depend on
+a model being installed.
+
+Endpoints (same request / response shapes as Ollama):
+  /api/embed        {"model", "input": str | [str]}  -> {"embeddings": [[...]]}
+  /api/embeddings   {"model", "prompt"}              -> {"embedding": [...]}
+  /api/generate     {"model", "prompt", "stream"}    -> NDJSON {"response", "done"} lines,
+                                                       or one JSON object when stream is false
+                                                       (no prompt: load the model, answer at once)
+  /v1/chat/completions  {"model", "messages"}        -> OpenAI-style completion with "usage"
+                                                       (Ollama's OpenAI-compatible API; Groq and
+                                                       openai clients can point their base URL here)
+
+Embeddings are gauge_rag2 HashingEmbedder vectors (768 dims, like
+nomic-embed-text).  A generated answer is the first TOKENS words of the
+prompt's "Context:" section (chat: of the last message), one word per token.
+
+Simulated cost:
+  request_ms        per request (HTTP + scheduling; requests overlap)
+  text_ms           per embedded text
+  prefill_ms        per generation, before the first token
+  prefill_token_ms  per prompt token (rag_common.chunker estimate), before the first token
+  token_ms          per generated token
+Model work (text_ms, prefill_ms, token_ms) holds one of PARALLEL slots
+(OLLAMA_NUM_PARALLEL), so client-side concurrency cannot fake compute.
+
+Usage:
+    python benchmarks/fixture_ollama.py --port 11434 --prefill-ms 300 --token-ms 30
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "Gauge" / "gauge_rag2"))
+
+from rag.hash_embedder import HashingEmbedder  # noqa: E402
+from rag_common.chunker import estimate_tokens  # noqa: E402
+
+
+class FakeOllama(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, request_ms=8.0, text_ms=4.0, prefill_ms=300.0, token_ms=30.0, tokens=40,
+                 parallel=1, port=0, prefill_token_ms=0.0):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.request_s = request_ms / 1000
+        self.text_s    = text_ms / 1000
+        self.prefill_s = prefill_ms / 1000
+        self.token_s   = token_ms / 1000
+        self.prompt_token_s = prefill_token_ms / 1000
+        self.tokens    = tokens
+        self.slots     = threading.Semaphore(parallel)
+        self.hasher    = HashingEmbedder(dims=768)
+        self.lock      = threading.Lock()
+        self.requests  = self.texts = self.generations = 0
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def prefill_s_for(self, prompt):
+        return self.prefill_s + self.prompt_token_s * estimate_tokens([prompt])[0]
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def counters(self):
+        """Requests / embedded texts / generations since the last call."""
+        with self.lock:
+            out = {"requests": self.requests, "texts": self.texts, "generations": self.generations}
+            self.requests = self.texts = self.generations = 0
+        return out
+
+    def count(self, texts=0, generations=0):
+        with self.lock:
+            self.requests    += 1
+            self.texts       += texts
+            self.generations += generations
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"          # keep-alive, as Ollama
+    disable_nagle_algorithm = True         # small writes (headers, streamed tokens) go out at once
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        srv  = self.server
+        if self.path == "/api/generate":
+            return self._generate(body)
+        if self.path == "/v1/chat/completions":
+            return self._chat(body)
+        if self.path == "/api/embed":
+            texts = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        elif self.path == "/api/embeddings":
+            texts = [body["prompt"]]
+        else:
+            return self._send(404, b"404 page not found")
+        time.sleep(srv.request_s)
+        with srv.slots:
+            time.sleep(srv.text_s * len(texts))
+        vecs = srv.hasher.embed_batch(texts).tolist()
+        srv.count(texts=len(texts))
+        out = {"embeddings": vecs} if self.path == "/api/embed" else {"embedding": vecs[0]}
+        self._send(200, json.dumps(out).encode())
+
+    def _generate(self, body):
+        srv    = self.server
+        prompt = body.get("prompt", "")
+        words  = prompt.split("Context:", 1)[-1].split("Question:", 1)[0].split()[:srv.tokens] or ["n/a"]
+        model  = body.get("model", "")
+        time.sleep(srv.request_s)
+        if not prompt:                      # Ollama: no prompt just loads the model
+            srv.count()
+            return self._send(200, json.dumps({"model": model, "response": "", "done": True,
+                                               "done_reason": "load"}).encode())
+        srv.count(generations=1)
+        if not body.get("stream", True):
+            with srv.slots:
+                time.sleep(srv.prefill_s_for(prompt) + srv.token_s * len(words))
+            return self._send(200, json.dumps({"model": model, "response": " ".join(words), "done": True}).encode())
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        with srv.slots:
+            time.sleep(srv.prefill_s_for(prompt))
+            for i, word in enumerate(words):
+                time.sleep(srv.token_s)
+                self._chunk({"model": model, "response": word if i == 0 else " " + word, "done": False})
+        self._chunk({"model": model, "response": "", "done": True, "done_reason": "stop"})
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _chat(self, body):
+        srv      = self.server
+        messages = body.get("messages") or [{"content": ""}]
+        prompt   = "\n".join(str(m.get("content", "")) for m in messages)
+        words    = str(messages[-1].get("content", "")).split()[:srv.tokens] or ["n/a"]
+        time.sleep(srv.request_s)
+        srv.count(generations=1)
+        with srv.slots:
+            time.sleep(srv.prefill_s_for(prompt) + srv.token_s * len(words))
+        prompt_tokens = estimate_tokens([prompt])[0]
+        return self._send(200, json.dumps({
+            "id": f"chatcmpl-{srv.generations}", "object": "chat.completion", "created": int(time.time()),
+            "model": body.get("model", ""),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": " ".join(words)}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(words),
+                      "total_tokens": prompt_tokens + len(words)},
+        }).encode())
+
+    def _chunk(self, obj):
+        data = json.dumps(obj).encode() + b"\n"
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def _send(self, code, data):
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def add_ollama_args(parser):
+    parser.add_argument("--request-ms", type=float, default=8.0, help="fake Ollama: per-request overhead")
+    parser.add_argument("--text-ms", type=float, default=4.0, help="fake Ollama: per embedded text")
+    parser.add_argument("--prefill-ms", type=float, default=300.0, help="fake Ollama: before the first token")
+    parser.add_argument("--prefill-token-ms", type=float, default=0.0, help="fake Ollama: per prompt token")
+    parser.add_argument("--token-ms", type=float, default=30.0, help="fake Ollama: per generated token")
+    parser.add_argument("--tokens", type=int, default=40, help="fake Ollama: tokens per answer")
+    parser.add_argument("--server-parallel", type=int, default=1, help="fake Ollama: OLLAMA_NUM_PARALLEL")
+
+
+def from_args(args, port=0):
+    return FakeOllama(args.request_ms, args.text_ms, args.prefill_ms, args.token_ms, args.tokens,
+                      args.server_parallel, port, args.prefill_token_ms)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=11434)
+    add_ollama_args(parser)
+    server = from_args(parser.parse_args(), parser.parse_args().port)
+    print(f"Fake Ollama on {server.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
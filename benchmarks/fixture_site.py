@@ -0,0 +1,275 @@
+"""
+benchmarks/fixture_site.py
+==========================
+Deterministic synthetic website for crawler benchmarks.
+
+Every page is generated from (seed, page index), so the same settings always
+produce the same site — results from different commits are comparable.
+
+Each page has:
+  - a header nav linking to the first NAV pages
+  - FANOUT links to other pages (seeded random)
+  - FORMS forms (text / email / number / select / textarea + submit)
+  - TABLES tables, IMAGES <img> tags (served as a 1x1 PNG)
+  - optionally a block of links + a form injected by JavaScript after
+    JS_DELAY ms, to expose crawlers that extract before scripts finish
+
+The server can add LATENCY ms (+/- JITTER) before each HTML response and
+records every HTML request so a benchmark can derive per-page timings
+without instrumenting the crawler.
+
+Usage:
+    python benchmarks/fixture_site.py --pages 200 --port 8000            # serve
+    python benchmarks/fixture_site.py --pages 200 --out /tmp/fixture     # write static files
+"""
+
+import argparse
+import base64
+import json
+import os
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+PNG_1X1 = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+)
+
+
+@dataclass
+class SiteConfig:
+    pages:    int   = 100
+    fanout:   int   = 8      # links per page to other pages
+    nav:      int   = 5      # header links on every page
+    forms:    int   = 1
+    fields:   int   = 5
+    tables:   int   = 1
+    rows:     int   = 10
+    images:   int   = 3
+    latency:  float = 0.0    # ms added before every HTML response
+    jitter:   float = 0.0    # ms, uniform +/-
+    js_delay: float = 0.0    # ms before the JS-injected block appears; 0 = no JS block
+    seed:     int   = 42
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Page generation
+# ─────────────────────────────────────────────────────────────────────────────
+
+def page_path(i: int) -> str:
+    return "/" if i == 0 else f"/page-{i}.html"
+
+
+def render_page(cfg: SiteConfig, i: int) -> str:
+    rnd = random.Random(cfg.seed * 1_000_003 + i)
+    others = [j for j in range(cfg.pages) if j != i]
+    targets = rnd.sample(others, min(cfg.fanout, len(others)))
+
+    nav = "".join(
+        f'<a href="{page_path(j)}">Section {j}</a>' for j in range(min(cfg.nav, cfg.pages))
+    )
+    links = "".join(
+        f'<li><a href="{page_path(j)}" id="link-{i}-{j}">Go to page {j}</a></li>'
+        for j in targets
+    )
+    forms = "".join(_form(cfg, i, f, rnd) for f in range(cfg.forms))
+    tables = "".join(_table(cfg, i, t) for t in range(cfg.tables))
+    images = "".join(
+        f'<img src="/img/{i}-{k}.png" alt="Figure {k} on page {i}" width="1" height="1">'
+        for k in range(cfg.images)
+    )
+    script = ""
+    if cfg.js_delay > 0:
+        late = rnd.sample(others, min(3, len(others)))
+        late_links = "".join(f'<a href="{page_path(j)}">Late link {j}</a>' for j in late)
+        late_form = (f'<form id="late-form-{i}" action="{page_path(i)}" method="get">'
+                     f'<input type="text" name="late_q" id="late-q-{i}" placeholder="Search">'
+                     f'<button type="submit">Search</button></form>')
+        script = (
+            '<div id="late"></div><script>setTimeout(function(){'
+            f'document.getElementById("late").innerHTML={json.dumps(late_links + late_form)};'
+            f'}},{int(cfg.js_delay)});</script>'
+        )
+
+    return (
+        "<!DOCTYPE html><html><head><meta charset='utf-8'>"
+        f"<title>Fixture page {i}</title></head><body>"
+        f"<header><nav>{nav}</nav></header>"
+        f"<main><h1>Fixture page {i}</h1><h2>Links</h2><ul>{links}</ul>"
+        f"<h2>Forms</h2>{forms}<h2>Data</h2>{tables}{images}{script}</main>"
+        "<footer><a href='/'>Home</a> <a href='mailto:bench@example.com'>Mail</a></footer>"
+        "</body></html>"
+    )
+
+
+def _form(cfg: SiteConfig, i: int, f: int, rnd: random.Random) -> str:
+    kinds = ["text", "email", "number", "select", "textarea"]
+    fields = []
+    for k in range(cfg.fields):
+        kind = kinds[k % len(kinds)]
+        fid = f"f{i}-{f}-{k}"
+        label = f'<label for="{fid}">Field {k}</label>'
+        if kind == "select":
+            opts = "".join(f'<option value="{o}">Option {o}</option>' for o in range(4))
+            fields.append(f'{label}<select id="{fid}" name="field_{k}">{opts}</select>')
+        elif kind == "textarea":
+            fields.append(f'{label}<textarea id="{fid}" name="field_{k}" placeholder="Notes"></textarea>')
+        else:
+            extra = ' min="0" max="100"' if kind == "number" else ""
+            fields.append(f'{label}<input type="{kind}" id="{fid}" name="field_{k}" '
+                          f'placeholder="Enter {kind}" required{extra}>')
+    action = page_path(rnd.randrange(cfg.pages))
+    return (f'<form id="form-{i}-{f}" name="form{f}" action="{action}" method="get">'
+            f'{"".join(fields)}<input type="submit" name="go" value="Submit"></form>')
+
+
+def _table(cfg: SiteConfig, i: int, t: int) -> str:
+    head = "<tr><th>Key</th><th>Value</th><th>Note</th></tr>"
+    body = "".join(
+        f"<tr><td>k{r}</td><td>{(i * 31 + t * 7 + r) % 997}</td><td>row {r}</td></tr>"
+        for r in range(cfg.rows)
+    )
+    return f'<table id="table-{i}-{t}">{head}{body}</table>'
+
+
+def write_site(cfg: SiteConfig, out_dir: str) -> int:
+    """Write the site as static files (no latency / request log)."""
+    os.makedirs(os.path.join(out_dir, "img"), exist_ok=True)
+    for i in range(cfg.pages):
+        name = "index.html" if i == 0 else page_path(i).lstrip("/")
+        with open(os.path.join(out_dir, name), "w", encoding="utf-8") as fh:
+            fh.write(render_page(cfg, i))
+        for k in range(cfg.images):
+            with open(os.path.join(out_dir, "img", f"{i}-{k}.png"), "wb") as fh:
+                fh.write(PNG_1X1)
+    return cfg.pages
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Server
+# ─────────────────────────────────────────────────────────────────────────────
+
+class FixtureServer:
+    """
+    Threaded HTTP server for a SiteConfig.  ``requests`` is a list of
+    (path, start, end) for every HTML page served, in perf_counter seconds.
+    """
+
+    def __init__(self, cfg: SiteConfig, host: str = "127.0.0.1", port: int = 0):
+        self.cfg = cfg
+        self.requests: list[tuple[str, float, float]] = []
+        self._lock = threading.Lock()
+        self._cache: dict[int, bytes] = {}
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self) -> "FixtureServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def reset_log(self):
+        with self._lock:
+            self.requests = []
+
+    def page(self, i: int) -> bytes:
+        body = self._cache.get(i)
+        if body is None:
+            body = self._cache[i] = render_page(self.cfg, i).encode("utf-8")
+        return body
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                start = time.perf_counter()
+                path = urlparse(self.path).path
+                if path.startswith("/img/"):
+                    return self._send(200, "image/png", PNG_1X1)
+                idx = _page_index(path, server.cfg.pages)
+                if idx is None:
+                    return self._send(404, "text/html", b"<html><body>Not found</body></html>")
+                cfg = server.cfg
+                if cfg.latency or cfg.jitter:
+                    delay = cfg.latency + random.uniform(-cfg.jitter, cfg.jitter)
+                    time.sleep(max(0.0, delay) / 1000)
+                self._send(200, "text/html; charset=utf-8", server.page(idx))
+                with server._lock:
+                    server.requests.append((path, start, time.perf_counter()))
+
+            def _send(self, code, ctype, body):
+                self.send_response(code)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def _page_index(path: str, pages: int) -> int | None:
+    if path in ("/", "/index.html"):
+        return 0
+    if path.startswith("/page-") and path.endswith(".html"):
+        try:
+            i = int(path[len("/page-"):-len(".html")])
+        except ValueError:
+            return None
+        return i if 0 < i < pages else None
+    return None
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────────────────────────────────────
+
+def add_site_args(parser: argparse.ArgumentParser):
+    for name, default in asdict(SiteConfig()).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(default), default=default)
+
+
+def site_config(args: argparse.Namespace) -> SiteConfig:
+    return SiteConfig(**{k: getattr(args, k) for k in asdict(SiteConfig())})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve or write the synthetic fixture site")
+    add_site_args(parser)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--out", help="write static files here instead of serving")
+    args = parser.parse_args()
+
+    cfg = site_config(args)
+    if args.out:
+        print(f"Wrote {write_site(cfg, args.out)} pages to {args.out}")
+        return
+    server = FixtureServer(cfg, args.host, args.port)
+    print(f"Serving {cfg.pages} pages at {server.url}  (Ctrl+C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+"""Helpers shared by the RAG pipelines in Gauge/ and ai_automation_using_gauge/."""
+
+from rag_common.chunker import Chunk, chunk_file, chunk_text, token_counter
+from rag_common.context_packer import Section, fit_json, mmr_select, pack, pack_chunks, prompt_counter
+from rag_common.embedding_cache import EmbeddingCache, model_revision
+from rag_common.hybrid_search import BM25Index, HybridSearcher, reciprocal_rank_fusion
+from rag_common.onnx_encoder import load_encoder
+
+__all__ = [
+    "Chunk", "chunk_file", "chunk_text", "token_counter",
+    "Section", "fit_json", "mmr_select", "pack", "pack_chunks", "prompt_counter",
+    "EmbeddingCache", "model_revision",
+    "BM25Index", "HybridSearcher", "reciprocal_rank_fusion",
+    "load_encoder",
+]
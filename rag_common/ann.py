@@ -0,0 +1,258 @@
+"""
+rag_common/ann.py
+=================
+FAISS index construction for the RAG vector stores: exact search for small
+corpora, approximate nearest-neighbour (HNSW or IVF) once a corpus is large
+enough that a full scan per query starts to matter.
+
+All indexes use inner product over L2-normalised vectors (= cosine), the
+same metric as the exact IndexFlatIP they replace, so scores stay
+comparable across backends.
+
+  backend   used for (backend="auto")       knobs
+  exact     n <  EXACT_MAX                  -
+  hnsw      EXACT_MAX <= n < HNSW_MAX       HNSW_M, HNSW_EF_CONSTRUCTION, HNSW_EF_SEARCH
+  ivf       n >= HNSW_MAX                   nlist = IVF_LISTS_PER_SQRT_N * sqrt(n), nprobe
+
+HNSW gives the best latency/recall but its build is the slowest per vector,
+so very large (and frequently rebuilt) stores use IVF, whose build is one
+k-means on a sample plus a cheap assignment pass.  The defaults were tuned
+with benchmarks/bench_ann_index.py for recall@10 >= 0.95.
+
+Any backend can also store its vectors compressed (`compression`):
+
+  none         float32, 4 bytes per dimension
+  sq8          int8 scalar quantisation, 1 byte per dimension
+  pca<k>       PCA down to k dimensions (float32)
+  pca<k>+sq8   both
+
+Compressed indexes only produce candidates: search() asks for
+RERANK_FACTOR * k of them and re-scores those against the full-precision
+vectors, which the caller keeps outside the index (typically a
+memory-mapped .npy, so only the candidate rows are ever read).
+benchmarks/bench_vector_compression.py reports memory, latency and recall
+for each setting.
+
+faiss is imported lazily: callers without faiss installed can check
+faiss_available() and keep their own exact search.
+"""
+
+import functools
+import logging
+import math
+import re
+from typing import Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("auto", "exact", "hnsw", "ivf")
+
+EXACT_MAX             = 20_000    # below this a full scan is a few ms and exact
+HNSW_MAX              = 200_000   # above this the HNSW build gets too slow to redo per run
+HNSW_M                = 32
+HNSW_EF_CONSTRUCTION  = 80
+HNSW_EF_SEARCH        = 64
+IVF_LISTS_PER_SQRT_N  = 2         # nlist = 2 * sqrt(n)
+IVF_TRAIN_PER_LIST    = 50        # k-means sample size per list
+IVF_NPROBE_FRACTION   = 0.02      # lists scanned per query
+IVF_MIN_NPROBE        = 16
+TRAIN_SAMPLE          = 100_000   # max rows used to fit PCA / the int8 ranges
+RERANK_FACTOR         = 4         # candidates per result re-scored at full precision
+
+_COMPRESSION = re.compile(r"^(?:none|sq8|pca(\d+)(\+sq8)?)$")
+
+
+@functools.lru_cache(maxsize=None)
+def faiss_available() -> bool:
+    try:
+        import faiss  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def choose_backend(n: int, backend: str = "auto") -> str:
+    """Backend actually used for a corpus of n vectors."""
+    backend = (backend or "auto").lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown ANN backend {backend!r} (expected one of {', '.join(BACKENDS)})")
+    if backend != "auto":
+        return backend
+    if n < EXACT_MAX:
+        return "exact"
+    return "hnsw" if n < HNSW_MAX else "ivf"
+
+
+def parse_compression(compression: str) -> Tuple[Optional[int], bool]:
+    """(PCA dims or None, int8?) for a compression setting."""
+    compression = (compression or "none").lower().replace(" ", "")
+    match = _COMPRESSION.match(compression)
+    if not match:
+        raise ValueError(f"unknown vector compression {compression!r} (expected none, sq8, pca<k> or pca<k>+sq8)")
+    if compression == "sq8":
+        return None, True
+    return (int(match.group(1)) if match.group(1) else None), bool(match.group(2))
+
+
+def effective_compression(n: int, compression: str) -> str:
+    """The compression build_index applies to n vectors (PCA needs at least k of them)."""
+    pca, sq8 = parse_compression(compression)
+    if pca is not None and n < pca:
+        pca = None
+    if pca is None:
+        return "sq8" if sq8 else "none"
+    return f"pca{pca}+sq8" if sq8 else f"pca{pca}"
+
+
+def matches(index, backend: str = "auto", compression: str = "none") -> bool:
+    """Whether index is what build_index(...) would build for its size today."""
+    return (kind(index), compression_of(index)) == \
+           (choose_backend(index.ntotal, backend), effective_compression(index.ntotal, compression))
+
+
+def build_index(matrix: np.ndarray, backend: str = "auto", compression: str = "none", seed: int = 0):
+    """A searchable FAISS index over the rows of matrix (float32, normalised)."""
+    import faiss
+
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    n, dim = matrix.shape
+    kind   = choose_backend(n, backend)
+    pca, sq8 = parse_compression(compression)
+    if pca is not None and not 0 < pca < dim:
+        raise ValueError(f"PCA to {pca} dims needs vectors with more than {pca} dims (have {dim})")
+    if pca is not None and n < pca:       # see effective_compression()
+        logger.info(f"ann: {n} vectors are too few to fit PCA to {pca} dims — not reducing")
+        pca = None
+
+    codec = "SQ8" if sq8 else "Flat"
+    if kind == "hnsw":
+        spec = f"HNSW{HNSW_M},{codec}"
+    elif kind == "ivf":
+        nlist = max(1, min(n // 39, int(IVF_LISTS_PER_SQRT_N * math.sqrt(n))))
+        spec  = f"IVF{nlist},{codec}"
+    else:
+        spec = codec
+    if pca is not None:
+        spec = f"PCA{pca},{spec}"
+    index = faiss.index_factory(dim, spec, faiss.METRIC_INNER_PRODUCT)
+
+    inner = _inner(index)
+    if hasattr(inner, "hnsw"):
+        inner.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+    if not index.is_trained:
+        sample = min(n, TRAIN_SAMPLE)
+        if isinstance(inner, faiss.IndexIVF):
+            sample = min(n, max(sample if pca else 0, inner.nlist * IVF_TRAIN_PER_LIST))
+        rows = np.random.default_rng(seed).choice(n, sample, replace=False) if sample < n else slice(None)
+        index.train(matrix[rows])
+    index.add(matrix)
+    tune(index)
+    return index
+
+
+def tune(index):
+    """(Re)apply the search-time parameters; call after faiss.read_index()."""
+    import faiss
+
+    inner = _inner(index)
+    if hasattr(inner, "hnsw"):
+        inner.hnsw.efSearch = HNSW_EF_SEARCH
+    elif isinstance(inner, faiss.IndexIVF):
+        inner.nprobe = min(inner.nlist, max(IVF_MIN_NPROBE, int(inner.nlist * IVF_NPROBE_FRACTION)))
+    return index
+
+
+def is_compressed(index) -> bool:
+    """True when the index holds approximations of the vectors (int8 and/or PCA)."""
+    import faiss
+
+    if isinstance(index, faiss.IndexPreTransform):
+        return True
+    inner = _inner(index)
+    if hasattr(inner, "storage"):                  # HNSW: look at what the graph stores
+        inner = faiss.downcast_index(inner.storage)
+    return isinstance(inner, (faiss.IndexScalarQuantizer, faiss.IndexIVFScalarQuantizer))
+
+
+def search(index, queries: np.ndarray, k: int, vectors: Optional[np.ndarray] = None,
+           rerank: int = RERANK_FACTOR) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    faiss-style (scores, rows) for a batch of normalised queries.
+
+    For a compressed index with the full vectors given, rerank * k candidates
+    are re-scored exactly and the best k returned; otherwise this is plain
+    index.search.  Missing results are row -1, as in FAISS.
+    """
+    queries = np.ascontiguousarray(queries, dtype=np.float32)
+    k = min(k, index.ntotal)
+    if vectors is None or rerank <= 1 or not is_compressed(index):
+        return index.search(queries, k)
+
+    _, cand = index.search(queries, min(index.ntotal, k * rerank))
+    scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+    rows   = np.full((len(queries), k), -1, dtype=np.int64)
+    for i, c in enumerate(cand):
+        c = np.sort(c[c >= 0])                     # ascending rows = sequential reads of a memmap
+        exact = np.asarray(vectors[c], dtype=np.float32) @ queries[i]
+        best  = np.argsort(-exact, kind="stable")[:k]
+        scores[i, :len(best)] = exact[best]
+        rows[i, :len(best)]   = c[best]
+    return scores, rows
+
+
+def reconstruct(index, start: int, count: int) -> Optional[np.ndarray]:
+    """Stored vectors [start, start + count) of any index built here (lossy if compressed)."""
+    import faiss
+
+    if count <= 0:
+        return None
+    if isinstance(_inner(index), faiss.IndexIVF):
+        _inner(index).make_direct_map()
+    return index.reconstruct_n(start, count)
+
+
+def kind(index) -> str:
+    """"exact", "hnsw" or "ivf" — the backend an index was built with."""
+    import faiss
+
+    inner = _inner(index)
+    if hasattr(inner, "hnsw"):
+        return "hnsw"
+    return "ivf" if isinstance(inner, faiss.IndexIVF) else "exact"
+
+
+def compression_of(index) -> str:
+    """The compression setting an index was built with."""
+    import faiss
+
+    pca = None
+    if isinstance(index, faiss.IndexPreTransform):
+        pca = _inner(index).d
+    sq8 = is_compressed(index) and (pca is None or is_compressed(_inner(index)))
+    if pca is None:
+        return "sq8" if sq8 else "none"
+    return f"pca{pca}+sq8" if sq8 else f"pca{pca}"
+
+
+def describe(index) -> str:
+    inner   = _inner(index)
+    backend = kind(index)
+    if backend == "hnsw":
+        text = f"hnsw(M={inner.hnsw.nb_neighbors(1)}, ef={inner.hnsw.efSearch})"
+    elif backend == "ivf":
+        text = f"ivf(nlist={inner.nlist}, nprobe={inner.nprobe})"
+    else:
+        text = "exact"
+    packed = compression_of(index)
+    return text if packed == "none" else f"{text}+{packed}"
+
+
+def _inner(index):
+    """The searching index under any PCA pre-transform."""
+    import faiss
+
+    if isinstance(index, faiss.IndexPreTransform):
+        return faiss.downcast_index(index.index)
+    return index
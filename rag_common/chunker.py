@@ -0,0 +1,260 @@
+"""
+rag_common/chunker.py
+=====================
+Streaming, sentence-aware, token-budgeted text chunker shared by the RAG
+pipelines (gauge_rag3 embedder, ai_automation RAGEngine, rag_meeting_minutes).
+
+  - Files are read in BLOCK_CHARS pieces; only the current block, the
+    unfinished sentence and the chunk being packed are held in memory.
+  - Text is cut into units at sentence ends (. ! ? outside common
+    abbreviations), blank lines, and line starts that open a markdown
+    structure (heading, list item, quote, table row).  A unit keeps its
+    trailing whitespace, so a chunk is an exact slice of the source.
+  - Units are packed greedily up to max_tokens, counted with the embedding
+    model's own tokenizer (token_counter(model)), so no chunk is silently
+    truncated by the model.  The next chunk starts with the last whole
+    sentences of the previous one, up to overlap_tokens.
+  - A unit longer than max_tokens on its own is split between words
+    (inside a word only if one word alone is over budget).
+
+Output depends only on the text and the (counter, max_tokens,
+overlap_tokens) settings, never on block size or read pattern, so chunk
+ids derived from (file, position) stay stable across runs.
+CHUNKER_VERSION changes whenever the cutting rules do; callers put it in
+their index fingerprints.
+"""
+
+import math
+import re
+from collections import deque
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional, Sequence
+
+CHUNKER_VERSION   = 1
+BLOCK_CHARS       = 1 << 20      # characters read per step
+MAX_UNIT_CHARS    = 1 << 16      # a "sentence" longer than this is cut at whitespace
+DEFAULT_MAX_TOKENS     = 256
+DEFAULT_OVERLAP_TOKENS = 32
+
+_ABBREVIATIONS = frozenset(
+    "e.g i.e etc vs mr mrs ms dr prof sr jr st no fig approx dept est inc ltd co jan feb mar apr "
+    "jun jul aug sep sept oct nov dec".split()
+)
+
+# candidate boundaries; the whitespace they consume stays with the unit before them
+_BOUNDARY = re.compile(
+    r"(?P<sent>(?<=[.!?])[\"')\]]*(?:[ \t]+\n?|\n)[ \t]*(?=\S))"  # sentence end + spaces / one newline
+    r"|(?P<para>\n[ \t]*\n\s*)"                                    # blank line(s)
+    r"|(?P<line>\n[ \t]*(?=[#>|*+•-]|\d+[.)][ \t]|[A-Z][A-Z0-9]*_[A-Z0-9_]+))"   # markdown-ish line start
+)
+_PREV_WORD = re.compile(r"([A-Za-z][A-Za-z.]*)\.$")
+_EST_TOKEN = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+_EST_LONG  = re.compile(r"[A-Za-z]{7,}|\d{7,}")
+
+
+class Chunk(NamedTuple):
+    index: int      # position in the file, from 0
+    text: str       # stripped source slice
+    tokens: int     # token count (sum over its sentences)
+    start: int      # character offset of the chunk in the file
+
+
+class TokenCounter:
+    """Callable list[str] -> list[int] token counts, plus the limits of the model it stands for."""
+
+    def __init__(self, count: Callable[[Sequence[str]], List[int]], name: str,
+                 max_tokens: Optional[int] = None):
+        self.count      = count
+        self.name       = name          # goes into index fingerprints
+        self.max_tokens = max_tokens    # model input limit without special tokens, if known
+
+    def __call__(self, texts: Sequence[str]) -> List[int]:
+        return self.count(texts) if texts else []
+
+
+def estimate_tokens(texts: Sequence[str]) -> List[int]:
+    """
+    Offline stand-in for a WordPiece/BPE tokenizer: every punctuation mark
+    is a token, letters cost one token per 6 characters and digits one per
+    3.  Errs high for English, so budgets based on it stay under the limit.
+    """
+    out = []
+    for text in texts:
+        n = len(_EST_TOKEN.findall(text))
+        for tok in _EST_LONG.findall(text):
+            n += math.ceil(len(tok) / (3 if tok[0].isdigit() else 6)) - 1
+        out.append(n)
+    return out
+
+
+ESTIMATE = TokenCounter(estimate_tokens, "estimate-v1")
+
+
+def token_counter(model=None) -> TokenCounter:
+    """
+    Token counter for an embedding model: a loaded SentenceTransformer (or
+    anything with a HF `.tokenizer`), a HF tokenizer itself, or None for
+    the offline estimate.
+    """
+    if model is None:
+        return ESTIMATE
+    tokenizer = getattr(model, "tokenizer", model)
+    if not callable(tokenizer):
+        return ESTIMATE
+    limit = getattr(model, "max_seq_length", None) or getattr(tokenizer, "model_max_length", None)
+    if limit and limit < 100_000:                     # HF uses a huge sentinel for "no limit"
+        limit -= tokenizer.num_special_tokens_to_add() if hasattr(tokenizer, "num_special_tokens_to_add") else 2
+    else:
+        limit = None
+
+    def count(texts):
+        return [len(ids) for ids in tokenizer(list(texts), add_special_tokens=False)["input_ids"]]
+
+    return TokenCounter(count, f"hf:{getattr(tokenizer, 'name_or_path', type(tokenizer).__name__)}", limit)
+
+
+def chunk_file(path, max_tokens: int = DEFAULT_MAX_TOKENS, overlap_tokens: int = DEFAULT_OVERLAP_TOKENS,
+               counter: TokenCounter = ESTIMATE, encoding: str = "utf-8",
+               errors: str = "replace") -> Iterator[Chunk]:
+    """Chunks of a text file, read incrementally."""
+    with open(path, encoding=encoding, errors=errors, newline="") as f:
+        yield from chunk_stream(iter(lambda: f.read(BLOCK_CHARS), ""), max_tokens, overlap_tokens, counter)
+
+
+def chunk_text(text: str, max_tokens: int = DEFAULT_MAX_TOKENS, overlap_tokens: int = DEFAULT_OVERLAP_TOKENS,
+               counter: TokenCounter = ESTIMATE) -> List[Chunk]:
+    return list(chunk_stream([text], max_tokens, overlap_tokens, counter))
+
+
+def chunk_stream(pieces: Iterable[str], max_tokens: int = DEFAULT_MAX_TOKENS,
+                 overlap_tokens: int = DEFAULT_OVERLAP_TOKENS, counter: TokenCounter = ESTIMATE) -> Iterator[Chunk]:
+    """Chunks of the concatenation of `pieces` (any split of the text gives the same chunks)."""
+    if counter.max_tokens:
+        max_tokens = min(max_tokens, counter.max_tokens)
+    if max_tokens < 1:
+        raise ValueError("max_tokens must be positive")
+    overlap_tokens = max(0, min(overlap_tokens, max_tokens // 2))
+    packer = _Packer(max_tokens, overlap_tokens)
+
+    carry, offset = "", 0          # unfinished text and its offset in the file
+    for piece in pieces:
+        carry += piece
+        units, cut = _split(carry, final=False)
+        yield from packer.add(units, offset, counter)
+        offset += cut
+        carry   = carry[cut:]
+    units, _ = _split(carry, final=True)
+    yield from packer.add(units, offset, counter)
+    yield from packer.flush()
+
+
+# ── Internals ─────────────────────────────────────────────────────────────────
+
+def _split(text: str, final: bool):
+    """(units, consumed chars): complete units of text; the tail is left for the next block."""
+    units, start, size = [], 0, len(text)
+    for m in _BOUNDARY.finditer(text):
+        end = m.end()
+        if end >= size and not final:
+            break                                   # can't tell yet what follows
+        if m.lastgroup == "sent":
+            prev = _PREV_WORD.search(text, max(0, m.start() - 12), m.start())
+            if prev and prev.group(1).lower() in _ABBREVIATIONS:
+                continue
+        if end > start:
+            if end - start > MAX_UNIT_CHARS:
+                start = _cut_long(text, start, end, units)
+            units.append(text[start:end])
+            start = end
+    start = _cut_long(text, start, len(text), units)
+    if final and start < len(text):
+        units.append(text[start:])
+        start = len(text)
+    return units, start
+
+
+def _cut_long(text, start, end, units):
+    """Emit MAX_UNIT_CHARS-bounded pieces (cut after a space) of text[start:end] while it is too long."""
+    while end - start > MAX_UNIT_CHARS:
+        ws  = text.rfind(" ", start + 1, start + MAX_UNIT_CHARS)
+        cut = ws + 1 if ws > start else start + MAX_UNIT_CHARS
+        units.append(text[start:cut])
+        start = cut
+    return start
+
+
+class _Packer:
+    def __init__(self, max_tokens, overlap_tokens):
+        self.max_tokens     = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.units = deque()              # (text, tokens, offset)
+        self.total = 0
+        self.index = 0
+        self.fresh = 0                    # units added since the last emitted chunk
+
+    def add(self, units, offset, counter):
+        if not units:
+            return
+        for text, tokens in zip(units, counter(units)):
+            pieces = _split_long(text, tokens, self.max_tokens, counter) if tokens > self.max_tokens else [(text, tokens)]
+            for piece, n in pieces:
+                if self.total + n > self.max_tokens and self.fresh:
+                    yield self._emit()
+                    while self.units and self.total + n > self.max_tokens:
+                        self.total -= self.units.popleft()[1]
+                self.units.append((piece, n, offset))
+                self.total += n
+                self.fresh += 1
+                offset     += len(piece)
+
+    def flush(self):
+        if self.fresh:
+            yield self._emit()
+
+    def _emit(self):
+        text  = "".join(u[0] for u in self.units)
+        lead  = len(text) - len(text.lstrip())
+        chunk = Chunk(self.index, text.strip(), self.total, self.units[0][2] + lead)
+        self.index += 1
+        self.fresh  = 0
+        # carry the last whole units that fit in the overlap budget into the next chunk
+        keep, tokens = 0, 0
+        for _, n, _ in reversed(self.units):
+            if tokens + n > self.overlap_tokens:
+                break
+            keep, tokens = keep + 1, tokens + n
+        while len(self.units) > keep:
+            self.total -= self.units.popleft()[1]
+        return chunk
+
+
+def _split_long(text, tokens, max_tokens, counter):
+    """Split one over-long unit between words into pieces of at most max_tokens."""
+    words = re.findall(r"\s*\S+\s*", text) or [text]
+    pieces, i = [], 0
+    while i < len(words):
+        step = max(1, int(len(words) * max_tokens / max(tokens, 1) * 0.9))
+        while True:
+            piece = "".join(words[i:i + step])
+            n     = counter([piece])[0]
+            if n <= max_tokens or step == 1:
+                break
+            step = max(1, step * max_tokens // n)
+        if n > max_tokens:                          # one "word" over budget: cut inside it
+            piece, n = _longest_prefix(piece, max_tokens, counter)
+            words[i] = words[i][len(piece):]
+            step = 0 if words[i] else 1
+        pieces.append((piece, n))
+        i += step
+    return pieces
+
+
+def _longest_prefix(text, max_tokens, counter):
+    """(prefix, tokens): the longest prefix of text within max_tokens (at least one character)."""
+    lo, hi = 1, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if counter([text[:mid]])[0] <= max_tokens:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo], counter([text[:lo]])[0]
@@ -0,0 +1,281 @@
+"""
+rag_common/context_packer.py
+============================
+Fits retrieved chunks and page metadata into an LLM prompt under exact
+token budgets, shared by the gauge_rag2, gauge_rag3 and ai_automation test
+generators (instead of pasting the raw top-k and cutting the prompt at a
+word or character count).
+
+  prompt_counter()  token counter for prompt text: a tiktoken encoding or
+                    local HF tokenizer named by RAG_PROMPT_TOKENIZER
+                    (default cl100k_base) when it can be loaded offline,
+                    else chunker.estimate_tokens.  Loaded once per process;
+                    per-text counts are memoised, since the same rules,
+                    selector lines and chunks recur on every page.
+  mmr_select()      orders candidates by maximal marginal relevance
+                    (relevance minus similarity to what is already chosen)
+                    and drops near-duplicates outright.  Similarity comes
+                    from the caller's vectors, or TF-IDF over the chunk
+                    words when there are none.
+  pack()            fills Sections in priority order, each up to its own
+                    budget; a section may cut its last item at a word
+                    boundary to use the budget exactly, and budget a
+                    section leaves unused carries over to the next one.
+  pack_chunks()     mmr_select + one cut-able section: the common case of
+                    "retrieved chunks -> context string".
+  fit_json()        page metadata as JSON within a budget: lists lose
+                    entries from their end, longest first, until it fits, so
+                    the result is valid JSON (unless it does not fit even
+                    with every list emptied; then the text is cut).
+"""
+
+import json
+import math
+import os
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from rag_common import chunker
+from rag_common.hybrid_search import STOPWORDS, tokenize
+
+PROMPT_TOKENIZER  = os.getenv("RAG_PROMPT_TOKENIZER", "cl100k_base")   # tiktoken encoding | HF tokenizer | "estimate"
+MMR_LAMBDA        = float(os.getenv("RAG_MMR_LAMBDA", 0.7))            # 1 = relevance only, 0 = diversity only
+DUPLICATE_SIM     = float(os.getenv("RAG_DUPLICATE_SIM", 0.9))         # at or above: a near-duplicate, dropped
+COUNT_CACHE_SIZE  = 65536
+MIN_CUT_TOKENS    = 24       # a cut item shorter than this is not worth its tokens
+
+_WORD = re.compile(r"\S+\s*")
+
+
+# ── Token counting ────────────────────────────────────────────────────────────
+
+class PromptCounter:
+    """Memoised str -> token count, plus cutting text to a token budget."""
+
+    def __init__(self, counter: chunker.TokenCounter, cache_size: int = COUNT_CACHE_SIZE):
+        self.name  = counter.name
+        self.raw   = lambda text: counter([text])[0] if text else 0     # uncached, for one-off texts
+        self.count = lru_cache(maxsize=cache_size)(self.raw)
+
+    def __call__(self, text: str) -> int:
+        return self.count(text)
+
+    def cut(self, text: str, budget: int) -> str:
+        """Longest whole-word prefix of `text` within `budget` tokens."""
+        if self.count(text) <= budget:
+            return text
+        words = _WORD.findall(text)
+        lo, hi = 0, len(words)              # words[:lo] fits, words[:hi + 1] does not
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self.count("".join(words[:mid]).rstrip()) <= budget:
+                lo = mid
+            else:
+                hi = mid - 1
+        return "".join(words[:lo]).rstrip()
+
+
+def _load_counter(name: str) -> chunker.TokenCounter:
+    if name and name != "estimate":
+        try:
+            import tiktoken
+            enc = tiktoken.get_encoding(name)
+            return chunker.TokenCounter(lambda texts: [len(ids) for ids in enc.encode_ordinary_batch(list(texts))],
+                                        f"tiktoken:{name}")
+        except Exception:
+            pass
+        try:
+            from transformers import AutoTokenizer
+            return chunker.token_counter(AutoTokenizer.from_pretrained(name, local_files_only=True))
+        except Exception:
+            pass
+    return chunker.ESTIMATE
+
+
+@lru_cache(maxsize=None)
+def prompt_counter(name: str = PROMPT_TOKENIZER) -> PromptCounter:
+    """Shared counter for `name` (falls back to the offline estimate when it cannot be loaded)."""
+    return PromptCounter(_load_counter(name))
+
+
+# ── Maximal marginal relevance ────────────────────────────────────────────────
+
+def text_similarity(texts: Sequence[str]) -> np.ndarray:
+    """Cosine similarity of TF-IDF vectors (sublinear tf, stopwords dropped), texts x texts."""
+    bags = [Counter(t for t in tokenize(text) if t not in STOPWORDS) for text in texts]
+    vocab = {}
+    for bag in bags:
+        for term in bag:
+            vocab.setdefault(term, len(vocab))
+    m = np.zeros((len(texts), max(1, len(vocab))), dtype=np.float32)
+    for i, bag in enumerate(bags):
+        for term, tf in bag.items():
+            m[i, vocab[term]] = 1 + math.log(tf)
+    df = np.count_nonzero(m, axis=0)
+    m *= np.log((1 + len(texts)) / (1 + df)) + 1
+    m /= np.maximum(np.linalg.norm(m, axis=1, keepdims=True), 1e-10)
+    return m @ m.T
+
+
+def mmr_select(texts: Sequence[str], k: Optional[int] = None, scores: Optional[Sequence[float]] = None,
+               vectors=None, lambda_mult: float = MMR_LAMBDA,
+               duplicate_sim: float = DUPLICATE_SIM) -> List[int]:
+    """
+    Indices of `texts` (retrieval candidates, best first) in MMR order, at
+    most k of them.  Relevance is `scores` (higher is better) scaled to
+    [0, 1], or the rank when there are none.  A candidate whose similarity
+    to an already chosen one reaches `duplicate_sim` is never chosen.
+    """
+    n = len(texts)
+    if n == 0:
+        return []
+    if scores is not None:
+        rel = np.asarray(scores, dtype=np.float32)
+        span = float(rel.max() - rel.min())
+        rel = (rel - rel.min()) / span if span > 0 else np.ones(n, dtype=np.float32)
+    else:
+        rel = 1.0 - np.arange(n, dtype=np.float32) / n
+    if vectors is not None:
+        v = np.asarray(vectors, dtype=np.float32)
+        v = v / np.maximum(np.linalg.norm(v, axis=1, keepdims=True), 1e-10)
+        sim = v @ v.T
+    else:
+        sim = text_similarity(texts)
+
+    chosen = []
+    max_sim = np.zeros(n, dtype=np.float32)        # similarity to the closest chosen candidate
+    alive = np.ones(n, dtype=bool)
+    while alive.any() and (k is None or len(chosen) < k):
+        mmr = np.where(alive, lambda_mult * rel - (1 - lambda_mult) * max_sim, -np.inf)
+        best = int(np.argmax(mmr))
+        chosen.append(best)
+        alive[best] = False
+        max_sim = np.maximum(max_sim, sim[best])
+        alive &= max_sim < duplicate_sim
+    return chosen
+
+
+# ── Budgeted packing ──────────────────────────────────────────────────────────
+
+class Section(NamedTuple):
+    name: str
+    items: Sequence[str]      # in priority order
+    budget: int               # tokens, separators included
+    separator: str = "\n"
+    cut: bool = False         # cut the first item that does not fit to fill the budget (else skip it)
+
+
+class Packed(NamedTuple):
+    texts: Dict[str, str]     # section name -> packed text
+    tokens: Dict[str, int]    # section name -> tokens used
+    kept: Dict[str, int]      # section name -> items (whole or cut) included
+    offered: Dict[str, int]   # section name -> items offered
+
+    def summary(self) -> str:
+        return ", ".join(f"{name} {self.tokens[name]} tok ({self.kept[name]}/{self.offered[name]})"
+                         for name in self.texts)
+
+
+def _fill(section: Section, budget: int, counter: PromptCounter):
+    sep_tokens = counter(section.separator) if section.separator.strip() else 0
+    parts, used = [], 0
+    for item in section.items:
+        cost = counter(item) + (sep_tokens if parts else 0)
+        if used + cost <= budget:
+            parts.append(item)
+            used += cost
+            continue
+        if not section.cut:
+            continue                        # a shorter item further down may still fit
+        room = budget - used - (sep_tokens if parts else 0)
+        if room >= MIN_CUT_TOKENS:
+            head = counter.cut(item, room)
+            if head:
+                parts.append(head)
+        break
+    text = section.separator.join(parts)
+    # joined text can tokenise a little differently from its parts: the budget is a hard limit
+    while parts and counter(text) > budget:
+        parts.pop()
+        text = section.separator.join(parts)
+    return text, len(parts)
+
+
+def pack(sections: Sequence[Section], counter: Optional[PromptCounter] = None, carry: bool = True) -> Packed:
+    """Fill each section up to its budget (plus what earlier sections left unused when `carry`)."""
+    counter = counter or prompt_counter()
+    texts, tokens, kept, offered = {}, {}, {}, {}
+    spare = 0
+    for section in sections:
+        budget = section.budget + spare
+        text, n = _fill(section, budget, counter)
+        used = counter(text)
+        texts[section.name], tokens[section.name] = text, used
+        kept[section.name], offered[section.name] = n, len(section.items)
+        spare = budget - used if carry else 0
+    return Packed(texts, tokens, kept, offered)
+
+
+def pack_chunks(chunks: Sequence[str], budget: int, scores: Optional[Sequence[float]] = None, vectors=None,
+                separator: str = "\n\n", counter: Optional[PromptCounter] = None, name: str = "context") -> Packed:
+    """Retrieved chunks (best first) -> MMR-ordered, de-duplicated context of at most `budget` tokens."""
+    order = mmr_select(chunks, scores=scores, vectors=vectors)
+    packed = pack([Section(name, [chunks[i] for i in order], budget, separator, cut=True)], counter)
+    return packed._replace(offered={name: len(chunks)})
+
+
+def _entries(obj, out, order):
+    """(index in its list, list number, id of the list) for every list entry in obj."""
+    if isinstance(obj, list):
+        n = len(order)
+        order.append(obj)
+        out.extend((i, n, id(obj)) for i in range(len(obj)))
+    for value in (obj.values() if isinstance(obj, dict) else obj if isinstance(obj, list) else ()):
+        if isinstance(value, (dict, list)):
+            _entries(value, out, order)
+    return out
+
+
+def _trimmed(obj, keep: Dict[int, int]):
+    """obj with each list cut to keep[id(list)] entries."""
+    if isinstance(obj, dict):
+        return {k: _trimmed(v, keep) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_trimmed(v, keep) for v in obj[:keep.get(id(obj), 0)]]
+    return obj
+
+
+def fit_json(obj, budget: int, counter: Optional[PromptCounter] = None, indent: Optional[int] = 2) -> str:
+    """
+    json.dumps(obj) within `budget` tokens.  List entries (anywhere in obj)
+    are ranked by their index, so lists keep their first entries before any
+    list keeps a later one.  The longest prefix of that ranking that fits is
+    found by exponential search; when the next entry does not fit its list
+    is full and leaves the ranking, and the others go on filling.  Candidate
+    dumps are counted uncached.  When even the emptied lists do not fit, the
+    text is cut to the budget.
+    """
+    counter = counter or prompt_counter()
+    text = json.dumps(obj, indent=indent)
+    if counter.raw(text) <= budget:
+        return text
+
+    ranked = sorted(_entries(obj, [], []))
+
+    def dump(n):
+        return json.dumps(_trimmed(obj, Counter(list_id for _, _, list_id in ranked[:n])), indent=indent)
+
+    kept = 0                                # dump(kept) fits, or kept == 0
+    while kept < len(ranked):
+        step = 1
+        while kept + step <= len(ranked) and counter.raw(dump(kept + step)) <= budget:
+            kept, step = kept + step, step * 2
+        if step == 1:
+            full = ranked[kept][2]
+            ranked = ranked[:kept] + [e for e in ranked[kept:] if e[2] != full]
+    text = dump(kept)
+    return text if kept else counter.cut(text, budget)
@@ -0,0 +1,202 @@
+"""
+rag_common/embedding_cache.py
+=============================
+Persistent embedding cache shared by every RAG component in the repo
+(gauge_rag2, gauge_rag3, ai_automation RAGEngine).
+
+Vectors are stored in one SQLite file, keyed by
+
+    (model name, model revision, sha256 of the text)
+
+as float16 blobs, so the same chunk embedded by two pipelines - or by the
+same pipeline on its next run - is computed once.  The database runs in WAL
+mode: any number of processes can read while one writes, and writers wait
+on a busy timeout instead of failing.
+
+Typical use:
+
+    cache = EmbeddingCache("all-MiniLM-L6-v2", model_revision(model))
+    vectors = cache.encode(texts, lambda batch: model.encode(batch))
+    logger.info(cache.summary())
+
+Vectors always come back as float32 rounded through float16, whether they
+were computed now or read from disk, so a cold and a warm run see exactly
+the same numbers.
+
+Set RAG_EMBEDDING_CACHE to move the file, or to "off" to disable caching.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+REPO_ROOT    = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_PATH = os.path.join(REPO_ROOT, ".cache", "embeddings.sqlite3")
+
+BUSY_TIMEOUT = 30       # seconds a writer waits for the lock
+MAX_PARAMS   = 500      # keys per SELECT ... IN (...) statement
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    model    TEXT    NOT NULL,
+    revision TEXT    NOT NULL,
+    key      BLOB    NOT NULL,
+    dim      INTEGER NOT NULL,
+    vec      BLOB    NOT NULL,
+    PRIMARY KEY (model, revision, key)
+) WITHOUT ROWID
+"""
+
+
+def cache_path() -> str:
+    """Cache file location ('' when disabled via RAG_EMBEDDING_CACHE=off)."""
+    path = os.getenv("RAG_EMBEDDING_CACHE", DEFAULT_PATH)
+    return "" if path.lower() in ("", "0", "off", "none", "false") else path
+
+
+def text_key(text: str) -> bytes:
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+def model_revision(model) -> str:
+    """
+    Best-effort revision id for a loaded sentence-transformers model: the
+    Hugging Face commit hash when the weights came from the hub, otherwise a
+    fingerprint of the first and last weight tensors, so swapping the model
+    files under the same name never serves stale vectors.  Encoders that
+    declare an `embedding_revision` (rag_common.onnx_encoder) use that.
+    """
+    rev = getattr(model, "embedding_revision", None)
+    if isinstance(rev, str) and rev:
+        return rev
+    try:
+        rev = getattr(model[0].auto_model.config, "_commit_hash", None)
+        if rev:
+            return str(rev)
+    except Exception:
+        pass
+    try:
+        params = list(model.parameters())
+        h = hashlib.sha256()
+        for p in (params[0], params[-1]):
+            h.update(p.detach().flatten()[:65536].cpu().numpy().tobytes())
+        return "w:" + h.hexdigest()[:16]
+    except Exception:
+        return ""
+
+
+class EmbeddingCache:
+    """SQLite-backed (model, revision, sha256(text)) -> float16 vector store."""
+
+    def __init__(self, model: str, revision: str = "", path: str = None):
+        self.model    = model
+        self.revision = revision or ""
+        self.path     = cache_path() if path is None else path
+        self.hits     = 0
+        self.misses   = 0
+        self._local   = threading.local()           # sqlite connections are per-thread
+
+    # ── Connection ────────────────────────────────────────────────────────────
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # ── Batch get / put ───────────────────────────────────────────────────────
+
+    def get_many(self, texts: list[str]) -> list:
+        """Cached float32 vector per text, or None where there is no entry."""
+        if not self.path:
+            return [None] * len(texts)
+        keys  = [text_key(t) for t in texts]
+        found = self._fetch(set(keys))
+        return [found.get(k) for k in keys]
+
+    def put_many(self, texts: list[str], vectors) -> None:
+        """Store one vector per text (rows that don't fit float16 are skipped)."""
+        if not self.path or not len(texts):
+            return
+        half = np.asarray(vectors, dtype=np.float32).astype(np.float16)
+        if half.ndim != 2 or half.shape[0] != len(texts):
+            raise ValueError(f"EmbeddingCache: expected {len(texts)} vectors, got shape {half.shape}")
+        ok   = np.isfinite(half).all(axis=1)
+        rows = [
+            (self.model, self.revision, text_key(t), half.shape[1], half[i].tobytes())
+            for i, t in enumerate(texts) if ok[i]
+        ]
+        conn = self._conn()
+        with conn:                                  # one transaction per batch
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?, ?)", rows)
+
+    def _fetch(self, keys: set) -> dict:
+        conn, keys, found = self._conn(), list(keys), {}
+        for i in range(0, len(keys), MAX_PARAMS):
+            part = keys[i:i + MAX_PARAMS]
+            sql  = ("SELECT key, vec FROM embeddings WHERE model = ? AND revision = ? "
+                    f"AND key IN ({','.join('?' * len(part))})")
+            for key, blob in conn.execute(sql, (self.model, self.revision, *part)):
+                found[key] = np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+        return found
+
+    # ── Cached encode ─────────────────────────────────────────────────────────
+
+    def encode(self, texts: list[str], encode_fn) -> np.ndarray:
+        """
+        Return a (len(texts), dim) float32 matrix for `texts`.  Only texts
+        missing from the cache are passed to `encode_fn(list[str])` - in one
+        call, each distinct text once - and the results are written back.
+        """
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        cached  = dict(zip(texts, self.get_many(texts)))
+        missing = [t for t, v in cached.items() if v is None]
+        self.hits   += len(texts) - sum(1 for t in texts if cached[t] is None)
+        self.misses += len(missing)
+
+        if missing:
+            vecs = np.asarray(encode_fn(missing), dtype=np.float32).reshape(len(missing), -1)
+            self.put_many(missing, vecs)
+            half = vecs.astype(np.float16)
+            # match what a warm run reads back; keep full precision if float16 overflows
+            vecs = np.where(np.isfinite(half).all(axis=1, keepdims=True), half.astype(np.float32), vecs)
+            cached.update(zip(missing, vecs))
+
+        logger.debug(f"EmbeddingCache[{self.model}]: {len(texts) - len(missing)} hit / {len(missing)} miss")
+        return np.stack([cached[t] for t in texts])
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        rate  = f"{100 * self.hits / total:.0f}%" if total else "n/a"
+        where = self.path or "disabled"
+        return (f"Embedding cache [{self.model}]: {self.hits} hit / {self.misses} miss "
+                f"({rate} hit rate, {where})")
+
+    def __len__(self):
+        if not self.path:
+            return 0
+        row = self._conn().execute(
+            "SELECT COUNT(*) FROM embeddings WHERE model = ? AND revision = ?",
+            (self.model, self.revision),
+        ).fetchone()
+        return row[0]
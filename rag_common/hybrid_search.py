@@ -0,0 +1,157 @@
+"""
+rag_common/hybrid_search.py
+===========================
+Lexical (BM25) + dense retrieval with reciprocal-rank fusion, shared by the
+gauge_rag2, gauge_rag3 and ai_automation retrievers.
+
+  BM25Index        in-memory inverted index over the same chunks as the
+                   dense index (rows are the caller's row numbers)
+  HybridSearcher   per query: BM25 ranking + dense ranking -> RRF.  Short
+                   keyword-like queries ("password", "maxlength") whose
+                   terms are all in the index vocabulary take a lexical-only
+                   fast path and never reach the embedding model.
+
+The dense side is a callback, dense_search(queries, n) -> one list of
+(row, similarity) per query, so every retriever plugs in its own vector
+store (Chroma, NumPy matrix, FAISS) and can batch the encode.
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+RRF_K             = 60     # standard reciprocal-rank-fusion constant
+CANDIDATES        = 20     # depth of each ranking fed into the fusion
+KEYWORD_MAX_TERMS = 3      # queries with at most this many content terms can go lexical-only
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have how i in is it of on or that the this "
+    "to was were what when where which who why will with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+def content_terms(text: str) -> List[str]:
+    """tokenize() without STOPWORDS: the terms BM25 indexes and scores."""
+    return [t for t in _TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+
+class Hit(NamedTuple):
+    row: int
+    score: float                 # fused score (RRF), or BM25 score on the lexical path
+    dense: Optional[float]       # similarity from the dense side, None if not retrieved there
+    lexical: Optional[float]     # BM25 score, None if no query term matched
+
+
+class BM25Index:
+    """Okapi BM25 over the content terms of a fixed list of texts; row i is texts[i].
+
+    Stopwords are neither indexed nor scored, so a query shares a term with a
+    chunk only when it shares a content word ("paris", not "the").
+    """
+
+    def __init__(self, texts: Sequence[str], k1: float = 1.5, b: float = 0.75):
+        self.k1, self.b = k1, b
+        self.n = len(texts)
+        lengths = np.zeros(self.n, dtype=np.float32)
+        postings = {}
+        for row, text in enumerate(texts):
+            counts = Counter(content_terms(text or ""))
+            lengths[row] = sum(counts.values())
+            for term, tf in counts.items():
+                postings.setdefault(term, ([], []))
+                postings[term][0].append(row)
+                postings[term][1].append(tf)
+        avg = float(lengths.mean()) if self.n else 0.0
+        self._norm = k1 * (1 - b + b * lengths / avg) if avg else np.full(self.n, k1, dtype=np.float32)
+        self._postings = {}
+        for term, (rows, tfs) in postings.items():
+            df  = len(rows)
+            idf = math.log(1 + (self.n - df + 0.5) / (df + 0.5))
+            self._postings[term] = (np.asarray(rows, dtype=np.int64), np.asarray(tfs, dtype=np.float32), idf)
+
+    def __contains__(self, term: str) -> bool:
+        return term in self._postings
+
+    def __len__(self):
+        return self.n
+
+    def scores(self, query: str) -> np.ndarray:
+        out = np.zeros(self.n, dtype=np.float32)
+        for term in set(content_terms(query)):
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            rows, tf, idf = posting
+            out[rows] += idf * tf * (self.k1 + 1) / (tf + self._norm[rows])
+        return out
+
+    def search(self, query: str, top_k: int) -> List[Tuple[int, float]]:
+        """(row, score) best first; rows with no matching term are left out."""
+        scores = self.scores(query)
+        hit = np.flatnonzero(scores > 0)
+        if len(hit) > top_k:
+            hit = hit[np.argpartition(-scores[hit], top_k - 1)[:top_k]]
+        hit = hit[np.argsort(-scores[hit], kind="stable")]
+        return [(int(i), float(scores[i])) for i in hit]
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[int]], k: int = RRF_K) -> List[Tuple[int, float]]:
+    """Fuse row rankings: score(row) = sum over rankings of 1 / (k + rank)."""
+    fused = {}
+    for ranking in rankings:
+        for rank, row in enumerate(ranking, start=1):
+            fused[row] = fused.get(row, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda x: (-x[1], x[0]))
+
+
+class HybridSearcher:
+    """BM25 + dense search fused with RRF, with a lexical-only fast path."""
+
+    def __init__(self, bm25: BM25Index,
+                 dense_search: Callable[[List[str], int], List[List[Tuple[int, float]]]],
+                 candidates: int = CANDIDATES, rrf_k: int = RRF_K,
+                 keyword_max_terms: int = KEYWORD_MAX_TERMS):
+        self.bm25              = bm25
+        self.dense_search      = dense_search
+        self.candidates        = candidates
+        self.rrf_k             = rrf_k
+        self.keyword_max_terms = keyword_max_terms
+        self.lexical_queries   = 0
+        self.hybrid_queries    = 0
+
+    def is_keyword_query(self, query: str) -> bool:
+        """Short, and every content term is in the index vocabulary."""
+        terms = content_terms(query)
+        return 0 < len(terms) <= self.keyword_max_terms and all(t in self.bm25 for t in terms)
+
+    def search(self, query: str, top_k: int) -> List[Hit]:
+        return self.search_many([query], top_k)[0]
+
+    def search_many(self, queries: Sequence[str], top_k: int) -> List[List[Hit]]:
+        """One hit list per query; all non-keyword queries share one dense_search call."""
+        depth   = max(top_k, self.candidates)
+        lexical = [self.bm25.search(q, depth) for q in queries]
+        dense_q = [i for i, q in enumerate(queries) if not self.is_keyword_query(q)]
+        dense   = dict(zip(dense_q, self.dense_search([queries[i] for i in dense_q], depth))) if dense_q else {}
+        self.lexical_queries += len(queries) - len(dense_q)
+        self.hybrid_queries  += len(dense_q)
+
+        out = []
+        for i, lex in enumerate(lexical):
+            lex_scores = dict(lex)
+            if i not in dense:
+                out.append([Hit(row, score, None, score) for row, score in lex[:top_k]])
+                continue
+            dense_scores = dict(dense[i])
+            fused = reciprocal_rank_fusion([[r for r, _ in dense[i]], [r for r, _ in lex]], self.rrf_k)
+            out.append([Hit(row, score, dense_scores.get(row), lex_scores.get(row))
+                        for row, score in fused[:top_k]])
+        return out
@@ -0,0 +1,359 @@
+"""
+rag_common/onnx_encoder.py
+==========================
+Optional ONNX Runtime backend for the sentence-transformers encoders.
+
+    model = load_encoder("all-MiniLM-L6-v2", backend)
+    vectors = model.encode(texts, show_progress_bar=False)
+
+  backend     runs
+  torch       SentenceTransformer in PyTorch (the default, unchanged)
+  onnx        the transformer exported to ONNX, float32, under ONNX Runtime
+  onnx-int8   the same with dynamic int8 quantisation of the weights
+
+The first ONNX load exports the model once into ONNX_DIR/<model>/ (needs
+torch, sentence-transformers, onnx and onnxruntime), then compares its
+embeddings with the PyTorch ones on CHECK_SENTENCES.  A backend whose
+worst cosine agreement is below AGREEMENT_MIN is not used: load_encoder
+logs a warning and returns the PyTorch model instead.  Later loads only
+need onnxruntime and the `tokenizers` library (tokenizer.json is read
+directly, not through transformers), so they never import torch.
+
+The export is redone when the source model changes (hub snapshot or local
+files) or EXPORT_VERSION does.  An OnnxEncoder carries its own
+embedding_revision (source revision + backend), so the embedding cache and
+index fingerprints never mix its vectors with PyTorch ones.
+
+ONNX Runtime uses RAG_ONNX_THREADS intra-op threads (default: the physical
+cores this process may run on) and one inter-op thread.
+benchmarks/bench_onnx_encoder.py reports cold load, sentences/s and the
+agreement per backend.
+"""
+
+import hashlib
+import inspect
+import json
+import logging
+import os
+import shutil
+import time
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from rag_common.embedding_cache import REPO_ROOT, model_revision
+
+logger = logging.getLogger(__name__)
+
+BACKENDS       = ("torch", "onnx", "onnx-int8")
+ONNX_DIR       = os.getenv("RAG_ONNX_DIR", os.path.join(REPO_ROOT, ".cache", "onnx"))
+EXPORT_VERSION = 1
+OPSET          = 17
+AGREEMENT_MIN  = 0.99     # worst cosine vs PyTorch accepted on CHECK_SENTENCES
+
+_FILES = {"onnx": "model.onnx", "onnx-int8": "model.int8.onnx"}
+
+CHECK_SENTENCES = [
+    "Verify that the login form shows an error for an empty password.",
+    "Password fields must mask the characters that are typed.",
+    "Click the submit button and wait for the confirmation page.",
+    "The search box accepts at most 100 characters (maxlength=100).",
+    "Scenario: a user with an expired session is redirected to /login",
+    "Table rows are sorted by date, newest first.",
+    "Step: enter \"admin@example.com\" into the email field",
+    "## Boundary values",
+    "Negative test: submit the registration form with mismatched passwords, "
+    "an invalid e-mail address and a phone number containing letters; every "
+    "field must show its own validation message and nothing may be saved.",
+    "selenium webdriver gauge spec step implementation",
+    "What was decided about the release date in the stand-up meeting?",
+    "404",
+    " ".join(["The checkout page lists the items, the shipping address, the "
+              "payment method and the order total before confirmation."] * 12),
+]
+
+
+def load_encoder(model_name: str, backend: str = "torch", threads: Optional[int] = None):
+    """A SentenceTransformer (backend "torch") or an OnnxEncoder with the same encode()."""
+    backend = (backend or "torch").lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown encoder backend {backend!r} (expected one of {', '.join(BACKENDS)})")
+    if backend != "torch":
+        try:
+            return OnnxEncoder.load(model_name, backend, threads)
+        except ImportError as exc:
+            logger.warning(f"encoder: {backend} needs onnxruntime ({exc}) — using PyTorch")
+        except RuntimeError as exc:
+            logger.warning(f"encoder: {exc} — using PyTorch")
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(model_name)
+
+
+def default_threads() -> int:
+    """RAG_ONNX_THREADS, else the physical cores available to this process."""
+    if os.getenv("RAG_ONNX_THREADS"):
+        return max(1, int(os.environ["RAG_ONNX_THREADS"]))
+    try:
+        usable = len(os.sched_getaffinity(0))
+    except AttributeError:
+        usable = os.cpu_count() or 1
+    try:
+        import psutil
+        usable = min(usable, psutil.cpu_count(logical=False) or usable)
+    except ImportError:
+        pass
+    return max(1, usable)
+
+
+class OnnxEncoder:
+    """sentence-transformers compatible encode() over an exported ONNX model."""
+
+    def __init__(self, path: str, meta: dict, backend: str = "onnx-int8", threads: Optional[int] = None):
+        import onnxruntime as ort
+
+        self.name               = meta["model"]
+        self.backend            = backend
+        self.tokenizer          = _Tokenizer(path, meta)
+        self.max_seq_length     = meta["max_seq_length"]
+        self.pooling            = meta["pooling"]
+        self.normalize          = meta["normalize"]
+        self.embedding_revision = f"{meta['revision']}+{backend}.{EXPORT_VERSION}"
+        self.threads            = threads or default_threads()
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads     = self.threads
+        options.inter_op_num_threads     = 1
+        options.execution_mode           = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self._session = ort.InferenceSession(os.path.join(path, _FILES[backend]), options,
+                                             providers=["CPUExecutionProvider"])
+        self.dim      = meta["dim"]
+
+    @classmethod
+    def load(cls, model_name: str, backend: str = "onnx-int8", threads: Optional[int] = None) -> "OnnxEncoder":
+        """Encoder for model_name, exporting it first if needed; RuntimeError if it fails the agreement check."""
+        path = export_dir(model_name)
+        meta = _read_meta(path)
+        if not _fresh(meta, model_name):
+            meta = export(model_name)
+        agreement = meta["agreement"][backend]
+        if agreement["min"] < AGREEMENT_MIN:
+            raise RuntimeError(f"{backend} export of {model_name} agrees with PyTorch only to cosine "
+                               f"{agreement['min']:.4f} (< {AGREEMENT_MIN})")
+        return cls(path, meta, backend, threads)
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
+
+    def encode(self, sentences, batch_size: int = 32, show_progress_bar: bool = False,
+               convert_to_numpy: bool = True, normalize_embeddings: bool = False, **_) -> np.ndarray:
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+        out = np.empty((len(sentences), self.dim), dtype=np.float32)
+        # longest first, as sentence-transformers does, so batches pad little
+        order = np.argsort([-len(s) for s in sentences], kind="stable")
+        for lo in range(0, len(sentences), batch_size):
+            rows   = order[lo:lo + batch_size]
+            feeds  = self.tokenizer.batch([sentences[i] for i in rows])
+            hidden = self._session.run(None, feeds)[0]
+            out[rows] = _pool(hidden, feeds["attention_mask"], self.pooling)
+        if self.normalize or normalize_embeddings:
+            out /= np.maximum(np.linalg.norm(out, axis=1, keepdims=True), 1e-12)
+        return out[0] if single else out
+
+
+# ── Export ────────────────────────────────────────────────────────────────────
+
+def export_dir(model_name: str) -> str:
+    safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in model_name.strip("/\\"))
+    return os.path.join(ONNX_DIR, safe)
+
+
+def export(model_name: str) -> dict:
+    """Export model_name to ONNX (float32 + int8), check agreement, write encoder.json."""
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from sentence_transformers import SentenceTransformer
+
+    start = time.perf_counter()
+    st    = SentenceTransformer(model_name, device="cpu").eval()
+    names = [type(m).__name__ for m in st]
+    if names[:2] != ["Transformer", "Pooling"] or any(n != "Normalize" for n in names[2:]):
+        raise RuntimeError(f"cannot export {model_name}: modules {names} (expected Transformer, Pooling[, Normalize])")
+    pooling = _pooling_mode(st[1])
+
+    path = export_dir(model_name)
+    tmp  = path + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    tokenizer = st.tokenizer
+    tokenizer.save_pretrained(tmp)
+    if not os.path.exists(os.path.join(tmp, "tokenizer.json")):
+        raise RuntimeError(f"cannot export {model_name}: it has no fast (tokenizer.json) tokenizer")
+
+    inputs = ["input_ids", "attention_mask"] + (["token_type_ids"] if "token_type_ids" in tokenizer.model_input_names else [])
+    sample = tokenizer(["a short one", "and a somewhat longer second sentence"], padding=True, return_tensors="pt")
+    class Hidden(torch.nn.Module):
+        """The HF transformer with a plain tensor output for export."""
+
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, input_ids, attention_mask, token_type_ids=None):
+            extra = {} if token_type_ids is None else {"token_type_ids": token_type_ids}
+            return self.model(input_ids=input_ids, attention_mask=attention_mask, **extra).last_hidden_state
+
+    kwargs = {"dynamo": False} if "dynamo" in inspect.signature(torch.onnx.export).parameters else {}
+    with torch.no_grad():
+        torch.onnx.export(
+            Hidden(st[0].auto_model), tuple(sample[n] for n in inputs), os.path.join(tmp, _FILES["onnx"]),
+            input_names=inputs, output_names=["last_hidden_state"], opset_version=OPSET,
+            dynamic_axes={n: {0: "batch", 1: "seq"} for n in inputs + ["last_hidden_state"]}, **kwargs,
+        )
+    logging.disable(logging.WARNING)        # the quantizer logs every tensor to the root logger
+    try:
+        quantize_dynamic(os.path.join(tmp, _FILES["onnx"]), os.path.join(tmp, _FILES["onnx-int8"]),
+                         weight_type=QuantType.QInt8)
+    finally:
+        logging.disable(logging.NOTSET)
+
+    reference = st.encode(CHECK_SENTENCES, convert_to_numpy=True, normalize_embeddings=True)
+
+    meta = {
+        "export_version": EXPORT_VERSION,
+        "model":          model_name,
+        "source":         _source_fingerprint(model_name),
+        "revision":       model_revision(st),
+        "max_seq_length": st.max_seq_length,
+        "pooling":        pooling,
+        "normalize":      len(names) > 2,
+        "dim":            int(reference.shape[1]),
+        "inputs":         inputs,
+        "pad_token_id":   tokenizer.pad_token_id or 0,
+        "special_tokens": tokenizer.num_special_tokens_to_add(),
+        "agreement":      {},
+    }
+    for backend in _FILES:
+        cos = np.sum(reference * OnnxEncoder(tmp, meta, backend).encode(CHECK_SENTENCES, normalize_embeddings=True), axis=1)
+        meta["agreement"][backend] = {"min": round(float(cos.min()), 6), "mean": round(float(cos.mean()), 6)}
+    _write_meta(tmp, meta)
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp, path)
+    logger.info(f"encoder: exported {model_name} to {path} in {time.perf_counter() - start:.1f} s  |  "
+                + "  ".join(f"{b} min cosine {a['min']:.4f}" for b, a in meta["agreement"].items()))
+    return meta
+
+
+def check_agreement(model_name: str, backend: str = "onnx-int8",
+                    sentences: Sequence[str] = CHECK_SENTENCES) -> Dict[str, float]:
+    """Cosine agreement of an ONNX backend with PyTorch on sentences: {"min", "mean"}."""
+    from sentence_transformers import SentenceTransformer
+
+    reference = SentenceTransformer(model_name, device="cpu").encode(list(sentences), normalize_embeddings=True)
+    onnx      = OnnxEncoder.load(model_name, backend).encode(list(sentences), normalize_embeddings=True)
+    cos       = np.sum(reference * onnx, axis=1)
+    return {"min": float(cos.min()), "mean": float(cos.mean())}
+
+
+# ── Internals ─────────────────────────────────────────────────────────────────
+
+class _Tokenizer:
+    """
+    What the pipelines use of a HF tokenizer, on the `tokenizers` library
+    alone: batch() for the model inputs, and the HF call / special-token
+    count that rag_common.chunker.token_counter() relies on.
+    """
+
+    def __init__(self, path: str, meta: dict):
+        from tokenizers import Tokenizer
+
+        self.name_or_path     = meta["model"]
+        self.model_max_length = meta["max_seq_length"]
+        self._inputs  = meta["inputs"]
+        self._special = meta["special_tokens"]
+        self._counter = Tokenizer.from_file(os.path.join(path, "tokenizer.json"))
+        self._counter.no_truncation()
+        self._counter.no_padding()
+        self._encoder = Tokenizer.from_file(os.path.join(path, "tokenizer.json"))
+        self._encoder.enable_truncation(meta["max_seq_length"])
+        self._encoder.enable_padding(pad_id=meta["pad_token_id"])
+
+    def __call__(self, texts, add_special_tokens: bool = True, **_) -> dict:
+        encodings = self._counter.encode_batch(list(texts), add_special_tokens=add_special_tokens)
+        return {"input_ids": [e.ids for e in encodings]}
+
+    def num_special_tokens_to_add(self, pair: bool = False) -> int:
+        return self._special
+
+    def batch(self, texts) -> Dict[str, np.ndarray]:
+        """Padded, truncated int64 model inputs for texts."""
+        encodings = self._encoder.encode_batch(list(texts))
+        columns   = {"input_ids": "ids", "attention_mask": "attention_mask", "token_type_ids": "type_ids"}
+        return {name: np.array([getattr(e, columns[name]) for e in encodings], dtype=np.int64)
+                for name in self._inputs}
+
+
+def _pool(hidden: np.ndarray, mask: np.ndarray, mode: str) -> np.ndarray:
+    if mode == "cls":
+        return hidden[:, 0]
+    mask = mask[:, :, None].astype(np.float32)
+    if mode == "max":
+        return np.where(mask > 0, hidden, -1e9).max(axis=1)
+    return (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+
+
+def _pooling_mode(pooling) -> str:
+    mode = getattr(pooling, "pooling_mode", None)
+    if isinstance(mode, str):
+        modes = [mode]
+    else:                                   # sentence-transformers < 6: one flag per mode
+        config = pooling.get_config_dict()
+        modes  = [m for m, key in (("cls", "pooling_mode_cls_token"), ("mean", "pooling_mode_mean_tokens"),
+                                   ("max", "pooling_mode_max_tokens")) if config.get(key)]
+    if len(modes) != 1 or modes[0] not in ("cls", "mean", "max"):
+        raise RuntimeError(f"cannot export pooling {modes}")
+    return modes[0]
+
+
+def _source_fingerprint(model_name: str) -> str:
+    """Cheap id of the model files: hub snapshot ref, or size/mtime of a local model directory."""
+    if os.path.isdir(model_name):
+        digest = hashlib.sha256()
+        for root, dirs, files in os.walk(model_name):
+            dirs.sort()
+            for fname in sorted(files):
+                st = os.stat(os.path.join(root, fname))
+                digest.update(f"{os.path.relpath(os.path.join(root, fname), model_name)}:{st.st_size}:{st.st_mtime_ns}\n".encode())
+        return "dir:" + digest.hexdigest()[:16]
+    repo = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+    hub  = os.getenv("HF_HUB_CACHE") or os.path.join(
+        os.getenv("HF_HOME", os.path.join(os.path.expanduser("~"), ".cache", "huggingface")), "hub")
+    try:
+        with open(os.path.join(hub, "models--" + repo.replace("/", "--"), "refs", "main"), encoding="utf-8") as f:
+            return "hub:" + f.read().strip()
+    except OSError:
+        return "hub:"
+
+
+def _fresh(meta: Optional[dict], model_name: str) -> bool:
+    return bool(meta) and meta.get("export_version") == EXPORT_VERSION \
+        and meta.get("source") == _source_fingerprint(model_name) \
+        and set(meta.get("agreement", {})) == set(_FILES)
+
+
+def _read_meta(path: str) -> Optional[dict]:
+    try:
+        with open(os.path.join(path, "encoder.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(path: str, meta: dict):
+    tmp = os.path.join(path, "encoder.json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=1)
+    os.replace(tmp, os.path.join(path, "encoder.json"))
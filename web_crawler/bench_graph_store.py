@@ -0,0 +1,89 @@
+"""
+Timings for graph_store.GraphStore on synthetic crawl graphs.
+
+For each size: insert every edge through add_edge() (URL strings, as the
+crawlers do), reopen the SQLite file, load the edge arrays, then time
+degrees, PageRank, strongly connected components and GraphML export.
+With --networkx the same graph is also built in networkx and its pagerank /
+SCC timed for comparison; --layout adds spring_layout (only up to 10k).
+
+Usage:
+    python bench_graph_store.py --sizes 10000 100000 --out-degree 8
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from graph_store import GraphStore
+
+
+def synthetic_edges(n, out_degree, seed=0):
+    # Preferential-ish targets: a few hub pages (nav/footer) get most links.
+    rng = np.random.default_rng(seed)
+    src = np.repeat(np.arange(n), out_degree)
+    hubs = rng.integers(0, max(n // 100, 1), size=len(src))
+    local = (src + rng.integers(1, 50, size=len(src))) % n
+    dst = np.where(rng.random(len(src)) < 0.3, hubs, local)
+    return src, dst
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, round(time.perf_counter() - t0, 3)
+
+
+def bench(n, out_degree, with_networkx, with_layout):
+    src, dst = synthetic_edges(n, out_degree)
+    urls = [f"https://site.local/page/{i}.html" for i in range(n)]
+    tmp = tempfile.mkdtemp()
+    db = os.path.join(tmp, "graph.sqlite")
+    row = {"nodes": n, "edges_generated": int(len(src))}
+
+    store = GraphStore(db, reset=True)
+    _, row["insert_s"] = timed(lambda: store.add_edges(
+        (urls[s], urls[d]) for s, d in zip(src.tolist(), dst.tolist())))
+    store.close()
+
+    store = GraphStore(db)
+    _, row["load_s"] = timed(store.edge_arrays)
+    _, row["degrees_s"] = timed(store.degrees)
+    pr, row["pagerank_s"] = timed(store.pagerank)
+    (labels, n_scc), row["scc_s"] = timed(store.strongly_connected_components)
+    _, row["graphml_s"] = timed(lambda: store.export_graphml(os.path.join(tmp, "g.graphml")))
+    row["scc_count"] = int(n_scc)
+    row["db_mb"] = round(os.path.getsize(db) / 1e6, 1)
+
+    if with_networkx:
+        import networkx as nx
+        g = nx.DiGraph()
+        g.add_edges_from(zip(src.tolist(), dst.tolist()))
+        nx_pr, row["nx_pagerank_s"] = timed(lambda: nx.pagerank(g))
+        _, row["nx_scc_s"] = timed(lambda: list(nx.strongly_connected_components(g)))
+        # DB ids follow first-seen order, so map back through the URLs.
+        page_of = [int(u.rsplit("/", 1)[1].split(".")[0]) for u in store.urls(range(len(pr)))]
+        ours = dict(zip(page_of, pr.tolist()))
+        row["pagerank_max_abs_diff_vs_nx"] = float(max(abs(ours[k] - v) for k, v in nx_pr.items()))
+        if with_layout and n <= 10_000:
+            _, row["nx_spring_layout_s"] = timed(lambda: nx.spring_layout(g, seed=42))
+    store.close()
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--out-degree", type=int, default=8)
+    parser.add_argument("--networkx", action="store_true")
+    parser.add_argument("--layout", action="store_true", help="also time nx.spring_layout (slow)")
+    args = parser.parse_args()
+    print(json.dumps([bench(n, args.out_degree, args.networkx, args.layout) for n in args.sizes], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""
+SQLite-backed transition graph for the web crawlers.
+
+Edges are appended to an on-disk edge list while the crawl runs instead of
+being held in a networkx DiGraph, and are only read back (as NumPy arrays)
+when analytics or an export are requested.  Analytics run in O(V + E):
+
+    degrees()                  in/out degree via bincount
+    pagerank()                 power iteration over the edge arrays
+    strongly_connected_components()   iterative Tarjan over a CSR view
+
+For visualisation, export_graphml() streams the graph to a file that Gephi
+(ForceAtlas2) or Graphviz sfdp can lay out at 100k+ nodes, and subgraph()
+returns a small networkx graph of the top-PageRank pages for a quick
+matplotlib plot.
+"""
+
+import os
+import sqlite3
+from xml.sax.saxutils import escape
+
+import numpy as np
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+FLUSH_EVERY = 5000      # buffered edges per INSERT batch
+READ_CHUNK = 100_000    # rows per fetchmany() when loading edges
+
+
+class GraphStore:
+    def __init__(self, path, reset=False):
+        if reset and os.path.exists(path):
+            os.remove(path)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS nodes (
+                id  INTEGER PRIMARY KEY,
+                url TEXT NOT NULL UNIQUE
+            );
+            CREATE TABLE IF NOT EXISTS edges (
+                src INTEGER NOT NULL,
+                dst INTEGER NOT NULL,
+                PRIMARY KEY (src, dst)
+            ) WITHOUT ROWID;
+            """
+        )
+        self._ids = {}
+        self._pending = []
+        self._cache = None
+
+    # -----------------------------
+    # WRITE
+    # -----------------------------
+    def node_id(self, url):
+        nid = self._ids.get(url)
+        if nid is None:
+            row = self.conn.execute("SELECT id FROM nodes WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                nid = self.conn.execute("INSERT INTO nodes (url) VALUES (?)", (url,)).lastrowid
+            else:
+                nid = row[0]
+            self._ids[url] = nid
+        return nid
+
+    def add_node(self, url):
+        self.node_id(url)
+        self._cache = None
+
+    def add_edge(self, src_url, dst_url):
+        self._pending.append((self.node_id(src_url), self.node_id(dst_url)))
+        self._cache = None
+        if len(self._pending) >= FLUSH_EVERY:
+            self.flush()
+
+    def add_edges(self, pairs):
+        for src_url, dst_url in pairs:
+            self.add_edge(src_url, dst_url)
+
+    def flush(self):
+        if self._pending:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO edges (src, dst) VALUES (?, ?)", self._pending
+            )
+            self._pending = []
+        self.conn.commit()
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -----------------------------
+    # READ (lazy)
+    # -----------------------------
+    def number_of_nodes(self):
+        self.flush()
+        return self.conn.execute("SELECT COUNT(*) FROM nodes").fetchone()[0]
+
+    def number_of_edges(self):
+        self.flush()
+        return self.conn.execute("SELECT COUNT(*) FROM edges").fetchone()[0]
+
+    def iter_edges(self):
+        """Yield (src_url, dst_url) pairs without loading the graph."""
+        self.flush()
+        cur = self.conn.execute(
+            "SELECT a.url, b.url FROM edges "
+            "JOIN nodes a ON a.id = edges.src JOIN nodes b ON b.id = edges.dst"
+        )
+        while True:
+            rows = cur.fetchmany(READ_CHUNK)
+            if not rows:
+                break
+            yield from rows
+
+    def urls(self, ids):
+        """Map 0-based node indices (as used by the analytics) back to URLs."""
+        ids = [int(i) + 1 for i in ids]
+        found = {}
+        for start in range(0, len(ids), 900):
+            part = ids[start:start + 900]
+            marks = ",".join("?" * len(part))
+            found.update(self.conn.execute(
+                f"SELECT id, url FROM nodes WHERE id IN ({marks})", part
+            ).fetchall())
+        return [found[i] for i in ids]
+
+    def edge_arrays(self):
+        """Return (n_nodes, src, dst) with 0-based int64 node indices."""
+        if self._cache is None:
+            self.flush()
+            n = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM nodes").fetchone()[0]
+            m = self.number_of_edges()
+            src = np.empty(m, dtype=np.int64)
+            dst = np.empty(m, dtype=np.int64)
+            cur = self.conn.execute("SELECT src, dst FROM edges")
+            pos = 0
+            while True:
+                rows = cur.fetchmany(READ_CHUNK)
+                if not rows:
+                    break
+                block = np.array(rows, dtype=np.int64)
+                src[pos:pos + len(block)] = block[:, 0] - 1
+                dst[pos:pos + len(block)] = block[:, 1] - 1
+                pos += len(block)
+            self._cache = (n, src[:pos], dst[:pos])
+        return self._cache
+
+    # -----------------------------
+    # ANALYTICS
+    # -----------------------------
+    def degrees(self):
+        n, src, dst = self.edge_arrays()
+        return np.bincount(dst, minlength=n), np.bincount(src, minlength=n)
+
+    def pagerank(self, damping=0.85, tol=1e-6, max_iter=100):
+        n, src, dst = self.edge_arrays()
+        if n == 0:
+            return np.zeros(0)
+        out_deg = np.bincount(src, minlength=n).astype(np.float64)
+        dangling = out_deg == 0
+        inv_out = np.divide(1.0, out_deg, out=np.zeros(n), where=~dangling)
+        pr = np.full(n, 1.0 / n)
+        for _ in range(max_iter):
+            spread = np.bincount(dst, weights=(pr * inv_out)[src], minlength=n)
+            new = (1.0 - damping) / n + damping * (spread + pr[dangling].sum() / n)
+            done = np.abs(new - pr).sum() < n * tol
+            pr = new
+            if done:
+                break
+        return pr / pr.sum()
+
+    def strongly_connected_components(self):
+        """Return (labels, count) using an iterative Tarjan over a CSR view."""
+        n, src, dst = self.edge_arrays()
+        order = np.argsort(src, kind="stable")
+        indices = dst[order].tolist()
+        indptr = np.concatenate(([0], np.cumsum(np.bincount(src, minlength=n)))).tolist()
+
+        index = [-1] * n
+        low = [0] * n
+        on_stack = [False] * n
+        labels = [-1] * n
+        stack = []
+        counter = comp = 0
+
+        for root in range(n):
+            if index[root] != -1:
+                continue
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            work = [[root, indptr[root]]]
+            while work:
+                frame = work[-1]
+                v, pos = frame
+                if pos < indptr[v + 1]:
+                    frame[1] = pos + 1
+                    w = indices[pos]
+                    if index[w] == -1:
+                        index[w] = low[w] = counter
+                        counter += 1
+                        stack.append(w)
+                        on_stack[w] = True
+                        work.append([w, indptr[w]])
+                    elif on_stack[w] and index[w] < low[v]:
+                        low[v] = index[w]
+                    continue
+                work.pop()
+                if work:
+                    u = work[-1][0]
+                    if low[v] < low[u]:
+                        low[u] = low[v]
+                if low[v] == index[v]:
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = False
+                        labels[w] = comp
+                        if w == v:
+                            break
+                    comp += 1
+        return np.array(labels, dtype=np.int64), comp
+
+    def summary(self, top=10):
+        in_deg, out_deg = self.degrees()
+        pr = self.pagerank()
+        labels, n_scc = self.strongly_connected_components()
+        top_ids = np.argsort(-pr)[:top]
+        return {
+            "nodes": int(len(pr)),
+            "edges": int(in_deg.sum()),
+            "scc_count": int(n_scc),
+            "largest_scc": int(np.bincount(labels).max()) if len(labels) else 0,
+            "top_pagerank": [
+                {"url": url, "pagerank": round(float(pr[i]), 6),
+                 "in": int(in_deg[i]), "out": int(out_deg[i])}
+                for i, url in zip(top_ids, self.urls(top_ids))
+            ],
+        }
+
+    # -----------------------------
+    # EXPORT / VISUALISATION
+    # -----------------------------
+    def export_graphml(self, path):
+        """Stream the graph as GraphML (with degree + PageRank node attributes)."""
+        in_deg, out_deg = self.degrees()
+        pr = self.pagerank()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                    '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n'
+                    '<key id="url" for="node" attr.name="url" attr.type="string"/>\n'
+                    '<key id="pr" for="node" attr.name="pagerank" attr.type="double"/>\n'
+                    '<key id="in" for="node" attr.name="in_degree" attr.type="int"/>\n'
+                    '<key id="out" for="node" attr.name="out_degree" attr.type="int"/>\n'
+                    '<graph edgedefault="directed">\n')
+            cur = self.conn.execute("SELECT id, url FROM nodes ORDER BY id")
+            for nid, url in cur:
+                i = nid - 1
+                f.write(f'<node id="n{i}"><data key="url">{escape(url)}</data>'
+                        f'<data key="pr">{pr[i]:.8g}</data><data key="in">{in_deg[i]}</data>'
+                        f'<data key="out">{out_deg[i]}</data></node>\n')
+            _, src, dst = self.edge_arrays()
+            for start in range(0, len(src), READ_CHUNK):
+                f.write("".join(
+                    f'<edge source="n{s}" target="n{d}"/>\n'
+                    for s, d in zip(src[start:start + READ_CHUNK].tolist(),
+                                    dst[start:start + READ_CHUNK].tolist())
+                ))
+            f.write("</graph>\n</graphml>\n")
+
+    def subgraph(self, top_n=200):
+        """networkx DiGraph of the top_n pages by PageRank, for plotting."""
+        import networkx as nx
+
+        n, src, dst = self.edge_arrays()
+        keep = np.zeros(n, dtype=bool)
+        top_ids = np.argsort(-self.pagerank())[:top_n]
+        keep[top_ids] = True
+        mask = keep[src] & keep[dst]
+        names = dict(zip(top_ids.tolist(), self.urls(top_ids)))
+        graph = nx.DiGraph()
+        graph.add_nodes_from(names.values())
+        graph.add_edges_from((names[s], names[d]) for s, d in zip(src[mask].tolist(), dst[mask].tolist()))
+        return graph
@@ -4,11 +4,17 @@ from collections import deque
 import networkx as nx
 import matplotlib.pyplot as plt
 
-def build_transition_graph(start_url, max_depth=2):
-    # Use a set to keep track of visited URLs and a queue for BFS
+from graph_store import GraphStore
+
+GRAPH_DB = "transition_graph.sqlite"
+PLOT_TOP_N = 200   # only the top-PageRank pages are drawn
+
+def build_transition_graph(start_url, max_depth=2, store=None):
+    # Use a set to keep track of visited URLs and a queue for BFS.
+    # Edges go straight to the on-disk GraphStore instead of a networkx graph.
     visited_urls = set()
     url_queue = deque([(start_url, 0)])
-    graph = nx.DiGraph()
+    graph = store or GraphStore(GRAPH_DB, reset=True)
 
     while url_queue:
         current_url, depth = url_queue.popleft()
@@ -39,14 +45,20 @@ def build_transition_graph(start_url, max_depth=2):
         except requests.exceptions.RequestException as e:
             print(f"Error crawling {current_url}: {e}")
 
+    graph.flush()
     return graph
 
 
-target_website = "https://seleniumbase.io/" 
-website_graph = build_transition_graph(target_website)
+if __name__ == "__main__":
+    target_website = "https://seleniumbase.io/"
+    website_graph = build_transition_graph(target_website)
+    print(website_graph.summary())
+    website_graph.export_graphml("transition_graph.graphml")
 
-# To visualize the graph using networkx and matplotlib
-plt.figure(figsize=(10, 10))
-pos = nx.spring_layout(website_graph, seed=42) # Positions for all nodes
-nx.draw(website_graph, pos, with_labels=True, node_size=50, font_size=8, arrows=True)
-plt.show()
+    # spring_layout is roughly quadratic, so only the top pages are drawn;
+    # open transition_graph.graphml in Gephi / sfdp for the full graph.
+    sample = website_graph.subgraph(PLOT_TOP_N)
+    plt.figure(figsize=(10, 10))
+    pos = nx.spring_layout(sample, seed=42) # Positions for all nodes
+    nx.draw(sample, pos, with_labels=True, node_size=50, font_size=8, arrows=True)
+    plt.show()
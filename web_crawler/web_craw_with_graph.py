@@ -9,6 +9,8 @@ import json
 import time
 import os
 
+from graph_store import GraphStore
+
 # -----------------------------
 # CONFIG
 # -----------------------------
@@ -21,6 +23,9 @@ PAGE_LOAD_WAIT = 2
 
 OUTPUT_DIR = r"D:/Internship/web_crawler"
 OUTPUT_JSON = os.path.join(OUTPUT_DIR, "clickables.json")
+OUTPUT_GRAPH_DB = os.path.join(OUTPUT_DIR, "transition_graph.sqlite")
+OUTPUT_GRAPHML = os.path.join(OUTPUT_DIR, "transition_graph.graphml")
+PLOT_TOP_N = 200   # spring_layout is ~quadratic: only draw the top-PageRank pages
 
 # -----------------------------
 # HELPER: GET XPATH
@@ -104,7 +109,7 @@ def crawl_and_collect(start_url):
     visited = set()
     queue = deque([(start_url, 0)])
     results = []
-    graph = nx.DiGraph()
+    graph = GraphStore(OUTPUT_GRAPH_DB, reset=True)
 
     print("Selenium crawl started")
 
@@ -145,6 +150,7 @@ def crawl_and_collect(start_url):
             print(f"Error visiting {current_url}: {e}")
 
     driver.quit()
+    graph.flush()
     return results, graph
 
 # -----------------------------
@@ -164,15 +170,24 @@ if __name__ == "__main__":
     print(f" Graph nodes: {graph.number_of_nodes()}")
     print(f" Graph edges: {graph.number_of_edges()}")
 
+    # -----------------------------
+    # GRAPH ANALYTICS + EXPORT
+    # -----------------------------
+    if graph.number_of_nodes() > 0:
+        print(json.dumps(graph.summary(), indent=2))
+        graph.export_graphml(OUTPUT_GRAPHML)
+        print(f" Graph exported to {OUTPUT_GRAPHML} (open in Gephi / sfdp for large graphs)")
+
     # -----------------------------
     # GRAPH VISUALIZATION
     # -----------------------------
     if graph.number_of_nodes() > 0:
+        sample = graph.subgraph(PLOT_TOP_N)
         plt.figure(figsize=(20, 20))
-        pos = nx.spring_layout(graph, seed=42, k=0.15, iterations=60)
+        pos = nx.spring_layout(sample, seed=42, k=0.15, iterations=60)
 
         nx.draw(
-            graph,
+            sample,
             pos,
             with_labels=True,
             node_size=120,